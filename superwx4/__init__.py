@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from .wx import WeChat
+from .aio import AsyncWeChat
 from .param import WxParam, WxResponse
 from .logger import wxlog
 from .moment import Moment
@@ -17,6 +18,7 @@ from .utils.lock import LockManager, uilock
 
 __all__ = [
     "WeChat",
+    "AsyncWeChat",
     "WxParam",
     "WxResponse",
     "wxlog",
@@ -0,0 +1,328 @@
+"""asyncio 接口。
+
+:class:`AsyncWeChat` 把所有 UI 操作放到一个专用 UI 线程中串行执行，对外提供协程方法；
+等待中的调用只是事件循环里的协程和 UI 线程队列里的任务，不占用额外线程。
+取消一个尚未开始执行的调用会把它从 UI 线程队列中移除；已经开始的 UI 操作会执行完毕。
+
+用法::
+
+    async with AsyncWeChat() as wx:
+        await wx.SendMsg('你好', who='文件传输助手')
+        async for msg in wx.messages(chats=['文件传输助手']):
+            print(msg.content)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    TYPE_CHECKING,
+    Union,
+)
+
+from superwx4.logger import wxlog
+from superwx4.param import WxResponse
+from superwx4.wx import Chat, WeChat
+
+if TYPE_CHECKING:
+    from superwx4.msgs.base import Message
+
+
+def _init_ui_thread():
+    try:
+        from superwx4 import uia
+        uia.InitializeUIAutomationInCurrentThread()
+    except Exception as e:
+        wxlog.debug(f'UI 线程初始化 UIAutomation 失败：{e}')
+
+
+class UIThread:
+    """专用 UI 线程
+
+    所有提交的函数在同一个线程中按提交顺序执行，UIA/COM 对象只在该线程中创建和使用。
+
+    Args:
+        name (str): 线程名称
+    """
+
+    def __init__(self, name: str = 'superwx4-ui'):
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=name, initializer=_init_ui_thread
+        )
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """在 UI 线程中同步执行并返回结果"""
+
+        return self._executor.submit(func, *args, **kwargs).result()
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """在 UI 线程中执行并等待结果
+
+        协程被取消时，尚未开始执行的任务会一并取消。
+        """
+
+        future = self._executor.submit(func, *args, **kwargs)
+        # wrap_future 会把 asyncio 侧的取消传递给 concurrent future
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+class _Subscription:
+    __slots__ = ('loop', 'queue', 'chats')
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int, chats: Optional[set]):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.chats = chats
+
+    def put(self, msg: Any) -> None:
+        # 在事件循环线程中执行；订阅者跟不上时丢弃最早的消息
+        if self.queue.full():
+            self.queue.get_nowait()
+            wxlog.debug('异步消息流已满，丢弃最早的消息')
+        self.queue.put_nowait(msg)
+
+
+class AsyncWeChat:
+    """WeChat 的 asyncio 门面
+
+    Args:
+        *args, **kwargs: 传给 :class:`~superwx4.wx.WeChat` 的参数，WeChat 在 UI 线程中创建
+        wx (WeChat, optional): 已有的 WeChat 实例（需在 UI 线程中创建），指定后忽略其它参数
+        ui_thread (UIThread, optional): 复用的 UI 线程
+    """
+
+    def __init__(
+            self,
+            *args,
+            wx: WeChat = None,
+            ui_thread: UIThread = None,
+            **kwargs
+        ):
+        self._ui = ui_thread or UIThread()
+        self.wx: WeChat = wx if wx is not None else self._ui.call(WeChat, *args, **kwargs)
+        self._lock = threading.Lock()
+        self._subscriptions: List[_Subscription] = []
+        self._callbacks: Dict[str, tuple] = {}
+        self._refs: Dict[str, int] = {}
+
+    def __repr__(self):
+        return f'<AsyncWeChat({self.wx!r})>'
+
+    async def __aenter__(self) -> 'AsyncWeChat':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """在 UI 线程中执行任意函数"""
+
+        return await self._ui.run(func, *args, **kwargs)
+
+    async def call(self, method: str, *args, **kwargs) -> Any:
+        """在 UI 线程中调用 WeChat 的任意方法"""
+
+        return await self._ui.run(getattr(self.wx, method), *args, **kwargs)
+
+    # ---- 协程版接口 ----
+
+    async def SendMsg(
+            self,
+            msg: str,
+            who: str = None,
+            clear: bool = True,
+            at: Union[str, List[str]] = None,
+            exact: bool = False,
+            allow_foreground: bool = False,
+        ) -> WxResponse:
+        """发送消息，参数同 :meth:`WeChat.SendMsg`"""
+
+        return await self._ui.run(self.wx.SendMsg, msg, who, clear, at, exact, allow_foreground)
+
+    async def SendFiles(
+            self,
+            filepath,
+            who=None,
+            exact=False,
+            allow_foreground: bool = False,
+        ) -> WxResponse:
+        """发送文件，参数同 :meth:`WeChat.SendFiles`"""
+
+        return await self._ui.run(self.wx.SendFiles, filepath, who, exact, allow_foreground)
+
+    async def GetAllMessage(self) -> List['Message']:
+        """获取当前聊天窗口的所有消息"""
+
+        return await self._ui.run(self.wx.GetAllMessage)
+
+    async def ChatWith(
+            self,
+            who: str,
+            exact: bool = True,
+            force: bool = False,
+            force_wait: Union[float, int] = 0.5
+        ):
+        """打开聊天窗口，参数同 :meth:`WeChat.ChatWith`"""
+
+        return await self._ui.run(self.wx.ChatWith, who, exact, force, force_wait)
+
+    async def GetHistoryMessage(
+            self,
+            n: int = 50,
+            callback: Callable = None,
+            interval: float = 0.5,
+            speed: int = 1,
+            goback: bool = True,
+        ) -> List['Message']:
+        """获取历史消息，参数同 :meth:`WeChat.GetHistoryMessage`
+
+        滚动等待在 UI 线程中进行，期间事件循环不受阻塞。
+        """
+
+        return await self._ui.run(
+            self.wx.GetHistoryMessage, n, callback, interval, speed, goback
+        )
+
+    # ---- 监听 ----
+
+    def _on_message(self, msg: Union['Message', List['Message']], chat: Chat) -> None:
+        # 在监听回调线程中执行
+        who = chat.who
+        msgs = msg if isinstance(msg, list) else [msg]
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            callback = self._callbacks.get(who)
+        for sub in subscriptions:
+            if sub.chats is not None and who not in sub.chats:
+                continue
+            for item in msgs:
+                try:
+                    sub.loop.call_soon_threadsafe(sub.put, item)
+                except RuntimeError:
+                    # 事件循环已关闭
+                    pass
+        if callback is not None:
+            func, loop = callback
+            if loop is not None:
+                asyncio.run_coroutine_threadsafe(func(msg, chat), loop)
+            else:
+                func(msg, chat)
+
+    async def _listen(self, nickname: str) -> Union[Chat, WxResponse]:
+        result = await self._ui.run(self.wx.AddListenChat, nickname, self._on_message)
+        if isinstance(result, WxResponse) and nickname in self.wx.listen:
+            chat, callback = self.wx.listen[nickname]
+            if callback != self._on_message:
+                wxlog.debug(f'聊天已由其它回调监听，消息不会进入异步消息流：{nickname}')
+            return chat
+        return result
+
+    async def AddListenChat(
+            self,
+            nickname: str,
+            callback: Callable[['Message', Chat], Any] = None,
+        ) -> Union[Chat, WxResponse]:
+        """添加监听聊天
+
+        Args:
+            nickname (str): 要监听的聊天对象
+            callback (Callable, optional): 回调函数，可以是普通函数或协程函数；
+                协程函数在调用本方法的事件循环中执行
+
+        Returns:
+            Union[Chat, WxResponse]: 成功时返回 Chat 对象
+        """
+
+        loop = asyncio.get_running_loop() if inspect.iscoroutinefunction(callback) else None
+        result = await self._listen(nickname)
+        if not isinstance(result, WxResponse):
+            with self._lock:
+                self._refs[result.who] = self._refs.get(result.who, 0) + 1
+                if callback is not None:
+                    self._callbacks[result.who] = (callback, loop)
+        return result
+
+    async def RemoveListenChat(self, nickname: str, close_window: bool = False) -> WxResponse:
+        """移除监听聊天"""
+
+        with self._lock:
+            self._refs.pop(nickname, None)
+            self._callbacks.pop(nickname, None)
+        return await self._ui.run(self.wx.RemoveListenChat, nickname, close_window)
+
+    async def _release(self, nickname: str) -> None:
+        with self._lock:
+            refs = self._refs.get(nickname, 0) - 1
+            if refs > 0:
+                self._refs[nickname] = refs
+                return
+            self._refs.pop(nickname, None)
+            if nickname in self._callbacks:
+                return
+        await self._ui.run(self.wx.RemoveListenChat, nickname)
+
+    async def messages(
+            self,
+            chats: Iterable[str] = None,
+            maxsize: int = 1000,
+        ) -> AsyncIterator['Message']:
+        """监听消息流
+
+        Args:
+            chats (Iterable[str], optional): 要监听的聊天，未监听的会自动添加，
+                消息流结束后自动移除；不指定则接收所有已监听聊天的消息
+            maxsize (int): 消息流缓冲上限，订阅者跟不上时丢弃最早的消息
+
+        Yields:
+            Message: 新消息
+        """
+
+        names = None if chats is None else [chats] if isinstance(chats, str) else list(chats)
+        sub = _Subscription(asyncio.get_running_loop(), maxsize, None)
+        added = []
+        with self._lock:
+            self._subscriptions.append(sub)
+        try:
+            if names is not None:
+                resolved = set()
+                for name in names:
+                    chat = await self._listen(name)
+                    if not isinstance(chat, WxResponse):
+                        with self._lock:
+                            self._refs[chat.who] = self._refs.get(chat.who, 0) + 1
+                        added.append(chat.who)
+                        resolved.add(chat.who)
+                    else:
+                        wxlog.debug(f'监听聊天失败：{name} {chat}')
+                sub.chats = resolved
+            while True:
+                yield await sub.queue.get()
+        finally:
+            with self._lock:
+                self._subscriptions.remove(sub)
+            for who in added:
+                try:
+                    await self._release(who)
+                except Exception:
+                    wxlog.debug(f'移除监听聊天失败：{who}')
+
+    async def close(self) -> None:
+        """停止监听并关闭 UI 线程"""
+
+        await self._ui.run(self.wx.StopListening, True)
+        self._ui.shutdown(wait=False)
+
+# 1
@@ -0,0 +1,27 @@
+"""可替换的 UI 后端。
+
+:mod:`~superwx4.backend.protocol` 描述 superwx4 用到的 UIAutomation 接口子集，
+:mod:`~superwx4.backend.memory` 是从 ``dump_ui_tree`` 导出加载的纯 Python 实现，
+:mod:`~superwx4.backend.cached` 提供两种后端通用的批量子控件 / 子树属性读取。
+"""
+
+from .cached import CACHED_PROPERTIES, CachedControl, get_children_cached, get_subtree_cached
+from .protocol import ControlLike, PatternId, RectLike, UIBackend
+from .memory import MemoryAction, MemoryTree, get_tree, load_tree, set_tree
+
+__all__ = [
+    'ControlLike',
+    'RectLike',
+    'UIBackend',
+    'PatternId',
+    'CachedControl',
+    'CACHED_PROPERTIES',
+    'get_children_cached',
+    'get_subtree_cached',
+    'MemoryTree',
+    'MemoryAction',
+    'load_tree',
+    'set_tree',
+    'get_tree',
+]
+# 1
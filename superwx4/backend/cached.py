@@ -0,0 +1,120 @@
+"""批量获取子控件属性。
+
+逐个读取子控件的属性时，每个属性都是一次跨进程调用，列表有 N 个子控件、读 k 个属性就是
+``1 + N + N*k`` 次往返。UIA 的 ``FindAllBuildCache`` 可以在一次调用里取回全部子控件及指定属性，
+``GetChildrenCached`` 把结果包装成 :class:`CachedControl`，``GetSubtreeCached`` 用 ``BuildUpdatedCache``
+一次取回整棵子树：
+
+- 缓存过的属性直接返回，不再访问界面
+- 其它属性和方法（点击、滚动、模式等）交给 ``.control``，即对应的实时控件
+
+缓存是取回那一刻的快照，滚动等操作之后 ``BoundingRectangle`` 等属性需要从 ``.control`` 重新读取。
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+__all__ = ['CACHED_PROPERTIES', 'CachedControl', 'get_children_cached', 'get_subtree_cached']
+
+
+# 默认缓存的属性
+CACHED_PROPERTIES = (
+    'runtimeid',
+    'ControlTypeName',
+    'Name',
+    'ClassName',
+    'AutomationId',
+    'BoundingRectangle',
+)
+
+
+class CachedControl:
+    """子控件的属性快照
+
+    Args:
+        values (Dict[str, Any]): 已缓存的属性
+        source: 底层元素；create 为 None 时就是控件本身
+        create (Callable, optional): 由底层元素创建实时控件，用到时才调用
+    """
+
+    __slots__ = ('_values', '_source', '_create', '_control')
+
+    def __init__(self, values: Dict[str, Any], source: Any, create: Optional[Callable[[Any], Any]] = None):
+        self._values = values
+        self._source = source
+        self._create = create
+        self._control = None if create is not None else source
+
+    @property
+    def control(self) -> Any:
+        """实时控件"""
+        if self._control is None:
+            self._control = self._create(self._source)
+        return self._control
+
+    @property
+    def cached(self) -> Dict[str, Any]:
+        """已缓存的属性"""
+        return self._values
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        values = self._values
+        if name in values:
+            return values[name]
+        return getattr(self.control, name)
+
+    def __repr__(self) -> str:
+        return f'<CachedControl({self._values})>'
+
+
+def get_children_cached(control: Any, properties: Sequence[str] = CACHED_PROPERTIES) -> List[CachedControl]:
+    """获取子控件及其属性
+
+    控件类型实现了 ``GetChildrenCached`` 时一次取回；否则退回 ``GetChildren`` 并逐个读取属性，
+    返回值的用法相同。
+
+    Args:
+        control: 父控件
+        properties (Sequence[str]): 需要缓存的属性
+
+    Returns:
+        List[CachedControl]: 子控件
+    """
+    if getattr(type(control), 'GetChildrenCached', None) is not None:
+        return control.GetChildrenCached(properties)
+    return [
+        CachedControl({name: getattr(child, name) for name in properties}, child)
+        for child in control.GetChildren()
+    ]
+
+
+def get_subtree_cached(
+    control: Any, properties: Sequence[str] = CACHED_PROPERTIES, max_depth: int = 0xFFFFFFFF
+) -> List[Tuple[CachedControl, int]]:
+    """获取全部子孙控件及其属性
+
+    控件类型实现了 ``GetSubtreeCached`` 时一次取回；否则逐层调用 :func:`get_children_cached`，
+    返回值的用法相同。
+
+    Args:
+        control: 根控件，本身不包含在结果中
+        properties (Sequence[str]): 需要缓存的属性
+        max_depth (int): 最大深度，根控件的子控件深度为 1
+
+    Returns:
+        List[Tuple[CachedControl, int]]: 深度优先先序的 ``(控件, 深度)``，与 ``WalkControl`` 的顺序相同
+    """
+    if getattr(type(control), 'GetSubtreeCached', None) is not None:
+        return control.GetSubtreeCached(properties, max_depth)
+    nodes = []
+    stack = [(child, 1) for child in reversed(get_children_cached(control, properties))]
+    while stack:
+        child, depth = stack.pop()
+        nodes.append((child, depth))
+        if depth < max_depth:
+            stack.extend((c, depth + 1) for c in reversed(get_children_cached(child.control, properties)))
+    return nodes
+# 1
@@ -0,0 +1,1026 @@
+"""纯 Python 的内存控件树后端。
+
+实现 :mod:`superwx4.backend.protocol` 中的接口，控件树可以从 ``dump_ui_tree`` 导出的
+JSON 加载，也可以用字典手工构造。设置环境变量 ``SUPERWX4_UI_BACKEND=memory`` 后，
+``superwx4.uia`` 指向本模块，消息解析、会话切换、定位器等代码无需 Windows/COM 即可运行，
+用于在 Linux 上剖析和回放真实会话::
+
+    # SUPERWX4_UI_BACKEND=memory python bench.py
+    from superwx4.backend.memory import load_tree
+    tree = load_tree('.superwx4_repair/dumps/dump_wechat_ui_20250101_120000.json')
+    ...
+    print(tree.calls.most_common(10))
+
+- :attr:`MemoryTree.calls` 统计每种 UIA 调用的次数，对应真实环境中的跨进程往返
+- :attr:`MemoryTree.latency` 为每次调用模拟的耗时（秒）
+- 点击、输入等操作不产生界面变化，只记录到 :attr:`MemoryTree.actions`，
+  需要模拟界面反应时设置 :attr:`MemoryTree.on_action`
+
+Win32 窗口函数（FindWindow 等）不在协议内，不由本模块提供。
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import re
+import threading
+import time
+from collections import Counter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .cached import CACHED_PROPERTIES, CachedControl
+from .protocol import CONTROL_TYPE_NAMES, PatternId
+
+__all__ = [
+    'Rect',
+    'Control',
+    'MemoryTree',
+    'MemoryAction',
+    'PatternId',
+    'ControlTypeNames',
+    'GetRootControl',
+    'ControlFromHandle',
+    'WalkControl',
+    'IsElementInWindow',
+    'RollIntoView',
+    'InitializeUIAutomationInCurrentThread',
+    'load_tree',
+    'set_tree',
+    'get_tree',
+]
+
+SEARCH_INTERVAL = 0.5
+OPERATION_WAIT_TIME = 0.1
+
+ControlTypeNames = dict(CONTROL_TYPE_NAMES)
+_CONTROL_TYPES = {name: type_id for type_id, name in ControlTypeNames.items()}
+
+
+class Rect:
+    """与 ``uiautomation.Rect`` 相同的矩形"""
+
+    def __init__(self, left: int = 0, top: int = 0, right: int = 0, bottom: int = 0):
+        self.left = left
+        self.top = top
+        self.right = right
+        self.bottom = bottom
+
+    def width(self) -> int:
+        return self.right - self.left
+
+    def height(self) -> int:
+        return self.bottom - self.top
+
+    def xcenter(self) -> int:
+        return self.left + self.width() // 2
+
+    def ycenter(self) -> int:
+        return self.top + self.height() // 2
+
+    def contains(self, x: int, y: int) -> bool:
+        return self.left <= x < self.right and self.top <= y < self.bottom
+
+    def __eq__(self, rect):
+        if not isinstance(rect, Rect):
+            return NotImplemented
+        return (self.left, self.top, self.right, self.bottom) == (rect.left, rect.top, rect.right, rect.bottom)
+
+    def __str__(self) -> str:
+        return f'({self.left},{self.top},{self.right},{self.bottom})[{self.width()}x{self.height()}]'
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}{self}'
+
+
+class MemoryAction(NamedTuple):
+    """一次界面操作
+
+    Attributes:
+        action: 操作名称，如 ``Click``、``SendKeys``、``Invoke``
+        runtimeid: 目标控件的 runtimeid
+        name: 目标控件的 Name
+        args: 操作参数
+    """
+
+    action: str
+    runtimeid: str
+    name: str
+    args: tuple
+
+
+# ---- 模式 ----
+
+class _Pattern:
+    name = ''
+
+    def __init__(self, element: '_Element'):
+        self._element = element
+        self._state: Dict[str, Any] = element.patterns[self.name]
+
+    def _record(self, action: str, *args) -> None:
+        self._element.tree._record(action, self._element, args)
+
+
+class InvokePattern(_Pattern):
+    name = 'Invoke'
+
+    def Invoke(self, waitTime: float = OPERATION_WAIT_TIME) -> bool:
+        self._record('Invoke')
+        return True
+
+
+class ValuePattern(_Pattern):
+    name = 'Value'
+
+    @property
+    def Value(self) -> str:
+        return self._state.get('Value', '')
+
+    @property
+    def IsReadOnly(self) -> bool:
+        return bool(self._state.get('IsReadOnly', False))
+
+    def SetValue(self, value: str, waitTime: float = OPERATION_WAIT_TIME) -> bool:
+        self._state['Value'] = value
+        self._record('SetValue', value)
+        return True
+
+
+class TogglePattern(_Pattern):
+    name = 'Toggle'
+
+    @property
+    def ToggleState(self) -> int:
+        return self._state.get('ToggleState', 0)
+
+    def Toggle(self, waitTime: float = OPERATION_WAIT_TIME) -> bool:
+        self._state['ToggleState'] = 0 if self.ToggleState else 1
+        self._record('Toggle')
+        return True
+
+
+class ScrollItemPattern(_Pattern):
+    name = 'ScrollItem'
+
+    def ScrollIntoView(self, waitTime: float = OPERATION_WAIT_TIME) -> bool:
+        self._record('ScrollIntoView')
+        return True
+
+
+class ExpandCollapsePattern(_Pattern):
+    name = 'ExpandCollapse'
+
+    @property
+    def ExpandCollapseState(self) -> int:
+        return self._state.get('ExpandCollapseState', 0)
+
+    def Expand(self, waitTime: float = OPERATION_WAIT_TIME) -> bool:
+        self._state['ExpandCollapseState'] = 1
+        self._record('Expand')
+        return True
+
+    def Collapse(self, waitTime: float = OPERATION_WAIT_TIME) -> bool:
+        self._state['ExpandCollapseState'] = 0
+        self._record('Collapse')
+        return True
+
+
+class SelectionItemPattern(_Pattern):
+    name = 'SelectionItem'
+
+    @property
+    def IsSelected(self) -> bool:
+        return bool(self._state.get('IsSelected', False))
+
+    def Select(self, waitTime: float = OPERATION_WAIT_TIME) -> bool:
+        self._state['IsSelected'] = True
+        self._record('Select')
+        return True
+
+
+class ScrollPattern(_Pattern):
+    name = 'Scroll'
+
+    @property
+    def VerticalScrollPercent(self) -> float:
+        return self._state.get('VerticalScrollPercent', 100.0)
+
+    @property
+    def HorizontalScrollPercent(self) -> float:
+        return self._state.get('HorizontalScrollPercent', 0.0)
+
+    @property
+    def VerticallyScrollable(self) -> bool:
+        return bool(self._state.get('VerticallyScrollable', True))
+
+    def SetScrollPercent(self, horizontalPercent: float, verticalPercent: float,
+                         waitTime: float = OPERATION_WAIT_TIME) -> bool:
+        if horizontalPercent >= 0:
+            self._state['HorizontalScrollPercent'] = horizontalPercent
+        if verticalPercent >= 0:
+            self._state['VerticalScrollPercent'] = verticalPercent
+        self._record('SetScrollPercent', horizontalPercent, verticalPercent)
+        return True
+
+
+class LegacyIAccessiblePattern(_Pattern):
+    name = 'LegacyIAccessible'
+
+    @property
+    def Name(self) -> str:
+        return self._state.get('Name', self._element.name)
+
+    @property
+    def Value(self) -> str:
+        return self._state.get('Value', '')
+
+    @property
+    def Description(self) -> str:
+        return self._state.get('Description', '')
+
+    @property
+    def Role(self) -> int:
+        return self._state.get('Role', 0)
+
+    @property
+    def State(self) -> int:
+        return self._state.get('State', 0)
+
+    @property
+    def DefaultAction(self) -> str:
+        return self._state.get('DefaultAction', '')
+
+    def DoDefaultAction(self) -> None:
+        self._record('DoDefaultAction')
+
+
+_PATTERNS = {
+    PatternId.InvokePattern: InvokePattern,
+    PatternId.ValuePattern: ValuePattern,
+    PatternId.ScrollPattern: ScrollPattern,
+    PatternId.ExpandCollapsePattern: ExpandCollapsePattern,
+    PatternId.SelectionItemPattern: SelectionItemPattern,
+    PatternId.TogglePattern: TogglePattern,
+    PatternId.ScrollItemPattern: ScrollItemPattern,
+    PatternId.LegacyIAccessiblePattern: LegacyIAccessiblePattern,
+}
+
+# 导出的 JSON 不含模式信息，按控件类型给出 UIA 通常提供的模式
+_DEFAULT_PATTERNS = {
+    'ButtonControl': ('Invoke',),
+    'HyperlinkControl': ('Invoke',),
+    'MenuItemControl': ('Invoke',),
+    'SplitButtonControl': ('Invoke', 'ExpandCollapse'),
+    'EditControl': ('Value',),
+    'ComboBoxControl': ('Value', 'ExpandCollapse'),
+    'CheckBoxControl': ('Toggle',),
+    'ListControl': ('Scroll',),
+    'ListItemControl': ('SelectionItem', 'ScrollItem'),
+    'TabItemControl': ('SelectionItem',),
+    'TreeItemControl': ('SelectionItem', 'ScrollItem', 'ExpandCollapse'),
+}
+
+
+# ---- 控件树 ----
+
+class _Element:
+    """内存中的 UIA 元素，对应 IUIAutomationElement"""
+
+    __slots__ = (
+        'tree', 'control_type', 'class_name', 'automation_id', 'name', 'rect',
+        'children', 'parent', 'runtime_id', 'handle', 'process_id', 'patterns', 'properties',
+    )
+
+    def __init__(self, tree: 'MemoryTree', node: Dict[str, Any], runtime_id: List[int]):
+        self.tree = tree
+        self.children: List[_Element] = []
+        self.parent: Optional[_Element] = None
+        self.runtime_id = list(node.get('RuntimeId') or runtime_id)
+        self.update(node)
+        self.patterns: Dict[str, Dict[str, Any]] = {'LegacyIAccessible': {}}
+        for name in _DEFAULT_PATTERNS.get(ControlTypeNames[self.control_type], ()):
+            self.patterns[name] = {}
+        for name, state in (node.get('Patterns') or {}).items():
+            if state is None:
+                self.patterns.pop(name, None)
+            else:
+                self.patterns[name] = dict(state)
+
+    def update(self, node: Dict[str, Any]) -> None:
+        """用节点字典重设属性（不含子节点、RuntimeId 与模式）"""
+
+        type_name = node.get('ControlType') or 'CustomControl'
+        self.control_type = _CONTROL_TYPES.get(type_name, _CONTROL_TYPES['CustomControl'])
+        self.class_name = node.get('ClassName', '')
+        self.automation_id = node.get('AutomationId', '')
+        self.name = node.get('Name', '')
+        r = node.get('Rect') or {}
+        self.rect = Rect(r.get('left', 0), r.get('top', 0), r.get('right', 0), r.get('bottom', 0))
+        self.handle = int(node.get('NativeWindowHandle', 0) or 0)
+        self.process_id = int(node.get('ProcessId', 0) or 0)
+        self.properties = {
+            k: v for k, v in node.items()
+            if k not in ('depth', 'ControlType', 'ClassName', 'AutomationId', 'Name', 'Rect',
+                         'RuntimeId', 'NativeWindowHandle', 'ProcessId', 'Patterns', 'children')
+        }
+
+    @property
+    def type_name(self) -> str:
+        return ControlTypeNames[self.control_type]
+
+    def alive(self) -> bool:
+        element = self
+        while element.parent is not None:
+            element = element.parent
+        return element is self.tree.root_element
+
+    def top_level(self) -> Optional['_Element']:
+        element = self
+        while element.parent is not None and element.parent is not self.tree.root_element:
+            element = element.parent
+        return element if element.parent is not None else None
+
+    def to_dict(self, depth: int = 0, max_depth: int = 0xFFFFFFFF, runtime_ids: bool = True) -> Dict[str, Any]:
+        node: Dict[str, Any] = {
+            'depth': depth,
+            'ControlType': self.type_name,
+            'ClassName': self.class_name,
+            'AutomationId': self.automation_id,
+            'Name': self.name,
+            'Rect': {'left': self.rect.left, 'top': self.rect.top,
+                     'right': self.rect.right, 'bottom': self.rect.bottom},
+        }
+        if runtime_ids:
+            node['RuntimeId'] = list(self.runtime_id)
+        if self.handle:
+            node['NativeWindowHandle'] = self.handle
+        if self.process_id:
+            node['ProcessId'] = self.process_id
+        node.update(self.properties)
+        if self.children and depth < max_depth:
+            node['children'] = [c.to_dict(depth + 1, max_depth, runtime_ids) for c in self.children]
+        return node
+
+
+class MemoryTree:
+    """内存控件树
+
+    根节点是桌面，``load`` 的每个导出文件作为一个顶层窗口挂在桌面下。
+
+    Args:
+        latency (float): 每次 UIA 调用模拟的耗时（秒），0 表示不等待
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self.actions: List[MemoryAction] = []
+        self.on_action: Optional[Callable[[MemoryAction], None]] = None
+        self.focused: Optional[_Element] = None
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._handles = itertools.count(0x10010)
+        self.root_element = self._build(
+            {'ControlType': 'PaneControl', 'ClassName': '#32769', 'Name': '桌面'}, None
+        )
+
+    def __repr__(self):
+        return f'<MemoryTree({len(self.root_element.children)} windows)>'
+
+    @property
+    def root(self) -> 'Control':
+        return Control(element=self.root_element)
+
+    def _build(self, node: Dict[str, Any], parent: Optional[_Element], attach: bool = True) -> _Element:
+        element = _Element(self, node, [42, next(self._ids)])
+        if parent is not None:
+            element.parent = parent
+            if attach:
+                parent.children.append(element)
+            if parent is self.root_element and not element.handle:
+                element.handle = next(self._handles)
+        for child in node.get('children', ()):
+            self._build(child, element)
+        return element
+
+    def add(self, node: Dict[str, Any], parent: 'Control' = None, index: int = None) -> 'Control':
+        """把 ``dump_ui_tree`` 格式的节点（含子节点）挂到 parent 下
+
+        Args:
+            node (dict): 节点，键同导出的 JSON；可额外指定 RuntimeId、NativeWindowHandle、
+                ProcessId，以及 Patterns（模式名 -> 状态，如 ``{"Value": {"Value": "你好"}}``，
+                值为 null 表示不支持该模式）
+            parent (Control, optional): 父控件，默认桌面
+            index (int, optional): 插入位置，默认追加到末尾
+
+        Returns:
+            Control: 新节点
+        """
+
+        with self._lock:
+            parent_element = self.root_element if parent is None else parent.Element
+            element = self._build(node, parent_element)
+            if index is not None:
+                parent_element.children.remove(element)
+                parent_element.children.insert(index, element)
+        return Control(element=element)
+
+    def load(self, source: Union[str, Dict[str, Any]]) -> 'Control':
+        """加载一个导出文件作为顶层窗口
+
+        Args:
+            source (str | dict): ``dump_ui_tree`` 生成的 JSON 文件路径，或已解析的字典
+
+        Returns:
+            Control: 顶层窗口
+        """
+
+        if isinstance(source, str):
+            with open(source, encoding='utf-8') as f:
+                source = json.load(f)
+        return self.add(source)
+
+    def remove(self, control: 'Control') -> None:
+        """从树中移除控件，之后该控件 ``Exists()`` 为 False"""
+
+        with self._lock:
+            element = control.Element
+            if element.parent is not None:
+                element.parent.children.remove(element)
+                element.parent = None
+
+    def dump(
+            self,
+            control: 'Control' = None,
+            max_depth: int = 0xFFFFFFFF,
+            runtime_ids: bool = True
+        ) -> Dict[str, Any]:
+        """把子树导出为可重新 ``load`` 的字典
+
+        Args:
+            control (Control, optional): 子树的根，默认桌面
+            max_depth (int): 最大深度
+            runtime_ids (bool): 是否包含 RuntimeId，与 ``dump_ui_tree`` 比较时应为 False
+        """
+
+        element = self.root_element if control is None else control.Element
+        return element.to_dict(max_depth=max_depth, runtime_ids=runtime_ids)
+
+    def patch(self, control: 'Control', patch: Optional[Dict[str, Any]]) -> None:
+        """原地应用 :func:`superwx4.backend.recording.diff_tree` 生成的差异
+
+        未变化的子节点保留原来的元素（runtimeid 不变），和真实界面中列表增量刷新的表现一致。
+
+        Args:
+            control (Control): 差异的根节点
+            patch (dict): 差异，None 表示无变化
+        """
+
+        if patch is None:
+            return
+        with self._lock:
+            self._patch(control.Element, patch)
+
+    def _patch(self, element: _Element, patch: Dict[str, Any]) -> None:
+        if 'p' in patch or 'x' in patch:
+            props = element.to_dict(max_depth=0, runtime_ids=False)
+            for key in patch.get('x', ()):
+                props.pop(key, None)
+            props.update(patch.get('p', {}))
+            element.update(props)
+        if 'c' not in patch:
+            return
+        old = element.children
+        children: List[_Element] = []
+        for op in patch['c']:
+            if op[0] == '=':
+                children.extend(old[op[1]:op[2]])
+            elif op[0] == '~':
+                child = old[op[1]]
+                self._patch(child, op[2])
+                children.append(child)
+            else:
+                children.extend(self._build(node, element, attach=False) for node in op[1])
+        kept = {id(c) for c in children}
+        for child in old:
+            if id(child) not in kept:
+                child.parent = None
+        # 整体替换列表，读取方不会看到修改到一半的子节点
+        element.children = children
+
+    def from_handle(self, handle: int) -> Optional['Control']:
+        for element in self.root_element.children:
+            if element.handle == handle:
+                return Control(element=element)
+        for element, _ in _walk_elements(self.root_element):
+            if element.handle == handle:
+                return Control(element=element)
+        return None
+
+    def reset_stats(self) -> None:
+        self.calls.clear()
+        self.actions.clear()
+
+    def _call(self, name: str) -> None:
+        self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _record(self, action: str, element: _Element, args: tuple) -> None:
+        record = MemoryAction(action, ''.join(str(i) for i in element.runtime_id), element.name, args)
+        self.actions.append(record)
+        if self.on_action is not None:
+            self.on_action(record)
+
+
+def _walk_elements(element: _Element, max_depth: int = 0xFFFFFFFF) -> Iterator[Tuple[_Element, int]]:
+    stack = [(child, 1) for child in reversed(element.children)]
+    while stack:
+        element, depth = stack.pop()
+        yield element, depth
+        if depth < max_depth:
+            stack.extend((child, depth + 1) for child in reversed(element.children))
+
+
+# ---- 控件 ----
+
+def _property(name: str, getter: Callable[[_Element], Any]):
+    def fget(self: 'Control'):
+        element = self.Element
+        element.tree._call(name)
+        return getter(element)
+    return property(fget)
+
+
+# 可以由 GetChildrenCached 缓存的属性，与 uiautomation 相同
+_CACHED_READERS: Dict[str, Callable[[_Element], Any]] = {
+    'runtimeid': lambda e: ''.join(str(i) for i in e.runtime_id),
+    'ControlType': lambda e: e.control_type,
+    'ControlTypeName': lambda e: e.type_name,
+    'Name': lambda e: e.name,
+    'ClassName': lambda e: e.class_name,
+    'AutomationId': lambda e: e.automation_id,
+    'BoundingRectangle': lambda e: Rect(e.rect.left, e.rect.top, e.rect.right, e.rect.bottom),
+    'NativeWindowHandle': lambda e: e.handle,
+    'ProcessId': lambda e: e.process_id,
+    'IsEnabled': lambda e: e.properties.get('IsEnabled', True),
+    'IsOffscreen': lambda e: e.properties.get('IsOffscreen', False),
+}
+
+
+class Control:
+    """内存控件，参数与 ``uiautomation.Control`` 相同
+
+    指定 element 时直接包装该元素；否则按 searchProperties 从 searchFromControl 开始深度优先查找，
+    找到后缓存。查找只进行一次，不等待（内存树不会自己变化）。
+
+    Args:
+        searchFromControl (Control, optional): 查找起点，默认桌面
+        searchDepth (int): 最大查找深度
+        searchInterval (float): 兼容参数，不使用
+        foundIndex (int): 返回第几个匹配的控件，从 1 开始
+        element: 直接包装的元素
+        **searchProperties: ControlType、ClassName、AutomationId、Name、SubName、RegexName、Depth、Compare
+    """
+
+    def __init__(
+            self,
+            searchFromControl: 'Control' = None,
+            searchDepth: int = 0xFFFFFFFF,
+            searchInterval: float = SEARCH_INTERVAL,
+            foundIndex: int = 1,
+            element: _Element = None,
+            **searchProperties
+        ):
+        self._element = element
+        self._direct = element is not None
+        self.searchFromControl = searchFromControl
+        self.searchDepth = searchProperties.get('Depth', searchDepth)
+        self.foundIndex = foundIndex
+        self.searchProperties = searchProperties
+        self.regexName = re.compile(searchProperties['RegexName']) if 'RegexName' in searchProperties else None
+
+    def __repr__(self):
+        if self._element is None:
+            return f'<Control(unresolved {self.searchProperties})>'
+        e = self._element
+        return f'<Control({e.type_name} ClassName={e.class_name!r} Name={e.name!r} rid={self.runtimeid})>'
+
+    def __eq__(self, other):
+        if not isinstance(other, Control):
+            return NotImplemented
+        try:
+            return self.Element is other.Element
+        except LookupError:
+            return False
+
+    def __hash__(self):
+        return id(self._element) if self._element is not None else id(self)
+
+    def __bool__(self):
+        return True
+
+    @property
+    def tree(self) -> MemoryTree:
+        if self._element is not None:
+            return self._element.tree
+        if self.searchFromControl is not None:
+            return self.searchFromControl.tree
+        return get_tree()
+
+    # ---- 查找 ----
+
+    def _compare(self, element: _Element, depth: int) -> bool:
+        for key, value in self.searchProperties.items():
+            if key == 'ControlType':
+                if _CONTROL_TYPES.get(value, value) != element.control_type:
+                    return False
+            elif key == 'ClassName':
+                if value != element.class_name:
+                    return False
+            elif key == 'AutomationId':
+                if value != element.automation_id:
+                    return False
+            elif key == 'Depth':
+                if value != depth:
+                    return False
+            elif key == 'Name':
+                if value != element.name:
+                    return False
+            elif key == 'SubName':
+                if value not in element.name:
+                    return False
+            elif key == 'RegexName':
+                if not self.regexName.match(element.name):
+                    return False
+            elif key == 'Compare':
+                if not value(Control(element=element), depth):
+                    return False
+        return True
+
+    def _search(self) -> Optional[_Element]:
+        start = self.searchFromControl.Element if self.searchFromControl is not None \
+            else get_tree().root_element
+        start.tree._call('FindControl')
+        found = 0
+        for element, depth in _walk_elements(start, self.searchDepth):
+            if self._compare(element, depth):
+                found += 1
+                if found == self.foundIndex:
+                    return element
+        return None
+
+    @property
+    def Element(self) -> _Element:
+        """底层元素；查找不到时抛出 LookupError"""
+
+        if self._element is None:
+            self._element = self._search()
+            if self._element is None:
+                raise LookupError(f'Find Control Timeout: {self.searchProperties}')
+        return self._element
+
+    def Exists(self, maxSearchSeconds: float = 5, searchIntervalSeconds: float = SEARCH_INTERVAL,
+               printIfNotExist: bool = False) -> bool:
+        if self._direct:
+            self._element.tree._call('Exists')
+            return self._element.alive()
+        try:
+            if self.searchFromControl is not None and not self.searchFromControl.Exists(0):
+                return False
+            self._element = self._search()
+        except LookupError:
+            self._element = None
+        return self._element is not None
+
+    def Refind(self, maxSearchSeconds: float = 5, searchIntervalSeconds: float = SEARCH_INTERVAL,
+               raiseException: bool = True) -> bool:
+        if not self.Exists(maxSearchSeconds) and raiseException:
+            raise LookupError(f'Find Control Timeout: {self.searchProperties}')
+        return self._element is not None
+
+    def Control(self, searchDepth: int = 0xFFFFFFFF, searchInterval: float = SEARCH_INTERVAL,
+                foundIndex: int = 1, element=None, **searchProperties) -> 'Control':
+        return Control(self, searchDepth, searchInterval, foundIndex, element, **searchProperties)
+
+    # ---- 属性 ----
+
+    Name = _property('Name', lambda e: e.name)
+    ClassName = _property('ClassName', lambda e: e.class_name)
+    AutomationId = _property('AutomationId', lambda e: e.automation_id)
+    ControlType = _property('ControlType', lambda e: e.control_type)
+    ControlTypeName = _property('ControlTypeName', lambda e: e.type_name)
+    LocalizedControlType = _property('LocalizedControlType', lambda e: e.type_name[:-len('Control')].lower())
+    ProcessId = _property('ProcessId', lambda e: e.process_id)
+    NativeWindowHandle = _property('NativeWindowHandle', lambda e: e.handle)
+    IsEnabled = _property('IsEnabled', lambda e: e.properties.get('IsEnabled', True))
+    IsOffscreen = _property('IsOffscreen', lambda e: e.properties.get('IsOffscreen', False))
+    IsKeyboardFocusable = _property('IsKeyboardFocusable', lambda e: e.properties.get('IsKeyboardFocusable', True))
+    HasKeyboardFocus = _property('HasKeyboardFocus', lambda e: e.tree.focused is e)
+
+    @property
+    def BoundingRectangle(self) -> Rect:
+        element = self.Element
+        element.tree._call('BoundingRectangle')
+        r = element.rect
+        return Rect(r.left, r.top, r.right, r.bottom)
+
+    def GetRuntimeId(self) -> List[int]:
+        element = self.Element
+        element.tree._call('GetRuntimeId')
+        return list(element.runtime_id)
+
+    @property
+    def runtimeid(self) -> str:
+        return ''.join(str(i) for i in self.GetRuntimeId())
+
+    @staticmethod
+    def CreateControlFromElement(element: _Element) -> 'Control':
+        """直接包装元素，与 ``uiautomation.Control.CreateControlFromElement`` 对应"""
+        return Control(element=element)
+
+    # ---- 树导航 ----
+
+    def _wrap(self, element: Optional[_Element]) -> Optional['Control']:
+        return None if element is None else Control(element=element)
+
+    def GetChildren(self) -> List['Control']:
+        element = self.Element
+        element.tree._call('GetChildren')
+        return [Control(element=child) for child in element.children]
+
+    def GetChildrenCached(self, properties: Iterable[str] = CACHED_PROPERTIES) -> List[CachedControl]:
+        """一次调用取回子控件及指定属性，计为一次 ``GetChildrenCached`` 调用"""
+        properties = tuple(properties)
+        for name in properties:
+            if name not in _CACHED_READERS:
+                raise ValueError(f'property {name} can not be cached')
+        element = self.Element
+        element.tree._call('GetChildrenCached')
+        return [
+            CachedControl({name: _CACHED_READERS[name](child) for name in properties}, child, _wrap_element)
+            for child in element.children
+        ]
+
+    def GetSubtreeCached(self, properties: Iterable[str] = CACHED_PROPERTIES,
+                         maxDepth: int = 0xFFFFFFFF) -> List[Tuple[CachedControl, int]]:
+        """一次调用取回全部子孙控件及指定属性，按深度优先先序返回 ``(控件, 深度)``，计为一次 ``GetSubtreeCached`` 调用"""
+        properties = tuple(properties)
+        for name in properties:
+            if name not in _CACHED_READERS:
+                raise ValueError(f'property {name} can not be cached')
+        element = self.Element
+        element.tree._call('GetSubtreeCached')
+        nodes = []
+        stack = [(child, 1) for child in reversed(element.children)]
+        while stack:
+            child, depth = stack.pop()
+            nodes.append((CachedControl({name: _CACHED_READERS[name](child) for name in properties}, child, _wrap_element), depth))
+            if depth < maxDepth:
+                stack.extend((c, depth + 1) for c in reversed(child.children))
+        return nodes
+
+    def GetParentControl(self) -> Optional['Control']:
+        element = self.Element
+        element.tree._call('GetParentControl')
+        return self._wrap(element.parent)
+
+    def GetFirstChildControl(self) -> Optional['Control']:
+        element = self.Element
+        element.tree._call('GetFirstChildControl')
+        return self._wrap(element.children[0] if element.children else None)
+
+    def GetLastChildControl(self) -> Optional['Control']:
+        element = self.Element
+        element.tree._call('GetLastChildControl')
+        return self._wrap(element.children[-1] if element.children else None)
+
+    def _sibling(self, offset: int) -> Optional[_Element]:
+        element = self.Element
+        if element.parent is None:
+            return None
+        siblings = element.parent.children
+        index = next(i for i, e in enumerate(siblings) if e is element) + offset
+        return siblings[index] if 0 <= index < len(siblings) else None
+
+    def GetNextSiblingControl(self) -> Optional['Control']:
+        self.Element.tree._call('GetNextSiblingControl')
+        return self._wrap(self._sibling(1))
+
+    def GetPreviousSiblingControl(self) -> Optional['Control']:
+        self.Element.tree._call('GetPreviousSiblingControl')
+        return self._wrap(self._sibling(-1))
+
+    def GetSiblingControl(self, condition: Callable[['Control'], bool], forward: bool = True) -> Optional['Control']:
+        control = self.GetNextSiblingControl() if forward else self.GetPreviousSiblingControl()
+        while control is not None:
+            if condition(control):
+                return control
+            control = control.GetNextSiblingControl() if forward else control.GetPreviousSiblingControl()
+        return None
+
+    def GetAncestorControl(self, condition: Callable[['Control', int], bool]) -> Optional['Control']:
+        ancestor = self
+        depth = 0
+        while True:
+            ancestor = ancestor.GetParentControl()
+            depth -= 1
+            if ancestor is None:
+                return None
+            if condition(ancestor, depth):
+                return ancestor
+
+    def GetTopLevelControl(self) -> Optional['Control']:
+        element = self.Element
+        element.tree._call('GetTopLevelControl')
+        return self._wrap(element.top_level())
+
+    # ---- 模式 ----
+
+    def GetPattern(self, patternId: int):
+        element = self.Element
+        element.tree._call('GetPattern')
+        cls = _PATTERNS.get(patternId)
+        if cls is None or cls.name not in element.patterns:
+            return None
+        return cls(element)
+
+    def GetInvokePattern(self) -> Optional[InvokePattern]:
+        return self.GetPattern(PatternId.InvokePattern)
+
+    def GetValuePattern(self) -> Optional[ValuePattern]:
+        return self.GetPattern(PatternId.ValuePattern)
+
+    def GetScrollPattern(self) -> Optional[ScrollPattern]:
+        return self.GetPattern(PatternId.ScrollPattern)
+
+    def GetExpandCollapsePattern(self) -> Optional[ExpandCollapsePattern]:
+        return self.GetPattern(PatternId.ExpandCollapsePattern)
+
+    def GetSelectionItemPattern(self) -> Optional[SelectionItemPattern]:
+        return self.GetPattern(PatternId.SelectionItemPattern)
+
+    def GetTogglePattern(self) -> Optional[TogglePattern]:
+        return self.GetPattern(PatternId.TogglePattern)
+
+    def GetScrollItemPattern(self) -> Optional[ScrollItemPattern]:
+        return self.GetPattern(PatternId.ScrollItemPattern)
+
+    def GetLegacyIAccessiblePattern(self) -> Optional[LegacyIAccessiblePattern]:
+        return self.GetPattern(PatternId.LegacyIAccessiblePattern)
+
+    # ---- 操作 ----
+
+    def _act(self, action: str, *args) -> None:
+        element = self.Element
+        element.tree._call(action)
+        element.tree._record(action, element, args)
+
+    def SetFocus(self) -> bool:
+        self._act('SetFocus')
+        self._element.tree.focused = self._element
+        return True
+
+    def SendKeys(self, text: str, interval: float = 0.01, waitTime: float = OPERATION_WAIT_TIME,
+                 charMode: bool = True) -> None:
+        self._act('SendKeys', text)
+
+
+def _wrap_element(element: _Element) -> Control:
+    return Control(element=element)
+
+
+def _action(name: str):
+    def method(self: Control, *args, **kwargs) -> None:
+        self._act(name, *args, *kwargs.items())
+    method.__name__ = name
+    return method
+
+
+for _name in (
+    'Click', 'RightClick', 'DoubleClick', 'MiddleClick', 'WheelUp', 'WheelDown',
+    'MoveCursorToMyCenter', 'Show', 'Hide', 'SwitchToThisWindow', 'SetActive', 'SetTopmost',
+    'Maximize', 'Minimize', 'Restore', 'MoveWindow',
+):
+    setattr(Control, _name, _action(_name))
+
+
+def _finder(type_name: str):
+    def method(self: Control, searchDepth: int = 0xFFFFFFFF, searchInterval: float = SEARCH_INTERVAL,
+               foundIndex: int = 1, element=None, **searchProperties) -> Control:
+        searchProperties['ControlType'] = type_name
+        return Control(self, searchDepth, searchInterval, foundIndex, element, **searchProperties)
+    method.__name__ = type_name
+    return method
+
+
+# ButtonControl(...)、ListControl(...) 等按类型查找
+for _name in CONTROL_TYPE_NAMES.values():
+    setattr(Control, _name, _finder(_name))
+
+
+# ---- 模块函数 ----
+
+_tree: Optional[MemoryTree] = None
+_tree_lock = threading.Lock()
+
+
+def get_tree() -> MemoryTree:
+    """当前使用的控件树，尚未设置时创建一棵空树"""
+
+    global _tree
+    with _tree_lock:
+        if _tree is None:
+            _tree = MemoryTree()
+        return _tree
+
+
+def set_tree(tree: MemoryTree) -> MemoryTree:
+    """设置当前使用的控件树"""
+
+    global _tree
+    with _tree_lock:
+        _tree = tree
+    return tree
+
+
+def load_tree(*sources: Union[str, Dict[str, Any]], latency: float = 0.0) -> MemoryTree:
+    """从导出文件创建控件树并设为当前树
+
+    Args:
+        *sources: ``dump_ui_tree`` 生成的 JSON 文件路径或字典，每个作为一个顶层窗口
+        latency (float): 每次 UIA 调用模拟的耗时（秒）
+
+    Returns:
+        MemoryTree: 新的控件树
+    """
+
+    tree = MemoryTree(latency)
+    for source in sources:
+        tree.load(source)
+    return set_tree(tree)
+
+
+def GetRootControl() -> Control:
+    return get_tree().root
+
+
+def ControlFromHandle(handle: int) -> Optional[Control]:
+    return get_tree().from_handle(handle)
+
+
+def InitializeUIAutomationInCurrentThread() -> None:
+    pass
+
+
+def WalkControl(control: Control, includeTop: bool = False, maxDepth: int = 0xFFFFFFFF):
+    """与 ``uiautomation.WalkControl`` 相同，逐个获取首个子控件和下一个兄弟控件"""
+
+    if includeTop:
+        yield control, 0
+    if maxDepth <= 0:
+        return
+    depth = 0
+    child = control.GetFirstChildControl()
+    controlList = [child]
+    while depth >= 0:
+        lastControl = controlList[-1]
+        if lastControl:
+            yield lastControl, depth + 1
+            child = lastControl.GetNextSiblingControl()
+            controlList[depth] = child
+            if depth + 1 < maxDepth:
+                child = lastControl.GetFirstChildControl()
+                if child:
+                    depth += 1
+                    controlList.append(child)
+        else:
+            del controlList[depth]
+            depth -= 1
+
+
+def IsElementInWindow(win: Control, ele: Control, bias: int = 0) -> bool:
+    """判断元素是否在窗口内（仅垂直方向）"""
+
+    win_rect = win.BoundingRectangle
+    ele_rect = ele.BoundingRectangle
+    return win_rect.top + bias <= ele_rect.top and ele_rect.bottom <= win_rect.bottom - bias
+
+
+def RollIntoView(win: Control, ele: Control, equal: bool = True, bias: int = 0) -> None:
+    """内存树不会滚动，只记录操作"""
+
+    ele._act('RollIntoView', bias)
+# 1
@@ -0,0 +1,229 @@
+"""UI 后端协议。
+
+superwx4 只用到 ``uiautomation`` 的一个子集，这里把这个子集写成协议，任何满足协议的
+实现都可以作为 ``superwx4.uia`` 使用：
+
+- 控件：``Name`` / ``ClassName`` / ``AutomationId`` / ``ControlTypeName`` /
+  ``BoundingRectangle`` / ``runtimeid``，树导航（含批量取属性的 ``GetChildrenCached`` / ``GetSubtreeCached``），``Exists``，模式（pattern），
+  按类型查找子控件（``ListControl(...)`` 等）以及点击、输入等操作
+- 模块函数：``GetRootControl`` / ``ControlFromHandle`` / ``WalkControl`` /
+  ``IsElementInWindow`` / ``RollIntoView`` / ``InitializeUIAutomationInCurrentThread``
+"""
+
+from __future__ import annotations
+
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Tuple,
+    runtime_checkable,
+)
+
+__all__ = ['RectLike', 'ControlLike', 'UIBackend', 'CONTROL_TYPE_NAMES', 'PatternId']
+
+
+# 与 UIA 的 ControlTypeId 一致
+CONTROL_TYPE_NAMES = {
+    50000: 'ButtonControl',
+    50001: 'CalendarControl',
+    50002: 'CheckBoxControl',
+    50003: 'ComboBoxControl',
+    50004: 'EditControl',
+    50005: 'HyperlinkControl',
+    50006: 'ImageControl',
+    50007: 'ListItemControl',
+    50008: 'ListControl',
+    50009: 'MenuControl',
+    50010: 'MenuBarControl',
+    50011: 'MenuItemControl',
+    50012: 'ProgressBarControl',
+    50013: 'RadioButtonControl',
+    50014: 'ScrollBarControl',
+    50015: 'SliderControl',
+    50016: 'SpinnerControl',
+    50017: 'StatusBarControl',
+    50018: 'TabControl',
+    50019: 'TabItemControl',
+    50020: 'TextControl',
+    50021: 'ToolBarControl',
+    50022: 'ToolTipControl',
+    50023: 'TreeControl',
+    50024: 'TreeItemControl',
+    50025: 'CustomControl',
+    50026: 'GroupControl',
+    50027: 'ThumbControl',
+    50028: 'DataGridControl',
+    50029: 'DataItemControl',
+    50030: 'DocumentControl',
+    50031: 'SplitButtonControl',
+    50032: 'WindowControl',
+    50033: 'PaneControl',
+    50034: 'HeaderControl',
+    50035: 'HeaderItemControl',
+    50036: 'TableControl',
+    50037: 'TitleBarControl',
+    50038: 'SeparatorControl',
+    50039: 'SemanticZoomControl',
+    50040: 'AppBarControl',
+}
+
+
+class PatternId:
+    """与 UIA 的 PatternId 一致（仅 superwx4 用到的部分）"""
+
+    InvokePattern = 10000
+    ValuePattern = 10002
+    ScrollPattern = 10004
+    ExpandCollapsePattern = 10005
+    SelectionItemPattern = 10010
+    TogglePattern = 10015
+    ScrollItemPattern = 10017
+    LegacyIAccessiblePattern = 10018
+
+
+@runtime_checkable
+class RectLike(Protocol):
+    left: int
+    top: int
+    right: int
+    bottom: int
+
+    def width(self) -> int: ...
+
+    def height(self) -> int: ...
+
+    def xcenter(self) -> int: ...
+
+    def ycenter(self) -> int: ...
+
+
+@runtime_checkable
+class ControlLike(Protocol):
+    """superwx4 使用的控件接口"""
+
+    @property
+    def Name(self) -> str: ...
+
+    @property
+    def ClassName(self) -> str: ...
+
+    @property
+    def AutomationId(self) -> str: ...
+
+    @property
+    def ControlType(self) -> int: ...
+
+    @property
+    def ControlTypeName(self) -> str: ...
+
+    @property
+    def BoundingRectangle(self) -> RectLike: ...
+
+    @property
+    def ProcessId(self) -> int: ...
+
+    @property
+    def NativeWindowHandle(self) -> int: ...
+
+    @property
+    def runtimeid(self) -> str: ...
+
+    def GetRuntimeId(self) -> List[int]: ...
+
+    def Exists(self, maxSearchSeconds: float = 5, searchIntervalSeconds: float = 0.5) -> bool: ...
+
+    # ---- 树导航 ----
+
+    def GetChildren(self) -> List['ControlLike']: ...
+
+    def GetChildrenCached(self, properties: Iterable[str] = ...) -> List[Any]: ...
+
+    def GetSubtreeCached(self, properties: Iterable[str] = ..., maxDepth: int = ...) -> List[Any]: ...
+
+    def GetParentControl(self) -> Optional['ControlLike']: ...
+
+    def GetFirstChildControl(self) -> Optional['ControlLike']: ...
+
+    def GetNextSiblingControl(self) -> Optional['ControlLike']: ...
+
+    def GetPreviousSiblingControl(self) -> Optional['ControlLike']: ...
+
+    def GetTopLevelControl(self) -> Optional['ControlLike']: ...
+
+    def GetAncestorControl(self, condition: Callable[['ControlLike', int], bool]) -> Optional['ControlLike']: ...
+
+    # ---- 模式 ----
+
+    def GetPattern(self, patternId: int) -> Any: ...
+
+    def GetInvokePattern(self) -> Any: ...
+
+    def GetValuePattern(self) -> Any: ...
+
+    def GetTogglePattern(self) -> Any: ...
+
+    def GetScrollItemPattern(self) -> Any: ...
+
+    def GetExpandCollapsePattern(self) -> Any: ...
+
+    def GetLegacyIAccessiblePattern(self) -> Any: ...
+
+    # ---- 按类型查找，其它类型同理 ----
+
+    def ButtonControl(self, searchDepth: int = ..., foundIndex: int = 1, **searchProperties) -> 'ControlLike': ...
+
+    def EditControl(self, searchDepth: int = ..., foundIndex: int = 1, **searchProperties) -> 'ControlLike': ...
+
+    def GroupControl(self, searchDepth: int = ..., foundIndex: int = 1, **searchProperties) -> 'ControlLike': ...
+
+    def ListControl(self, searchDepth: int = ..., foundIndex: int = 1, **searchProperties) -> 'ControlLike': ...
+
+    def ListItemControl(self, searchDepth: int = ..., foundIndex: int = 1, **searchProperties) -> 'ControlLike': ...
+
+    def TextControl(self, searchDepth: int = ..., foundIndex: int = 1, **searchProperties) -> 'ControlLike': ...
+
+    def WindowControl(self, searchDepth: int = ..., foundIndex: int = 1, **searchProperties) -> 'ControlLike': ...
+
+    # ---- 操作 ----
+
+    def Click(self, *args, **kwargs) -> None: ...
+
+    def RightClick(self, *args, **kwargs) -> None: ...
+
+    def DoubleClick(self, *args, **kwargs) -> None: ...
+
+    def SetFocus(self) -> bool: ...
+
+    def SendKeys(self, text: str, *args, **kwargs) -> None: ...
+
+    def WheelUp(self, *args, **kwargs) -> None: ...
+
+    def WheelDown(self, *args, **kwargs) -> None: ...
+
+
+@runtime_checkable
+class UIBackend(Protocol):
+    """可以替换 ``superwx4.uia`` 的模块接口"""
+
+    Control: type
+    Rect: type
+
+    def GetRootControl(self) -> ControlLike: ...
+
+    def ControlFromHandle(self, handle: int) -> Optional[ControlLike]: ...
+
+    def WalkControl(
+        self, control: ControlLike, includeTop: bool = False, maxDepth: int = 0xFFFFFFFF
+    ) -> Iterator[Tuple[ControlLike, int]]: ...
+
+    def IsElementInWindow(self, win: ControlLike, ele: ControlLike, bias: int = 0) -> bool: ...
+
+    def RollIntoView(self, win: ControlLike, ele: ControlLike, equal: bool = True, bias: int = 0) -> None: ...
+
+    def InitializeUIAutomationInCurrentThread(self) -> None: ...
+# 1
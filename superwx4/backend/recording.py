@@ -0,0 +1,535 @@
+"""会话录制与回放。
+
+:class:`SessionRecorder` 定期用 ``dump_ui_tree`` 的遍历函数给若干控件（消息列表、会话列表等）
+拍快照，每帧只写入与上一帧的差异，文件为 JSON Lines，路径以 ``.gz`` 结尾时 gzip 压缩。
+
+:class:`ReplayDriver` 把录制文件按原始时间间隔（可加速）回放到内存控件树
+（:mod:`superwx4.backend.memory`）上，配合 ``SUPERWX4_UI_BACKEND=memory`` 可以在没有微信的
+环境中重现一次消息高峰，并用 ``GetListenStats`` / ``GetCallbackStats`` 测量吞吐、丢弃与延迟。
+
+录制::
+
+    recorder = SessionRecorder.for_wechat(wx, 'burst.jsonl.gz')
+    recorder.start(interval=0.2)
+    ...
+    recorder.close()
+
+回放::
+
+    driver = ReplayDriver('burst.jsonl.gz')
+    driver.run(speed=10)      # 10 倍速；speed=None 为不等待
+
+文件格式：第一行是头部 ``{"version", "started", "max_depth", "roots": {名称: {"path": [...]}}}``，
+path 为从顶层窗口到该控件父节点的各级属性；之后每行一帧 ``{"t": 秒, "k": {名称: 完整快照},
+"d": {名称: 差异}}``，没有变化的控件不写入，没有任何变化的帧不写入。差异格式见 :func:`diff_tree`。
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import threading
+import time
+from difflib import SequenceMatcher
+from hashlib import sha1
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    IO,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    TYPE_CHECKING,
+)
+
+from superwx4.locator.dump import _walk_control
+from superwx4.logger import wxlog
+
+from .memory import Control, MemoryTree, set_tree
+
+if TYPE_CHECKING:
+    from superwx4.wx import WeChat
+
+__all__ = [
+    'diff_tree',
+    'apply_patch',
+    'SessionRecorder',
+    'Recording',
+    'RecordingFrame',
+    'ReplayDriver',
+]
+
+FORMAT_VERSION = 1
+
+
+# ---- 差异 ----
+
+def _props(node: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in node.items() if k not in ('children', 'depth')}
+
+
+def _strip(node: Dict[str, Any]) -> Dict[str, Any]:
+    # depth 可以由位置推出，不写入文件
+    result = _props(node)
+    children = node.get('children')
+    if children:
+        result['children'] = [_strip(c) for c in children]
+    return result
+
+
+def _shape(node: Dict[str, Any]) -> tuple:
+    return node.get('ControlType'), node.get('ClassName'), node.get('AutomationId')
+
+
+def _sign(node: Dict[str, Any], out: Dict[int, str]) -> str:
+    h = sha1(json.dumps(_props(node), sort_keys=True, ensure_ascii=False).encode())
+    for child in node.get('children', ()):
+        h.update(_sign(child, out).encode())
+    sig = out[id(node)] = h.hexdigest()
+    return sig
+
+
+def diff_tree(old: Dict[str, Any], new: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """比较两棵 ``dump_ui_tree`` 格式的树
+
+    差异格式::
+
+        {"p": {变化的属性}, "x": [删除的属性], "c": [子节点操作]}
+
+    子节点操作按顺序拼出新的子节点列表：``["=", i, j]`` 保留旧子节点 i..j-1，
+    ``["~", i, 差异]`` 修改旧子节点 i，``["+", [节点, ...]]`` 插入新节点。
+
+    Returns:
+        Optional[dict]: 差异，两棵树相同时为 None
+    """
+
+    sigs: Dict[int, str] = {}
+    _sign(old, sigs)
+    _sign(new, sigs)
+    return _diff(old, new, sigs)
+
+
+def _diff(old: Dict[str, Any], new: Dict[str, Any], sigs: Dict[int, str]) -> Optional[Dict[str, Any]]:
+    if sigs[id(old)] == sigs[id(new)]:
+        return None
+    patch: Dict[str, Any] = {}
+    before, after = _props(old), _props(new)
+    changed = {k: v for k, v in after.items() if before.get(k, None) != v or k not in before}
+    removed = [k for k in before if k not in after]
+    if changed:
+        patch['p'] = changed
+    if removed:
+        patch['x'] = removed
+    old_children = old.get('children', [])
+    new_children = new.get('children', [])
+    a = [sigs[id(c)] for c in old_children]
+    b = [sigs[id(c)] for c in new_children]
+    if a == b:
+        return patch
+    ops: List[list] = []
+
+    def keep(i1, i2):
+        if ops and ops[-1][0] == '=' and ops[-1][2] == i1:
+            ops[-1][2] = i2
+        else:
+            ops.append(['=', i1, i2])
+
+    def insert(node):
+        if ops and ops[-1][0] == '+':
+            ops[-1][1].append(_strip(node))
+        else:
+            ops.append(['+', [_strip(node)]])
+
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == 'equal':
+            keep(i1, i2)
+        elif tag in ('replace', 'insert'):
+            for k, j in enumerate(range(j1, j2)):
+                i = i1 + k
+                if i < i2 and _shape(old_children[i]) == _shape(new_children[j]):
+                    child = _diff(old_children[i], new_children[j], sigs)
+                    if child is None:
+                        keep(i, i + 1)
+                    else:
+                        ops.append(['~', i, child])
+                else:
+                    insert(new_children[j])
+    patch['c'] = ops
+    return patch
+
+
+def apply_patch(node: Dict[str, Any], patch: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """把 :func:`diff_tree` 的差异应用到树上，返回新树（不修改原树）"""
+
+    if patch is None:
+        return node
+    result = {k: v for k, v in node.items() if k != 'children'}
+    for key in patch.get('x', ()):
+        result.pop(key, None)
+    result.update(patch.get('p', {}))
+    children = node.get('children', [])
+    if 'c' in patch:
+        rebuilt = []
+        for op in patch['c']:
+            if op[0] == '=':
+                rebuilt.extend(children[op[1]:op[2]])
+            elif op[0] == '~':
+                rebuilt.append(apply_patch(children[op[1]], op[2]))
+            else:
+                rebuilt.extend(op[1])
+        children = rebuilt
+    if children:
+        result['children'] = children
+    return result
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+# ---- 录制 ----
+
+class SessionRecorder:
+    """定期给控件拍快照并写入差异
+
+    Args:
+        path (str): 输出文件，以 ``.gz`` 结尾时压缩
+        roots (Dict[str, Control]): 名称 -> 要录制的控件
+        max_depth (int): 每个控件的遍历深度
+        keyframe_every (int): 每隔多少帧以完整快照代替差异，便于截取和校验
+    """
+
+    def __init__(
+            self,
+            path: str,
+            roots: Dict[str, Any],
+            max_depth: int = 12,
+            keyframe_every: int = 500
+        ):
+        self.path = path
+        self.roots = dict(roots)
+        self.max_depth = max_depth
+        self.keyframe_every = keyframe_every
+        self.frames = 0
+        self._last: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = time.monotonic()
+        self._file = _open(path, 'w')
+        self._file.write(_dumps({
+            'version': FORMAT_VERSION,
+            'started': time.time(),
+            'max_depth': max_depth,
+            'roots': {name: {'path': self._path(ctrl)} for name, ctrl in self.roots.items()},
+        }) + '\n')
+
+    @classmethod
+    def for_wechat(cls, wx: 'WeChat', path: str, **kwargs) -> 'SessionRecorder':
+        """录制主窗口的会话列表、消息列表以及所有监听窗口的消息列表"""
+
+        roots = {
+            'session_list': wx._api._session_api.session_list,
+            'main': wx._api._chat_api.msgbox,
+        }
+        for who, (chat, _) in wx.listen.items():
+            roots[f'chat:{who}'] = chat._api._chat_api.msgbox
+        return cls(path, roots, **kwargs)
+
+    def __enter__(self) -> 'SessionRecorder':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @staticmethod
+    def _path(ctrl) -> List[Dict[str, Any]]:
+        # 从顶层窗口到父节点的各级属性，回放时据此重建祖先节点
+        path = []
+        try:
+            parent = ctrl.GetParentControl()
+            while parent is not None and parent.GetParentControl() is not None:
+                path.append(_strip(_walk_control(parent, max_depth=0)))
+                parent = parent.GetParentControl()
+        except Exception as e:
+            wxlog.debug(f'获取控件祖先失败：{e}')
+        return path[::-1]
+
+    def snapshot(self) -> int:
+        """拍一帧快照并写入变化
+
+        Returns:
+            int: 发生变化的控件数
+        """
+
+        with self._lock:
+            t = round(time.monotonic() - self._started, 3)
+            keyframe = self.frames % self.keyframe_every == 0
+            frame: Dict[str, Any] = {'t': t}
+            for name, ctrl in self.roots.items():
+                try:
+                    tree = _strip(_walk_control(ctrl, max_depth=self.max_depth))
+                except Exception as e:
+                    wxlog.debug(f'录制快照失败：{name} {e}')
+                    continue
+                last = self._last.get(name)
+                if last is None or keyframe:
+                    if last != tree:
+                        frame.setdefault('k', {})[name] = tree
+                else:
+                    patch = diff_tree(last, tree)
+                    if patch is not None:
+                        frame.setdefault('d', {})[name] = patch
+                self._last[name] = tree
+            self.frames += 1
+            changed = len(frame.get('k', ())) + len(frame.get('d', ()))
+            if changed:
+                self._file.write(_dumps(frame) + '\n')
+            return changed
+
+    def _record(self, interval: float) -> None:
+        from superwx4 import uia
+        uia.InitializeUIAutomationInCurrentThread()
+        while not self._stop.is_set():
+            self.snapshot()
+            self._stop.wait(interval)
+
+    def start(self, interval: float = 0.5) -> None:
+        """在后台线程中定期拍快照"""
+
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._record, args=(interval,), name='superwx4-recorder', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    def close(self) -> None:
+        self.stop()
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+# ---- 读取 ----
+
+class RecordingFrame(NamedTuple):
+    """录制文件中的一帧
+
+    Attributes:
+        t: 相对录制开始的秒数
+        keyframes: 名称 -> 完整快照
+        deltas: 名称 -> 与上一帧的差异
+    """
+
+    t: float
+    keyframes: Dict[str, Dict[str, Any]]
+    deltas: Dict[str, Dict[str, Any]]
+
+
+class Recording:
+    """录制文件
+
+    Args:
+        path (str): :class:`SessionRecorder` 生成的文件
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with _open(path, 'r') as f:
+            self.header: Dict[str, Any] = json.loads(f.readline())
+        if self.header.get('version') != FORMAT_VERSION:
+            raise ValueError(f'不支持的录制文件版本：{self.header.get("version")}')
+
+    @property
+    def roots(self) -> Dict[str, Dict[str, Any]]:
+        return self.header['roots']
+
+    def __iter__(self) -> Iterator[RecordingFrame]:
+        with _open(self.path, 'r') as f:
+            f.readline()
+            for line in f:
+                if not line.strip():
+                    continue
+                frame = json.loads(line)
+                yield RecordingFrame(frame['t'], frame.get('k', {}), frame.get('d', {}))
+
+    def snapshots(self) -> Iterator[tuple]:
+        """逐帧生成 (t, 名称 -> 完整快照)，只包含本帧变化的控件"""
+
+        state: Dict[str, Dict[str, Any]] = {}
+        for frame in self:
+            changed = {}
+            for name, tree in frame.keyframes.items():
+                state[name] = changed[name] = tree
+            for name, patch in frame.deltas.items():
+                state[name] = changed[name] = apply_patch(state[name], patch)
+            yield frame.t, changed
+
+
+# ---- 回放 ----
+
+class ReplayDriver:
+    """把录制文件回放到内存控件树上
+
+    每个录制的控件按头部中的祖先路径挂到树上（同一窗口下的控件共用祖先），
+    之后每帧在原地应用差异，未变化的节点保持同一元素。
+
+    Args:
+        path (str): 录制文件
+        tree (MemoryTree, optional): 目标控件树，默认新建一棵并设为当前树
+        on_frame (Callable, optional): 每帧应用后调用，参数为 (t, 变化的控件名称列表)，
+            可用于通知事件源
+    """
+
+    def __init__(
+            self,
+            path: str,
+            tree: MemoryTree = None,
+            on_frame: Callable[[float, List[str]], None] = None
+        ):
+        self.recording = Recording(path)
+        self.tree = tree if tree is not None else set_tree(MemoryTree())
+        self.on_frame = on_frame
+        self.controls: Dict[str, Control] = {}
+        self._frames = iter(self.recording)
+        self._pending: Optional[RecordingFrame] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {'frames': 0, 'updates': 0, 'replay_seconds': 0.0, 'max_lag_ms': 0.0}
+
+    # ---- 挂载 ----
+
+    def _parent(self, path: List[Dict[str, Any]]) -> Control:
+        parent = self.tree.root
+        for node in path:
+            shape, handle = _shape(node), node.get('NativeWindowHandle', 0)
+            found = next(
+                (c for c in parent.GetChildren()
+                 if (c.ControlTypeName, c.ClassName, c.AutomationId) == shape
+                 and (not handle or c.NativeWindowHandle == handle)),
+                None
+            )
+            parent = found if found is not None else self.tree.add(node, parent)
+        return parent
+
+    def _apply(self, name: str, tree: Dict[str, Any] = None, patch: Dict[str, Any] = None) -> None:
+        control = self.controls.get(name)
+        if control is None:
+            if tree is None:
+                raise ValueError(f'录制文件缺少完整快照：{name}')
+            parent = self._parent(self.recording.roots.get(name, {}).get('path', []))
+            self.controls[name] = self.tree.add(tree, parent)
+            return
+        if tree is not None:
+            patch = diff_tree(self.tree.dump(control, runtime_ids=False), tree)
+        self.tree.patch(control, patch)
+
+    def step(self) -> Optional[float]:
+        """应用下一帧
+
+        Returns:
+            Optional[float]: 该帧的时间，没有更多帧时为 None
+        """
+
+        frame = self._next()
+        if frame is None:
+            return None
+        self._apply_frame(frame)
+        return frame.t
+
+    def _next(self) -> Optional[RecordingFrame]:
+        frame, self._pending = self._pending, None
+        return frame if frame is not None else next(self._frames, None)
+
+    def _apply_frame(self, frame: RecordingFrame) -> None:
+        for name, tree in frame.keyframes.items():
+            self._apply(name, tree=tree)
+        for name, patch in frame.deltas.items():
+            self._apply(name, patch=patch)
+        changed = list(frame.keyframes) + list(frame.deltas)
+        self._stats['frames'] += 1
+        self._stats['updates'] += len(changed)
+        if self.on_frame is not None:
+            self.on_frame(frame.t, changed)
+
+    def run(self, speed: Optional[float] = 1.0, until: float = None) -> Dict[str, Any]:
+        """按录制时的时间间隔回放
+
+        Args:
+            speed (float, optional): 倍速，1 为原速；None 或 0 表示不等待，尽快回放
+            until (float, optional): 回放到录制中的该时间为止
+
+        Returns:
+            dict: :meth:`stats`
+        """
+
+        started = time.monotonic()
+        first = None
+        while not self._stop.is_set():
+            frame = self._next()
+            if frame is None:
+                break
+            if until is not None and frame.t > until:
+                self._pending = frame
+                break
+            if first is None:
+                first = frame.t
+            if speed:
+                delay = started + (frame.t - first) / speed - time.monotonic()
+                if delay > 0 and self._stop.wait(delay):
+                    break
+                lag = (time.monotonic() - started - (frame.t - first) / speed) * 1000
+                self._stats['max_lag_ms'] = max(self._stats['max_lag_ms'], round(lag, 2))
+            self._apply_frame(frame)
+        self._stats['replay_seconds'] += time.monotonic() - started
+        return self.stats()
+
+    def start(self, speed: Optional[float] = 1.0) -> None:
+        """在后台线程中回放"""
+
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run, args=(speed,), name='superwx4-replay', daemon=True
+        )
+        self._thread.start()
+
+    def join(self, timeout: float = None) -> bool:
+        """等待后台回放结束
+
+        Returns:
+            bool: 是否已结束
+        """
+
+        if self._thread is None:
+            return True
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.join()
+
+    def stats(self) -> Dict[str, Any]:
+        """回放统计：frames 帧数，updates 控件更新次数，replay_seconds 耗时，max_lag_ms 最大落后时间"""
+
+        return dict(self._stats, replay_seconds=round(self._stats['replay_seconds'], 3))
+
+# 1
@@ -0,0 +1,53 @@
+"""Windows 专用模块（pywin32 / comtypes）的导入。
+
+默认直接导入。使用内存后端（``SUPERWX4_UI_BACKEND=memory``）时，缺少的模块以占位模块代替，
+导入 superwx4 不再需要 Windows；只有真正调用其中的函数时才报错::
+
+    from superwx4.backend.windows import import_windows_module
+    win32gui = import_windows_module('win32gui')
+"""
+
+from __future__ import annotations
+
+import importlib
+import os
+from types import ModuleType
+
+__all__ = ['memory_backend', 'import_windows_module', 'WindowsModuleUnavailable']
+
+
+def memory_backend() -> bool:
+    """是否通过环境变量 ``SUPERWX4_UI_BACKEND=memory`` 选择了内存后端"""
+
+    return os.environ.get('SUPERWX4_UI_BACKEND', '').lower() == 'memory'
+
+
+class WindowsModuleUnavailable(ModuleType):
+    """内存后端下缺少的 Windows 模块，访问其中的函数、常量时抛出 ImportError"""
+
+    def __getattr__(self, name: str):
+        # 私有属性按普通模块处理，便于 inspect / mock 探测
+        if name.startswith('_'):
+            raise AttributeError(name)
+        raise ImportError(
+            f'{self.__name__}.{name} 不可用：当前使用内存 UI 后端（SUPERWX4_UI_BACKEND=memory）'
+        )
+
+
+def import_windows_module(name: str) -> ModuleType:
+    """导入 Windows 专用模块
+
+    Args:
+        name (str): 模块名，如 ``'win32gui'``
+
+    Returns:
+        ModuleType: 真实模块；内存后端下导入失败时返回 :class:`WindowsModuleUnavailable`
+    """
+
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        if not memory_backend():
+            raise
+        return WindowsModuleUnavailable(name)
+# 1
@@ -19,7 +19,7 @@ from typing import Dict, List, Tuple
 
 from superwx4.locator import (
     ctrl_exists,
-    find_first,
+    find_many,
     find_wechat_window,
     describe_control,
     SELECTORS,
@@ -83,8 +83,11 @@ def run_doctor(report_path: str = None, dump_on_fail: bool = False) -> int:
         ("session_list", "请确认微信主界面会话列表可见"),
     ]
 
+    # one walk of the window resolves every key
+    found = find_many(root, [key for key, _ in probe_keys])
+
     for key, hint in probe_keys:
-        ctrl = find_first(root, key)
+        ctrl = found[key]
         ok = ctrl is not None and ctrl_exists(ctrl)
         _check(key, ok, hint)
         all_ok = all_ok and ok
@@ -99,6 +102,7 @@ def run_doctor(report_path: str = None, dump_on_fail: bool = False) -> int:
 
     # summary
     _log()
+    _log(f"UI 树遍历节点数: {found.visited}")
     if all_ok:
         _log("所有控件检测通过！")
     else:
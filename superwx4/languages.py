@@ -143,6 +143,20 @@ MESSAGES = {
     're_拍一拍': {'cn': "^.+拍了拍.+$", 'cn_t': '', 'en': ""},
 }
 
+# 消息类型识别规则，由 superwx4.msgs.classify 在导入时按语言编译
+MESSAGE_TYPES = {
+    # 气泡消息 Name 前缀
+    '链接': {'cn': "[链接]", 'cn_t': '', 'en': ""},
+    '位置': {'cn': "位置", 'cn_t': '', 'en': ""},
+    '文件': {'cn': "文件\n", 'cn_t': '', 'en': ""},
+    '视频': {'cn': "视频", 'cn_t': '', 'en': ""},
+    '图片': {'cn': "图片", 'cn_t': '', 'en': ""},
+    # 字段提取
+    're_文件': {'cn': r"^文件\n([^\n]+)\n(\d+(\.\d+)?)(B|KB|MB|GB|TB)\n微信电脑版$", 'cn_t': '', 'en': ""},
+    're_视频时长': {'cn': r"视频(\d+):(\d+)", 'cn_t': '', 'en': ""},
+    're_引用': {'cn': r"^(.*?)\s*\n引用\s+(.+?)\s+的消息\s*:\s*(.*)$", 'cn_t': '', 'en': ""},
+}
+
 CHATROOM_DETAIL_WINDOW = {
     "聊天信息": {'cn': "聊天信息", 'cn_t': '', 'en': ""},
     "查看更多": {'cn': "查看更多", 'cn_t': '', 'en': ""},
@@ -0,0 +1,10 @@
+from .source import (
+    EventSource,
+    PollingSource,
+    MemoryEventSource,
+    UIAEventSource,
+    create_event_source
+)
+from .scheduler import PollScheduler
+from .dispatch import CallbackDispatcher
+# 1
@@ -0,0 +1,318 @@
+"""监听回调分发。
+
+- 每个聊天一条串行通道：同一聊天的回调按顺序执行，不同聊天并行
+- 全局有界队列，满时按策略处理：``block`` 阻塞生产者，``drop_oldest`` 丢弃最早的一条，
+  ``spill`` 把新任务写入磁盘，有空位时再按顺序读回
+- ``batch`` 模式下每个聊天每轮的新消息作为 ``List[Message]`` 一次回调
+- ``process`` 模式下回调在进程池中执行（回调需可 pickle，参数为 MessageRecord 和聊天名称）
+- :meth:`CallbackDispatcher.stats` 提供队列深度与回调延迟统计
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import tempfile
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, Hashable, List, Literal, Optional
+
+from superwx4.logger import wxlog
+
+OverflowPolicy = Literal['block', 'drop_oldest', 'spill']
+
+
+class _Task:
+    __slots__ = ('seq', 'key', 'payload', 'enqueued')
+
+    def __init__(self, seq: int, key: Hashable, payload: Any, enqueued: float):
+        self.seq = seq
+        self.key = key
+        self.payload = payload
+        self.enqueued = enqueued
+
+
+def _to_record(msg: Any) -> Any:
+    to_record = getattr(msg, 'to_record', None)
+    return to_record() if callable(to_record) else msg
+
+
+def _picklable(payload: Any) -> Any:
+    if isinstance(payload, list):
+        return [_to_record(msg) for msg in payload]
+    return _to_record(payload)
+
+
+class _SpillFile:
+    """追加写、顺序读的 pickle 文件队列"""
+
+    def __init__(self, directory: Optional[str] = None):
+        fd, self.path = tempfile.mkstemp(prefix='superwx4-spill-', suffix='.pkl', dir=directory)
+        os.close(fd)
+        self._writer = open(self.path, 'ab')
+        self._reader = open(self.path, 'rb')
+        self.count = 0
+
+    def push(self, task: _Task) -> None:
+        pickle.dump(
+            (task.seq, task.key, _picklable(task.payload), task.enqueued),
+            self._writer,
+            protocol=pickle.HIGHEST_PROTOCOL
+        )
+        self._writer.flush()
+        self.count += 1
+
+    def pop(self) -> _Task:
+        seq, key, payload, enqueued = pickle.load(self._reader)
+        self.count -= 1
+        if self.count == 0:
+            # 读空后截断文件，避免无限增长
+            self._writer.truncate(0)
+            self._writer.seek(0)
+            self._reader.seek(0)
+        return _Task(seq, key, payload, enqueued)
+
+    def close(self) -> None:
+        self._writer.close()
+        self._reader.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class CallbackDispatcher:
+    """按聊天串行、全局有界的回调分发器
+
+    Args:
+        workers: 工作线程数，即最多同时执行回调的聊天数
+        maxsize: 内存中排队任务的上限，0 表示不限制
+        overflow: 队列满时的策略，``block`` / ``drop_oldest`` / ``spill``
+        batch: 是否按批回调，回调参数为 (List[Message], Chat)
+        mode: ``thread`` 在工作线程中回调，``process`` 在进程池中回调
+        spill_dir: ``spill`` 策略的临时文件目录，默认系统临时目录
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        maxsize: int = 1000,
+        overflow: OverflowPolicy = 'block',
+        batch: bool = False,
+        mode: Literal['thread', 'process'] = 'thread',
+        spill_dir: Optional[str] = None
+    ):
+        if overflow not in ('block', 'drop_oldest', 'spill'):
+            raise ValueError(f'未知的队列溢出策略：{overflow}')
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.batch = batch
+        self.mode = mode
+        self._spill_dir = spill_dir
+        self._cond = threading.Condition()
+        self._lanes: Dict[Hashable, Deque[_Task]] = {}
+        self._targets: Dict[Hashable, tuple] = {}
+        self._ready: Deque[Hashable] = deque()
+        self._running: set = set()
+        self._spill: Optional[_SpillFile] = None
+        self._size = 0
+        self._seq = 0
+        self._closed = False
+        self._counters = {'submitted': 0, 'delivered': 0, 'dropped': 0, 'spilled': 0, 'errors': 0}
+        self._latency: Deque[float] = deque(maxlen=1024)
+        self._duration: Deque[float] = deque(maxlen=1024)
+        self._pool = ProcessPoolExecutor(max_workers=workers) if mode == 'process' else None
+        self._threads = [
+            threading.Thread(target=self._work, name=f'superwx4-callback-{i}', daemon=True)
+            for i in range(max(workers, 1))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    # ---- 生产者 ----
+
+    def submit(
+        self,
+        key: Hashable,
+        callback: Callable,
+        msgs: List[Any],
+        chat: Any
+    ) -> None:
+        """提交一个聊天本轮的新消息
+
+        Args:
+            key: 聊天标识
+            callback: 回调函数
+            msgs: 新消息，按时间顺序
+            chat: Chat 对象
+        """
+
+        if not msgs:
+            return
+        payloads = [list(msgs)] if self.batch else list(msgs)
+        with self._cond:
+            self._targets[key] = (callback, chat)
+            for payload in payloads:
+                self._seq += 1
+                self._put(_Task(self._seq, key, payload, time.perf_counter()))
+
+    def _put(self, task: _Task) -> None:
+        self._counters['submitted'] += 1
+        full = self.maxsize > 0 and self._size >= self.maxsize
+        if self.overflow == 'spill' and (full or (self._spill and self._spill.count)):
+            # 磁盘中还有任务时新任务也写入磁盘，保证顺序
+            if self._spill is None:
+                self._spill = _SpillFile(self._spill_dir)
+            self._spill.push(task)
+            self._counters['spilled'] += 1
+            return
+        if full and self.overflow == 'drop_oldest':
+            self._drop_oldest()
+        while self.overflow == 'block' and self.maxsize > 0 \
+                and self._size >= self.maxsize and not self._closed:
+            self._cond.wait()
+        self._enqueue(task)
+
+    def _enqueue(self, task: _Task) -> None:
+        lane = self._lanes.setdefault(task.key, deque())
+        if not lane and task.key not in self._running:
+            self._ready.append(task.key)
+        lane.append(task)
+        self._size += 1
+        self._cond.notify_all()
+
+    def _drop_oldest(self) -> None:
+        heads = [lane[0] for lane in self._lanes.values() if lane]
+        if not heads:
+            return
+        oldest = min(heads, key=lambda task: task.seq)
+        lane = self._lanes[oldest.key]
+        lane.popleft()
+        self._size -= 1
+        if not lane and oldest.key in self._ready:
+            self._ready.remove(oldest.key)
+        self._counters['dropped'] += 1
+        wxlog.debug(f'回调队列已满，丢弃最早的消息：{oldest.key}')
+
+    def _refill(self) -> None:
+        while self._spill is not None and self._spill.count \
+                and (self.maxsize <= 0 or self._size < self.maxsize):
+            self._enqueue(self._spill.pop())
+
+    # ---- 消费者 ----
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while not self._ready and not self._closed:
+                    self._cond.wait()
+                if not self._ready:
+                    return
+                key = self._ready.popleft()
+                task = self._lanes[key].popleft()
+                self._running.add(key)
+                self._size -= 1
+                self._refill()
+                callback, chat = self._targets[key]
+                self._cond.notify_all()
+
+            started = time.perf_counter()
+            ok = self._call(callback, task.payload, chat)
+            finished = time.perf_counter()
+
+            with self._cond:
+                self._running.discard(key)
+                if self._lanes.get(key):
+                    self._ready.append(key)
+                self._latency.append(finished - task.enqueued)
+                self._duration.append(finished - started)
+                self._counters['delivered' if ok else 'errors'] += 1
+                self._cond.notify_all()
+
+    def _call(self, callback: Callable, payload: Any, chat: Any) -> bool:
+        try:
+            if self._pool is not None:
+                name = getattr(chat, 'who', None) or str(chat)
+                self._pool.submit(callback, _picklable(payload), name).result()
+            else:
+                callback(payload, chat)
+            return True
+        except Exception:
+            wxlog.debug(f"监听消息回调发生错误：{traceback.format_exc()}")
+            return False
+
+    # ---- 管理 ----
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """等待所有已提交的任务执行完毕
+
+        Returns:
+            bool: 是否在超时前全部完成
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._size or self._running or (self._spill and self._spill.count):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, wait: bool = True) -> None:
+        """停止分发
+
+        Args:
+            wait: 是否等待已排队的任务执行完毕
+        """
+
+        if wait:
+            self.join()
+        with self._cond:
+            self._closed = True
+            if not wait:
+                self._lanes.clear()
+                self._ready.clear()
+                self._size = 0
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def stats(self) -> Dict[str, Any]:
+        """队列深度与回调延迟统计
+
+        Returns:
+            dict: depth 内存中排队数，spill_depth 磁盘中排队数，lanes 各聊天排队数，
+                latency_ms 从入队到回调完成的延迟，callback_ms 回调本身耗时，以及累计计数
+        """
+
+        with self._cond:
+            return {
+                'depth': self._size,
+                'spill_depth': self._spill.count if self._spill else 0,
+                'running': len(self._running),
+                'lanes': {key: len(lane) for key, lane in self._lanes.items() if lane},
+                'latency_ms': _summary(self._latency),
+                'callback_ms': _summary(self._duration),
+                **self._counters,
+            }
+
+
+def _summary(samples: Deque[float]) -> Dict[str, float]:
+    if not samples:
+        return {'avg': 0.0, 'p95': 0.0, 'max': 0.0}
+    ordered = sorted(samples)
+    return {
+        'avg': round(sum(ordered) / len(ordered) * 1000, 2),
+        'p95': round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1000, 2),
+        'max': round(ordered[-1] * 1000, 2),
+    }
+# 1
@@ -0,0 +1,207 @@
+"""监听聊天的自适应轮询调度。
+
+每个聊天有自己的轮询间隔：有新消息时回到最短间隔，空闲时按倍数退避直到最长间隔。
+加入时可以给聊天指定更长的最短间隔，例如事件推送的聊天只需要很慢的兜底轮询。
+所有聊天按下次轮询时间放在一个小顶堆里，每轮只取出到期的聊天；全局每秒轮询次数
+由令牌桶限制，超出预算的聊天留在堆里等下一轮。
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional
+
+
+class _ChatState:
+    __slots__ = ('interval', 'floor', 'due', 'seq', 'polls', 'messages', 'last_active')
+
+    def __init__(self, interval: float, due: float):
+        self.interval = interval
+        self.floor = interval
+        self.due = due
+        self.seq = 0
+        self.polls = 0
+        self.messages = 0
+        self.last_active = due
+
+
+class PollScheduler:
+    """自适应轮询调度器
+
+    Args:
+        min_interval: 最短轮询间隔（秒），有新消息后使用
+        max_interval: 最长轮询间隔（秒），空闲退避的上限
+        backoff: 每次空闲轮询后间隔乘以的倍数
+        budget: 全局每秒最多轮询次数，0 表示不限制
+        clock: 时钟函数，默认 ``time.monotonic``
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 1,
+        max_interval: float = 30,
+        backoff: float = 2.0,
+        budget: float = 0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.backoff = max(backoff, 1.0)
+        self.budget = budget
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._heap: List[tuple] = []
+        self._states: Dict[Hashable, _ChatState] = {}
+        self._counter = itertools.count()
+        self._tokens = float(max(budget, 1))
+        self._refilled = clock()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._states
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def _push(self, key: Hashable, state: _ChatState, due: float) -> None:
+        # 堆中的旧条目通过 seq 失效，取出时丢弃
+        state.due = due
+        state.seq = next(self._counter)
+        heapq.heappush(self._heap, (due, state.seq, key))
+
+    def add(self, key: Hashable, min_interval: Optional[float] = None) -> None:
+        """加入聊天，立即到期
+
+        Args:
+            key: 聊天标识
+            min_interval: 该聊天的最短轮询间隔（秒），默认使用调度器的 ``min_interval``；
+                大于 ``max_interval`` 时该聊天按此固定间隔轮询
+        """
+
+        floor = self.min_interval if min_interval is None else max(min_interval, self.min_interval)
+        with self._lock:
+            now = self._clock()
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = _ChatState(floor, now)
+            state.floor = state.interval = floor
+            self._push(key, state, now)
+
+    def remove(self, key: Hashable) -> None:
+        with self._lock:
+            self._states.pop(key, None)
+
+    def poke(self, key: Hashable) -> None:
+        """让聊天立即到期（例如收到了变化事件）"""
+
+        with self._lock:
+            state = self._states.get(key)
+            if state is not None and state.due > self._clock():
+                self._push(key, state, self._clock())
+
+    def _refill(self, now: float) -> None:
+        if self.budget <= 0:
+            return
+        self._tokens = min(
+            float(max(self.budget, 1)),
+            self._tokens + (now - self._refilled) * self.budget
+        )
+        self._refilled = now
+
+    def pop_due(self) -> List[Hashable]:
+        """取出所有到期的聊天，受全局预算限制
+
+        取出的聊天在 :meth:`report` 之前不会再次到期。
+
+        Returns:
+            List: 本轮需要轮询的聊天，按到期时间排序
+        """
+
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            keys = []
+            while self._heap and self._heap[0][0] <= now:
+                if self.budget > 0 and self._tokens < 1:
+                    break
+                due, seq, key = heapq.heappop(self._heap)
+                state = self._states.get(key)
+                if state is None or state.seq != seq:
+                    continue
+                # 标记为进行中，等待 report 重新入堆
+                state.seq = -1
+                state.due = float('inf')
+                if self.budget > 0:
+                    self._tokens -= 1
+                keys.append(key)
+            return keys
+
+    def report(self, key: Hashable, count: int) -> None:
+        """报告一次轮询的结果并安排下次轮询
+
+        Args:
+            key: 聊天标识
+            count: 本次获取到的新消息数量
+        """
+
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                return
+            now = self._clock()
+            state.polls += 1
+            if count > 0:
+                state.messages += count
+                state.last_active = now
+                state.interval = state.floor
+            else:
+                state.interval = min(state.interval * self.backoff, max(self.max_interval, state.floor))
+            if state.seq == -1 or now + state.interval < state.due:
+                self._push(key, state, now + state.interval)
+
+    def next_wait(self) -> Optional[float]:
+        """距离下一个聊天到期的秒数，没有聊天时返回 None"""
+
+        with self._lock:
+            while self._heap:
+                due, seq, key = self._heap[0]
+                state = self._states.get(key)
+                if state is not None and state.seq == seq:
+                    break
+                heapq.heappop(self._heap)
+            if not self._heap:
+                return None
+            now = self._clock()
+            wait = max(self._heap[0][0] - now, 0.0)
+            if self.budget > 0 and self._tokens < 1:
+                wait = max(wait, (1 - self._tokens) / self.budget)
+            return wait
+
+    def rates(self) -> Dict[Hashable, float]:
+        """每个聊天当前的轮询频率（次/秒）"""
+
+        with self._lock:
+            return {
+                key: (1 / state.interval if state.interval else float('inf'))
+                for key, state in self._states.items()
+            }
+
+    def stats(self) -> Dict[Hashable, dict]:
+        """每个聊天的调度状态"""
+
+        with self._lock:
+            now = self._clock()
+            return {
+                key: {
+                    'interval': state.interval,
+                    'rate': 1 / state.interval if state.interval else float('inf'),
+                    'next_in': max(state.due - now, 0.0) if state.seq != -1 else 0.0,
+                    'polls': state.polls,
+                    'messages': state.messages,
+                    'idle': now - state.last_active,
+                }
+                for key, state in self._states.items()
+            }
+# 1
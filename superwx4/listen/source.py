@@ -0,0 +1,206 @@
+"""监听事件源。
+
+监听循环只处理事件源报告"有变化"的聊天：
+
+- :class:`PollingSource` 不产生事件，只等待超时，轮询完全交给 :class:`~superwx4.listen.scheduler.PollScheduler`
+- :class:`UIAEventSource` 订阅每个 ``chat_message_list`` 的 UIA 结构变化事件，
+  只有列表子元素变化的聊天才会被报告；订阅失败的聊天由 :meth:`~EventSource.pushes`
+  报告，交给调度器轮询
+- :class:`MemoryEventSource` 由调用方手动 :meth:`~MemoryEventSource.fire`，用于测试
+"""
+
+from __future__ import annotations
+
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+
+from superwx4.logger import wxlog
+
+# IUIAutomation TreeScope_Children
+TREE_SCOPE_CHILDREN = 2
+
+
+class EventSource(ABC):
+    """监听事件源接口
+
+    子类实现 :meth:`_attach` / :meth:`_detach`，在聊天有变化时调用 :meth:`notify`。
+    """
+
+    #: 是否为推送式事件源（False 表示按间隔轮询）
+    push: bool = True
+
+    def __init__(self):
+        #: 有聊天变化时额外调用的唤醒函数，用于多个事件源共用一个等待线程
+        self.on_notify: Optional[Callable[[], None]] = None
+        self._cond = threading.Condition()
+        self._handles: Dict[Hashable, Any] = {}
+        self._dirty: Set[Hashable] = set()
+        self._closed = False
+
+    @abstractmethod
+    def _attach(self, key: Hashable, chat: Any) -> Any:
+        """开始监视某个聊天，返回用于取消订阅的句柄"""
+
+    def _detach(self, key: Hashable, handle: Any) -> None:
+        """取消监视某个聊天"""
+
+    def subscribe(self, key: Hashable, chat: Any) -> None:
+        """订阅聊天变化
+
+        Args:
+            key: 聊天标识，一般为聊天名称
+            chat: Chat 对象
+        """
+
+        self.unsubscribe(key)
+        handle = self._attach(key, chat)
+        with self._cond:
+            self._handles[key] = handle
+
+    def unsubscribe(self, key: Hashable) -> None:
+        with self._cond:
+            if key not in self._handles:
+                return
+            handle = self._handles.pop(key)
+            self._dirty.discard(key)
+        try:
+            self._detach(key, handle)
+        except Exception:
+            wxlog.debug(f'取消订阅失败：{key}')
+
+    @property
+    def keys(self) -> Set[Hashable]:
+        with self._cond:
+            return set(self._handles)
+
+    def pushes(self, key: Hashable) -> bool:
+        """聊天的变化是否由事件推送；为 False 时需要调用方轮询"""
+
+        with self._cond:
+            return self.push and key in self._handles
+
+    def notify(self, key: Hashable) -> None:
+        """标记聊天有变化并唤醒等待者，可在任意线程调用"""
+
+        with self._cond:
+            if key not in self._handles:
+                return
+            self._dirty.add(key)
+            self._cond.notify_all()
+        if self.on_notify is not None:
+            self.on_notify()
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Hashable]:
+        """等待直到有聊天变化或超时
+
+        Args:
+            timeout: 最长等待秒数
+
+        Returns:
+            Set: 需要检查新消息的聊天标识，超时且无变化时为空集合
+        """
+
+        with self._cond:
+            if not self._dirty and not self._closed:
+                self._cond.wait(timeout)
+            fired = self._dirty
+            self._dirty = set()
+            return fired
+
+    def close(self) -> None:
+        """取消全部订阅并唤醒等待者"""
+
+        for key in list(self.keys):
+            self.unsubscribe(key)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class PollingSource(EventSource):
+    """轮询事件源：不产生事件，何时轮询哪个聊天由调度器决定"""
+
+    push = False
+
+    def _attach(self, key, chat):
+        return None
+
+
+class MemoryEventSource(EventSource):
+    """内存事件源，通过 :meth:`fire` 手动触发，用于测试"""
+
+    def _attach(self, key, chat):
+        return None
+
+    def fire(self, *keys: Hashable) -> None:
+        for key in keys:
+            self.notify(key)
+
+
+class UIAEventSource(EventSource):
+    """UIA 结构变化事件源
+
+    在每个聊天的消息列表上注册 ``StructureChanged`` 事件（子元素范围），
+    事件回调只做标记，不在 UIA 回调线程中访问控件。注册失败的聊天
+    :meth:`pushes` 返回 False，由调用方放回轮询调度。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._polled: Set[Hashable] = set()
+
+    def _attach(self, key, chat):
+        try:
+            from superwx4.uia.uiautomation import _AutomationClient
+            import comtypes
+
+            client = _AutomationClient.instance()
+            core = client.UIAutomationCore
+            source = self
+
+            class _Handler(comtypes.COMObject):
+                _com_interfaces_ = [core.IUIAutomationStructureChangedEventHandler]
+
+                def IUIAutomationStructureChangedEventHandler_HandleStructureChangedEvent(
+                        self, sender, changeType, runtimeId):
+                    source.notify(key)
+                    return 0
+
+            element = chat._api._chat_api.msgbox.Element
+            handler = _Handler()
+            client.IUIAutomation.AddStructureChangedEventHandler(
+                element, TREE_SCOPE_CHILDREN, None, handler
+            )
+            return (element, handler)
+        except Exception as e:
+            wxlog.debug(f'注册消息列表事件失败，退回轮询：{key} {e}')
+            with self._cond:
+                self._polled.add(key)
+            return None
+
+    def _detach(self, key, handle):
+        with self._cond:
+            self._polled.discard(key)
+        if handle is None:
+            return
+        from superwx4.uia.uiautomation import _AutomationClient
+        element, handler = handle
+        _AutomationClient.instance().IUIAutomation.RemoveStructureChangedEventHandler(element, handler)
+
+    def pushes(self, key):
+        with self._cond:
+            return key in self._handles and key not in self._polled
+
+
+def create_event_source(mode: str = 'poll') -> EventSource:
+    """按模式创建事件源
+
+    Args:
+        mode: ``'poll'`` 轮询，``'event'`` UIA 事件（失败时逐个退回轮询）
+    """
+
+    if mode == 'event':
+        return UIAEventSource()
+    return PollingSource()
+# 1
@@ -8,10 +8,15 @@ from .engine import (
     rect_to_dict,
     safe_get,
     find_first,
+    find_many,
+    FindManyResult,
     find_wechat_window,
     describe_control,
 )
 from .selectors import SELECTORS
+from .registry import ControlRegistry, get_registry
+from .paths import PathLocator, get_path_locator
+from .snapshot import SnapshotNode, TreeSnapshot
 from .dump import dump_ui_tree
 from .repair_context import generate_repair_context
 from .patch_guard import validate_patch, guard_report
@@ -21,9 +26,17 @@ __all__ = [
     "rect_to_dict",
     "safe_get",
     "find_first",
+    "find_many",
+    "FindManyResult",
     "find_wechat_window",
     "describe_control",
     "SELECTORS",
+    "ControlRegistry",
+    "get_registry",
+    "PathLocator",
+    "get_path_locator",
+    "TreeSnapshot",
+    "SnapshotNode",
     "dump_ui_tree",
     "generate_repair_context",
     "validate_patch",
@@ -27,6 +27,9 @@ def _walk_control(ctrl, depth: int = 0, max_depth: int = 10) -> Dict[str, Any]:
         "AutomationId": safe_get(ctrl, "AutomationId", ""),
         "Name": safe_get(ctrl, "Name", ""),
     }
+    handle = safe_get(ctrl, "NativeWindowHandle", 0)
+    if isinstance(handle, int) and handle:
+        node["NativeWindowHandle"] = handle
     rect = safe_get(ctrl, "BoundingRectangle")
     if rect:
         try:
@@ -6,10 +6,12 @@ any existing superwx4 business logic.
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from superwx4 import uia
 from superwx4.locator.selectors import SELECTORS
+from superwx4.locator.registry import get_registry
 
 
 # ---- basic helpers ----
@@ -45,6 +47,7 @@ def find_first(
     root: uia.Control,
     selectors_key: str,
     search_depth: int = 30,
+    hwnd: Optional[int] = None,
 ) -> Optional[uia.Control]:
     """Try each selector in the fallback chain, return first match that Exists().
 
@@ -52,10 +55,20 @@ def find_first(
         root: The parent control to search under.
         selectors_key: Key into the SELECTORS dict.
         search_depth: UIA search depth.
+        hwnd: Top-level window handle of ``root``.  When given, the result is
+            kept in the control registry and reused while it stays valid.
 
     Returns:
         The first matching control, or None.
     """
+    if hwnd is not None:
+        return get_registry().locate(
+            hwnd, selectors_key, lambda: _find_first(root, selectors_key, search_depth)
+        )
+    return _find_first(root, selectors_key, search_depth)
+
+
+def _find_first(root, selectors_key: str, search_depth: int) -> Optional[uia.Control]:
     selectors = SELECTORS.get(selectors_key, [])
     for sel in selectors:
         method_name = sel["method"]
@@ -74,6 +87,105 @@ def find_first(
     return None
 
 
+class FindManyResult(dict):
+    """``key -> control`` (None when not found) returned by :func:`find_many`.
+
+    Attributes:
+        visited: Number of tree nodes visited by the walk.
+        ranks: Index in the fallback chain of the selector that matched each found key.
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        super().__init__((key, None) for key in keys)
+        self.visited = 0
+        self.ranks: Dict[str, int] = {}
+
+
+def _compile(keys: Iterable[str]) -> Dict[str, List[Tuple[str, int, Dict[str, Any]]]]:
+    """Group the selector chains of ``keys`` by control type name.
+
+    Returns:
+        ``ControlTypeName -> [(key, rank, properties), ...]``
+    """
+    by_type: Dict[str, List[Tuple[str, int, Dict[str, Any]]]] = {}
+    for key in keys:
+        for rank, sel in enumerate(SELECTORS.get(key, [])):
+            props = {k: v for k, v in sel.items() if k != "method"}
+            by_type.setdefault(sel["method"], []).append((key, rank, props))
+    return by_type
+
+
+def _matches(ctrl, props: Dict[str, Any], values: Dict[str, Any]) -> bool:
+    """Compare selector properties with a control, reading each property at most once per node."""
+    for name, expected in props.items():
+        attr = "Name" if name in ("SubName", "RegexName") else name
+        if attr not in values:
+            values[attr] = getattr(ctrl, attr)
+        actual = values[attr]
+        if name == "SubName":
+            if expected not in (actual or ""):
+                return False
+        elif name == "RegexName":
+            if not re.search(expected, actual or ""):
+                return False
+        elif actual != expected:
+            return False
+    return True
+
+
+def find_many(
+    root: uia.Control,
+    keys: Iterable[str],
+    search_depth: int = 30,
+) -> FindManyResult:
+    """Resolve several selector keys with a single walk of the tree.
+
+    All fallback chains are compiled into one matcher.  The walk is depth
+    first, like ``FindControl``; for every key the hit of the best-ranked
+    selector wins, and among hits of the same rank the first one in walk
+    order — the same control :func:`find_first` returns.  The walk stops
+    as soon as every key has a hit of its first selector.
+
+    Args:
+        root: The parent control to search under.
+        keys: Keys into the SELECTORS dict.
+        search_depth: UIA search depth.
+
+    Returns:
+        FindManyResult: ``key -> control`` plus ``visited``, the number of nodes visited.
+    """
+    keys = list(dict.fromkeys(keys))
+    result = FindManyResult(keys)
+    by_type = _compile(keys)
+    pending = {key for key in keys if SELECTORS.get(key)}
+    if not pending:
+        return result
+    try:
+        for ctrl, _depth in uia.WalkControl(root, maxDepth=search_depth or 0xFFFFFFFF):
+            result.visited += 1
+            candidates = by_type.get(ctrl.ControlTypeName)
+            if not candidates:
+                continue
+            values: Dict[str, Any] = {}
+            for key, rank, props in candidates:
+                if rank >= result.ranks.get(key, len(SELECTORS[key])):
+                    continue
+                try:
+                    if not _matches(ctrl, props, values):
+                        continue
+                except Exception:
+                    continue
+                result[key] = ctrl
+                result.ranks[key] = rank
+                if rank == 0:
+                    pending.discard(key)
+            if not pending:
+                break
+    except Exception:
+        pass
+    return result
+
+
 def find_wechat_window() -> Optional[uia.Control]:
     """Find the WeChat main window control via UIAutomation.
 
@@ -0,0 +1,207 @@
+"""Recorded index-path locator for deep, static controls.
+
+Following a hard-coded ``GetChildren()[1]...[0]`` chain is fast but breaks
+silently when the layout changes; a selector search is robust but walks
+the tree.  A :class:`PathLocator` gets both: after a successful search it
+records the child-index path from the search root to the control, plus a
+``(ClassName, AutomationId)`` fingerprint of every hop.  Later lookups
+follow the path in O(depth) calls — one batched ``GetChildrenCached`` per
+hop — and verify each fingerprint.  On any mismatch the locator falls back
+to the search and records the new path.
+
+Paths are kept per WeChat version and persisted to a JSON file, so a cold
+start on a known version skips the search as well::
+
+    locator = get_path_locator("4.0.3.22")
+    contact_list = locator.locate(main_view, "contact_list",
+                                  lambda: main_view.ListControl(AutomationId="primary_table_.contact_list"))
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from superwx4.backend.cached import get_children_cached
+from superwx4.param import WxParam
+
+# (child index, ClassName, AutomationId)
+Hop = Tuple[int, str, str]
+
+# give up recording when the control is deeper than this below the root
+MAX_PATH_DEPTH = 64
+
+_HOP_PROPERTIES = ("ClassName", "AutomationId")
+
+
+class PathLocator:
+    """Recorded index paths of one WeChat version.
+
+    Args:
+        version: WeChat version the paths belong to.
+        path: JSON file the paths are persisted to; None keeps them in memory only.
+    """
+
+    def __init__(self, version: str = "", path: Optional[str] = None):
+        self.version = version or ""
+        self.path = path
+        self.paths: Dict[str, List[Hop]] = {}
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._load()
+
+    # ---- persistence ----
+
+    def _read_file(self) -> Dict[str, Any]:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _load(self) -> None:
+        section = self._read_file().get(self.version, {})
+        self.paths = {
+            key: [(int(i), cls, aid) for i, cls, aid in hops]
+            for key, hops in section.items()
+        }
+
+    def save(self) -> None:
+        """Write this version's paths, keeping other versions already in the file."""
+        if not self.path:
+            return
+        with self._lock:
+            data = self._read_file()
+            data[self.version] = {key: [list(hop) for hop in hops] for key, hops in self.paths.items()}
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.path)
+
+    # ---- lookup ----
+
+    def follow(self, root, key: str) -> Optional[Any]:
+        """Follow the recorded path of ``key`` from ``root``.
+
+        Returns:
+            The control, or None when there is no path or a fingerprint does not match.
+        """
+        hops = self.paths.get(key)
+        if not hops:
+            return None
+        ctrl = root
+        try:
+            for index, cls, aid in hops:
+                children = get_children_cached(ctrl, _HOP_PROPERTIES)
+                if index >= len(children):
+                    return None
+                child = children[index]
+                if (child.ClassName or "") != cls or (child.AutomationId or "") != aid:
+                    return None
+                ctrl = child.control
+        except Exception:
+            return None
+        return ctrl
+
+    def record(self, root, key: str, ctrl) -> Optional[List[Hop]]:
+        """Record the index path from ``root`` to ``ctrl``.
+
+        Returns:
+            The recorded hops, or None when ``ctrl`` is not below ``root``.
+        """
+        try:
+            root_id = root.runtimeid
+            hops: List[Hop] = []
+            current = ctrl
+            current_id = current.runtimeid
+            while current_id != root_id:
+                if len(hops) >= MAX_PATH_DEPTH:
+                    return None
+                parent = current.GetParentControl()
+                if parent is None:
+                    return None
+                children = get_children_cached(parent, ("runtimeid",) + _HOP_PROPERTIES)
+                for index, child in enumerate(children):
+                    if child.runtimeid == current_id:
+                        hops.append((index, child.ClassName or "", child.AutomationId or ""))
+                        break
+                else:
+                    return None
+                current = parent
+                current_id = parent.runtimeid
+        except Exception:
+            return None
+        hops.reverse()
+        with self._lock:
+            self.paths[key] = hops
+        return hops
+
+    def locate(self, root, key: str, resolve: Callable[[], Optional[Any]]) -> Optional[Any]:
+        """Follow the recorded path, or search with ``resolve`` and record the result.
+
+        Args:
+            root: Control the path starts from.
+            key: Name of the path.
+            resolve: Full search, returns the control or None.
+
+        Returns:
+            The control, or None when the search finds nothing.
+        """
+        ctrl = self.follow(root, key)
+        if ctrl is not None:
+            self.counts["hits"] += 1
+            return ctrl
+        self.counts["misses" if key not in self.paths else "mismatches"] += 1
+        try:
+            ctrl = resolve()
+            if ctrl is None or not ctrl.Exists(0):
+                return None
+        except Exception:
+            return None
+        if self.record(root, key, ctrl) is not None:
+            try:
+                self.save()
+            except OSError:
+                pass
+        return ctrl
+
+    def forget(self, key: str = None) -> None:
+        """Drop the path of ``key``, or every path when key is None."""
+        with self._lock:
+            if key is None:
+                self.paths.clear()
+            else:
+                self.paths.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/mismatch counters and the number of recorded paths."""
+        return {
+            "hits": self.counts["hits"],
+            "misses": self.counts["misses"],
+            "mismatches": self.counts["mismatches"],
+            "paths": len(self.paths),
+        }
+
+
+_LOCATORS: Dict[Tuple[str, Optional[str]], PathLocator] = {}
+_LOCATORS_LOCK = threading.Lock()
+
+
+def get_path_locator(version: str = "") -> PathLocator:
+    """Return the shared locator of a WeChat version, persisted to ``WxParam.LOCATOR_PATHS``."""
+    path = WxParam.LOCATOR_PATHS or None
+    with _LOCATORS_LOCK:
+        locator = _LOCATORS.get((version, path))
+        if locator is None:
+            locator = _LOCATORS[(version, path)] = PathLocator(version, path)
+        return locator
+# 1
@@ -0,0 +1,188 @@
+"""Control registry — remember located controls per window and selector key.
+
+Resolving a control through ``ListControl(AutomationId=...)`` walks the UIA
+tree from the search root, and ``Exists()`` on such a control walks it again
+every time.  The registry keeps the resolved element, wrapped as a directly
+assigned control, keyed by ``(top-level hwnd, selector key)``.  Before an
+entry is handed out it is validated with a cheap probe (parent + bounding
+rectangle, two calls); only stale entries fall back to a re-search.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from superwx4.param import WxParam
+
+
+def _wrap(ctrl) -> Any:
+    """Re-wrap a searched control as a directly assigned one.
+
+    ``Exists()`` on a directly assigned control checks the element instead
+    of searching the tree again.
+    """
+    create = getattr(type(ctrl), "CreateControlFromElement", None)
+    if create is None:
+        return ctrl
+    return create(ctrl.Element) or ctrl
+
+
+def _probe(ctrl) -> bool:
+    """Cheap validity check: the element still has a parent and a non-empty rect."""
+    try:
+        if ctrl.GetParentControl() is None:
+            return False
+        rect = ctrl.BoundingRectangle
+        return rect.right > rect.left or rect.bottom > rect.top
+    except Exception:
+        return False
+
+
+class ControlRegistry:
+    """Located controls keyed by ``(hwnd, key)``.
+
+    Args:
+        probe: Validity check for a stored control, defaults to a parent/rect probe.
+    """
+
+    def __init__(self, probe: Callable[[Any], bool] = _probe):
+        self.probe = probe
+        self._entries: Dict[Tuple[Hashable, str], Any] = {}
+        self._lock = threading.Lock()
+        self.counts: Counter = Counter()
+
+    def get(self, hwnd: Hashable, key: str) -> Optional[Any]:
+        """Return the stored control if it is still valid, else None.
+
+        Stale entries are dropped.
+        """
+        with self._lock:
+            ctrl = self._entries.get((hwnd, key))
+            if ctrl is None:
+                self.counts["misses"] += 1
+                return None
+        valid = self.probe(ctrl)
+        with self._lock:
+            if valid:
+                self.counts["hits"] += 1
+                return ctrl
+            self.counts["stale"] += 1
+            if self._entries.get((hwnd, key)) is ctrl:
+                del self._entries[(hwnd, key)]
+        return None
+
+    def put(self, hwnd: Hashable, key: str, ctrl) -> Any:
+        """Store a resolved control and return the stored (directly assigned) wrapper."""
+        ctrl = _wrap(ctrl)
+        with self._lock:
+            self._entries[(hwnd, key)] = ctrl
+        return ctrl
+
+    def locate(self, hwnd: Hashable, key: str, resolve: Callable[[], Optional[Any]]) -> Optional[Any]:
+        """Return the stored control, or resolve, store and return it.
+
+        Args:
+            hwnd: Top-level window handle the control belongs to.
+            key: Selector key, e.g. a key of ``SELECTORS``.
+            resolve: Searches the control; called on miss or when the entry is stale.
+
+        Returns:
+            The control.  A resolved control that does not exist is returned
+            as-is and not stored.
+        """
+        if not WxParam.CONTROL_REGISTRY:
+            return resolve()
+        ctrl = self.get(hwnd, key)
+        if ctrl is not None:
+            return ctrl
+        ctrl = resolve()
+        if ctrl is None:
+            return None
+        try:
+            if not ctrl.Exists(0):
+                return ctrl
+            return self.put(hwnd, key, ctrl)
+        except Exception:
+            return ctrl
+
+    def locate_many(
+        self,
+        hwnd: Hashable,
+        keys: Iterable[str],
+        resolve: Callable[[List[str]], Dict[str, Optional[Any]]],
+    ) -> Dict[str, Optional[Any]]:
+        """Like :meth:`locate` for several keys; ``resolve`` is called once with the keys that need a search.
+
+        Args:
+            hwnd: Top-level window handle the controls belong to.
+            keys: Selector keys.
+            resolve: Takes the missing/stale keys and returns ``key -> control or None``,
+                e.g. ``lambda keys: find_many(root, keys)``.
+
+        Returns:
+            ``key -> control or None`` for every key.
+        """
+        keys = list(keys)
+        if not WxParam.CONTROL_REGISTRY:
+            found = resolve(keys)
+            return {key: found.get(key) for key in keys}
+        result = {key: self.get(hwnd, key) for key in keys}
+        missing = [key for key, ctrl in result.items() if ctrl is None]
+        if missing:
+            found = resolve(missing)
+            for key in missing:
+                ctrl = found.get(key)
+                if ctrl is not None:
+                    try:
+                        ctrl = self.put(hwnd, key, ctrl)
+                    except Exception:
+                        pass
+                result[key] = ctrl
+        return result
+
+    def invalidate(self, hwnd: Hashable = None, key: str = None) -> None:
+        """Drop entries matching ``hwnd`` and/or ``key`` (all entries when both are None)."""
+        with self._lock:
+            for entry in list(self._entries):
+                if (hwnd is None or entry[0] == hwnd) and (key is None or entry[1] == key):
+                    del self._entries[entry]
+
+    def prune(self, alive: Callable[[Hashable], bool]) -> None:
+        """Drop entries of windows for which ``alive(hwnd)`` is false."""
+        with self._lock:
+            hwnds = {hwnd for hwnd, _ in self._entries}
+        dead = []
+        for hwnd in hwnds:
+            try:
+                if not alive(hwnd):
+                    dead.append(hwnd)
+            except Exception:
+                pass
+        for hwnd in dead:
+            self.invalidate(hwnd)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/stale counters and the number of stored controls."""
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "hits": self.counts["hits"],
+            "misses": self.counts["misses"],
+            "stale": self.counts["stale"],
+            "size": size,
+        }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.counts.clear()
+
+
+_REGISTRY = ControlRegistry()
+
+
+def get_registry() -> ControlRegistry:
+    """Return the process-wide registry."""
+    return _REGISTRY
+# 1
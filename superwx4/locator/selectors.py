@@ -36,6 +36,10 @@ SELECTORS = {
     "input_view": [
         {"method": "GroupControl", "ClassName": "mmui::InputView"},
     ],
+    "search_box": [
+        {"method": "EditControl", "Name": "搜索"},
+        {"method": "EditControl", "ClassName": "mmui::XValidatorTextEdit"},
+    ],
     "session_list": [
         {"method": "ListControl", "AutomationId": "session_list"},
         {"method": "ListControl", "ClassName": "mmui::XTableView"},
@@ -0,0 +1,235 @@
+"""Tree snapshot — fetch a subtree once, run many queries in memory.
+
+Scanning a large subtree node by node (``GetChildren()`` plus a property
+read per node) costs several cross-process calls per node; the Moments
+timeline alone can take hundreds of thousands.  A :class:`TreeSnapshot`
+fetches the structure and the key properties of the whole subtree in one
+batched ``GetSubtreeCached`` call and answers predicate, text and spatial
+queries from that copy.  Every node keeps its element, so ``node.control``
+is the live control for clicking or reading uncached properties.
+
+A snapshot is a picture of one moment: call :meth:`TreeSnapshot.invalidate`
+after an action that changes the UI, or pass ``ttl`` to re-fetch on the
+next query once the copy is older than ``ttl`` seconds::
+
+    snap = TreeSnapshot(sns_window, ttl=2.0)
+    cells = snap.find_all(control_type="ListItemControl", class_name="mmui::TimelineCommentCell")
+    buttons = snap.near(x, y, 340, name="赞")
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from superwx4.backend.cached import CACHED_PROPERTIES, CachedControl, get_subtree_cached
+
+
+class SnapshotNode:
+    """One node of a :class:`TreeSnapshot`.
+
+    Cached properties are answered from the snapshot; anything else is
+    forwarded to the live control.
+    """
+
+    __slots__ = ("cached", "depth", "parent", "children")
+
+    def __init__(self, cached: CachedControl, depth: int, parent: Optional["SnapshotNode"]):
+        self.cached = cached
+        self.depth = depth
+        self.parent = parent
+        self.children: List[SnapshotNode] = []
+
+    @property
+    def control(self) -> Any:
+        """The live control."""
+        return self.cached.control
+
+    @property
+    def rect(self) -> Optional[tuple]:
+        """Cached ``(left, top, right, bottom)``, None when the rect is not cached or empty."""
+        rect = self.cached.cached.get("BoundingRectangle")
+        if rect is None or rect.right <= rect.left or rect.bottom <= rect.top:
+            return None
+        return int(rect.left), int(rect.top), int(rect.right), int(rect.bottom)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.cached, name)
+
+    def __repr__(self) -> str:
+        return f"<SnapshotNode(depth={self.depth}, {self.cached.cached})>"
+
+
+def _distance(rect: tuple, x: int, y: int) -> float:
+    left, top, right, bottom = rect
+    dx = 0 if left <= x <= right else (left - x if x < left else x - right)
+    dy = 0 if top <= y <= bottom else (top - y if y < top else y - bottom)
+    return (dx * dx + dy * dy) ** 0.5
+
+
+class TreeSnapshot:
+    """In-memory copy of the subtree below ``root``.
+
+    Args:
+        root: Control whose descendants are captured; the root itself is not a node.
+        properties: Properties captured per node, see ``CACHED_PROPERTIES``.
+        max_depth: Deepest level captured, the root's children are depth 1.
+        max_nodes: Keep at most this many nodes (in breadth-first order).
+        ttl: Seconds after which the next query re-fetches; None never expires.
+    """
+
+    def __init__(
+        self,
+        root,
+        properties: Sequence[str] = CACHED_PROPERTIES,
+        max_depth: int = 0xFFFFFFFF,
+        max_nodes: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ):
+        self.root = root
+        self.properties = tuple(properties)
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.ttl = ttl
+        self.walks = 0
+        self.taken_at: Optional[float] = None
+        self._nodes: List[SnapshotNode] = []
+
+    # ---- lifecycle ----
+
+    def refresh(self) -> "TreeSnapshot":
+        """Fetch the subtree again (one batched call)."""
+        pre_order = get_subtree_cached(self.root, self.properties, self.max_depth)
+        self.walks += 1
+        nodes: List[SnapshotNode] = []
+        stack: List[SnapshotNode] = []
+        for cached, depth in pre_order:
+            del stack[depth - 1:]
+            parent = stack[-1] if stack else None
+            node = SnapshotNode(cached, depth, parent)
+            if parent is not None:
+                parent.children.append(node)
+            stack.append(node)
+            nodes.append(node)
+        # a stable sort of the pre-order by depth is the breadth-first order
+        nodes.sort(key=lambda n: n.depth)
+        if self.max_nodes is not None:
+            del nodes[self.max_nodes:]
+        self._nodes = nodes
+        self.taken_at = time.monotonic()
+        return self
+
+    def invalidate(self) -> None:
+        """Drop the copy; the next query fetches the subtree again."""
+        self._nodes = []
+        self.taken_at = None
+
+    @property
+    def stale(self) -> bool:
+        """True when the subtree has not been fetched or the copy is older than ``ttl``."""
+        if self.taken_at is None:
+            return True
+        return self.ttl is not None and time.monotonic() - self.taken_at > self.ttl
+
+    @property
+    def nodes(self) -> List[SnapshotNode]:
+        """All nodes in breadth-first order, fetching first when stale."""
+        if self.stale:
+            self.refresh()
+        return self._nodes
+
+    def __iter__(self) -> Iterator[SnapshotNode]:
+        return iter(self.nodes)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    # ---- queries ----
+
+    def find_all(
+        self,
+        pred: Optional[Callable[[SnapshotNode], bool]] = None,
+        *,
+        control_type: Optional[str] = None,
+        class_name: Optional[str] = None,
+        name: Optional[str] = None,
+        sub_name: Optional[str] = None,
+        regex_name: Optional[str] = None,
+        automation_id: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[SnapshotNode]:
+        """Nodes matching every given filter, in breadth-first order.
+
+        Args:
+            pred: Extra test on the node; exceptions count as no match.
+            control_type: ``ControlTypeName``, e.g. ``"ListControl"``.
+            class_name: Exact ``ClassName``.
+            name: Exact ``Name``.
+            sub_name: Substring of ``Name``.
+            regex_name: Regular expression searched in ``Name``.
+            automation_id: Exact ``AutomationId``.
+            limit: Stop after this many matches.
+        """
+        exact: Dict[str, str] = {}
+        if control_type is not None:
+            exact["ControlTypeName"] = control_type
+        if class_name is not None:
+            exact["ClassName"] = class_name
+        if name is not None:
+            exact["Name"] = name
+        if automation_id is not None:
+            exact["AutomationId"] = automation_id
+        pattern = re.compile(regex_name) if regex_name is not None else None
+
+        hits: List[SnapshotNode] = []
+        for node in self.nodes:
+            values = node.cached.cached
+            try:
+                if any((values[k] if k in values else getattr(node, k)) != v for k, v in exact.items()):
+                    continue
+                if sub_name is not None or pattern is not None:
+                    text = (values["Name"] if "Name" in values else node.Name) or ""
+                    if sub_name is not None and sub_name not in text:
+                        continue
+                    if pattern is not None and not pattern.search(text):
+                        continue
+                if pred is not None and not pred(node):
+                    continue
+            except Exception:
+                continue
+            hits.append(node)
+            if limit is not None and len(hits) >= limit:
+                break
+        return hits
+
+    def find(self, pred: Optional[Callable[[SnapshotNode], bool]] = None, **filters) -> Optional[SnapshotNode]:
+        """First node matching :meth:`find_all`'s filters, or None."""
+        hits = self.find_all(pred, limit=1, **filters)
+        return hits[0] if hits else None
+
+    def near(
+        self,
+        x: int,
+        y: int,
+        radius: float,
+        pred: Optional[Callable[[SnapshotNode], bool]] = None,
+        **filters,
+    ) -> List[SnapshotNode]:
+        """Nodes with a non-empty cached rect within ``radius`` pixels of ``(x, y)``, nearest first.
+
+        ``filters`` are those of :meth:`find_all`.
+        """
+        hits = []
+        for node in self.find_all(pred, **filters):
+            rect = node.rect
+            if rect is None:
+                continue
+            distance = _distance(rect, x, y)
+            if distance <= radius:
+                hits.append((distance, node))
+        hits.sort(key=lambda h: h[0])
+        return [node for _, node in hits]
+# 1
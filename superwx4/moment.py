@@ -16,6 +16,7 @@ import time
 
 from superwx4 import uia
 from superwx4.languages import MOMENTS
+from superwx4.locator.snapshot import TreeSnapshot
 from superwx4.logger import wxlog
 from superwx4.param import WxParam, WxResponse
 from superwx4.ui.base import BaseUISubWnd
@@ -46,31 +47,8 @@ def _rect_ok(rect) -> bool:
     return True
 
 
-def _dist_point_to_rect(rect, x: int, y: int) -> float:
-    l, t, r, b = rect
-    dx = 0 if l <= x <= r else (l - x if x < l else x - r)
-    dy = 0 if t <= y <= b else (t - y if y < t else y - b)
-    return (dx * dx + dy * dy) ** 0.5
-
-
-def _bfs_find_all(root: uia.Control, pred, max_nodes: int = 260000, max_hits: int = 2000):
-    """轻量 BFS：返回满足 pred 的控件列表。"""
-    from collections import deque
-
-    q = deque([root])
-    seen = 0
-    hits = []
-    while q and seen < max_nodes and len(hits) < max_hits:
-        cur = q.popleft()
-        seen += 1
-        try:
-            if pred(cur):
-                hits.append(cur)
-            for ch in cur.GetChildren():
-                q.append(ch)
-        except Exception:
-            pass
-    return hits
+# SNSWindow 快照的节点上限，与原先逐个遍历的上限相同
+SNS_SNAPSHOT_MAX_NODES = 260000
 
 
 def _lang(key: str) -> str:
@@ -310,45 +288,25 @@ class MomentList(BaseUISubWnd):
 
     def _locate_list(self, parent: 'Moment') -> Optional[uia.Control]:
         wxlog.debug('尝试定位朋友圈列表控件')
-        # 首先尝试通过常用 className 定位
-        candidates: Iterable[uia.Control] = []
+        # 一次取回整个子树，按广度优先顺序在内存中匹配
         try:
-            candidates = parent._api.control.GetChildren()
+            snapshot = TreeSnapshot(parent._api.control, ('ControlTypeName', 'Name', 'ClassName', 'AutomationId'))
+            lists = snapshot.find_all(control_type='ListControl')
         except Exception:
-            candidates = []
-
-        queue = list(candidates)
-        visited = set()
-
-        while queue:
-            ctrl = queue.pop(0)
-            if ctrl in visited:
-                continue
-            visited.add(ctrl)
-
-            class_name = getattr(ctrl, 'ClassName', '') or ''
-            automation_id = getattr(ctrl, 'AutomationId', '') or ''
-            if ctrl.ControlTypeName == 'ListControl' and ('Moment' in class_name or 'moment' in automation_id.lower()):
+            lists = []
+
+        comment = _lang('评论')
+        for node in lists:
+            class_name = node.ClassName or ''
+            automation_id = node.AutomationId or ''
+            # 首先通过常用 className 定位
+            if 'Moment' in class_name or 'moment' in automation_id.lower():
                 wxlog.debug(f'找到疑似朋友圈列表控件：{class_name}')
-                return ctrl
-
+                return node.control
             # 朋友圈列表一般会包含"评论"按钮
-            children = []
-            try:
-                children = ctrl.GetChildren()
-            except Exception:
-                children = []
-
-            if ctrl.ControlTypeName == 'ListControl':
-                for child in children:
-                    try:
-                        if getattr(child, 'Name', '') == _lang('评论'):
-                            wxlog.debug('通过子元素匹配到朋友圈列表控件')
-                            return ctrl
-                    except Exception:
-                        continue
-
-            queue.extend(children)
+            if any(child.Name == comment for child in node.children):
+                wxlog.debug('通过子元素匹配到朋友圈列表控件')
+                return node.control
 
         wxlog.debug('未能定位到朋友圈列表控件')
         return None
@@ -537,23 +495,27 @@ class Moment:
             time.sleep(0.1)
         return None
 
-    def _find_comment_separators(self, sns: uia.Control):
+    def _sns_snapshot(self, sns: uia.Control) -> TreeSnapshot:
+        """SNSWindow 的子树快照，一次调用取回结构和坐标。"""
+        return TreeSnapshot(sns, max_nodes=SNS_SNAPSHOT_MAX_NODES)
+
+    def _find_comment_separators(self, sns: uia.Control, snapshot: Optional[TreeSnapshot] = None):
         """找灰色分割线（TimelineCommentCell）。返回 [(y, l, t, r, b, ctrl), ...]"""
-        seps = _bfs_find_all(
-            sns,
-            lambda c: getattr(c, 'ControlTypeName', '') == 'ListItemControl' and getattr(c, 'ClassName', '') == 'mmui::TimelineCommentCell',
-            max_nodes=260000,
-            max_hits=2000,
+        snapshot = snapshot or self._sns_snapshot(sns)
+        seps = snapshot.find_all(
+            control_type='ListItemControl',
+            class_name='mmui::TimelineCommentCell',
+            limit=2000,
         )
         out = []
         for s in seps:
-            rect = _rect_of(s)
+            rect = s.rect
             if not _rect_ok(rect):
                 continue
             l, t, r, b = rect
             w, h = r - l, b - t
             if w >= 280 and h <= 3:
-                out.append((t, l, t, r, b, s))
+                out.append((t, l, t, r, b, s.control))
         out.sort(key=lambda x: x[0])
         return out
 
@@ -566,24 +528,20 @@ class Moment:
         time.sleep(0.22)
         return x, y
 
-    def _find_like_panel_controls_near(self, sns: uia.Control, click_x: int, click_y: int, radius: int = 340):
-        """在 SNSWindow 内，找点击点附近出现的 赞/取消/评论 控件。"""
-        hits = []
-        q = [sns]
-        seen = 0
-        while q and seen < 200000 and len(hits) < 80:
-            cur = q.pop(0)
-            seen += 1
-            try:
-                n = (getattr(cur, 'Name', '') or '').strip()
-                if n in (_lang('赞'), _lang('取消'), _lang('评论')):
-                    rect = _rect_of(cur)
-                    if _rect_ok(rect) and _dist_point_to_rect(rect, click_x, click_y) <= radius:
-                        hits.append(cur)
-                q.extend(cur.GetChildren())
-            except Exception:
-                pass
-        return hits
+    def _find_like_panel_controls_near(self, sns: uia.Control, click_x: int, click_y: int, radius: int = 340,
+                                       snapshot: Optional[TreeSnapshot] = None):
+        """在 SNSWindow 内，找点击点附近出现的 赞/取消/评论 控件。
+
+        浮层在点击之后才出现，所以先刷新快照（一次调用），再在内存中按名称和距离筛选。
+        """
+        snapshot = snapshot or self._sns_snapshot(sns)
+        snapshot.refresh()
+        names = (_lang('赞'), _lang('取消'), _lang('评论'))
+        hits = snapshot.near(
+            click_x, click_y, radius,
+            lambda c: (c.Name or '').strip() in names and _rect_ok(c.rect),
+        )
+        return [c.control for c in hits[:80]]
 
     def _pick_like_button(self, ctrls: List[uia.Control], cancel: bool = False) -> Optional[uia.Control]:
         """优先找 ButtonControl(name='赞'|'取消', class='mmui::XButton')。"""
@@ -611,11 +569,12 @@ class Moment:
         win32.Click(uia.Rect(cx, cy, cx + 1, cy + 1))
         return True
 
-    def _verify_after_like(self, sns: uia.Control, click_x: int, click_y: int, radius: int = 340, timeout: float = 1.0) -> bool:
+    def _verify_after_like(self, sns: uia.Control, click_x: int, click_y: int, radius: int = 340, timeout: float = 1.0,
+                           snapshot: Optional[TreeSnapshot] = None) -> bool:
         """点完赞后验证：附近出现"取消"（已赞）或"赞"消失。"""
         end = time.time() + timeout
         while time.time() < end:
-            ctrls = self._find_like_panel_controls_near(sns, click_x, click_y, radius=radius)
+            ctrls = self._find_like_panel_controls_near(sns, click_x, click_y, radius=radius, snapshot=snapshot)
             names = {getattr(c, 'Name', '') for c in ctrls}
             if _lang('取消') in names:
                 return True
@@ -676,8 +635,11 @@ class Moment:
         success = 0
         tried = 0
 
+        # 每页一次取回整个 SNSWindow 子树，分割线和浮层按钮都在内存中查找
+        snapshot = self._sns_snapshot(sns)
         for _page in range(max_pages):
-            seps = self._find_comment_separators(sns)
+            snapshot.invalidate()
+            seps = self._find_comment_separators(sns, snapshot)
             if not seps:
                 # 继续滚动加载 — 先把光标移回 SNSWindow 中心
                 try:
@@ -701,14 +663,14 @@ class Moment:
                     break
                 tried += 1
                 click_x, click_y = self._click_more_hotspot(sep)
-                ctrls = self._find_like_panel_controls_near(sns, click_x, click_y, radius=340)
+                ctrls = self._find_like_panel_controls_near(sns, click_x, click_y, radius=340, snapshot=snapshot)
                 btn = self._pick_like_button(ctrls, cancel=cancel)
                 if not btn:
                     continue
                 if not self._click_control_center_win32(btn):
                     continue
                 time.sleep(0.22)
-                if self._verify_after_like(sns, click_x, click_y, radius=340, timeout=1.0):
+                if self._verify_after_like(sns, click_x, click_y, radius=340, timeout=1.0, snapshot=snapshot):
                     success += 1
                 time.sleep(0.55)
 
@@ -1,4 +1,6 @@
 from .base import *
 from .mattr import *
 from .mtype import *
+from .lazy import *
+from .record import *
 # 1
@@ -6,6 +6,7 @@ from superwx4.ui.component import (
 from superwx4.ui.driver import get_driver
 from superwx4.utils import uilock
 from superwx4.param import WxParam, WxResponse, PROJECT_NAME
+from .record import MessageRecord
 from abc import ABC, abstractmethod
 from typing import (
     Dict,
@@ -14,8 +15,10 @@ from typing import (
     Any,
     TYPE_CHECKING,
     Iterator,
+    FrozenSet,
     Tuple
 )
+from functools import cached_property
 from hashlib import md5
 import time
 
@@ -35,44 +38,72 @@ class Message:
     """
 
     _EXCLUDE_FIELDS = {"control", "parent", "root"}
+    # 首次访问时才计算的字段，计算后缓存在实例 __dict__ 中
+    _LAZY_FIELDS: Tuple[str, ...] = ()
 
     # region --- 迭代/映射相关 -------------------------------------------------
+    def _public_fields(self) -> Tuple[Tuple[str, ...], FrozenSet[str]]:
+        """当前消息可公开的字段名（有序元组与集合），不触发延迟字段的计算
+
+        结果缓存在实例上，实例属性数量或 ``WxParam.MESSAGE_HASH`` 变化时重新计算。
+        """
+
+        state = getattr(self, "__dict__", None)
+        if state is None:
+            return (), frozenset()
+        cache = state.get("_public_cache")
+        if cache is not None and cache[0] == len(state) and cache[1] == WxParam.MESSAGE_HASH:
+            return cache[2], cache[3]
+
+        keys = [
+            key for key in state
+            if not (key.startswith("_") or key in self._EXCLUDE_FIELDS or key in self._LAZY_FIELDS)
+        ]
+        keys.extend(self._LAZY_FIELDS)
+        if not WxParam.MESSAGE_HASH and "hash" in keys:
+            keys.remove("hash")
+        keys = tuple(keys)
+        fields = frozenset(keys)
+        # 先占位，缓存记录的属性数量包含缓存本身
+        state["_public_cache"] = None
+        state["_public_cache"] = (len(state), WxParam.MESSAGE_HASH, keys, fields)
+        return keys, fields
+
+    def _iter_public_keys(self) -> Iterator[str]:
+        """遍历当前消息可公开的字段名（不触发延迟字段的计算）"""
+
+        return iter(self._public_fields()[0])
+
     def _iter_public_items(self) -> Iterator[Tuple[str, Any]]:
         """遍历当前消息可公开的字段"""
 
-        if not hasattr(self, "__dict__"):
-            return
-
-        for key, value in self.__dict__.items():
-            if key.startswith("_") or key in self._EXCLUDE_FIELDS:
-                continue
-            if key == "hash" and not WxParam.MESSAGE_HASH:
-                continue
-            yield key, value
+        for key in self._iter_public_keys():
+            yield key, getattr(self, key) if key in self._LAZY_FIELDS else self.__dict__[key]
 
     def __iter__(self) -> Iterator[str]:
-        for key, _ in self._iter_public_items():
-            yield key
+        return self._iter_public_keys()
 
     def __len__(self) -> int:
-        return sum(1 for _ in self._iter_public_items())
+        return len(self._public_fields()[0])
+
+    def _is_public_field(self, key: object) -> bool:
+        return isinstance(key, str) and key in self._public_fields()[1]
 
     def __getitem__(self, item: str) -> Any:
-        for key, value in self._iter_public_items():
-            if key == item:
-                return value
-        raise KeyError(item)
+        if not self._is_public_field(item):
+            raise KeyError(item)
+        if item in self._LAZY_FIELDS:
+            return getattr(self, item)
+        return self.__dict__[item]
 
     def __contains__(self, key: object) -> bool:
-        if not isinstance(key, str):
-            return False
-        return any(field == key for field, _ in self._iter_public_items())
+        return self._is_public_field(key)
 
     # endregion ----------------------------------------------------------------
 
     # region --- 字段访问 -------------------------------------------------------
     def keys(self) -> Tuple[str, ...]:
-        return tuple(key for key, _ in self._iter_public_items())
+        return tuple(self._iter_public_keys())
 
     def values(self) -> Tuple[Any, ...]:
         return tuple(value for _, value in self._iter_public_items())
@@ -81,10 +112,10 @@ class Message:
         return tuple(self._iter_public_items())
 
     def get(self, key: str, default: Any = None) -> Any:
-        for field, value in self._iter_public_items():
-            if field == key:
-                return value
-        return default
+        try:
+            return self[key]
+        except KeyError:
+            return default
 
     def to_dict(self) -> Dict[str, Any]:
         return dict(self._iter_public_items())
@@ -92,6 +123,34 @@ class Message:
     def copy(self) -> Dict[str, Any]:
         return self.to_dict().copy()
 
+    def to_record(self, rect: bool = False) -> MessageRecord:
+        """转换为不持有 COM 对象的不可变 :class:`MessageRecord`
+
+        不计算 ``hash_text`` 等延迟字段；``hash`` 仅在 ``WxParam.MESSAGE_HASH`` 开启时计算。
+
+        Args:
+            rect (bool): 是否包含消息矩形，延迟消息读取矩形需要一次 UIA 调用，默认不包含
+        """
+
+        extra = {
+            key: getattr(self, key)
+            for key in self._iter_public_keys()
+            if key not in self._LAZY_FIELDS
+        }
+        msg_rect = getattr(self, 'rect', None) if rect else None
+        if msg_rect is not None:
+            msg_rect = (msg_rect.left, msg_rect.top, msg_rect.right, msg_rect.bottom)
+        return MessageRecord(
+            id=getattr(self, 'id', None),
+            type=getattr(self, 'type', None),
+            attr=getattr(self, 'attr', None),
+            content=getattr(self, 'content', None),
+            direction=getattr(self, 'direction', None),
+            rect=msg_rect,
+            hash=getattr(self, 'hash', None) if WxParam.MESSAGE_HASH else None,
+            extra=extra,
+        )
+
     # endregion ----------------------------------------------------------------
 
     # region --- 信息访问 -------------------------------------------------------
@@ -176,6 +235,9 @@ class BaseMessage(Message, ABC):
     type: str = 'base'
     attr: str = 'base'
     control: uia.Control
+    # 几何判断的来源与置信度只作为属性提供，不进入 to_dict / MCP 输出
+    _EXCLUDE_FIELDS = Message._EXCLUDE_FIELDS | {"rect", "direction_source", "direction_confidence"}
+    _LAZY_FIELDS = ('hash_text', 'hash')
 
     def __init__(
             self, 
@@ -187,12 +249,32 @@ class BaseMessage(Message, ABC):
         self.control = control
         self.direction = additonal_attr.get('direction', None)
         self.distince = additonal_attr.get('direction_distence', None)
+        self.direction_source = additonal_attr.get('direction_source', None)
+        self.direction_confidence = additonal_attr.get('direction_confidence', None)
         self.root = parent.root
         self.id = self.control.runtimeid
-        self.content = self.control.Name
-        rect = self.control.BoundingRectangle
-        self.hash_text = f'({rect.height()},{rect.width()}){self.content}'
-        self.hash = md5(self.hash_text.encode()).hexdigest()
+        self.content = self._raw_content = self.control.Name
+        if not WxParam.LAZY_MESSAGE:
+            # 非延迟模式在创建时读取矩形，之后列表项可能已被回收或滚出可见区域
+            self.rect = self.control.BoundingRectangle
+        # 类型识别时一并提取的结构化字段（文件名、引用内容等）
+        self._fields = additonal_attr.get('fields', {})
+        for key, value in self._fields.items():
+            setattr(self, key, value)
+
+    @cached_property
+    def rect(self) -> uia.Rect:
+        """消息控件的矩形；非延迟模式在创建时读取，延迟模式在首次访问时读取"""
+        return self.control.BoundingRectangle
+
+    @cached_property
+    def hash_text(self) -> str:
+        rect = self.rect
+        return f'({rect.height()},{rect.width()}){self._raw_content}'
+
+    @cached_property
+    def hash(self) -> str:
+        return md5(self.hash_text.encode()).hexdigest()
 
     def __repr__(self):
         cls_name = self.__class__.__name__
@@ -0,0 +1,150 @@
+"""表驱动的消息类型识别。
+
+规则来自 ``superwx4.languages.MESSAGE_TYPES``，按语言在首次使用时编译一次：
+ClassName 强特征查表、Name 前缀按首字符分派、正则预编译。识别只依赖
+``(ClassName, Name)`` 两个字符串，可脱离 UIA 单独测试与压测；识别的同时
+提取文件名/大小、视频时长、引用发送者与内容等结构化字段。
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+from superwx4.languages import MESSAGE_TYPES
+from superwx4.param import WxParam
+
+# ClassName 强特征 -> 消息类型
+CLASSNAME_RULES: Dict[str, str] = {
+    "mmui::ChatVoiceItemView": "VoiceMessage",
+    "mmui::ChatPersonalCardItemView": "PersonalCardMessage",
+}
+
+# 气泡消息 Name 前缀（MESSAGE_TYPES 键） -> 消息类型，按优先级排列
+PREFIX_RULES: Tuple[Tuple[str, str], ...] = (
+    ('链接', 'LinkMessage'),
+    ('位置', 'LocationMessage'),
+    ('文件', 'FileMessage'),
+    ('视频', 'VideoMessage'),
+)
+
+BUBBLE_CLASSNAME = "mmui::ChatBubbleItemView"
+TEXT_CLASSNAME = "mmui::ChatTextItemView"
+
+
+def _text(key: str, language: str) -> str:
+    """取规则在指定语言下的文本，未翻译时回退到简体中文。"""
+
+    data = MESSAGE_TYPES[key]
+    return data.get(language) or data['cn']
+
+
+class MessageClassifier:
+    """编译后的消息类型识别器。
+
+    Args:
+        language: 语言，``'cn'`` / ``'cn_t'`` / ``'en'``
+    """
+
+    def __init__(self, language: str = 'cn'):
+        self.language = language
+        self._prefixes: Dict[str, List[Tuple[str, str]]] = {}
+        for key, msgtype in PREFIX_RULES:
+            prefix = _text(key, language)
+            self._prefixes.setdefault(prefix[0], []).append((prefix, msgtype))
+        self._image = _text('图片', language)
+        self._file_pattern: Pattern = re.compile(_text('re_文件', language))
+        self._video_pattern: Pattern = re.compile(_text('re_视频时长', language))
+        self._quote_pattern: Pattern = re.compile(_text('re_引用', language), re.DOTALL)
+
+    def _match_prefix(self, name: str) -> Optional[str]:
+        for prefix, msgtype in self._prefixes.get(name[:1], ()):
+            if name.startswith(prefix):
+                return msgtype
+        return None
+
+    def _extract(self, msgtype: str, name: str) -> Dict[str, Any]:
+        if msgtype == 'FileMessage':
+            m = self._file_pattern.match(name)
+            if m:
+                return {'file_name': m.group(1), 'file_size': m.group(2) + m.group(4)}
+        elif msgtype == 'VideoMessage':
+            m = self._video_pattern.search(name)
+            if m:
+                return {'duration': int(m.group(1)) * 60 + int(m.group(2))}
+        return {}
+
+    def match_quote(self, name: str) -> Optional[Dict[str, Any]]:
+        """匹配引用消息，返回 content / quote_nickname / quote_content，不匹配时返回 None"""
+
+        m = self._quote_pattern.match(name)
+        if not m:
+            return None
+        content, nickname, quote_content = m.groups()
+        return {'content': content, 'quote_nickname': nickname, 'quote_content': quote_content}
+
+    def classify(self, classname: str, name: str) -> Tuple[str, Dict[str, Any]]:
+        """识别消息类型
+
+        Args:
+            classname: 消息控件的 ClassName
+            name: 消息控件的 Name
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: (类型名如 ``'TextMessage'``, 提取出的字段)
+        """
+
+        name = name or ''
+        # 第一层：ClassName强特征识别（最可靠）
+        msgtype = CLASSNAME_RULES.get(classname)
+        if msgtype:
+            return msgtype, {}
+
+        # 第二层：气泡消息按 Name 前缀识别
+        if classname == BUBBLE_CLASSNAME:
+            msgtype = self._match_prefix(name)
+            if msgtype:
+                return msgtype, self._extract(msgtype, name)
+            if name == self._image:
+                return 'ImageMessage', {}
+            return 'OtherMessage', {}
+
+        # 第三层：引用消息处理
+        if classname == TEXT_CLASSNAME:
+            fields = self.match_quote(name)
+            if fields is not None:
+                return 'QuoteMessage', fields
+            return 'TextMessage', {}
+
+        return 'OtherMessage', {}
+
+    __call__ = classify
+
+
+_CLASSIFIERS: Dict[str, MessageClassifier] = {}
+_CLASSIFIERS_LOCK = threading.Lock()
+
+
+def get_classifier(language: Optional[str] = None) -> MessageClassifier:
+    """获取指定语言（默认 WxParam.LANGUAGE）的识别器，每种语言只编译一次"""
+
+    language = language or WxParam.LANGUAGE
+    classifier = _CLASSIFIERS.get(language)
+    if classifier is None:
+        with _CLASSIFIERS_LOCK:
+            classifier = _CLASSIFIERS.get(language)
+            if classifier is None:
+                classifier = _CLASSIFIERS[language] = MessageClassifier(language)
+    return classifier
+
+
+def classify_message(classname: str, name: str) -> Tuple[str, Dict[str, Any]]:
+    """按当前语言识别消息类型，见 :meth:`MessageClassifier.classify`"""
+
+    return get_classifier().classify(classname, name)
+
+
+# 导入时编译默认语言
+get_classifier()
+# 1
@@ -0,0 +1,172 @@
+"""基于 UIA 几何信息的消息方向判断。
+
+对比消息内部气泡/头像子控件与消息列表 ``msgbox`` 的水平位置来区分自己与好友的消息，
+无需截图。几何信息不足以判断时由调用方回退到像素检测。
+"""
+
+from __future__ import annotations
+
+from typing import Any, List, Literal, Optional, Sequence, Tuple
+
+from superwx4 import uia
+from superwx4.backend.cached import get_subtree_cached
+from superwx4.utils.frame import RectTuple, rect_to_tuple
+
+Direction = Literal['left', 'right']
+
+# 头像控件的尺寸范围（像素），近似正方形
+AVATAR_MIN_SIZE = 20
+AVATAR_MAX_SIZE = 80
+AVATAR_SQUARE_TOLERANCE = 0.25
+
+# 头像证据对置信度的加成
+AVATAR_CONFIDENCE_BONUS = 0.5
+
+
+def _is_avatar_rect(rect: RectTuple) -> bool:
+    left, top, right, bottom = rect
+    w, h = right - left, bottom - top
+    if not (AVATAR_MIN_SIZE <= w <= AVATAR_MAX_SIZE and AVATAR_MIN_SIZE <= h <= AVATAR_MAX_SIZE):
+        return False
+    return abs(w - h) <= max(w, h) * AVATAR_SQUARE_TOLERANCE
+
+
+def _union(rects: Sequence[RectTuple]) -> Optional[RectTuple]:
+    if not rects:
+        return None
+    return (
+        min(r[0] for r in rects),
+        min(r[1] for r in rects),
+        max(r[2] for r in rects),
+        max(r[3] for r in rects),
+    )
+
+
+def classify_direction_by_geometry(
+    item_rect: Any,
+    body_rects: Sequence[Any],
+    avatar_rects: Sequence[Any] = (),
+    box_rect: Any = None,
+) -> Tuple[Optional[Direction], float, float]:
+    """根据子控件矩形判断消息方向（纯函数，不访问 UIA）。
+
+    Args:
+        item_rect: 消息控件自身的矩形
+        body_rects: 气泡/文本子控件矩形
+        avatar_rects: 头像子控件矩形
+        box_rect: 消息列表 ``msgbox`` 的矩形，为空时以 ``item_rect`` 为参照
+
+    Returns:
+        Tuple[Optional[str], float, float]: (方向, 距离, 置信度)
+
+            - 方向: ``'left'`` 为好友消息，``'right'`` 为自己的消息，无法判断时为 None
+            - 距离: 主体到对应一侧边缘的像素距离
+            - 置信度: 0~1，左右留白越不对称、头像位置越明确则越高
+    """
+
+    item = rect_to_tuple(item_rect)
+    ref = rect_to_tuple(box_rect) if box_rect is not None else item
+    # 参照区取消息控件与 msgbox 的交集，避免 msgbox 包含滚动条等额外区域
+    ref_left, ref_right = max(ref[0], item[0]), min(ref[2], item[2])
+    if ref_right <= ref_left:
+        ref_left, ref_right = item[0], item[2]
+    mid = (ref_left + ref_right) / 2
+
+    bodies = [rect_to_tuple(r) for r in body_rects]
+    avatars = [rect_to_tuple(r) for r in avatar_rects]
+    avatars = [r for r in avatars if _is_avatar_rect(r)]
+    body = _union(bodies)
+    if body is None and not avatars:
+        return None, 0.0, 0.0
+
+    direction: Optional[Direction] = None
+    confidence = 0.0
+    if body is not None:
+        gap_l = max(body[0] - ref_left, 0)
+        gap_r = max(ref_right - body[2], 0)
+        total = gap_l + gap_r
+        if total > 0 and gap_l != gap_r:
+            direction = 'left' if gap_l < gap_r else 'right'
+            confidence = abs(gap_l - gap_r) / total
+
+    # 头像位于某一侧，是最直接的证据
+    avatar_votes = {'left': 0, 'right': 0}
+    for r in avatars:
+        center = (r[0] + r[2]) / 2
+        avatar_votes['left' if center < mid else 'right'] += 1
+    if avatar_votes['left'] != avatar_votes['right']:
+        avatar_side: Direction = 'left' if avatar_votes['left'] > avatar_votes['right'] else 'right'
+        if direction is None or direction == avatar_side:
+            direction = avatar_side
+            confidence = min(1.0, confidence + AVATAR_CONFIDENCE_BONUS)
+        else:
+            # 气泡与头像证据矛盾，交给像素检测
+            confidence = 0.0
+
+    if direction is None:
+        return None, 0.0, 0.0
+
+    anchor = _union(bodies + avatars)
+    if direction == 'left':
+        distance = float(max(anchor[0] - item[0], 0))
+    else:
+        distance = float(max(item[2] - anchor[2], 0))
+    return direction, distance, round(confidence, 4)
+
+
+# 几何判断用到的子控件属性
+GEOMETRY_PROPERTIES = ('ControlTypeName', 'ClassName', 'BoundingRectangle')
+
+
+def collect_message_rects(
+    control: uia.Control,
+    max_depth: int = 5
+) -> Tuple[List[RectTuple], List[RectTuple]]:
+    """一次取回消息控件的子树，收集气泡/文本子控件与头像子控件的矩形。
+
+    筛选方式与 ``HumanMessage._find_body_controls`` 相同。子树及其类型、类名、矩形通过
+    :func:`~superwx4.backend.cached.get_subtree_cached` 批量读取，每条消息一次调用，
+    不再逐个节点获取首个子控件、下一个兄弟控件和属性。
+
+    Returns:
+        Tuple[List, List]: (气泡矩形列表, 头像矩形列表)
+    """
+
+    bodies: List[RectTuple] = []
+    avatars: List[RectTuple] = []
+    for child, _ in get_subtree_cached(control, GEOMETRY_PROPERTIES, max_depth):
+        try:
+            ctype = child.ControlTypeName
+            cname = child.ClassName or ''
+            cr = child.BoundingRectangle
+            rect = rect_to_tuple(cr)
+            if rect[2] - rect[0] <= 10 or rect[3] - rect[1] <= 10:
+                continue
+        except:
+            continue
+        if ctype in ('TextControl', 'DocumentControl') \
+                or 'ChatText' in cname or 'Bubble' in cname or 'AlbumContent' in cname:
+            bodies.append(rect)
+        elif ctype in ('ButtonControl', 'ImageControl') or 'Avatar' in cname:
+            if _is_avatar_rect(rect):
+                avatars.append(rect)
+    return bodies, avatars
+
+
+def detect_message_direction_by_geometry(
+    control: uia.Control,
+    box_rect: Any = None
+) -> Tuple[Optional[Direction], float, float]:
+    """通过 UIA 几何信息判断消息方向。
+
+    Args:
+        control: 消息控件
+        box_rect: 消息列表 ``msgbox`` 的矩形
+
+    Returns:
+        Tuple[Optional[str], float, float]: (方向, 距离, 置信度)，见 :func:`classify_direction_by_geometry`
+    """
+
+    bodies, avatars = collect_message_rects(control)
+    return classify_direction_by_geometry(control.BoundingRectangle, bodies, avatars, box_rect)
+# 1
@@ -0,0 +1,96 @@
+from .base import Message, truncate_string
+from .classify import classify_message
+from superwx4 import uia
+from superwx4.param import PROJECT_NAME
+from typing import (
+    Any,
+    Callable,
+    FrozenSet,
+    Iterator,
+    Optional,
+    Tuple,
+    TYPE_CHECKING
+)
+import threading
+
+if TYPE_CHECKING:
+    from superwx4.ui.chatbox import ChatBox
+    from .base import BaseMessage
+
+__all__ = ['LazyMessage']
+
+
+def _eager_content(control: uia.Control) -> str:
+    # 与完整解析得到的 content 一致：系统消息取 Name，引用消息只取回复部分；
+    # 类型识别只用 ClassName 和 Name，不截图
+    name = control.Name
+    if not control.AutomationId:
+        return name
+    _, fields = classify_message(control.ClassName, name)
+    return fields.get('content', name)
+
+
+class LazyMessage(Message):
+    """延迟解析的消息对象
+
+    创建时只读取 ``runtimeid``、``Name``、``ClassName`` 等廉价属性；方向、具体类型、哈希、
+    矩形等字段在首次访问时才完成解析（截图/几何判断/类型识别），之后缓存。
+    只按 ``content`` 做关键词路由的监听回调因此不会触发任何截图或哈希计算。
+
+    未在本类中定义的属性和方法都会转发到解析后的真实消息对象，
+    需要做 ``isinstance`` 判断时请使用 :meth:`resolve` 的返回值。
+
+    Args:
+        control: 消息控件
+        parent: 所属的 ChatBox
+        factory: ``(control, parent) -> BaseMessage`` 的解析函数
+    """
+
+    def __init__(
+            self,
+            control: uia.Control,
+            parent: "ChatBox",
+            factory: Callable[[uia.Control, "ChatBox"], "BaseMessage"]
+        ):
+        self.parent = parent
+        self.control = control
+        self.root = parent.root
+        self.id = control.runtimeid
+        self.content = _eager_content(control)
+        self._factory = factory
+        self._message: Optional["BaseMessage"] = None
+        self._lock = threading.Lock()
+
+    @property
+    def resolved(self) -> bool:
+        """是否已完成完整解析"""
+        return self._message is not None
+
+    def resolve(self) -> "BaseMessage":
+        """完成解析并返回真实的消息对象（只解析一次）"""
+        if self._message is None:
+            with self._lock:
+                if self._message is None:
+                    self._message = self._factory(self.control, self.parent)
+        return self._message
+
+    def __getattr__(self, name: str) -> Any:
+        # 只有在实例和类上都找不到时才会进入，私有/魔术属性不触发解析
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+
+    def _public_fields(self) -> Tuple[Tuple[str, ...], FrozenSet[str]]:
+        return self.resolve()._public_fields()
+
+    def _iter_public_items(self) -> Iterator[Tuple[str, Any]]:
+        return self.resolve()._iter_public_items()
+
+    def __getitem__(self, item: str) -> Any:
+        return self.resolve()[item]
+
+    def __repr__(self):
+        content = truncate_string(self.content)
+        state = self._message.__class__.__name__ if self._message is not None else 'pending'
+        return f"<{PROJECT_NAME} - LazyMessage[{state}]({content}) at {hex(id(self))}>"
+# 1
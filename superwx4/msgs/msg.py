@@ -1,7 +1,12 @@
 from superwx4.utils.tools import (
-    detect_message_direction
+    detect_message_direction_from_image
 )
 from superwx4 import uia
+from superwx4.param import WxParam
+from .classify import classify_message
+from .geometry import detect_message_direction_by_geometry
+from .base import Message
+from .lazy import LazyMessage
 from .mattr import (
     SystemMessage,
     FriendMessage,
@@ -10,12 +15,24 @@ from .mattr import (
 from .mtype import *
 from . import self as selfmsg
 from . import friend as friendmsg
+from superwx4.logger import wxlog
+from concurrent.futures import (
+    Executor,
+    ThreadPoolExecutor,
+    ProcessPoolExecutor
+)
 from typing import (
     TYPE_CHECKING,
     Literal,
     Dict,
-    Any
+    List,
+    Any,
+    Iterable,
+    Iterator,
+    Optional
 )
+from contextlib import contextmanager
+import threading
 import time
 import os
 import re
@@ -23,38 +40,81 @@ import re
 if TYPE_CHECKING:
     from superwx4.ui.chatbox import ChatBox
 
-def parse_msg_attr(
+def _box_rect(parent: 'ChatBox'):
+    msgbox = getattr(parent, 'msgbox', None)
+    try:
+        return msgbox.BoundingRectangle if msgbox is not None else None
+    except Exception:
+        return None
+
+def _geometry_direction(
+    control: uia.Control,
+    box_rect
+):
+    """几何判断方向，置信度足够时返回 (方向, 距离, 置信度)，否则方向为 None"""
+    if not WxParam.GEOMETRY_DIRECTION:
+        return None, None, None
+    try:
+        direction, distence, confidence = detect_message_direction_by_geometry(control, box_rect)
+    except Exception:
+        return None, None, 0.0
+    if direction is not None and confidence >= WxParam.GEOMETRY_DIRECTION_THRESHOLD:
+        return direction, distence, confidence
+    return None, None, confidence
+
+def _detect_direction(
     control: uia.Control,
     parent: 'ChatBox'
+):
+    """判断消息方向，优先使用几何信息，置信度不足时回退到像素检测
+
+    Returns:
+        tuple: (方向, 距离, 判断来源 'geometry' / 'pixel', 几何置信度)
+    """
+    direction, distence, confidence = _geometry_direction(control, _box_rect(parent))
+    if direction is not None:
+        return direction, distence, 'geometry', confidence
+
+    # uia.RollIntoView(parent.msgbox, control)
+    # 从本批次共享的窗口帧中取视图，在内存中判断方向，不再逐条截图、落盘
+    msg_screenshot = parent.frame_capture.view(control.BoundingRectangle)
+    direction, distence = detect_message_direction_from_image(msg_screenshot)
+    return direction, distence, 'pixel', confidence
+
+def _build_msg(
+    control: uia.Control,
+    parent: 'ChatBox',
+    direction,
+    distence,
+    source,
+    confidence
 ):
     msg_direction_hash = {
         'left': 'friend',
         'right': 'self'
     }
-    if control.AutomationId:
-        # uia.RollIntoView(parent.msgbox, control)
-        msg_screenshot = control.ScreenShot()
-        msg_direction, msg_direction_distence = detect_message_direction(msg_screenshot)
-        msg_attr = msg_direction_hash.get(msg_direction)
-        os.remove(msg_screenshot)
-
-        additonal_attr = {
-            'direction': msg_direction,
-            'direction_distence': msg_direction_distence
-        }
-        
-    else:
-        msg_attr = 'system'
-
-    if msg_attr == 'system':
-        return SystemMessage(control, parent)
-    elif msg_attr == 'friend':
+    msg_attr = msg_direction_hash.get(direction)
+    additonal_attr = {
+        'direction': direction,
+        'direction_distence': distence,
+        'direction_source': source,
+        'direction_confidence': confidence,
+    }
+    if msg_attr == 'friend':
         # return FriendMessage(control, parent)
         return parse_msg_type(control, parent, 'Friend', additonal_attr)
     elif msg_attr == 'self':
         # return SelfMessage(control, parent)
         return parse_msg_type(control, parent, 'Self', additonal_attr)
 
+def parse_msg_attr(
+    control: uia.Control,
+    parent: 'ChatBox'
+):
+    if not control.AutomationId:
+        return SystemMessage(control, parent)
+    return _build_msg(control, parent, *_detect_direction(control, parent))
+
 def parse_msg_type(
         control: uia.Control,
         parent,
@@ -63,84 +123,276 @@ def parse_msg_type(
     ):
     """
     多层次消息类型识别算法
-    基于ClassName、Name等多重验证确保识别准确性
+    基于ClassName、Name等多重验证确保识别准确性，规则见 :mod:`superwx4.msgs.classify`
     """
     if attr == 'Friend':
         msgtype = friendmsg
     else:
         msgtype = selfmsg
 
-    msg_text = control.Name
-    msg_classname = control.ClassName
-    msg_automation_id = control.AutomationId
-    
-    # 第一层：ClassName强特征识别（最可靠）
-    classname_result = _classify_by_classname(msg_classname)
-    if classname_result:
-        return getattr(msgtype, f'{attr}{classname_result}')(control, parent, additonal_attr)
-    
-    # 第二层：基于ClassName分类后的详细识别
-    if msg_classname == "mmui::ChatBubbleItemView":
-        # Name前缀特征识别
-        prefix_result = _classify_by_name_prefix(msg_text)
-        if prefix_result:
-            return getattr(msgtype, f'{attr}{prefix_result}')(control, parent, additonal_attr)
-        
-        # 图片消息处理
-        if msg_text == '图片':
-            return getattr(msgtype, f'{attr}ImageMessage')(control, parent, additonal_attr)
-        
-        # 如果都不匹配，归类为其他消息
-        return getattr(msgtype, f'{attr}OtherMessage')(control, parent, additonal_attr)
-    
-    elif msg_classname == "mmui::ChatTextItemView":
-        # 第三层：引用消息处理
-        if _is_quote_message(msg_text):
-            return getattr(msgtype, f'{attr}QuoteMessage')(control, parent, additonal_attr)
-        else:
-            return getattr(msgtype, f'{attr}TextMessage')(control, parent, additonal_attr)
-    
-    return getattr(msgtype, f'{attr}OtherMessage')(control, parent, additonal_attr)
+    classname, fields = classify_message(control.ClassName, control.Name)
+    if fields:
+        additonal_attr = {**additonal_attr, 'fields': fields}
+    return getattr(msgtype, f'{attr}{classname}')(control, parent, additonal_attr)
 
 
-def _classify_by_classname(classname: str) -> str:
-    classname_mapping = {
-        "mmui::ChatVoiceItemView": "VoiceMessage",
-        "mmui::ChatPersonalCardItemView": "PersonalCardMessage",
-    }
-    return classname_mapping.get(classname, "")
+def _parse_cache_key(control: uia.Control):
+    rect = control.BoundingRectangle
+    return (control.runtimeid, control.Name, rect.width(), rect.height())
 
 
-def _classify_by_name_prefix(name: str) -> str:
-    if name.startswith("[链接]"):
-        return "LinkMessage"
+def _cache_entry(result):
+    return (
+        type(result),
+        {
+            'direction': result.direction,
+            'direction_distence': result.distince,
+            'direction_source': result.direction_source,
+            'direction_confidence': result.direction_confidence,
+            'fields': dict(result._fields),
+        }
+    )
 
-    elif name.startswith("位置"):
-        return "LocationMessage"
 
-    elif name.startswith("文件\n"):
-        return "FileMessage"
+def parse_msg(
+    control: uia.Control,
+    parent,
+    lazy: bool = None
+):
+    """解析消息控件
 
-    elif name.startswith("视频"):
-        return "VideoMessage"
+    Args:
+        control: 消息控件
+        parent: 所属的 ChatBox
+        lazy: 是否返回延迟解析的 LazyMessage，默认取 WxParam.LAZY_MESSAGE
+    """
+    if lazy is None:
+        lazy = WxParam.LAZY_MESSAGE
+    if lazy:
+        return LazyMessage(control, parent, _parse_msg)
+    return _parse_msg(control, parent)
 
-    return ""
 
-def _is_quote_message(name: str) -> bool:
-    quote_pattern = r'^(.*?)\s*\n引用\s+(.+?)\s+的消息\s*:\s*(.*)$'
-    return bool(re.search(quote_pattern, name, re.DOTALL))
-    
-    
-def parse_msg(
+def _parse_msg(
     control: uia.Control,
     parent
 ):
     # t0 = time.time()
+    cache = getattr(parent, 'parse_cache', None)
+    if cache is None:
+        return parse_msg_attr(control, parent)
+
+    key = _parse_cache_key(control)
+    cached = cache.get(key)
+    if cached is not None:
+        # 命中缓存：直接按已知类型与方向重建，不再截图和识别
+        msg_cls, additonal_attr = cached
+        return msg_cls(control, parent, dict(additonal_attr))
+
     result = parse_msg_attr(control, parent)
+    cache.put(key, _cache_entry(result))
     
     # t1 = time.time()
     # msgtype = str(result.__class__.__name__).ljust(20)
     # ms = int((t1 - t0)*1000)
     # print(f'parse_msg: {msgtype} {"□"*ms} {ms}ms')
     return result
+
+
+_PARSE_EXECUTOR: Optional[Executor] = None
+_PARSE_EXECUTOR_KEY = None
+_PARSE_EXECUTOR_LOCK = threading.Lock()
+# 执行器 -> 正在使用它的 parse_msgs 调用数
+_PARSE_EXECUTOR_USERS: Dict[Executor, int] = {}
+
+
+def _current_parse_executor() -> Optional[Executor]:
+    """按当前参数返回执行器，调用方需持有 _PARSE_EXECUTOR_LOCK
+
+    参数变化时旧执行器退役：没有使用者时立即关闭，否则由最后一个使用者归还时关闭。
+    """
+    global _PARSE_EXECUTOR, _PARSE_EXECUTOR_KEY
+    key = (WxParam.PARSE_EXECUTOR, WxParam.PARSE_WORKERS)
+    if _PARSE_EXECUTOR is not None and _PARSE_EXECUTOR_KEY != key:
+        retired, _PARSE_EXECUTOR, _PARSE_EXECUTOR_KEY = _PARSE_EXECUTOR, None, None
+        if retired not in _PARSE_EXECUTOR_USERS:
+            retired.shutdown(wait=False)
+    if key[0] == 'none':
+        return None
+    if _PARSE_EXECUTOR is None:
+        if key[0] == 'process':
+            _PARSE_EXECUTOR = ProcessPoolExecutor(max_workers=key[1])
+        else:
+            _PARSE_EXECUTOR = ThreadPoolExecutor(
+                max_workers=key[1], thread_name_prefix='superwx4-parse'
+            )
+        _PARSE_EXECUTOR_KEY = key
+    return _PARSE_EXECUTOR
+
+
+def get_parse_executor() -> Optional[Executor]:
+    """获取批量解析使用的图像分析执行器
+
+    按 WxParam.PARSE_EXECUTOR / WxParam.PARSE_WORKERS 懒创建并复用，参数变化时重建。
+    需要在参数可能变化期间持续提交任务时使用 :func:`lease_parse_executor`。
+
+    Returns:
+        Optional[Executor]: 线程池或进程池，'none' 时返回 None（在调用线程中分析）
+    """
+    with _PARSE_EXECUTOR_LOCK:
+        return _current_parse_executor()
+
+
+@contextmanager
+def lease_parse_executor() -> Iterator[Optional[Executor]]:
+    """借用当前的图像分析执行器
+
+    借用期间即使参数变化、执行器被替换，借到的执行器也不会被关闭，
+    所有借用者归还后才关闭，避免 ``cannot schedule new futures after shutdown``。
+    """
+    with _PARSE_EXECUTOR_LOCK:
+        executor = _current_parse_executor()
+        if executor is not None:
+            _PARSE_EXECUTOR_USERS[executor] = _PARSE_EXECUTOR_USERS.get(executor, 0) + 1
+    try:
+        yield executor
+    finally:
+        if executor is not None:
+            with _PARSE_EXECUTOR_LOCK:
+                users = _PARSE_EXECUTOR_USERS.pop(executor) - 1
+                if users:
+                    _PARSE_EXECUTOR_USERS[executor] = users
+                elif executor is not _PARSE_EXECUTOR:
+                    executor.shutdown(wait=False)
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def parse_msgs(
+    controls: Iterable[uia.Control],
+    parent,
+    executor: Optional[Executor] = None,
+    lazy: bool = None,
+    ignore_errors: bool = False
+) -> List[Message]:
+    """批量解析消息控件
+
+    分三个阶段进行：
+
+    1. 在调用线程中读取所有 UIA 属性（缓存、几何判断、裁剪），需要像素判断的消息
+       一经裁剪就提交到执行器，与后续控件的 UIA 读取重叠进行
+    2. 图像分析（方向检测）在线程池/进程池中完成，PIL/NumPy 运算期间会释放 GIL
+    3. 在调用线程中按原始顺序组装消息对象
+
+    各阶段耗时记录在 ``parent.last_parse_stats`` 中（毫秒）。
+
+    Args:
+        controls: 消息控件
+        parent: 所属的 ChatBox
+        executor: 图像分析执行器，默认借用 :func:`lease_parse_executor`
+        lazy: 是否返回 LazyMessage，默认取 WxParam.LAZY_MESSAGE
+        ignore_errors: 为 True 时跳过解析失败的消息，否则抛出异常
+
+    Returns:
+        List[Message]: 与 controls 顺序一致的消息列表
+    """
+    controls = list(controls)
+    if lazy is None:
+        lazy = WxParam.LAZY_MESSAGE
+    if lazy:
+        return [LazyMessage(control, parent, _parse_msg) for control in controls]
+
+    if executor is not None:
+        return _parse_msgs_staged(controls, parent, executor, ignore_errors)
+    with lease_parse_executor() as executor:
+        return _parse_msgs_staged(controls, parent, executor, ignore_errors)
+
+
+def _parse_msgs_staged(
+    controls: List[uia.Control],
+    parent,
+    executor: Optional[Executor],
+    ignore_errors: bool
+) -> List[Message]:
+    t0 = time.perf_counter()
+    cache = getattr(parent, 'parse_cache', None)
+    box_rect = _box_rect(parent) if WxParam.GEOMETRY_DIRECTION else None
+
+    # 阶段一：UIA 读取
+    plans = []
+    pending = 0
+    with parent.frame_capture.batch():
+        for control in controls:
+            try:
+                key = _parse_cache_key(control) if cache is not None else None
+                cached = cache.get(key) if cache is not None else None
+                if cached is not None:
+                    plans.append(('cached', control, key, cached))
+                    continue
+                if not control.AutomationId:
+                    plans.append(('system', control, key, None))
+                    continue
+                direction, distence, confidence = _geometry_direction(control, box_rect)
+                if direction is not None:
+                    plans.append(('direction', control, key, (direction, distence, 'geometry', confidence)))
+                    continue
+                view = parent.frame_capture.view(control.BoundingRectangle)
+                if executor is not None:
+                    job = executor.submit(detect_message_direction_from_image, view)
+                else:
+                    job = view
+                plans.append(('pixel', control, key, (job, confidence)))
+                pending += 1
+            except Exception:
+                if not ignore_errors:
+                    raise
+    t1 = time.perf_counter()
+
+    # 阶段二、三：等待图像分析结果并按顺序组装
+    wait = 0.0
+    result = []
+    for kind, control, key, data in plans:
+        try:
+            if kind == 'cached':
+                msg_cls, additonal_attr = data
+                result.append(msg_cls(control, parent, dict(additonal_attr)))
+                continue
+            if kind == 'system':
+                msg = SystemMessage(control, parent)
+            else:
+                if kind == 'pixel':
+                    job, confidence = data
+                    tw = time.perf_counter()
+                    if executor is not None:
+                        direction, distence = job.result()
+                    else:
+                        direction, distence = detect_message_direction_from_image(job)
+                    wait += time.perf_counter() - tw
+                    data = (direction, distence, 'pixel', confidence)
+                msg = _build_msg(control, parent, *data)
+            if cache is not None:
+                cache.put(key, _cache_entry(msg))
+            result.append(msg)
+        except Exception:
+            if not ignore_errors:
+                raise
+    t2 = time.perf_counter()
+
+    stats = {
+        'count': len(controls),
+        'pixel': pending,
+        'uia_ms': _ms(t1 - t0),
+        'analysis_wait_ms': _ms(wait),
+        'assemble_ms': _ms(t2 - t1 - wait),
+        'total_ms': _ms(t2 - t0),
+    }
+    try:
+        parent.last_parse_stats = stats
+    except AttributeError:
+        pass
+    if controls:
+        wxlog.debug(f"parse_msgs: {stats}")
+    return result
 # 1
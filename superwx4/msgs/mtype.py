@@ -44,8 +44,9 @@ class QuoteMessage(BaseMessage):
             additonal_attr: Dict[str, Any]={}
         ):
         super().__init__(control, parent, additonal_attr)
-        self.content, self.quote_nickname, self.quote_content = \
-            re.findall(self.repattern, self.content, re.DOTALL)[0]
+        if not hasattr(self, 'quote_content'):
+            self.content, self.quote_nickname, self.quote_content = \
+                re.findall(self.repattern, self.content, re.DOTALL)[0]
 
     def download_quote_image(self, dir_path=None, timeout=10):
         """下载引用消息中的图片
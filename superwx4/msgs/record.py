@@ -0,0 +1,132 @@
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    Optional,
+    Tuple
+)
+
+__all__ = ['MessageRecord']
+
+_EMPTY = MappingProxyType({})
+
+
+class MessageRecord(Mapping):
+    """不可变的轻量消息记录
+
+    由 :meth:`Message.to_record` 生成，只保存消息的值，不持有 ``control``、
+    ``parent``、``root`` 等 COM 对象引用，适合长期保存消息历史、跨线程传递
+    或交给 MCP / skill / 存储层序列化。
+
+    支持属性访问与 O(1) 的映射访问（``record['content']``），
+    :meth:`to_dict` 的结果在首次调用后缓存。
+
+    Args:
+        id: 消息 runtimeid
+        type: 消息类型，如 ``'text'``
+        attr: 消息属性，``'self'`` / ``'friend'`` / ``'system'``
+        content: 消息内容
+        direction: 消息方向
+        rect: 消息矩形 ``(left, top, right, bottom)``
+        hash: 消息哈希
+        extra: 其他公开字段（发送者、引用内容、文件名等）
+    """
+
+    __slots__ = ('id', 'type', 'attr', 'content', 'direction', 'rect', 'hash', 'extra', '_dict')
+
+    CORE_FIELDS = ('id', 'type', 'attr', 'content', 'direction', 'rect', 'hash')
+    _CORE_SET = frozenset(CORE_FIELDS)
+
+    def __init__(
+            self,
+            id: Any = None,
+            type: Optional[str] = None,
+            attr: Optional[str] = None,
+            content: Optional[str] = None,
+            direction: Optional[str] = None,
+            rect: Optional[Tuple[int, int, int, int]] = None,
+            hash: Optional[str] = None,
+            extra: Optional[Dict[str, Any]] = None
+        ):
+        setattr_ = object.__setattr__
+        setattr_(self, 'id', id)
+        setattr_(self, 'type', type)
+        setattr_(self, 'attr', attr)
+        setattr_(self, 'content', content)
+        setattr_(self, 'direction', direction)
+        setattr_(self, 'rect', rect)
+        setattr_(self, 'hash', hash)
+        extra = {k: v for k, v in (extra or {}).items() if k not in self._CORE_SET}
+        setattr_(self, 'extra', MappingProxyType(extra) if extra else _EMPTY)
+        setattr_(self, '_dict', None)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f'{self.__class__.__name__} is immutable')
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f'{self.__class__.__name__} is immutable')
+
+    # region --- 映射接口 -------------------------------------------------------
+    def __getitem__(self, key: str) -> Any:
+        if key in self._CORE_SET:
+            return getattr(self, key)
+        return self.extra[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._CORE_SET or key in self.extra
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.CORE_FIELDS
+        yield from self.extra
+
+    def __len__(self) -> int:
+        return len(self.CORE_FIELDS) + len(self.extra)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = self._dict
+        if data is None:
+            data = {key: getattr(self, key) for key in self.CORE_FIELDS}
+            data.update(self.extra)
+            object.__setattr__(self, '_dict', data)
+        return dict(data)
+
+    # endregion ----------------------------------------------------------------
+
+    @property
+    def is_self(self) -> bool:
+        return self.attr == 'self'
+
+    @property
+    def is_friend(self) -> bool:
+        return self.attr == 'friend'
+
+    @property
+    def is_system(self) -> bool:
+        return self.attr == 'system'
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MessageRecord):
+            return NotImplemented
+        if self.id is not None and other.id is not None:
+            return self.id == other.id
+        return self.to_dict() == other.to_dict()
+
+    def __hash__(self) -> int:
+        if self.id is not None:
+            return hash(self.id)
+        return hash((self.content, self.hash))
+
+    def __reduce__(self):
+        return (
+            self.__class__,
+            (self.id, self.type, self.attr, self.content, self.direction,
+             self.rect, self.hash, dict(self.extra))
+        )
+
+    def __repr__(self):
+        content = (self.content or '').replace('\n', '').strip()
+        content = content if len(content) <= 8 else content[:8] + '...'
+        return f"<MessageRecord({self.type}/{self.attr}: {content})>"
+# 1
@@ -16,6 +16,33 @@ class WxParam:
     # 是否启用消息哈希值用于辅助判断消息，开启后会稍微影响性能
     MESSAGE_HASH: bool = False
 
+    # 是否启用延迟解析消息，开启后方向、类型、哈希等字段在首次访问时才计算
+    LAZY_MESSAGE: bool = False
+
+    # 每个聊天窗口缓存的消息解析结果数量（按 runtimeid + Name + 气泡尺寸）
+    PARSE_CACHE_SIZE: int = 1024
+
+    # 是否优先使用 UIA 几何信息判断消息方向，置信度低于阈值时回退到截图检测
+    GEOMETRY_DIRECTION: bool = True
+    GEOMETRY_DIRECTION_THRESHOLD: float = 0.3
+
+    # 新消息追踪：每个聊天保留的已见消息 id 数量，以及每个窗口保留的聊天数量
+    MESSAGE_TRACKER_SIZE: int = 500
+    MESSAGE_TRACKER_CHATS: int = 64
+
+    # 是否缓存已定位的控件（按窗口句柄与选择器），使用前用父控件/位置探测是否仍有效，失效时才重新查找
+    CONTROL_REGISTRY: bool = True
+
+    # 记录的控件索引路径文件（按微信版本保存，冷启动时直接沿路径定位），默认为空，只保存在内存中
+    LOCATOR_PATHS: str = ''
+
+    # 获取新消息时是否按指纹序列 (runtimeid, Name, 高度) 对齐前后两次可见窗口
+    MESSAGE_DIFF: bool = True
+
+    # 批量解析消息时图像分析使用的执行器：'thread' 线程池，'process' 进程池，'none' 在调用线程中执行
+    PARSE_EXECUTOR: Literal['thread', 'process', 'none'] = 'thread'
+    PARSE_WORKERS: int = 4
+
     # 头像到消息X偏移量，用于消息定位，点击消息等操作
     DEFAULT_MESSAGE_XBIAS = 51
     DEFAULT_MESSAGE_YBIAS = 30
@@ -26,9 +53,39 @@ class WxParam:
     # 监听消息时间间隔，单位秒
     LISTEN_INTERVAL: int = 1
 
+    # 监听模式：poll 按间隔轮询全部聊天，event 订阅消息列表的 UIA 结构变化事件，收到事件时检查，另按 LISTEN_EVENT_SAFETY_INTERVAL 兜底轮询（订阅失败的聊天退回轮询）
+    LISTEN_MODE: Literal['poll', 'event'] = 'poll'
+
+    # 事件模式下订阅成功的聊天的兜底轮询间隔，单位秒，防止事件丢失后不再检查；0 表示只靠事件
+    LISTEN_EVENT_SAFETY_INTERVAL: int = 120
+
+    # 空闲聊天的最长轮询间隔，单位秒；有新消息时回到 LISTEN_INTERVAL
+    LISTEN_MAX_INTERVAL: int = 30
+
+    # 空闲聊天每次轮询后间隔乘以的倍数
+    LISTEN_BACKOFF: float = 2.0
+
+    # 全局每秒最多轮询的聊天数，0 表示不限制
+    LISTEN_POLL_BUDGET: int = 20
+
     # 监听执行器线程池大小
     LISTENER_EXCUTOR_WORKERS: int = 4
 
+    # 本地消息库路径（SQLite），为空时不保存；用于重启后补发停机期间的消息和查询最近消息
+    MESSAGE_STORE: str = ''
+
+    # 监听回调队列上限，0 表示不限制
+    LISTEN_QUEUE_SIZE: int = 1000
+
+    # 回调队列满时的策略：block 阻塞监听，drop_oldest 丢弃最早的消息，spill 暂存到磁盘（回调收到 MessageRecord）
+    LISTEN_QUEUE_OVERFLOW: Literal['block', 'drop_oldest', 'spill'] = 'block'
+
+    # 是否按批回调：每个聊天每轮的新消息作为 List[Message] 一次回调
+    LISTEN_BATCH: bool = False
+
+    # 回调执行方式：thread 线程池，process 进程池（回调需可 pickle，参数为 (MessageRecord, 聊天名称)）
+    LISTEN_CALLBACK_EXECUTOR: Literal['thread', 'process'] = 'thread'
+
     # 搜索聊天对象超时时间，单位秒
     SEARCH_CHAT_TIMEOUT: int = 2
 
@@ -0,0 +1,342 @@
+"""多账号管理。
+
+:class:`WeChatPool` 发现本机所有已登录的微信主窗口，每个账号（进程）对应一个
+:class:`~superwx4.wx.WeChat`，首次使用时才初始化。所有账号的监听共用一个调度线程和
+一个回调分发器，账号增加时线程数不变。
+
+用法::
+
+    pool = WeChatPool()
+    for account in pool.accounts:
+        pool.AddListenChat(account.pid, '文件传输助手', on_message)
+    pool.SendMsg(pool.accounts[0].pid, '你好', who='文件传输助手')
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    TYPE_CHECKING,
+    Union,
+)
+
+from superwx4 import uia
+from superwx4.listen import CallbackDispatcher
+from superwx4.logger import wxlog
+from superwx4.param import WxParam, WxResponse
+from superwx4.ui.main import WeChatMainWnd
+from superwx4.utils.win32 import GetAllWindows, is_window
+from superwx4.wx import Chat, WeChat
+
+if TYPE_CHECKING:
+    from superwx4.msgs.base import Message
+
+
+class AccountInfo(NamedTuple):
+    """已登录的微信主窗口
+
+    Attributes:
+        pid: 进程 id，作为账号标识
+        hwnd: 主窗口句柄
+        title: 窗口标题
+    """
+
+    pid: int
+    hwnd: int
+    title: str
+
+
+def discover_main_windows() -> List[AccountInfo]:
+    """枚举本机所有微信主窗口，每个进程只取一个
+
+    Returns:
+        List[AccountInfo]: 按窗口枚举顺序排列
+    """
+
+    accounts: Dict[int, AccountInfo] = {}
+    for hwnd, _, title in GetAllWindows(classname=WeChatMainWnd._win_cls_name):
+        try:
+            control = uia.ControlFromHandle(hwnd)
+            # 独立聊天窗口与主窗口的 Win32 类名相同，用 UIA 类名区分
+            if control is None or control.ClassName != WeChatMainWnd._ui_cls_name:
+                continue
+            pid = control.ProcessId
+        except Exception:
+            continue
+        accounts.setdefault(pid, AccountInfo(pid, hwnd, title))
+    if not accounts:
+        # 新版本顶层窗口类名可能变化，退回 UIA 枚举
+        try:
+            for control in uia.GetRootControl().GetChildren():
+                if control.ClassName != WeChatMainWnd._ui_cls_name:
+                    continue
+                pid = control.ProcessId
+                hwnd = int(getattr(control, 'NativeWindowHandle', 0) or 0)
+                accounts.setdefault(pid, AccountInfo(pid, hwnd, control.Name))
+        except Exception:
+            wxlog.debug('UIA 枚举微信主窗口失败')
+    return list(accounts.values())
+
+
+class _Account:
+    __slots__ = ('info', 'wx', 'lock', 'stats')
+
+    def __init__(self, info: AccountInfo):
+        self.info = info
+        self.wx: Optional[WeChat] = None
+        self.lock = threading.Lock()
+        self.stats = {'sent': 0, 'send_errors': 0, 'send_seconds': 0.0}
+
+
+class WeChatPool:
+    """多账号实例池
+
+    Args:
+        factory (Callable, optional): 根据 AccountInfo 创建 WeChat 的函数，默认 ``WeChat(hwnd=...)``
+        discover (bool): 是否在创建时立即发现账号
+    """
+
+    def __init__(
+            self,
+            factory: Callable[[AccountInfo], WeChat] = None,
+            discover: bool = True
+        ):
+        self._factory = factory or (lambda info: WeChat(hwnd=info.hwnd))
+        self._accounts: Dict[int, _Account] = {}
+        self._lock = threading.RLock()
+        self._dispatcher: Optional[CallbackDispatcher] = None
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if discover:
+            self.discover()
+
+    def __repr__(self):
+        return f'<WeChatPool({len(self._accounts)} accounts)>'
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+    def __iter__(self) -> Iterator[AccountInfo]:
+        return iter(self.accounts)
+
+    def __getitem__(self, account: int) -> WeChat:
+        return self.get(account)
+
+    @property
+    def accounts(self) -> List[AccountInfo]:
+        with self._lock:
+            return [acc.info for acc in self._accounts.values()]
+
+    def discover(self) -> List[AccountInfo]:
+        """重新发现主窗口：新增账号延迟初始化，窗口已关闭的账号移除
+
+        Returns:
+            List[AccountInfo]: 当前所有账号
+        """
+
+        found = {info.pid: info for info in discover_main_windows()}
+        with self._lock:
+            for pid in list(self._accounts):
+                acc = self._accounts[pid]
+                if pid not in found and not is_window(acc.info.hwnd):
+                    self._detach(acc)
+                    del self._accounts[pid]
+            for pid, info in found.items():
+                if pid in self._accounts:
+                    self._accounts[pid].info = info
+                else:
+                    self._accounts[pid] = _Account(info)
+        return self.accounts
+
+    def add(self, info: AccountInfo) -> None:
+        """手动加入一个账号"""
+
+        with self._lock:
+            self._accounts.setdefault(info.pid, _Account(info))
+
+    def _account(self, account: int) -> _Account:
+        with self._lock:
+            acc = self._accounts.get(account)
+            if acc is None:
+                acc = next(
+                    (a for a in self._accounts.values() if a.info.hwnd == account), None
+                )
+        if acc is None:
+            raise KeyError(f'未找到微信账号：{account}')
+        return acc
+
+    def get(self, account: int) -> WeChat:
+        """获取账号对应的 WeChat 实例，首次获取时初始化
+
+        Args:
+            account (int): 进程 id 或主窗口句柄
+        """
+
+        acc = self._account(account)
+        with acc.lock:
+            if acc.wx is None:
+                acc.wx = self._factory(acc.info)
+                acc.wx._listener_namespace = acc.info.pid
+                if self._thread is not None:
+                    self._attach(acc.wx)
+            return acc.wx
+
+    # ---- 监听 ----
+
+    def _attach(self, wx: WeChat) -> None:
+        if getattr(wx, '_listener_is_listening', False):
+            return
+        wx._listener_start(dispatcher=self._dispatcher, thread=False)
+        wx._listener_source.on_notify = self._wakeup.set
+
+    def _detach(self, acc: _Account) -> None:
+        wx = acc.wx
+        if wx is not None and getattr(wx, '_listener_is_listening', False):
+            wx._listener_stop()
+
+    def StartListening(self) -> None:
+        """启动共用的监听调度线程"""
+
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._dispatcher = CallbackDispatcher(
+                workers=WxParam.LISTENER_EXCUTOR_WORKERS,
+                maxsize=WxParam.LISTEN_QUEUE_SIZE,
+                overflow=WxParam.LISTEN_QUEUE_OVERFLOW,
+                batch=WxParam.LISTEN_BATCH,
+                mode=WxParam.LISTEN_CALLBACK_EXECUTOR
+            )
+            self._stop.clear()
+            for acc in self._accounts.values():
+                if acc.wx is not None:
+                    self._attach(acc.wx)
+            self._thread = threading.Thread(
+                target=self._listen, name='superwx4-pool', daemon=True
+            )
+            self._thread.start()
+
+    def _listening(self) -> List[WeChat]:
+        with self._lock:
+            return [
+                acc.wx for acc in self._accounts.values()
+                if acc.wx is not None and getattr(acc.wx, '_listener_is_listening', False)
+            ]
+
+    def _listen(self) -> None:
+        while not self._stop.is_set():
+            # 先清除再处理，处理期间到达的事件会让下面的 wait 立即返回
+            self._wakeup.clear()
+            timeout = WxParam.LISTEN_INTERVAL
+            for wx in self._listening():
+                try:
+                    fired = wx._listener_source.wait(0)
+                    timeout = min(timeout, wx._listener_tick(fired))
+                except Exception as e:
+                    wxlog.debug(f'账号监听失败：{wx} {e}')
+            self._wakeup.wait(timeout)
+
+    def StopListening(self, remove: bool = True) -> None:
+        """停止监听
+
+        Args:
+            remove (bool, optional): 是否移除监听对象
+        """
+
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stop.set()
+        self._wakeup.set()
+        thread.join()
+        for wx in self._listening():
+            wx.StopListening(remove)
+        self._dispatcher.close(wait=True)
+
+    def AddListenChat(
+            self,
+            account: int,
+            nickname: str,
+            callback: Callable[['Message', Chat], None],
+        ) -> Union[Chat, WxResponse]:
+        """为指定账号添加监听聊天，监听由共用调度线程执行"""
+
+        self.StartListening()
+        wx = self.get(account)
+        self._attach(wx)
+        return wx.AddListenChat(nickname, callback)
+
+    def RemoveListenChat(self, account: int, nickname: str, close_window: bool = False) -> WxResponse:
+        return self.get(account).RemoveListenChat(nickname, close_window)
+
+    # ---- 发送 ----
+
+    def _send(self, account: int, method: str, *args, **kwargs) -> Any:
+        acc = self._account(account)
+        wx = self.get(account)
+        t0 = time.perf_counter()
+        result = getattr(wx, method)(*args, **kwargs)
+        elapsed = time.perf_counter() - t0
+        with self._lock:
+            acc.stats['sent'] += 1
+            acc.stats['send_seconds'] += elapsed
+            if isinstance(result, WxResponse) and not result.is_success:
+                acc.stats['send_errors'] += 1
+        return result
+
+    def SendMsg(self, account: int, msg: str, who: str = None, **kwargs) -> WxResponse:
+        """通过指定账号发送消息，其它参数同 :meth:`WeChat.SendMsg`"""
+
+        return self._send(account, 'SendMsg', msg, who, **kwargs)
+
+    def SendFiles(self, account: int, filepath, who: str = None, **kwargs) -> WxResponse:
+        """通过指定账号发送文件，其它参数同 :meth:`WeChat.SendFiles`"""
+
+        return self._send(account, 'SendFiles', filepath, who, **kwargs)
+
+    # ---- 统计 ----
+
+    def GetStats(self) -> Dict[int, dict]:
+        """每个账号的收发统计
+
+        Returns:
+            Dict[int, dict]: pid -> {initialized, listening, chats, sent, send_errors,
+                send_avg_ms, received, polls}
+        """
+
+        result = {}
+        with self._lock:
+            accounts = list(self._accounts.values())
+        for acc in accounts:
+            wx = acc.wx
+            listen_stats = wx.GetListenStats() if wx is not None else {}
+            sent = acc.stats['sent']
+            result[acc.info.pid] = {
+                'initialized': wx is not None,
+                'listening': bool(wx is not None and getattr(wx, '_listener_is_listening', False)),
+                'chats': len(listen_stats),
+                'sent': sent,
+                'send_errors': acc.stats['send_errors'],
+                'send_avg_ms': round(acc.stats['send_seconds'] / sent * 1000, 2) if sent else 0.0,
+                'received': sum(s['messages'] for s in listen_stats.values()),
+                'polls': sum(s['polls'] for s in listen_stats.values()),
+            }
+        return result
+
+    def GetCallbackStats(self) -> Dict[str, object]:
+        """共用回调分发器的统计"""
+
+        if self._dispatcher is None:
+            return {}
+        return self._dispatcher.stats()
+# 1
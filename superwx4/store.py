@@ -0,0 +1,299 @@
+"""本地消息存储。
+
+监听器把每轮分发的消息批量写入 SQLite（WAL 模式），用于：
+
+- 按 (聊天, runtimeid, 哈希) 去重，重复写入同一条消息不会产生重复记录，
+  与写入顺序无关
+- 每个聊天记录高水位（最后一条消息），重启后把可见消息与高水位对齐，
+  补发停机期间到达的消息，而不是直接把它们当作已读
+- 查询最近的历史消息，不必滚动界面
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from hashlib import sha1
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from superwx4.msgs.record import MessageRecord
+from superwx4.utils.diff import align_snapshots
+
+__all__ = ['MessageStore']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    hash TEXT,
+    msg_id TEXT,
+    type TEXT,
+    attr TEXT,
+    sender TEXT,
+    content TEXT,
+    direction TEXT,
+    created REAL NOT NULL,
+    extra TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_messages_fingerprint ON messages(chat, fingerprint);
+CREATE INDEX IF NOT EXISTS idx_messages_chat_created ON messages(chat, created);
+CREATE INDEX IF NOT EXISTS idx_messages_chat_msg_id ON messages(chat, msg_id);
+CREATE TABLE IF NOT EXISTS chat_state (
+    chat TEXT PRIMARY KEY,
+    last_seq INTEGER,
+    last_hash TEXT,
+    last_msg_id TEXT,
+    updated REAL NOT NULL
+);
+"""
+
+
+def _fingerprint(chat: str, msg_id: Optional[str], msg_hash: str, generation: int) -> str:
+    # runtimeid 区分同一会话中内容相同的不同气泡；列表项会被回收复用，
+    # generation 为该 id 此前承载过的消息数，回收后再遇到相同内容也能得到新指纹
+    return sha1(f'{chat}\0{msg_id or ""}\0{msg_hash}\0{generation}'.encode()).hexdigest()
+
+
+def _timestamp(since: Union[None, float, datetime]) -> Optional[float]:
+    if isinstance(since, datetime):
+        return since.timestamp()
+    return since
+
+
+def _record(msg: Any) -> MessageRecord:
+    if isinstance(msg, MessageRecord):
+        return msg
+    return msg.to_record()
+
+
+class MessageStore:
+    """SQLite 消息存储，线程安全
+
+    Args:
+        path (str): 数据库文件路径，``':memory:'`` 为内存数据库
+    """
+
+    def __init__(self, path: str):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+
+    def __repr__(self):
+        return f'<MessageStore({self.path})>'
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---- 写入 ----
+
+    def add(self, chat: str, msgs: Sequence[Any]) -> int:
+        """写入一个聊天的一批消息
+
+        Returns:
+            int: 实际新增的条数（重复的消息被忽略）
+        """
+
+        return self.add_batch({chat: msgs})
+
+    def add_batch(self, batch: Dict[str, Sequence[Any]]) -> int:
+        """在一个事务中写入多个聊天的消息
+
+        Args:
+            batch: 聊天名称 -> 按时间顺序排列的消息（Message 或 MessageRecord）
+
+        Returns:
+            int: 实际新增的条数
+        """
+
+        records = {chat: [_record(m) for m in msgs] for chat, msgs in batch.items() if msgs}
+        if not records:
+            return 0
+        now = time.time()
+        inserted = 0
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute('BEGIN')
+            try:
+                for chat, items in records.items():
+                    row = cur.execute(
+                        'SELECT last_hash, last_msg_id FROM chat_state WHERE chat = ?', (chat,)
+                    ).fetchone()
+                    prev_hash, prev_id = row if row else (None, None)
+                    last_seq = None
+                    for record in items:
+                        msg_hash = record.hash or sha1(str(record.content).encode()).hexdigest()
+                        msg_id = None if record.id is None else str(record.id)
+                        # 回收保护：只有该 id 最近一次承载的就是这条内容时才视为重复，
+                        # 中间被别的内容复用过则是新消息；判断只看该 id 自身的历史
+                        generation, last_hash = cur.execute(
+                            'SELECT COUNT(*), (SELECT hash FROM messages WHERE chat = ?1 AND msg_id IS ?2 '
+                            'ORDER BY seq DESC LIMIT 1) FROM messages WHERE chat = ?1 AND msg_id IS ?2',
+                            (chat, msg_id)
+                        ).fetchone()
+                        prev_hash, prev_id = msg_hash, msg_id
+                        if last_hash == msg_hash:
+                            continue
+                        extra = dict(record.extra)
+                        cur.execute(
+                            'INSERT OR IGNORE INTO messages '
+                            '(chat, fingerprint, hash, msg_id, type, attr, sender, content, direction, created, extra) '
+                            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                            (
+                                chat,
+                                _fingerprint(chat, msg_id, msg_hash, generation),
+                                msg_hash,
+                                msg_id,
+                                record.type,
+                                record.attr,
+                                extra.get('sender'),
+                                record.content,
+                                record.direction,
+                                now,
+                                json.dumps(extra, ensure_ascii=False, default=str),
+                            )
+                        )
+                        if cur.rowcount:
+                            inserted += 1
+                            last_seq = cur.lastrowid
+                    cur.execute(
+                        'INSERT INTO chat_state (chat, last_seq, last_hash, last_msg_id, updated) '
+                        'VALUES (?, ?, ?, ?, ?) '
+                        'ON CONFLICT(chat) DO UPDATE SET '
+                        'last_seq = COALESCE(excluded.last_seq, last_seq), '
+                        'last_hash = excluded.last_hash, last_msg_id = excluded.last_msg_id, '
+                        'updated = excluded.updated',
+                        (chat, last_seq, prev_hash, prev_id, now)
+                    )
+                cur.execute('COMMIT')
+            except Exception:
+                cur.execute('ROLLBACK')
+                raise
+        return inserted
+
+    # ---- 查询 ----
+
+    def _rows_to_records(self, rows: Iterable[tuple]) -> List[MessageRecord]:
+        result = []
+        for seq, chat, msg_hash, msg_id, type_, attr, content, direction, created, extra in rows:
+            fields = json.loads(extra) if extra else {}
+            fields.update(chat=chat, seq=seq, time=created)
+            result.append(MessageRecord(
+                id=msg_id, type=type_, attr=attr, content=content,
+                direction=direction, hash=msg_hash, extra=fields
+            ))
+        return result
+
+    def messages(
+        self,
+        chat: str,
+        since: Union[None, float, datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[MessageRecord]:
+        """查询聊天的消息
+
+        Args:
+            chat (str): 聊天名称
+            since (float | datetime, optional): 只返回该时间之后写入存储的消息，
+                比较的是写入时间（extra 中的 time），不是消息的发送时间
+            limit (int, optional): 最多返回最近的条数
+
+        Returns:
+            List[MessageRecord]: 按时间顺序排列，extra 中包含 chat、seq、time
+        """
+
+        sql = (
+            'SELECT seq, chat, hash, msg_id, type, attr, content, direction, created, extra '
+            'FROM messages WHERE chat = ?'
+        )
+        params: List[Any] = [chat]
+        if since is not None:
+            sql += ' AND created > ?'
+            params.append(_timestamp(since))
+        sql += ' ORDER BY seq DESC'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return self._rows_to_records(reversed(rows))
+
+    def recent(self, chat: str, n: int = 50) -> List[MessageRecord]:
+        """最近 n 条消息，按时间顺序"""
+
+        return self.messages(chat, limit=n)
+
+    def count(self, chat: Optional[str] = None) -> int:
+        with self._lock:
+            if chat is None:
+                return self._conn.execute('SELECT COUNT(*) FROM messages').fetchone()[0]
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM messages WHERE chat = ?', (chat,)
+            ).fetchone()[0]
+
+    def chats(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute('SELECT chat FROM chat_state ORDER BY chat')]
+
+    def high_water(self, chat: str) -> Optional[Dict[str, Any]]:
+        """聊天的高水位：最后写入的消息
+
+        Returns:
+            Optional[dict]: {seq, hash, updated}，从未写入时为 None
+        """
+
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT last_seq, last_hash, updated FROM chat_state WHERE chat = ?', (chat,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'seq': row[0], 'hash': row[1], 'updated': row[2]}
+
+    def tail_hashes(self, chat: str, n: int = 50) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT hash FROM messages WHERE chat = ? ORDER BY seq DESC LIMIT ?', (chat, n)
+            ).fetchall()
+        return [row[0] for row in reversed(rows)]
+
+    def missed(self, chat: str, msgs: Sequence[Any]) -> List[Any]:
+        """找出可见消息中位于高水位之后、尚未写入的消息
+
+        把可见消息的哈希序列与存储中最近的消息对齐，对齐点之后的即为停机期间到达的消息。
+
+        Args:
+            chat (str): 聊天名称
+            msgs: 当前可见的消息，按时间顺序
+
+        Returns:
+            list: 未写入的消息；从未写入过该聊天或无法对齐时返回空列表
+        """
+
+        if not msgs or self.high_water(chat) is None:
+            return []
+        stored = [(h,) for h in self.tail_hashes(chat, max(len(msgs), 50))]
+        visible = [(getattr(m, 'hash', None),) for m in msgs]
+        alignment = align_snapshots(stored, visible)
+        if not alignment.anchored:
+            return []
+        return list(msgs[alignment.start:])
+# 1
@@ -2,11 +2,13 @@ from superwx4 import uia
 from superwx4.param import PROJECT_NAME, WxResponse
 from superwx4.logger import wxlog
 from superwx4.utils.lock import uilock
+from superwx4.backend.windows import import_windows_module
 from abc import ABC, abstractmethod
-import win32gui
 from typing import Union
 import time
 
+win32gui = import_windows_module('win32gui')
+
 class BaseUIWnd(ABC):
     _ui_cls_name: str = None
     _ui_name: str = None
@@ -6,8 +6,15 @@ from superwx4.param import (
 from superwx4.utils.win32 import (
     SetClipboardFiles,
     SetClipboardData,
-    SetClipboardText
+    SetClipboardText,
+    capture_window,
+    is_window
 )
+from superwx4.utils.frame import FrameCapture
+from superwx4.utils.cache import LRUCache
+from superwx4.utils.tracker import MessageTracker, get_tracker
+from superwx4.utils.diff import align_snapshots, message_fingerprint
+from superwx4.backend.cached import CachedControl, get_children_cached
 from superwx4.ui.component import (
     Menu
 )
@@ -16,26 +23,33 @@ from superwx4.logger import wxlog
 from .base import (
     BaseUISubWnd
 )
-from superwx4.msgs.msg import parse_msg
-from superwx4.locator import find_first, ctrl_exists, SELECTORS
+from superwx4.msgs.msg import parse_msg, parse_msgs
+from superwx4.locator import find_first, find_many, ctrl_exists, get_registry, SELECTORS
 
 import time
 import os
 import re
-from typing import Iterable, Optional, Sequence, Tuple, Union
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
 
 def truncate_string(s: str, n: int=8) -> str:
     s = s.replace('\n', '').strip()
     return s if len(s) <= n else s[:n] + '...'
 
-USED_MSG_IDS = {}
-LAST_MSG_COUNT = {}
-
 class ChatBox(BaseUISubWnd):
     def __init__(self, control: uia.Control, parent):
         self.control: uia.Control = control
         self.root = parent
         self.parent = parent  # `wx` or `chat`
+        self.frame_capture = FrameCapture(self._top_hwnd, capture_window)
+        self.parse_cache = LRUCache(WxParam.PARSE_CACHE_SIZE)
+        self.last_parse_stats = {}
+        # 同一窗口的 ChatBox 重建后沿用同一个追踪器
+        self.tracker: MessageTracker = get_tracker(
+            self._top_hwnd(),
+            alive=is_window,
+            maxlen=WxParam.MESSAGE_TRACKER_SIZE,
+            max_chats=WxParam.MESSAGE_TRACKER_CHATS,
+        )
         self.init()
 
     def _lang(self, text: str):
@@ -47,13 +61,14 @@ class ChatBox(BaseUISubWnd):
             return self.msgbox.runtimeid
         return None
     
+    def _top_hwnd(self) -> int:
+        if not getattr(self, '_hwnd', None):
+            self._hwnd = self.control.GetTopLevelControl().NativeWindowHandle
+        return self._hwnd
+
     @property
     def used_msg_ids(self):
-        if self.id in USED_MSG_IDS:
-            return USED_MSG_IDS[self.id]
-        else:
-            USED_MSG_IDS[self.id] = tuple()
-            return USED_MSG_IDS[self.id]
+        return self.tracker.seen(self.id)
     
     @property
     def who(self):
@@ -105,17 +120,25 @@ class ChatBox(BaseUISubWnd):
 
     def refresh_send_button(self):
         """Re-locate the send button (may only appear after text is entered)."""
-        self.sendbtn = find_first(self.control, "send_button", search_depth=30)
+        hwnd = self._top_hwnd()
+        self.sendbtn = find_first(self.control, "send_button", search_depth=30, hwnd=hwnd)
         if not ctrl_exists(self.sendbtn):
             # Fallback: search from input_view if available
             if hasattr(self, "input_view") and ctrl_exists(self.input_view):
-                self.sendbtn = find_first(self.input_view, "send_button", search_depth=30)
+                self.sendbtn = find_first(self.input_view, "send_button", search_depth=30, hwnd=hwnd)
         return self.sendbtn
 
     def init(self):
+        # 一次遍历定位消息列表、输入框和发送按钮；已缓存且仍然有效的控件不再查找
+        found = get_registry().locate_many(
+            self._top_hwnd(),
+            ("chat_message_list", "chat_input_field", "send_button"),
+            lambda keys: find_many(self.control, keys),
+        )
+
         # Prefer stable AutomationId selectors (newer WeChat versions expose them)
         # Message list
-        self.msgbox = (
+        self.msgbox = found["chat_message_list"] or (
             self.control.ListControl(AutomationId="chat_message_list")
             or self.control.GroupControl(ClassName="mmui::MessageView").ListControl(AutomationId="chat_message_list")
             or self.control.GroupControl(ClassName="mmui::MessageView").ListControl()
@@ -123,28 +146,37 @@ class ChatBox(BaseUISubWnd):
         )
 
         # Chat input field (Name may change with current chat; do NOT use Name here)
-        self.editbox = (
+        self.editbox = found["chat_input_field"] or (
             self.control.EditControl(AutomationId="chat_input_field")
             or self.control.EditControl(ClassName="mmui::ChatInputField")
         )
 
         # Send button: no stable AutomationId in some builds, so use Name fuzzy match as fallback
-        self.sendbtn = self.control.ButtonControl(Name=self._lang('发送(S)'))
-        if not self.sendbtn or not self.sendbtn.Exists(0):
-            # Try common variants (Chinese/English, with/without shortcut hint)
-            self.sendbtn = (
-                self.control.ButtonControl(Name='发送')
-                or self.control.ButtonControl(Name='Send')
-                or self.control.ButtonControl(Name='发送(S)')
-            )
+        self.sendbtn = found["send_button"]
+        if self.sendbtn is None:
+            # Not visible yet (it may only appear after text is entered); keep a lazy control,
+            # refresh_send_button locates it again before sending
+            self.sendbtn = self.control.ButtonControl(Name=self._lang('发送(S)'))
+            if not self.sendbtn or not self.sendbtn.Exists(0):
+                # Try common variants (Chinese/English, with/without shortcut hint)
+                self.sendbtn = (
+                    self.control.ButtonControl(Name='发送')
+                    or self.control.ButtonControl(Name='Send')
+                    or self.control.ButtonControl(Name='发送(S)')
+                )
         self.tools = self.control.ToolBarControl()
         self._empty = False
+        # 切换聊天后 runtimeid 可能被复用，旧的解析结果不再可信
+        self.parse_cache.clear()
         # self._now_chat_info = self.get_info()
         # self.id = self.msgbox.runtimeid
-        if (cid := self.id) and cid not in USED_MSG_IDS:
+        if (cid := self.id) and not self.tracker.has(cid):
             # print("init chatbox", cid)
-            USED_MSG_IDS[self.id] = tuple((i.runtimeid for i in self.msgbox.GetChildren()))
-            if not USED_MSG_IDS[cid]:
+            controls = get_children_cached(self.msgbox)
+            ids = [i.runtimeid for i in controls]
+            self.tracker.baseline(cid, ids)
+            self.tracker.set_fingerprints(cid, self._fingerprints(controls))
+            if not ids:
                 self._empty = True
 
     def clear_edit(self):
@@ -252,124 +284,142 @@ class ChatBox(BaseUISubWnd):
         
     def get_msgs(self):
         if self.msgbox.Exists(0):
-            return [
-                parse_msg(msg_control, self)
-                for msg_control in self._iter_message_controls()
-                if uia.IsElementInWindow(self.msgbox, msg_control)
-            ]
+            return parse_msgs(
+                [
+                    msg_control.control
+                    for msg_control in self._message_records()
+                    if uia.IsElementInWindow(self.msgbox, msg_control)
+                ],
+                self
+            )
         return []
 
     def get_new_msgs(self):
         if not self.msgbox.Exists(0):
             return []
-        msg_controls = self.msgbox.GetChildren()
-        now_msg_ids = tuple((i.runtimeid for i in msg_controls))
+        # 一次取回子控件及 runtimeid、类型、指纹所需的属性，解析时再使用实时控件
+        msg_controls = get_children_cached(self.msgbox)
+        now_msg_ids = [i.runtimeid for i in msg_controls]
         current_msg_count = len(now_msg_ids)
         
         if not now_msg_ids:  # 当前没有消息id
             return []
         
-        # 确保used_msg_ids不为None
-        current_used_ids = self.used_msg_ids or tuple()
+        cid = self.id
+        tracker = self.tracker
+        has_used_ids = tracker.size(cid) > 0
         
-        if self._empty and current_used_ids:
+        if self._empty and has_used_ids:
             self._empty = False
         
         # 获取上次记录的消息数量
-        last_msg_count = LAST_MSG_COUNT.get(self.id, 0)
+        last_msg_count = tracker.last_count(cid)
+        
+        fingerprints = self._fingerprints(msg_controls)
+        last_fingerprints = tracker.fingerprints(cid)
+        tracker.set_fingerprints(cid, fingerprints)
         
         # 如果没有历史消息id，初始化
-        if not current_used_ids:
+        if not has_used_ids:
             if not self._empty:
                 # 初始化时记录当前所有消息id和数量
-                USED_MSG_IDS[self.id] = now_msg_ids[-100:]
-                LAST_MSG_COUNT[self.id] = current_msg_count
+                tracker.baseline(cid, now_msg_ids, current_msg_count)
                 return []
         
-        # 关键改进：基于消息数量变化的检测机制
-        msg_count_increased = current_msg_count > last_msg_count
+        unseen_ids = tracker.unseen(cid, now_msg_ids)
+        
+        # 优先用指纹序列对齐上次的可见窗口，得到准确的新增消息（不受列表回收、滚动影响）
+        if fingerprints and last_fingerprints:
+            alignment = align_snapshots(last_fingerprints, fingerprints)
+            if alignment.anchored:
+                tracker.update(cid, unseen_ids, current_msg_count)
+                return parse_msgs(
+                    [
+                        msg_control.control
+                        for msg_control in msg_controls[alignment.start:]
+                        if msg_control.ControlTypeName == 'ListItemControl'
+                    ],
+                    self
+                )
         
-        if msg_count_increased:
-            # 消息数量增加了，计算新消息数量
+        # 无法对齐时，基于消息数量与id变化判断
+        # 关键改进：基于消息数量变化的检测机制
+        if current_msg_count > last_msg_count:
+            # 消息数量增加了，取最后N条消息作为候选新消息
+            # 即使ID已见过也当作新消息处理，这是处理快速重复消息（ID重用）的关键逻辑
             new_msg_count = current_msg_count - last_msg_count
+            confirmed_new_ids = set(now_msg_ids[-new_msg_count:])
             
-            # 取最后N条消息作为候选新消息
-            candidate_new_ids = now_msg_ids[-new_msg_count:]
-            
-            # 验证这些ID确实是新的（排除可能的ID重用情况）
-            used_msg_ids_set = set(current_used_ids)
-            confirmed_new_ids = []
-            
-            for msg_id in candidate_new_ids:
-                if msg_id not in used_msg_ids_set:
-                    confirmed_new_ids.append(msg_id)
-                # 即使ID重复，如果消息数量确实增加了，也要包含这条消息
-                # 这是处理快速重复消息的关键逻辑
-                elif msg_count_increased and len(confirmed_new_ids) < new_msg_count:
-                    # 对于疑似重复ID的情况，仍然当作新消息处理
-                    confirmed_new_ids.append(msg_id)
+            # 更新记录
+            tracker.update(cid, unseen_ids, current_msg_count)
             
-            if confirmed_new_ids:
-                # 更新记录
-                USED_MSG_IDS[self.id] = now_msg_ids[-100:]
-                LAST_MSG_COUNT[self.id] = current_msg_count
-                
-                # 根据新消息id获取对应的控件
-                new_controls = [i for i in msg_controls if i.runtimeid in confirmed_new_ids]
-                
-                return [
-                        parse_msg(msg_control, self) 
-                        for msg_control 
-                        in new_controls
-                        if msg_control.ControlTypeName == 'ListItemControl'
-                    ]
+            # 根据新消息id获取对应的控件
+            return parse_msgs(
+                [
+                    msg_control.control
+                    for msg_control, msg_id
+                    in zip(msg_controls, now_msg_ids)
+                    if msg_id in confirmed_new_ids
+                    and msg_control.ControlTypeName == 'ListItemControl'
+                ],
+                self
+            )
         
         # 如果消息数量没有增加，但可能有ID变化（处理消息刷新的情况）
-        used_msg_ids_set = set(current_used_ids)
-        new_ids = [msg_id for msg_id in now_msg_ids if msg_id not in used_msg_ids_set]
-        
-        if new_ids:
+        if unseen_ids:
             # 更新记录
-            USED_MSG_IDS[self.id] = now_msg_ids[-100:]
-            LAST_MSG_COUNT[self.id] = current_msg_count
+            tracker.update(cid, unseen_ids, current_msg_count)
             
             # 根据新消息id获取对应的控件
-            new_controls = [i for i in msg_controls if i.runtimeid in new_ids]
-            
-            return [
-                    parse_msg(msg_control, self)
-                    for msg_control
-                    in new_controls
-                    if msg_control.ControlTypeName == 'ListItemControl'
-                ]
+            new_ids = set(unseen_ids)
+            return parse_msgs(
+                [
+                    msg_control.control
+                    for msg_control, msg_id
+                    in zip(msg_controls, now_msg_ids)
+                    if msg_id in new_ids
+                    and msg_control.ControlTypeName == 'ListItemControl'
+                ],
+                self
+            )
 
         return []
 
     def _update_used_msg_ids(self):
         if not self.msgbox.Exists(0):
-            USED_MSG_IDS[self.id] = tuple()
-            LAST_MSG_COUNT[self.id] = 0
+            self.tracker.baseline(self.id, [], 0)
+            self.tracker.set_fingerprints(self.id, [])
             return
         msg_controls = [
-            ctrl for ctrl in self.msgbox.GetChildren()
+            ctrl for ctrl in get_children_cached(self.msgbox)
             if ctrl.ControlTypeName == 'ListItemControl'
         ]
-        if not msg_controls:
-            USED_MSG_IDS[self.id] = tuple()
-            LAST_MSG_COUNT[self.id] = 0
-            return
-        USED_MSG_IDS[self.id] = tuple(ctrl.runtimeid for ctrl in msg_controls[-100:])
-        LAST_MSG_COUNT[self.id] = len(msg_controls)
+        self.tracker.baseline(
+            self.id,
+            [ctrl.runtimeid for ctrl in msg_controls],
+            len(msg_controls)
+        )
+        self.tracker.set_fingerprints(self.id, self._fingerprints(msg_controls))
 
-    def _iter_message_controls(self) -> Iterable[uia.Control]:
+    def _fingerprints(self, controls: Sequence[CachedControl]) -> List[Tuple]:
+        """可见消息的指纹序列，WxParam.MESSAGE_DIFF 关闭时返回空列表"""
+        if not WxParam.MESSAGE_DIFF:
+            return []
+        return [message_fingerprint(ctrl) for ctrl in controls]
+
+    def _message_records(self) -> List[CachedControl]:
+        """消息列表项及其缓存属性（runtimeid、Name、位置等），一次跨进程调用取回"""
         if not self.msgbox.Exists(0):
             return []
         return [
             ctrl
-            for ctrl in self.msgbox.GetChildren()
+            for ctrl in get_children_cached(self.msgbox)
             if ctrl.ControlTypeName == 'ListItemControl'
         ]
 
+    def _iter_message_controls(self) -> Iterable[uia.Control]:
+        return [ctrl.control for ctrl in self._message_records()]
+
     def _normalize_msg_id(self, msg_id: Union[Sequence[int], str, None]) -> Optional[Tuple[int, ...]]:
         if msg_id is None:
             return None
@@ -394,9 +444,9 @@ class ChatBox(BaseUISubWnd):
         normalized_id = self._normalize_msg_id(msg_id)
         if normalized_id is None:
             return None
-        for msg_control in self._iter_message_controls():
+        for msg_control in self._message_records():
             if msg_control.runtimeid == normalized_id:
-                return parse_msg(msg_control, self)
+                return parse_msg(msg_control.control, self)
         return None
 
     def get_msg_by_hash(self, msg_hash: str) -> Optional['Message']:
@@ -405,11 +455,12 @@ class ChatBox(BaseUISubWnd):
         msg_hash = msg_hash.strip()
         is_digest = bool(re.fullmatch(r"[0-9a-fA-F]{32}", msg_hash))
         controls = list(self._iter_message_controls())
-        for msg_control in reversed(controls):
-            msg = parse_msg(msg_control, self)
-            candidate = msg.hash if is_digest else getattr(msg, 'hash_text', None)
-            if candidate == msg_hash:
-                return msg
+        with self.frame_capture.batch():
+            for msg_control in reversed(controls):
+                msg = parse_msg(msg_control, self)
+                candidate = msg.hash if is_digest else getattr(msg, 'hash_text', None)
+                if candidate == msg_hash:
+                    return msg
         return None
 
     def get_last_msg(self) -> Optional['Message']:
@@ -418,6 +469,20 @@ class ChatBox(BaseUISubWnd):
             return None
         return parse_msg(message_controls[-1], self)
 
+    def get_last_msgs(self, n: int) -> List['Message']:
+        """解析最后 n 条消息
+
+        Args:
+            n (int): 消息数量
+
+        Returns:
+            List[Message]: 按时间顺序排列的消息
+        """
+        if n <= 0:
+            return []
+        message_controls = list(self._iter_message_controls())
+        return parse_msgs(message_controls[-n:], self)
+
     def get_history_msg(self, n: int = 50, callback=None, interval: float = 0.5, speed: int = 1, goback: bool = True) -> list:
         """Scroll up in the message list and collect up to *n* historical messages.
 
@@ -448,7 +513,7 @@ class ChatBox(BaseUISubWnd):
         bottom_ids = set()  # ids of messages visible at the bottom (original position)
 
         # Record current visible messages so we can detect what's "new" after scroll
-        for ctrl in self._iter_message_controls():
+        for ctrl in self._message_records():
             rid = ctrl.runtimeid
             if rid not in seen_ids:
                 seen_ids.add(rid)
@@ -468,18 +533,17 @@ class ChatBox(BaseUISubWnd):
                 break
             time.sleep(interval)
 
-            # Read new messages after scroll
+            # Read new messages after scroll (one window capture per round)
             new_this_round = 0
-            for ctrl in self._iter_message_controls():
+            new_controls = []
+            for ctrl in self._message_records():
                 rid = ctrl.runtimeid
                 if rid not in seen_ids:
                     seen_ids.add(rid)
-                    try:
-                        msg = parse_msg(ctrl, self)
-                        collected.insert(0, msg)  # insert at front (older messages)
-                        new_this_round += 1
-                    except Exception:
-                        pass
+                    new_controls.append(ctrl.control)
+            for msg in parse_msgs(new_controls, self, ignore_errors=True):
+                collected.insert(0, msg)  # insert at front (older messages)
+                new_this_round += 1
 
             if new_this_round == 0:
                 stale_rounds += 1
@@ -502,7 +566,7 @@ class ChatBox(BaseUISubWnd):
                     self.msgbox.WheelDown(waitTime=0.1, wheelTimes=speed)
                     time.sleep(0.05)
                     # Stop when we see the original bottom messages again
-                    current_ids = {ctrl.runtimeid for ctrl in self._iter_message_controls()}
+                    current_ids = {ctrl.runtimeid for ctrl in self._message_records()}
                     if current_ids & bottom_ids:
                         break
             except Exception:
@@ -10,6 +10,8 @@ from typing import List, Dict, Optional, TYPE_CHECKING
 
 from superwx4 import uia
 from superwx4.param import WxResponse
+from superwx4.backend.cached import get_children_cached
+from superwx4.locator.paths import get_path_locator
 from superwx4.utils.win32 import Click as Win32Click, set_cursor_pos
 
 if TYPE_CHECKING:
@@ -25,6 +27,9 @@ class ContactBox:
     CONTACT_GROUP_CLASS = 'mmui::ContactsCellGroupView'
     CONTACT_CLASSIFY_CLASS = 'mmui::ContactsCellClassifyView'
 
+    # 提取联系人时一次取回的属性
+    CONTACT_ITEM_PROPERTIES = ('ClassName', 'Name', 'AutomationId', 'ControlTypeName', 'BoundingRectangle')
+
     # 分组标题（不是联系人）
     GROUP_TITLES = {'群聊', '公众号', '服务号', '企业微信联系人', '联系人',
                     '新的朋友', '标签', '公众号'}
@@ -51,39 +56,38 @@ class ContactBox:
         return False
 
     def _find_contact_list(self) -> Optional[uia.Control]:
-        """定位联系人列表控件"""
+        """定位联系人列表控件
+
+        沿记录的索引路径定位（按微信版本保存），路径失效时重新查找并记录。
+        """
         try:
-            # Navigate through the control tree to find contact list
             outer_main = self.control.GroupControl(AutomationId='MainView')
             if not outer_main.Exists(0):
                 return None
+            locator = get_path_locator(self.root._get_wx_version())
+            return locator.locate(outer_main, 'contact_list', lambda: self._search_contact_list(outer_main))
+        except Exception:
+            pass
+        return None
 
-            inner_container = outer_main.GetChildren()[1]
-            inner_main = inner_container.GetChildren()[0]
-            splitter = inner_main.GetChildren()[0]
-            stacked = splitter.GetChildren()[0]
-            sub_splitter = stacked.GetChildren()[0]
-            xview = sub_splitter.GetChildren()[1]
-            inner_xview = xview.GetChildren()[0]
-            contact_table = inner_xview.GetChildren()[1]
-
-            if contact_table.AutomationId != 'primary_table_':
-                return None
-
-            # Find the list control inside
+    def _search_contact_list(self, outer_main: uia.Control) -> Optional[uia.Control]:
+        """按 AutomationId 查找联系人列表控件"""
+        contact_list = outer_main.ListControl(AutomationId=self.CONTACT_LIST_AID)
+        if contact_list.Exists(0):
+            return contact_list
+        # 列表没有 AutomationId 时，从联系人表格中取列表
+        contact_table = outer_main.Control(AutomationId='primary_table_')
+        if contact_table.Exists(0):
             for child in contact_table.GetChildren():
                 if child.ControlTypeName == 'ListControl':
                     return child
-
-        except Exception:
-            pass
         return None
 
     def _extract_contacts_from_list(self, contact_list: uia.Control) -> List[Dict]:
         """从列表控件中提取联系人信息"""
         contacts = []
         try:
-            for item in contact_list.GetChildren():
+            for item in get_children_cached(contact_list, self.CONTACT_ITEM_PROPERTIES):
                 try:
                     cls = item.ClassName or ''
                     name = item.Name or ''
@@ -104,6 +108,7 @@ class ContactBox:
                         # 解析联系人信息
                         # Name 格式通常是: nickname + remark + 其他信息
                         # 例如: 'Aa清濛旗达红旗_小凤18876549496'
+                        rect = item.BoundingRectangle
                         contact = {
                             'nickname': name.strip(),
                             'raw_name': name,
@@ -111,12 +116,12 @@ class ContactBox:
                             'automation_id': item.AutomationId or '',
                             'control_type': item.ControlTypeName,
                             'rect': {
-                                'left': item.BoundingRectangle.left,
-                                'top': item.BoundingRectangle.top,
-                                'right': item.BoundingRectangle.right,
-                                'bottom': item.BoundingRectangle.bottom,
-                                'width': item.BoundingRectangle.width(),
-                                'height': item.BoundingRectangle.height(),
+                                'left': rect.left,
+                                'top': rect.top,
+                                'right': rect.right,
+                                'bottom': rect.bottom,
+                                'width': rect.width(),
+                                'height': rect.height(),
                             },
                             'source': 'contact_list',
                         }
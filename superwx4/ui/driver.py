@@ -11,12 +11,14 @@ Usage:
 """
 
 import time
-import win32gui
-import win32con
-import win32api
+from superwx4.backend.windows import import_windows_module
 from superwx4.param import WxParam, WxResponse
 from superwx4.logger import wxlog
 
+win32gui = import_windows_module('win32gui')
+win32con = import_windows_module('win32con')
+win32api = import_windows_module('win32api')
+
 
 class OperationMode:
     BACKGROUND = "background"   # never move mouse, pure UIA patterns only
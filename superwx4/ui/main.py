@@ -6,11 +6,14 @@ from superwx4.utils.win32 import (
     FindWindow,
     GetAllWindows,
     GetPathByHwnd,
-    get_windows_by_pid
+    GetVersionByPath,
+    get_windows_by_pid,
+    is_window
 )
 from superwx4.param import WxParam, WxResponse, PROJECT_NAME
 from superwx4.logger import wxlog
 from superwx4 import uia
+from superwx4.locator.registry import get_registry
 from typing import (
     Union, 
     List,
@@ -63,6 +66,7 @@ class WeChatSubWnd(BaseUISubWnd):
             hwnd = FindWindow(classname=self._win_cls_name, name=key, timeout=timeout)
         else:
             hwnd = key
+        self.HWND = hwnd
         self.control = uia.ControlFromHandle(hwnd)
         if self.control is not None:
             chatbox_control = self.control.\
@@ -194,13 +198,15 @@ class WeChatMainWnd(WeChatSubWnd):
         self.HWND = hwnd
         self.control = uia.ControlFromHandle(hwnd)
         if self.control is not None:
-            navigation_control = self.control.\
-                ToolBarControl(ClassName="mmui::MainTabBar", AutomationId='MainView.main_tabbar')
-            sessionbox_control = self.control.\
-                GroupControl(ClassName="mmui::ChatMasterView")
-            chatbox_control = self.control.\
+            registry = get_registry()
+            registry.prune(is_window)
+            navigation_control = registry.locate(hwnd, "main_tabbar", lambda: self.control.\
+                ToolBarControl(ClassName="mmui::MainTabBar", AutomationId='MainView.main_tabbar'))
+            sessionbox_control = registry.locate(hwnd, "chat_master_view", lambda: self.control.\
+                GroupControl(ClassName="mmui::ChatMasterView"))
+            chatbox_control = registry.locate(hwnd, "chat_splitter_view", lambda: self.control.\
                 GroupControl(AutomationId="chat_message_page", ClassName="mmui::ChatMessagePage").\
-                CustomControl(ClassName="mmui::XSplitterView")
+                CustomControl(ClassName="mmui::XSplitterView"))
             self._navigation_api = NavigationBox(navigation_control, self)
             self._session_api = SessionBox(sessionbox_control, self)
             self._chat_api = ChatBox(chatbox_control, self)
@@ -212,6 +218,11 @@ class WeChatMainWnd(WeChatSubWnd):
     def _get_wx_path(self):
         return GetPathByHwnd(self.HWND)
     
+    def _get_wx_version(self) -> str:
+        if not getattr(self, '_wx_version', None):
+            self._wx_version = GetVersionByPath(self._get_wx_path()) or ''
+        return self._wx_version
+
     def _get_wx_dir(self):
         wxdir = os.path.dirname(self._get_wx_path())
         for d in os.listdir(wxdir):
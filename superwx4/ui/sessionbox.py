@@ -7,12 +7,16 @@ from superwx4.param import (
 from superwx4.languages import MENU_OPTIONS
 from superwx4.ui.component import Menu
 from superwx4.ui.driver import get_driver
+from superwx4.backend.cached import get_children_cached
+from superwx4.locator import find_many, get_registry
 from superwx4.utils.win32 import SetClipboardText
 from superwx4.logger import wxlog
 import time
 from typing import (
+    Dict,
     Union,
-    List
+    List,
+    Tuple
 )
 import re
 
@@ -25,8 +29,15 @@ class SessionBox:
         self.init()
 
     def init(self):
+        # 一次遍历定位搜索框和会话列表；已缓存且仍然有效的控件不再查找
+        found = get_registry().locate_many(
+            self.parent.HWND,
+            ("search_box", "session_list"),
+            lambda keys: find_many(self.control, keys),
+        )
+
         # Search box — try XSearchField group first, then name/class fallbacks
-        self.searchbox = (
+        self.searchbox = found["search_box"] or (
             self.control.GroupControl(ClassName="mmui::XSearchField").EditControl()
             or self.control.EditControl(Name="搜索")
             or self.control.EditControl(ClassName="mmui::XValidatorTextEdit")
@@ -34,7 +45,7 @@ class SessionBox:
         )
 
         # Session list — try AutomationId first (WeChat 4.x), then legacy selectors
-        self.session_list = (
+        self.session_list = found["session_list"] or (
             self.control.ListControl(AutomationId="session_list")
             or self.control.ListControl(ClassName="mmui::XTableView")
             or self.control.GroupControl(ClassName="mmui::ChatSessionList").ListControl(ClassName="mmui::XTableView", Name="会话")
@@ -53,7 +64,11 @@ class SessionBox:
 
     def get_session(self) -> List[SessionElement]:
         if self.session_list.Exists(0):
-            return [SessionElement(i, self) for i in self.session_list.GetChildren()]
+            # 一次取回所有会话项的 Name，点击等操作仍使用实时控件
+            return [
+                SessionElement(i.control, self, content=i.Name)
+                for i in get_children_cached(self.session_list, ('Name',))
+            ]
         else:
             return []
 
@@ -113,17 +128,17 @@ class SessionBox:
         # Fast path 2: scan visible session list items by name
         try:
             if self.session_list.Exists(0):
-                for item in self.session_list.GetChildren():
+                for item in get_children_cached(self.session_list, ('Name',)):
                     item_name = (item.Name or '').split('\n')[0].strip()
                     if exact:
                         if item_name == keywords:
-                            result = driver.click(item, reason=f'switch_chat scan: {keywords}',
+                            result = driver.click(item.control, reason=f'switch_chat scan: {keywords}',
                                                   allow_foreground=allow_foreground)
                             if result.is_success:
                                 return keywords
                     else:
                         if keywords in item_name:
-                            result = driver.click(item, reason=f'switch_chat scan: {keywords}',
+                            result = driver.click(item.control, reason=f'switch_chat scan: {keywords}',
                                                   allow_foreground=allow_foreground)
                             if result.is_success:
                                 return item_name
@@ -205,11 +220,13 @@ class SessionElement:
             self,
             control: uia.Control,
             parent: SessionBox,
+            content: str = None,
         ):
         self.root = parent.root
         self.parent = parent
         self.control = control
-        self.content = control.Name
+        # content 为 None 时读取控件的 Name
+        self.content = control.Name if content is None else content
 
     @property
     def texts(self) -> List[str]:
@@ -238,6 +255,20 @@ class SessionElement:
                 return int(match.group(1))
         return 0
 
+    @property
+    def preview(self) -> str:
+        """会话名称之后的预览文本（最后一条消息摘要等），不含未读数标记"""
+
+        unread_pattern = re.compile(r'\[\d+条\]')
+        return '\n'.join(unread_pattern.sub('', text) for text in self.texts[1:])
+
+    @property
+    def is_mute(self) -> bool:
+        """是否为消息免打扰会话"""
+
+        mute_text = self._menu_option_text('消息免打扰')
+        return any(mute_text in text for text in self.texts[1:])
+
     def _menu_option_text(self, option_key: str) -> str:
         option = MENU_OPTIONS.get(option_key, {})
         lang = getattr(WxParam, 'LANGUAGE', 'cn')
@@ -322,6 +353,55 @@ class SessionElement:
         """删除聊天"""
         return self.select_menu_option('删除聊天', allow_foreground=allow_foreground)
 
+class SessionWatcher:
+    """会话列表未读监视器
+
+    每次 :meth:`poll` 只读取一次 ``session_list`` 的子元素，按会话名称比较
+    (未读数, 预览文本)，返回有新动态的会话，不需要打开任何聊天窗口。
+    返回的会话在 :meth:`ack` 之前每次都会再次返回。
+
+    Args:
+        sessionbox (SessionBox): 会话列表
+    """
+
+    def __init__(self, sessionbox: SessionBox):
+        self.sessionbox = sessionbox
+        self._state: Dict[str, Tuple[int, str]] = {}
+
+    def poll(self, filter_mute: bool = False) -> List[SessionElement]:
+        """读取会话列表并返回有新消息的会话
+
+        Args:
+            filter_mute (bool): 是否过滤免打扰会话
+
+        Returns:
+            List[SessionElement]: 有未处理新消息的会话，按列表顺序
+        """
+        active = []
+        for session in self.sessionbox.get_session():
+            name = session.name
+            if not name or name in WxParam.SPECIAL_SESSION_NAME:
+                continue
+            unread = session.unread_count
+            key = (unread, session.preview)
+            if unread <= 0:
+                self._state[name] = key
+                continue
+            if self._state.get(name) == key:
+                continue
+            if filter_mute and session.is_mute:
+                continue
+            active.append(session)
+        return active
+
+    def ack(self, session: SessionElement) -> None:
+        """标记会话的新消息已处理"""
+
+        self._state[session.name] = (session.unread_count, session.preview)
+
+    def reset(self) -> None:
+        self._state.clear()
+
 class SearchResultElement:
     def __init__(self, control):
         self.control = control
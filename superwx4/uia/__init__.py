@@ -1,2 +1,17 @@
-from .uiautomation import *
+"""UIAutomation 后端。
+
+默认使用 Windows UIAutomation；环境变量 ``SUPERWX4_UI_BACKEND=memory`` 时改用纯 Python 的
+内存控件树（见 :mod:`superwx4.backend.memory`），无需 Windows/COM。
+"""
+
+import sys
+
+from superwx4.backend.windows import memory_backend
+
+if memory_backend():
+    from superwx4.backend import memory as uiautomation
+    from superwx4.backend.memory import *
+    sys.modules[__name__ + '.uiautomation'] = uiautomation
+else:
+    from .uiautomation import *
 # 1
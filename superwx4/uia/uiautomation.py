@@ -27,6 +27,7 @@ import win32gui
 import win32ui
 from PIL import Image
 from typing import (Any, Callable, Dict, List, Iterable, Tuple)  # need pip install typing for Python3.4 or lower
+from superwx4.backend.cached import CACHED_PROPERTIES, CachedControl
 TreeNode = Any
 
 # print('uia done')
@@ -923,6 +924,26 @@ class ToggleState:
     Indeterminate = 2
 
 
+class TreeScope:
+    """
+    TreeScope from IUIAutomation.
+    Refer https://docs.microsoft.com/en-us/windows/desktop/api/uiautomationclient/ne-uiautomationclient-treescope
+    """
+    Element = 1
+    Children = 2
+    Descendants = 4
+    Subtree = 7
+
+
+class AutomationElementMode:
+    """
+    AutomationElementMode from IUIAutomation.
+    Refer https://docs.microsoft.com/en-us/windows/desktop/api/uiautomationclient/ne-uiautomationclient-automationelementmode
+    """
+    None_ = 0
+    Full = 1
+
+
 class TextPatternRangeEndpoint:
     """
     TextPatternRangeEndpoint from IUIAutomation.
@@ -6275,6 +6296,45 @@ class Control():
             child = child.GetNextSiblingControl()
         return children
 
+    def GetChildrenCached(self, properties: Iterable[str] = CACHED_PROPERTIES) -> List[CachedControl]:
+        """
+        Get children and their properties in one call, IUIAutomationElement::FindAllBuildCache.
+        properties: Iterable[str], property names to cache, keys of `_CachedPropertyReaders`.
+        Return List[CachedControl], cached properties are read from the cache,
+            other properties and methods are forwarded to the live control `CachedControl.control`.
+        Refer https://docs.microsoft.com/en-us/windows/desktop/api/uiautomationclient/nf-uiautomationclient-iuiautomationelement-findallbuildcache
+        """
+        properties = tuple(properties)
+        client = _AutomationClient.instance().IUIAutomation
+        request = _CreateCacheRequest(properties, TreeScope.Element)
+        eleArray = self.Element.FindAllBuildCache(TreeScope.Children, client.CreateTrueCondition(), request)
+        children = []
+        if eleArray:
+            for i in range(eleArray.Length):
+                children.append(_CachedControlFromElement(eleArray.GetElement(i), properties))
+        return children
+
+    def GetSubtreeCached(self, properties: Iterable[str] = CACHED_PROPERTIES, maxDepth: int = 0xFFFFFFFF) -> List[Tuple[CachedControl, int]]:
+        """
+        Get all descendants and their properties in one call, IUIAutomationElement::BuildUpdatedCache with TreeScope.Subtree.
+        The structure is read from the cache (GetCachedChildren), no further cross-process calls.
+        properties: Iterable[str], property names to cache, keys of `_CachedPropertyReaders`.
+        maxDepth: int, descendants deeper than maxDepth are not returned (UIA still caches the whole subtree).
+        Return List[Tuple[CachedControl, int]], (descendant, depth) in depth-first pre-order, like `WalkControl`.
+        Refer https://docs.microsoft.com/en-us/windows/desktop/api/uiautomationclient/nf-uiautomationclient-iuiautomationelement-buildupdatedcache
+        """
+        properties = tuple(properties)
+        request = _CreateCacheRequest(properties, TreeScope.Subtree)
+        element = self.Element.BuildUpdatedCache(request)
+        nodes = []
+        stack = [(ele, 1) for ele in reversed(_GetCachedChildren(element))]
+        while stack:
+            ele, depth = stack.pop()
+            nodes.append((_CachedControlFromElement(ele, properties), depth))
+            if depth < maxDepth:
+                stack.extend((child, depth + 1) for child in reversed(_GetCachedChildren(ele)))
+        return nodes
+
     def _CompareFunction(self, control: 'Control', depth: int) -> bool:
         """
         Define how to search.
@@ -7852,6 +7912,73 @@ ControlConstructors = {
 }
 
 
+def _CreateControlFromCachedElement(element) -> 'Control':
+    """
+    Create a concreate `Control` from an element returned by FindAllBuildCache, using the cached ControlType.
+    """
+    controlType = element.CachedControlType
+    if controlType in ControlConstructors:
+        return ControlConstructors[controlType](element=element)
+    return Control.CreateControlFromElement(element)
+
+
+def _CreateCacheRequest(properties: Tuple[str, ...], treeScope: int):
+    """
+    Create an IUIAutomationCacheRequest caching `properties` (and ControlType) with full element references.
+    """
+    for name in properties:
+        if name not in _CachedPropertyReaders:
+            raise ValueError('property {} can not be cached'.format(name))
+    client = _AutomationClient.instance().IUIAutomation
+    request = client.CreateCacheRequest()
+    # ControlType is always cached so that creating the live control needs no extra call
+    propertyIds = {PropertyId.ControlTypeProperty}
+    propertyIds.update(_CachedPropertyReaders[name][0] for name in properties)
+    for propertyId in propertyIds:
+        request.AddProperty(propertyId)
+    request.TreeFilter = client.CreateTrueCondition()
+    request.TreeScope = treeScope
+    request.AutomationElementMode = AutomationElementMode.Full
+    return request
+
+
+def _GetCachedChildren(element) -> List[Any]:
+    """
+    Return the cached children of an element fetched with TreeScope.Children or TreeScope.Subtree.
+    """
+    eleArray = element.GetCachedChildren()
+    if not eleArray:
+        return []
+    return [eleArray.GetElement(i) for i in range(eleArray.Length)]
+
+
+def _CachedControlFromElement(element, properties: Tuple[str, ...]) -> CachedControl:
+    values = {name: _CachedPropertyReaders[name][1](element) for name in properties}
+    return CachedControl(values, element, _CreateControlFromCachedElement)
+
+
+def _CachedRect(element) -> Rect:
+    rect = element.CachedBoundingRectangle
+    return Rect(rect.left, rect.top, rect.right, rect.bottom)
+
+
+# property name: (PropertyId, read the cached value from an element)
+_CachedPropertyReaders = {
+    'runtimeid': (PropertyId.RuntimeIdProperty,
+                  lambda ele: ''.join([str(i) for i in ele.GetCachedPropertyValue(PropertyId.RuntimeIdProperty)])),
+    'ControlType': (PropertyId.ControlTypeProperty, lambda ele: ele.CachedControlType),
+    'ControlTypeName': (PropertyId.ControlTypeProperty, lambda ele: ControlTypeNames.get(ele.CachedControlType, '')),
+    'Name': (PropertyId.NameProperty, lambda ele: ele.CachedName or ''),
+    'ClassName': (PropertyId.ClassNameProperty, lambda ele: ele.CachedClassName or ''),
+    'AutomationId': (PropertyId.AutomationIdProperty, lambda ele: ele.CachedAutomationId or ''),
+    'BoundingRectangle': (PropertyId.BoundingRectangleProperty, _CachedRect),
+    'NativeWindowHandle': (PropertyId.NativeWindowHandleProperty, lambda ele: ele.CachedNativeWindowHandle),
+    'ProcessId': (PropertyId.ProcessIdProperty, lambda ele: ele.CachedProcessId),
+    'IsEnabled': (PropertyId.IsEnabledProperty, lambda ele: bool(ele.CachedIsEnabled)),
+    'IsOffscreen': (PropertyId.IsOffscreenProperty, lambda ele: bool(ele.CachedIsOffscreen)),
+}
+
+
 class UIAutomationInitializerInThread:
     def __init__(self, debug: bool = False):
         self.debug = debug
@@ -0,0 +1,118 @@
+"""可见消息窗口的快照对齐。
+
+``chat_message_list`` 是 ``mmui::RecyclerListView``，列表项会被回收复用，
+runtimeid 不能单独作为消息的身份。本模块把前后两次可见窗口看成同一条消息流上的
+两个窗口，用指纹序列（runtimeid, Name, 高度）中最长的公共连续片段作为锚点对齐，
+从而得到准确的新增消息，即使两次轮询之间列表发生了滚动或回收。
+
+纯 Python 实现，只处理指纹元组，便于用生成的消息流做性质测试。
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Hashable, List, NamedTuple, Sequence, Tuple
+
+Fingerprint = Tuple[Hashable, ...]
+
+
+class Alignment(NamedTuple):
+    """两次快照的对齐结果
+
+    Attributes:
+        anchored: 是否找到锚点；为 False 时两次快照没有任何公共片段
+        offset: 当前快照下标减去上次快照下标的偏移量
+        anchor_len: 锚点片段长度
+        start: 当前快照中第一条新增消息的下标，``curr[start:]`` 即新增消息
+        changed: 重叠区域内指纹不一致的当前快照下标（消息被撤回、编辑等）
+    """
+
+    anchored: bool
+    offset: int
+    anchor_len: int
+    start: int
+    changed: Tuple[int, ...]
+
+
+def message_fingerprint(control: Any) -> Fingerprint:
+    """读取消息控件的指纹 (runtimeid, Name, 高度)"""
+
+    return (control.runtimeid, control.Name, control.BoundingRectangle.height())
+
+
+def _longest_common_runs(
+    prev: Sequence[Fingerprint],
+    curr: Sequence[Fingerprint]
+) -> List[Tuple[int, int, int]]:
+    """返回所有最长公共连续片段 (长度, prev 起点, curr 起点)"""
+
+    positions: Dict[Fingerprint, List[int]] = {}
+    for i, fp in enumerate(prev):
+        positions.setdefault(fp, []).append(i)
+
+    best = 0
+    runs: List[Tuple[int, int, int]] = []
+    # lengths[i] 为以 prev[i-1]、curr[j-1] 结尾的公共片段长度，按行滚动
+    lengths: Dict[int, int] = {}
+    for j, fp in enumerate(curr):
+        current: Dict[int, int] = {}
+        for i in positions.get(fp, ()):
+            length = lengths.get(i - 1, 0) + 1
+            current[i] = length
+            if length > best:
+                best = length
+                runs = [(length, i - length + 1, j - length + 1)]
+            elif length == best:
+                runs.append((length, i - length + 1, j - length + 1))
+        lengths = current
+    return runs
+
+
+def align_snapshots(
+    prev: Sequence[Fingerprint],
+    curr: Sequence[Fingerprint]
+) -> Alignment:
+    """对齐上次与当前的可见消息指纹序列
+
+    以最长公共连续片段为锚点；有多个等长片段时，优先选包含上次快照最后一条的片段，
+    再选新增消息最少的片段，避免把相同内容的旧消息重复当作新消息。
+
+    Args:
+        prev: 上次可见消息的指纹序列
+        curr: 当前可见消息的指纹序列
+
+    Returns:
+        Alignment: 对齐结果
+    """
+
+    runs = _longest_common_runs(prev, curr)
+    if not runs:
+        return Alignment(False, 0, 0, 0, ())
+
+    def rank(run: Tuple[int, int, int]):
+        length, i, j = run
+        ends_at_tail = i + length == len(prev)
+        appended = len(curr) - (len(prev) + j - i)
+        return (ends_at_tail, -appended)
+
+    length, i, j = max(runs, key=rank)
+    offset = j - i
+    start = min(max(len(prev) + offset, 0), len(curr))
+
+    changed = tuple(
+        x for x in range(max(offset, 0), start)
+        if curr[x] != prev[x - offset]
+    )
+    return Alignment(True, offset, length, start, changed)
+
+
+def appended(
+    prev: Sequence[Fingerprint],
+    curr: Sequence[Fingerprint]
+) -> List[int]:
+    """返回当前快照中新增消息的下标；无法对齐时视为全部新增"""
+
+    alignment = align_snapshots(prev, curr)
+    if not alignment.anchored:
+        return list(range(len(curr)))
+    return list(range(alignment.start, len(curr)))
+# 1
@@ -0,0 +1,172 @@
+"""窗口帧捕获服务。
+
+一次解析批次（``get_msgs`` / ``get_new_msgs`` / ``get_history_msg``）内只对
+顶层窗口截图一次，之后每条消息按自身 ``BoundingRectangle`` 从内存帧中裁剪。
+
+本模块不依赖 win32，截图动作由 ``grabber`` 注入，便于用合成帧做测试。
+"""
+
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from PIL import Image
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，缺失时退化为 PIL 裁剪
+    np = None
+
+RectTuple = Tuple[int, int, int, int]
+Grabber = Callable[[int], Tuple[Image.Image, RectTuple]]
+
+
+def rect_to_tuple(rect: Any) -> RectTuple:
+    """把 ``uia.Rect`` 或四元组统一成 ``(left, top, right, bottom)``。"""
+
+    if isinstance(rect, (tuple, list)):
+        left, top, right, bottom = rect
+    else:
+        left, top, right, bottom = rect.left, rect.top, rect.right, rect.bottom
+    return int(left), int(top), int(right), int(bottom)
+
+
+class WindowFrame:
+    """一次窗口截图及其屏幕坐标。
+
+    Args:
+        image: 整个窗口的截图
+        window_rect: 截图时窗口的屏幕坐标 ``(left, top, right, bottom)``
+    """
+
+    def __init__(self, image: Image.Image, window_rect: Any):
+        self.image = image if image.mode == 'RGB' else image.convert('RGB')
+        self.window_rect = rect_to_tuple(window_rect)
+        self._array = None
+
+    @property
+    def origin(self) -> Tuple[int, int]:
+        return self.window_rect[0], self.window_rect[1]
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.image.size
+
+    @property
+    def array(self):
+        """帧的 ``(h, w, 3)`` uint8 数组，首次访问时转换一次；无 numpy 时为 None。"""
+
+        if self._array is None and np is not None:
+            self._array = np.asarray(self.image)
+        return self._array
+
+    def _to_local(self, rect: Any) -> RectTuple:
+        """屏幕坐标转换为帧内坐标，并裁剪到帧范围内。"""
+
+        left, top, right, bottom = rect_to_tuple(rect)
+        ox, oy = self.origin
+        w, h = self.size
+        left = min(max(left - ox, 0), w)
+        right = min(max(right - ox, left), w)
+        top = min(max(top - oy, 0), h)
+        bottom = min(max(bottom - oy, top), h)
+        return left, top, right, bottom
+
+    def contains(self, rect: Any) -> bool:
+        """目标区域是否完整落在帧内。"""
+
+        left, top, right, bottom = rect_to_tuple(rect)
+        wl, wt, wr, wb = self.window_rect
+        return wl <= left and wt <= top and right <= wr and bottom <= wb
+
+    def crop(self, rect: Any) -> Image.Image:
+        """按屏幕坐标裁剪出一张独立的 PIL 图片。"""
+
+        return self.image.crop(self._to_local(rect))
+
+    def view(self, rect: Any):
+        """按屏幕坐标返回区域视图。
+
+        有 numpy 时返回共享内存的数组切片（不复制像素），否则退化为 :meth:`crop`。
+        """
+
+        arr = self.array
+        if arr is None:
+            return self.crop(rect)
+        left, top, right, bottom = self._to_local(rect)
+        return arr[top:bottom, left:right]
+
+
+class FrameCapture:
+    """按批次复用窗口截图的捕获服务。
+
+    在 :meth:`batch` 上下文内，第一次请求时截图并缓存，批次结束后丢弃；
+    批次外的每次请求都会重新截图，行为与逐条 ``ScreenShot`` 一致。
+
+    Args:
+        hwnd_getter: 返回顶层窗口句柄的函数
+        grabber: ``hwnd -> (image, window_rect)`` 的截图函数
+    """
+
+    def __init__(self, hwnd_getter: Callable[[], int], grabber: Grabber):
+        self._hwnd_getter = hwnd_getter
+        self._grabber = grabber
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._frame: Optional[WindowFrame] = None
+        self.captures = 0
+        self.crops = 0
+
+    def _grab(self) -> WindowFrame:
+        image, window_rect = self._grabber(self._hwnd_getter())
+        self.captures += 1
+        return WindowFrame(image, window_rect)
+
+    @contextmanager
+    def batch(self) -> Iterator['FrameCapture']:
+        """标记一个解析批次，批次内共用同一帧。支持嵌套。"""
+
+        with self._lock:
+            self._depth += 1
+            try:
+                yield self
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._frame = None
+
+    @property
+    def in_batch(self) -> bool:
+        return self._depth > 0
+
+    def frame(self) -> WindowFrame:
+        """获取当前帧：批次内复用，批次外每次重新截图。"""
+
+        with self._lock:
+            if not self.in_batch:
+                return self._grab()
+            if self._frame is None:
+                self._frame = self._grab()
+            return self._frame
+
+    def invalidate(self) -> None:
+        """丢弃当前批次的缓存帧（如窗口滚动后），下次请求时重新截图。"""
+
+        with self._lock:
+            self._frame = None
+
+    def crop(self, rect: Any) -> Image.Image:
+        frame = self.frame()
+        self.crops += 1
+        return frame.crop(rect)
+
+    def view(self, rect: Any):
+        frame = self.frame()
+        self.crops += 1
+        return frame.view(rect)
+
+    def stats(self) -> Dict[str, int]:
+        return {'captures': self.captures, 'crops': self.crops}
+# 1
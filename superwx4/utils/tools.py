@@ -7,7 +7,12 @@ import re
 import shutil
 import time
 
-from PIL import Image
+from PIL import Image, ImageChops, ImageStat
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，缺失时使用 PIL 实现
+    np = None
 
 from superwx4.uia import uiautomation as uia
 
@@ -150,66 +155,125 @@ def delete_update_files():
 #                                                           消息解析方法
 # ============================================================================================================================================
 
-def detect_message_direction(
-    image_path: str,
+def _direction_from_columns(non_uniform, width: int) -> tuple[str, float]:
+    """根据非均匀列的首尾位置给出方向，与逐列扫描的结果保持一致。"""
+
+    if non_uniform is None:
+        # 都没找到变化列，兜底
+        return 'right', math.inf
+    first, last = non_uniform
+    left_idx = first
+    right_idx = width - 1 - last  # 距右边界的列数
+    if left_idx <= right_idx:
+        return 'left', float(left_idx)
+    return 'right', float(right_idx)
+
+
+def _non_uniform_span_array(arr, y0: int, y1: int, tolerance: int):
+    """numpy 版：返回 band 内非均匀列的 (首列, 末列)，全部均匀时返回 None。"""
+
+    if arr.ndim == 2:
+        arr = arr[:, :, None]
+    band = arr[y0:y1, :, :3].astype(np.int16)
+    if band.shape[0] == 0 or band.shape[1] == 0:
+        return None
+    # 以 band 顶部像素作为每列的参考
+    diff = np.abs(band - band[:1])
+    columns = np.flatnonzero((diff > tolerance).any(axis=(0, 2)))
+    if columns.size == 0:
+        return None
+    return int(columns[0]), int(columns[-1])
+
+
+def _non_uniform_span_image(img: Image.Image, y0: int, y1: int, tolerance: int):
+    """PIL 版：借助 ImageChops 与 getbbox 求非均匀列的 (首列, 末列)。"""
+
+    w = img.size[0]
+    band_h = y1 - y0
+    if band_h <= 0 or w == 0:
+        return None
+    band = img.crop((0, y0, w, y1))
+    ref = band.crop((0, 0, w, 1)).resize((w, band_h), Image.NEAREST)
+    diff = ImageChops.difference(band, ref)
+    r, g, b = diff.split()
+    mask = ImageChops.lighter(ImageChops.lighter(r, g), b)
+    if tolerance:
+        mask = mask.point(lambda v: 255 if v > tolerance else 0)
+    bbox = mask.getbbox()
+    if bbox is None:
+        return None
+    return bbox[0], bbox[2] - 1
+
+
+def detect_message_direction_from_image(
+    image,
     avatar_height_ratio: float = 0.8,
     tolerance: int = 0,
+    size: tuple[int, int] = None,
+    mode: str = 'RGB',
 ) -> tuple[str, float]:
-    """通过截图判断消息气泡的方向。
+    """在内存中判断消息气泡方向，不落盘、不逐像素循环。
 
     Args:
-        image_path: 消息截图路径。
+        image: PIL 图片、``(h, w, c)`` 数组（可以是窗口帧的切片视图），
+            或原始像素缓冲区（需同时给出 ``size``）。
         avatar_height_ratio: 头像在截图中占据的高度比例。
         tolerance: 像素颜色比较的容忍度。
+        size: 原始缓冲区的 ``(宽, 高)``。
+        mode: 原始缓冲区的像素格式，如 ``'RGB'``、``'BGRX'``。
 
     Returns:
-        Tuple[str, float]: ``("left", distance)`` 或 ``("right", distance)``，
-        ``distance`` 表示从对应方向开始出现气泡的列索引，便于后续定位。
+        Tuple[str, float]: 与 :func:`detect_message_direction` 相同的
+        ``("left"|"right", distance)``。
     """
 
-    img = Image.open(image_path)
-    if img.mode != 'RGB':
-        img = img.convert('RGB')
-    w, h = img.size
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        if size is None:
+            raise ValueError('原始缓冲区需要提供 size=(宽, 高)')
+        image = Image.frombuffer('RGB', size, image, 'raw', mode, 0, 1)
+
+    if np is not None and not isinstance(image, Image.Image):
+        arr = np.asarray(image)
+        h, w = arr.shape[:2]
+    else:
+        if not isinstance(image, Image.Image):
+            image = Image.fromarray(image)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        w, h = image.size
+        arr = None
 
     # 仅取中间 band 区域
     band_h = int(h * avatar_height_ratio)
     y0 = (h - band_h) // 2
     y1 = y0 + band_h
 
-    pixels = img.load()  # 获取像素访问对象
+    if arr is not None:
+        span = _non_uniform_span_array(arr, y0, y1, tolerance)
+    else:
+        span = _non_uniform_span_image(image, y0, y1, tolerance)
+    return _direction_from_columns(span, w)
 
-    def is_uniform_column(x: int) -> bool:
-        base = pixels[x, y0]  # 以 band 顶部像素作为参考
-        for y in range(y0, y1):
-            r, g, b = pixels[x, y]
-            if (abs(r - base[0]) > tolerance or
-                abs(g - base[1]) > tolerance or
-                abs(b - base[2]) > tolerance):
-                return False
-        return True
 
-    # 从左边扫描
-    left_idx = math.inf
-    for x in range(w):
-        if not is_uniform_column(x):
-            left_idx = x
-            break
-
-    # 从右边扫描
-    right_idx = math.inf
-    for offset, x in enumerate(range(w - 1, -1, -1)):
-        if not is_uniform_column(x):
-            right_idx = offset  # 距右边界的列数
-            break
-
-    # print(f"left_idx: {left_idx}, right_idx: {right_idx}")
-    if left_idx == math.inf and right_idx == math.inf:
-        # 都没找到变化列，兜底
-        return 'right', math.inf
-    if left_idx <= right_idx:
-        return 'left', float(left_idx)
-    return 'right', float(right_idx)
+def detect_message_direction(
+    image_path: str | Image.Image,
+    avatar_height_ratio: float = 0.8,
+    tolerance: int = 0,
+) -> tuple[str, float]:
+    """通过截图判断消息气泡的方向。
+
+    Args:
+        image_path: 消息截图路径，或已在内存中的 PIL 图片。
+        avatar_height_ratio: 头像在截图中占据的高度比例。
+        tolerance: 像素颜色比较的容忍度。
+
+    Returns:
+        Tuple[str, float]: ``("left", distance)`` 或 ``("right", distance)``，
+        ``distance`` 表示从对应方向开始出现气泡的列索引，便于后续定位。
+    """
+
+    img = image_path if isinstance(image_path, Image.Image) else Image.open(image_path)
+    return detect_message_direction_from_image(img, avatar_height_ratio, tolerance)
 
 def calculate_pixel_variance(region):
     """
@@ -224,22 +288,8 @@ def calculate_pixel_variance(region):
     if region.size[0] == 0 or region.size[1] == 0:
         return 0
     
-    # 获取所有像素值
-    pixels = list(region.getdata())
-    
-    if not pixels:
-        return 0
-    
-    # 分别计算R、G、B通道的方差
-    r_values = [p[0] for p in pixels]
-    g_values = [p[1] for p in pixels]
-    b_values = [p[2] for p in pixels]
-    
-    r_variance = calculate_variance(r_values)
-    g_variance = calculate_variance(g_values)
-    b_variance = calculate_variance(b_values)
-    
-    return r_variance + g_variance + b_variance
+    # 分别计算R、G、B通道的方差（总体方差，由 ImageStat 在 C 层完成）
+    return sum(ImageStat.Stat(region).var[:3])
 
 def calculate_variance(values):
     """
@@ -272,22 +322,21 @@ def calculate_color_diversity(region):
     Returns:
         float: 颜色多样性得分
     """
-    pixels = list(region.getdata())
+    total = region.size[0] * region.size[1]
     
-    if not pixels:
+    if not total:
         return 0
     
     # 统计不同颜色的数量
-    color_set = set(pixels)
-    unique_colors = len(color_set)
+    unique_colors = len(region.getcolors(maxcolors=total))
     
     # 计算颜色多样性比例
-    diversity_ratio = unique_colors / len(pixels)
+    diversity_ratio = unique_colors / total
     
     return diversity_ratio
 
 def detect_message_direction_enhanced(
-    image_path: str,
+    image_path: str | Image.Image,
     avatar_width_ratio: float = 0.15,
     avatar_height_ratio: float = 0.8,
 ) -> tuple[str, float]:
@@ -295,7 +344,7 @@ def detect_message_direction_enhanced(
     增强版检测，结合方差和颜色多样性
     
     Args:
-        image_path: 消息图片路径
+        image_path: 消息图片路径或 PIL 图片
         avatar_width_ratio: 头像区域宽度比例
         avatar_height_ratio: 头像区域高度比例
     
@@ -303,7 +352,8 @@ def detect_message_direction_enhanced(
         str: 'left' 或 'right'
     """
     
-    img = Image.open(image_path).convert('RGB')
+    img = image_path if isinstance(image_path, Image.Image) else Image.open(image_path)
+    img = img.convert('RGB')
     width, height = img.size
     
     avatar_width = int(width * avatar_width_ratio)
@@ -0,0 +1,231 @@
+"""新消息追踪。
+
+按聊天（``msgbox.runtimeid``）记录已见过的消息 id 与上次的消息数量，
+供 ``ChatBox.get_new_msgs`` 做增量判断：
+
+- 已见 id 用有序字典保存，成员判断 O(1)，超过容量时淘汰最早见到的 id
+- 聊天状态本身也按 LRU 限量，长时间未访问的聊天会被淘汰
+- 所有操作加锁，可在监听线程与调用线程间共享
+- :meth:`MessageTracker.snapshot` / :meth:`MessageTracker.restore` 用于跨重建保存状态
+
+同一个顶层窗口的多个 ChatBox 实例通过 :func:`get_tracker` 共享同一个追踪器，
+窗口关闭后其追踪器会被清理。
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+class _ChatState:
+    __slots__ = ('ids', 'count', 'fingerprints')
+
+    def __init__(self):
+        self.ids: 'OrderedDict[Hashable, None]' = OrderedDict()
+        self.count = 0
+        self.fingerprints: Tuple[Tuple, ...] = ()
+
+
+class MessageTracker:
+    """按聊天记录已见消息 id 的追踪器
+
+    Args:
+        maxlen: 每个聊天最多保留的已见 id 数量
+        max_chats: 最多保留的聊天数量，超出时淘汰最久未访问的聊天
+    """
+
+    def __init__(self, maxlen: int = 500, max_chats: int = 64):
+        self.maxlen = maxlen
+        self.max_chats = max_chats
+        self._chats: 'OrderedDict[Hashable, _ChatState]' = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _get(self, key: Hashable, create: bool = False) -> Optional[_ChatState]:
+        state = self._chats.get(key)
+        if state is None:
+            if not create:
+                return None
+            state = self._chats[key] = _ChatState()
+            while len(self._chats) > self.max_chats:
+                self._chats.popitem(last=False)
+        else:
+            self._chats.move_to_end(key)
+        return state
+
+    def _add(self, state: _ChatState, ids: Iterable[Hashable]) -> None:
+        seen = state.ids
+        for msg_id in ids:
+            if msg_id in seen:
+                continue
+            seen[msg_id] = None
+        while len(seen) > self.maxlen:
+            seen.popitem(last=False)
+
+    def has(self, key: Hashable) -> bool:
+        """是否已有该聊天的记录（包括空记录）"""
+
+        with self._lock:
+            return key in self._chats
+
+    def seen(self, key: Hashable) -> Tuple[Hashable, ...]:
+        """该聊天已见过的 id，按首次见到的顺序"""
+
+        with self._lock:
+            state = self._get(key)
+            return tuple(state.ids) if state is not None else tuple()
+
+    def size(self, key: Hashable) -> int:
+        """该聊天已见过的 id 数量"""
+
+        with self._lock:
+            state = self._chats.get(key)
+            return len(state.ids) if state is not None else 0
+
+    def is_seen(self, key: Hashable, msg_id: Hashable) -> bool:
+        with self._lock:
+            state = self._get(key)
+            return state is not None and msg_id in state.ids
+
+    def last_count(self, key: Hashable) -> int:
+        """上次记录的消息数量"""
+
+        with self._lock:
+            state = self._get(key)
+            return state.count if state is not None else 0
+
+    def unseen(self, key: Hashable, ids: Iterable[Hashable]) -> List[Hashable]:
+        """按原顺序返回 ids 中尚未见过的 id"""
+
+        with self._lock:
+            state = self._get(key)
+            if state is None:
+                return list(ids)
+            seen = state.ids
+            return [msg_id for msg_id in ids if msg_id not in seen]
+
+    def baseline(self, key: Hashable, ids: Iterable[Hashable], count: Optional[int] = None) -> None:
+        """以当前 ids 重置该聊天的记录
+
+        Args:
+            key: 聊天 id
+            ids: 当前可见的消息 id
+            count: 当前消息数量，为 None 时保持原值
+        """
+
+        with self._lock:
+            state = self._get(key, create=True)
+            state.ids.clear()
+            self._add(state, ids)
+            if count is not None:
+                state.count = count
+
+    def update(self, key: Hashable, new_ids: Iterable[Hashable], count: Optional[int] = None) -> None:
+        """记录新见到的 id，只处理传入的 id
+
+        Args:
+            key: 聊天 id
+            new_ids: 新见到的消息 id
+            count: 当前消息数量，为 None 时保持原值
+        """
+
+        with self._lock:
+            state = self._get(key, create=True)
+            self._add(state, new_ids)
+            if count is not None:
+                state.count = count
+
+    def fingerprints(self, key: Hashable) -> Tuple[Tuple, ...]:
+        """上次记录的可见消息指纹序列，见 :mod:`superwx4.utils.diff`"""
+
+        with self._lock:
+            state = self._get(key)
+            return state.fingerprints if state is not None else ()
+
+    def set_fingerprints(self, key: Hashable, fingerprints: Iterable[Tuple]) -> None:
+        with self._lock:
+            self._get(key, create=True).fingerprints = tuple(fingerprints)
+
+    def evict(self, key: Hashable) -> None:
+        """删除该聊天的记录"""
+
+        with self._lock:
+            self._chats.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._chats.clear()
+
+    def __len__(self) -> int:
+        return len(self._chats)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """导出全部状态，结果只含基础类型，可直接 JSON 序列化"""
+
+        with self._lock:
+            return {
+                'maxlen': self.maxlen,
+                'chats': [
+                    {
+                        'key': key,
+                        'ids': list(state.ids),
+                        'count': state.count,
+                        'fingerprints': [list(fp) for fp in state.fingerprints],
+                    }
+                    for key, state in self._chats.items()
+                ],
+            }
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        """从 :meth:`snapshot` 的结果恢复状态，覆盖同名聊天的记录"""
+
+        with self._lock:
+            for item in snapshot.get('chats', []):
+                key = _to_hashable(item['key'])
+                ids = [_to_hashable(i) for i in item.get('ids', [])]
+                self.baseline(key, ids, item.get('count', 0))
+                self.set_fingerprints(key, (_to_hashable(fp) for fp in item.get('fingerprints', [])))
+
+
+def _to_hashable(value: Any) -> Any:
+    """把 JSON 还原出的列表（包括嵌套的，如指纹中的 runtimeid）递归转换为元组"""
+
+    if isinstance(value, list):
+        return tuple(_to_hashable(v) for v in value)
+    return value
+
+
+_TRACKERS: Dict[Hashable, MessageTracker] = {}
+_TRACKERS_LOCK = threading.Lock()
+
+
+def get_tracker(
+    owner: Hashable,
+    alive: Optional[Callable[[Hashable], bool]] = None,
+    **kwargs
+) -> MessageTracker:
+    """获取某个窗口的追踪器，不存在时创建
+
+    Args:
+        owner: 追踪器所属对象的标识，一般为顶层窗口句柄
+        alive: 判断 owner 是否仍然存在的函数，提供时会顺带清理已失效的追踪器
+        **kwargs: 创建时传给 :class:`MessageTracker` 的参数
+
+    Returns:
+        MessageTracker: 该窗口的追踪器
+    """
+
+    with _TRACKERS_LOCK:
+        if alive is not None:
+            for key in [k for k in _TRACKERS if k != owner]:
+                try:
+                    if not alive(key):
+                        del _TRACKERS[key]
+                except Exception:
+                    pass
+        tracker = _TRACKERS.get(owner)
+        if tracker is None:
+            tracker = _TRACKERS[owner] = MessageTracker(**kwargs)
+        return tracker
+# 1
@@ -2,18 +2,20 @@ import os
 import time
 import struct
 import shutil
-import win32ui
-import win32gui
-import win32api
-import win32con
-import win32process
-import win32clipboard
 import traceback
 import pyperclip
 import psutil
 import ctypes
 from PIL import Image
 from superwx4 import uia
+from superwx4.backend.windows import import_windows_module
+
+win32ui = import_windows_module('win32ui')
+win32gui = import_windows_module('win32gui')
+win32api = import_windows_module('win32api')
+win32con = import_windows_module('win32con')
+win32process = import_windows_module('win32process')
+win32clipboard = import_windows_module('win32clipboard')
 
 def GetAllWindows(name=None, classname=None):
     """
@@ -70,7 +72,8 @@ def GetVersionByPath(file_path):
         version = None
     return version
 
-def capture(hwnd, bbox):
+def capture_window(hwnd):
+    """截取整个窗口，返回 (PIL图像, 窗口屏幕坐标)"""
     # 获取窗口的屏幕坐标
     window_rect = win32gui.GetWindowRect(hwnd)
     win_left, win_top, win_right, win_bottom = window_rect
@@ -104,6 +107,11 @@ def capture(hwnd, bbox):
     mfcDC.DeleteDC()
     win32gui.ReleaseDC(hwnd, hwndDC)
 
+    return im, window_rect
+
+def capture(hwnd, bbox):
+    im, (win_left, win_top, _, _) = capture_window(hwnd)
+
     # 计算bbox相对于窗口左上角的坐标
     bbox_left, bbox_top, bbox_right, bbox_bottom = bbox
     # 转换为截图图像中的相对坐标
@@ -392,6 +400,10 @@ def enum_windows_by_pid(pid):
     win32gui.EnumWindows(enum_callback, None)
     return window_list
 
+def is_window(hwnd):
+    # 检查窗口句柄是否仍然有效
+    return bool(hwnd) and bool(win32gui.IsWindow(hwnd))
+
 def is_window_visible(hwnd):
     # 检查窗口是否可见
     style = win32gui.GetWindowLong(hwnd, win32con.GWL_STYLE)
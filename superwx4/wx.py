@@ -3,12 +3,23 @@ from superwx4.ui import WeChatMainWnd, WeChatSubWnd
 from superwx4.logger import wxlog
 from superwx4.param import WxParam, WxResponse, PROJECT_NAME
 from superwx4.utils import GetAllWindows, uilock
+from superwx4.utils.win32 import is_window
 from superwx4.utils.tools import delete_update_files
 from superwx4.moment import Moment
-from concurrent.futures import ThreadPoolExecutor
+from superwx4.ui.sessionbox import SessionWatcher
+from superwx4.store import MessageStore
+from superwx4.msgs.record import MessageRecord
+from superwx4.listen import (
+    CallbackDispatcher,
+    EventSource,
+    PollScheduler,
+    create_event_source
+)
 from abc import ABC, abstractmethod
 import threading
+from collections import deque
 import traceback
+import json
 import time
 import sys
 import os
@@ -22,54 +33,168 @@ from typing import (
     Optional,
 )
 if TYPE_CHECKING:
+    from datetime import datetime
     from superwx4.msgs.base import Message
     from superwx4.ui.sessionbox import SessionElement
 
 class Listener(ABC):
-    def _listener_start(self):
+    # 共享回调分发器时用于区分不同实例的同名聊天
+    _listener_namespace = None
+
+    def _listener_start(
+            self,
+            source: EventSource = None,
+            scheduler: PollScheduler = None,
+            dispatcher: CallbackDispatcher = None,
+            thread: bool = True,
+            store: MessageStore = None
+        ):
+        """开始监听
+
+        Args:
+            source (EventSource, optional): 事件源，默认按 WxParam.LISTEN_MODE 创建
+            scheduler (PollScheduler, optional): 轮询调度器
+            dispatcher (CallbackDispatcher, optional): 回调分发器，传入时由调用方负责关闭
+            thread (bool): 是否启动自己的监听线程；为 False 时由调用方定期调用 _listener_tick
+            store (MessageStore, optional): 消息库，默认按 WxParam.MESSAGE_STORE 打开
+        """
         wxlog.debug('开始监听')
         self._listener_is_listening = True
         self._listener_messages = {}
         self._lock = threading.RLock()
         self._listener_stop_event = threading.Event()
-        self._listener_thread = threading.Thread(target=self._listener_listen, daemon=True)
-        self._listener_thread.start()
-
-    def _listener_listen(self):
-        self._excutor = ThreadPoolExecutor(max_workers=WxParam.LISTENER_EXCUTOR_WORKERS)
+        if source is None:
+            source = create_event_source(WxParam.LISTEN_MODE)
+        if scheduler is None:
+            scheduler = PollScheduler(
+                min_interval=WxParam.LISTEN_INTERVAL,
+                max_interval=WxParam.LISTEN_MAX_INTERVAL,
+                backoff=WxParam.LISTEN_BACKOFF,
+                budget=WxParam.LISTEN_POLL_BUDGET
+            )
+        self._listener_owns_dispatcher = dispatcher is None
+        if dispatcher is None:
+            dispatcher = CallbackDispatcher(
+                workers=WxParam.LISTENER_EXCUTOR_WORKERS,
+                maxsize=WxParam.LISTEN_QUEUE_SIZE,
+                overflow=WxParam.LISTEN_QUEUE_OVERFLOW,
+                batch=WxParam.LISTEN_BATCH,
+                mode=WxParam.LISTEN_CALLBACK_EXECUTOR
+            )
+        if store is None and WxParam.MESSAGE_STORE:
+            store = getattr(self, '_message_store', None) or MessageStore(WxParam.MESSAGE_STORE)
+        self._listener_source = source
+        self._listener_scheduler = scheduler
+        self._dispatcher = dispatcher
+        self._message_store = store
+        self._listener_resumed = set()
         if not hasattr(self, 'listen') or not self.listen:
             self.listen = {}
+        for who, (chat, _) in self.listen.copy().items():
+            self._listener_watch(who, chat)
+        self._listener_thread = None
+        if thread:
+            self._listener_thread = threading.Thread(target=self._listener_listen, daemon=True)
+            self._listener_thread.start()
+
+    def _listener_watch(self, who: str, chat: 'Chat'):
+        """开始调度某个聊天，并唤醒监听线程立即检查一次
+
+        事件推送的聊天收到事件时检查，另按 WxParam.LISTEN_EVENT_SAFETY_INTERVAL 慢速兜底轮询，
+        以免事件丢失后再也不检查；订阅失败的聊天按正常间隔轮询。
+        """
+        chat._history_store = getattr(self, '_message_store', None)
+        source = self._listener_source
+        source.subscribe(who, chat)
+        if not source.pushes(who):
+            self._listener_scheduler.add(who)
+        elif WxParam.LISTEN_EVENT_SAFETY_INTERVAL > 0:
+            self._listener_scheduler.add(who, min_interval=WxParam.LISTEN_EVENT_SAFETY_INTERVAL)
+        else:
+            self._listener_scheduler.remove(who)
+        source.notify(who)
+
+    def _listener_unwatch(self, who: str):
+        if getattr(self, '_listener_source', None) is not None:
+            self._listener_source.unsubscribe(who)
+            self._listener_scheduler.remove(who)
+
+    def _listener_listen(self):
+        fired = ()
         while not self._listener_stop_event.is_set():
-            delete_update_files()
             try:
-                self._get_listen_messages()
+                timeout = self._listener_tick(fired)
             except KeyboardInterrupt:
                 wxlog.debug("监听消息终止")
                 self._listener_stop()
                 break
-            except:
-                wxlog.debug(f'监听消息失败：{traceback.format_exc()}')
-            time.sleep(WxParam.LISTEN_INTERVAL)
-
-    def _safe_callback(
-            self, 
-            callback: Callable[['Message', 'Chat'], None], 
-            msg: 'Message', 
-            chat: 'Chat'
-        ):
+            fired = self._listener_source.wait(timeout)
+
+    def _listener_tick(self, fired=()) -> float:
+        """执行一轮监听：检查到期的聊天并分发新消息
+
+        Args:
+            fired (Iterable, optional): 事件源报告有变化的聊天，本轮立即检查
+
+        Returns:
+            float: 距离下一个聊天到期的秒数
+        """
+        scheduler = self._listener_scheduler
+        # 事件源报告有变化的聊天立即到期
+        for key in fired:
+            scheduler.poke(key)
+        keys = scheduler.pop_due()
+        # 关闭兜底轮询时事件推送的聊天不在调度器中，收到事件即检查
+        keys += [key for key in fired if key not in scheduler]
+        counts = {}
         try:
-            callback(msg, chat)
-        except Exception as e:
-            wxlog.debug(f"监听消息回调发生错误：{traceback.format_exc()}")
+            if keys:
+                delete_update_files()
+                counts = self._get_listen_messages(keys) or {}
+        except KeyboardInterrupt:
+            raise
+        except:
+            wxlog.debug(f'监听消息失败：{traceback.format_exc()}')
+        finally:
+            for key in keys:
+                scheduler.report(key, counts.get(key, 0))
+        timeout = scheduler.next_wait()
+        if timeout is None:
+            timeout = WxParam.LISTEN_INTERVAL
+        return timeout
 
     def _listener_stop(self):
         self._listener_is_listening = False
         self._listener_stop_event.set()
-        self._listener_thread.join()
-        self._excutor.shutdown(wait=True)
+        self._listener_source.close()
+        if self._listener_thread is not None \
+                and self._listener_thread is not threading.current_thread():
+            self._listener_thread.join()
+        if self._listener_owns_dispatcher:
+            self._dispatcher.close(wait=True)
+
+    def _listener_fetch(self, who: str, chat: 'Chat') -> List['Message']:
+        """获取聊天的新消息；启用消息库时，首次获取会补上停机期间到达的消息"""
+        store = getattr(self, '_message_store', None)
+        if store is None or who in self._listener_resumed:
+            return chat.GetNewMessage()
+        self._listener_resumed.add(who)
+        missed = store.missed(who, chat.GetAllMessage())
+        if missed:
+            wxlog.debug(f'补发停机期间的消息：{who} {len(missed)} 条')
+        return missed + chat.GetNewMessage()
+
+    def _listener_store(self, batch: Dict[str, List['Message']]):
+        store = getattr(self, '_message_store', None)
+        if store is None or not batch:
+            return
+        try:
+            store.add_batch(batch)
+        except Exception:
+            wxlog.debug(f'写入消息库失败：{traceback.format_exc()}')
 
     @abstractmethod
-    def _get_listen_messages(self):
+    def _get_listen_messages(self, keys=None):
         ...
 
 class Chat:
@@ -200,6 +325,7 @@ class Chat:
         if (_last_chat := self.ChatInfo().get('chat_name')) != self._last_chat:
             self._last_chat = _last_chat
             self._api._chat_api._update_used_msg_ids()
+            self._api._chat_api.parse_cache.clear()
             return []
         return self._api.get_new_msgs()
 
@@ -218,6 +344,14 @@ class Chat:
 
         return self._api.get_last_msg()
 
+    def GetParseCacheStats(self) -> Dict[str, int]:
+        """获取消息解析缓存的命中统计
+
+        Returns:
+            dict: hits, misses, size, maxsize
+        """
+        return self._api._chat_api.parse_cache.stats()
+
     def GetHistoryMessage(
             self,
             n: int = 50,
@@ -225,19 +359,27 @@ class Chat:
             interval: float = 0.5,
             speed: int = 1,
             goback: bool = True,
-        ) -> List['Message']:
-        """向上滚动获取历史消息
+        ) -> List[Union['Message', MessageRecord]]:
+        """获取历史消息
+
+        监听中的聊天启用了消息库（WxParam.MESSAGE_STORE）且库中已有 n 条消息时，
+        直接返回库中最近的 n 条 MessageRecord，不滚动界面；否则向上滚动界面获取。
 
         Args:
             n (int): 获取历史消息数量，默认50
-            callback (Callable, optional): 每次滚动后的回调，返回True停止
+            callback (Callable, optional): 每次滚动后的回调，返回True停止；传入时总是滚动界面
             interval (float): 滚动间隔秒数，默认0.5
             speed (int): 每次滚动行数，默认1
             goback (bool): 完成后是否滚回底部，默认True
 
         Returns:
-            List[Message]: 历史消息列表，按时间正序
+            List[Message | MessageRecord]: 历史消息列表，按时间正序
         """
+        store = getattr(self, '_history_store', None)
+        if store is not None and callback is None:
+            stored = store.messages(self.who, limit=n)
+            if len(stored) >= n:
+                return stored
         return self._api.get_history_msg(n, callback, interval, speed, goback)
 
     def Close(self, allow_foreground: bool = False) -> WxResponse:
@@ -525,25 +667,98 @@ class WeChat(Chat, Listener):
             wxlog.set_debug(True)
             wxlog.debug('Debug mode is on')
         
-    def _get_listen_messages(self):
+    def _get_listen_messages(self, keys=None) -> Dict[str, int]:
+        """获取监听聊天的新消息并分发回调
+
+        Args:
+            keys (list, optional): 按顺序检查这些聊天，None 表示检查全部
+
+        Returns:
+            Dict[str, int]: 每个聊天获取到的新消息数量
+        """
         try:
             sys.stdout.flush()
         except:
             pass
         temp_listen = self.listen.copy()
-        for who in temp_listen:
-            chat, callback = temp_listen.get(who, (None, None))
-            try:
-                if chat is None or not chat._api.exists():
-                    self.RemoveListenChat(who)
+        counts = {}
+        batch = {}
+        try:
+            for who in (temp_listen if keys is None else keys):
+                chat, callback = temp_listen.get(who, (None, None))
+                try:
+                    if chat is None or not self._chat_alive(chat):
+                        self.RemoveListenChat(who)
+                        continue
+                except:
                     continue
-            except:
-                continue
-            with self._lock:
-                msgs = chat.GetNewMessage()
-                for msg in msgs:
-                    wxlog.debug(f"[{msg.attr}]获取到新消息：{who} - {msg.content}")
-                    self._excutor.submit(self._safe_callback, callback, msg, chat)
+                with self._lock:
+                    msgs = self._listener_fetch(who, chat)
+                    counts[who] = len(msgs)
+                    for msg in msgs:
+                        # 只记录不需要解析的字段，未解析的延迟消息留给回调按需解析
+                        attr = msg.attr if getattr(msg, 'resolved', True) else 'pending'
+                        wxlog.debug(f"[{attr}]获取到新消息：{who} - {msg.content}")
+                    lane = who if self._listener_namespace is None else (self._listener_namespace, who)
+                    self._dispatcher.submit(lane, callback, msgs, chat)
+                    if msgs:
+                        batch[who] = msgs
+        finally:
+            # 每轮一次事务写入消息库
+            self._listener_store(batch)
+        return counts
+
+    @staticmethod
+    def _chat_alive(chat: Chat) -> bool:
+        # 先用窗口句柄判断，避免每次轮询都做一次 UIA 调用
+        hwnd = getattr(chat._api, 'HWND', None)
+        if hwnd:
+            return is_window(hwnd)
+        return chat._api.exists()
+
+    def GetStoredMessages(
+            self,
+            who: str,
+            n: int = 50,
+            since: Union[float, 'datetime'] = None
+        ) -> List[MessageRecord]:
+        """从本地消息库读取聊天的最近消息，不滚动界面
+
+        需要设置 ``WxParam.MESSAGE_STORE`` 并开启监听，只包含监听期间保存的消息。
+
+        Args:
+            who (str): 聊天名称
+            n (int): 最多返回的条数
+            since (float | datetime, optional): 只返回该时间之后保存的消息
+
+        Returns:
+            List[MessageRecord]: 按时间顺序排列的消息记录
+        """
+        store = getattr(self, '_message_store', None)
+        if store is None:
+            return []
+        return store.messages(who, since=since, limit=n)
+
+    def GetCallbackStats(self) -> Dict[str, object]:
+        """获取监听回调队列深度与回调延迟统计
+
+        Returns:
+            Dict[str, object]: 见 CallbackDispatcher.stats
+        """
+        if getattr(self, '_dispatcher', None) is None:
+            return {}
+        return self._dispatcher.stats()
+
+    def GetListenStats(self) -> Dict[str, dict]:
+        """获取监听聊天的轮询调度状态，事件推送的聊天为兜底轮询的状态
+
+        Returns:
+            Dict[str, dict]: 聊天名称 -> {interval, rate, next_in, polls, messages, idle}
+                rate 为当前轮询频率（次/秒）
+        """
+        if getattr(self, '_listener_scheduler', None) is None:
+            return {}
+        return self._listener_scheduler.stats()
 
     @property
     def path(self):
@@ -623,18 +838,113 @@ class WeChat(Chat, Listener):
             nickname (str): 要监听的聊天对象
             callback (Callable[['Message', Chat], None]): 回调函数，参数为(Message对象, Chat对象)，返回值为None
         """
+        return self._add_listen_chat(nickname, callback)
+
+    def _add_listen_chat(self, nickname: str, callback: Callable, subwin: WeChatSubWnd = None):
         if not hasattr(self, '_listener_is_listening') or not self._listener_is_listening:
             wxlog.debug('检测到未开启监听器，开启监听器')
             self._listener_start()
         if nickname in self.listen:
             return WxResponse.failure('该聊天已监听')
-        subwin = self._api.open_separate_window(nickname)
+        if subwin is None:
+            subwin = self._api.open_separate_window(nickname)
         if subwin is None:
             return WxResponse.failure('找不到聊天窗口')
         name = subwin.nickname
         chat = Chat(subwin)
         self.listen[name] = (chat, callback)
+        self._listener_watch(name, chat)
         return chat
+
+    def SaveListenState(self, path: str) -> WxResponse:
+        """保存监听状态，用于重启后快速恢复监听
+
+        保存每个监听聊天的子窗口句柄、昵称和新消息追踪状态（JSON），回调函数不保存。
+
+        Args:
+            path (str): 保存路径
+
+        Returns:
+            WxResponse: 执行结果，data 中包含保存的聊天数量
+        """
+        chats = []
+        for who, (chat, _) in self.listen.copy().items():
+            api = chat._api
+            chats.append({
+                'name': who,
+                'hwnd': getattr(api, 'HWND', None),
+                'nickname': api.nickname,
+                'tracker': api._chat_api.tracker.snapshot(),
+            })
+        state = {
+            'version': 1,
+            'saved': time.time(),
+            'hwnd': getattr(self._api, 'HWND', None),
+            'chats': chats,
+        }
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # 先写临时文件再替换，避免中途退出留下不完整的文件
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+        return WxResponse.success(data={'path': path, 'chats': len(chats)})
+
+    @uilock
+    def LoadListenState(
+            self,
+            path: str,
+            callback: Union[Callable[['Message', Chat], None], Dict[str, Callable]],
+        ) -> WxResponse:
+        """从 SaveListenState 保存的文件恢复监听
+
+        仍然存在的子窗口按句柄直接复用并恢复新消息追踪状态，不再切换聊天和打开窗口；
+        已关闭的子窗口按名称重新打开。
+
+        Args:
+            path (str): SaveListenState 保存的文件
+            callback (Callable | Dict[str, Callable]): 回调函数，或 聊天名称 -> 回调函数；
+                字典中没有的聊天不恢复
+
+        Returns:
+            WxResponse: 执行结果，data 中包含 restored（复用窗口）、reopened（重新打开）、failed
+        """
+        if not os.path.exists(path):
+            return WxResponse.failure(f'监听状态文件不存在：{path}')
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        restored, reopened, failed = [], [], []
+        for item in state.get('chats', []):
+            name = item['name']
+            cb = callback.get(name) if isinstance(callback, dict) else callback
+            if cb is None or name in self.listen:
+                continue
+            subwin = self._revalidate_sub_window(item)
+            if subwin is not None:
+                subwin._chat_api.tracker.restore(item.get('tracker') or {})
+                result = self._add_listen_chat(name, cb, subwin)
+                (restored if isinstance(result, Chat) else failed).append(name)
+                continue
+            result = self._add_listen_chat(name, cb)
+            (reopened if isinstance(result, Chat) else failed).append(name)
+        wxlog.debug(f'恢复监听：复用 {len(restored)}，重新打开 {len(reopened)}，失败 {len(failed)}')
+        return WxResponse.success(
+            data={'restored': restored, 'reopened': reopened, 'failed': failed}
+        )
+
+    def _revalidate_sub_window(self, item: dict) -> Optional[WeChatSubWnd]:
+        """按保存的句柄找回子窗口，窗口已关闭或已不是同一个聊天时返回 None"""
+        hwnd = item.get('hwnd')
+        if not hwnd or not is_window(hwnd):
+            return None
+        try:
+            subwin = WeChatSubWnd(hwnd, self._api)
+        except Exception:
+            return None
+        if subwin.control is None or subwin.nickname != item.get('nickname'):
+            return None
+        return subwin
     
     def StopListening(self, remove: bool = True) -> None:
         """停止监听
@@ -642,9 +952,9 @@ class WeChat(Chat, Listener):
         Args:
             remove (bool, optional): 是否移除监听对象. Defaults to True.
         """
-        if not hasattr(self, '_listener_thread') or self._listener_thread is None:
+        if not hasattr(self, '_listener_stop_event'):
             return
-        while self._listener_thread.is_alive():
+        if self._listener_is_listening:
             self._listener_stop()
         if remove:
             listen = self.listen.copy()
@@ -652,10 +962,7 @@ class WeChat(Chat, Listener):
                 self.RemoveListenChat(who)
 
     def StartListening(self) -> None:
-        if not hasattr(self, '_listener_thread') or self._listener_thread is None:
-            self._listener_start()
-            return
-        if not self._listener_thread.is_alive():
+        if not getattr(self, '_listener_is_listening', False):
             self._listener_start()
 
     @uilock
@@ -680,6 +987,8 @@ class WeChat(Chat, Listener):
         if close_window:
             chat.Close(allow_foreground=True)
         del self.listen[nickname]
+        chat._history_store = None
+        self._listener_unwatch(nickname)
         return WxResponse.success()
 
     def SwitchToChat(self, allow_foreground: bool = False) -> None:
@@ -904,6 +1213,7 @@ class WeChat(Chat, Listener):
             )
         return WxResponse.failure('not implemented: WeChat.EditFriendInfo')
 
+    @uilock
     def GetNextNewMessage(
             self,
             filter_mute: bool = False,
@@ -911,17 +1221,58 @@ class WeChat(Chat, Listener):
         ) -> List['Message']:
         """获取下一条新消息
 
+        读取一次会话列表找出有未读消息的会话，只打开这些会话读取全部未读消息。
+        数量和耗时分别受 ``WxParam.GET_NEXT_MAX_QUANTITY`` 和 ``WxParam.GET_NEXT_MAX_RUNTIME`` 限制，
+        未处理完的会话在下次调用时继续返回；打开会话后未读标记即被清除，
+        超出数量限制的消息暂存起来，下次调用时最先返回。
+
         Args:
             filter_mute (bool): 是否过滤免打扰消息
-            callback (Callable, optional): 回调函数
+            callback (Callable, optional): 回调函数，参数为(Message对象, Chat对象)，
+                返回 ``WxParam.CALLBACK_STOP_SIGN`` 时停止
 
         Returns:
             List[Message]: 新消息列表
 
         Note:
-            MEDIUM 风险。需要轮询消息。
+            MEDIUM 风险。会切换当前聊天。
         """
-        return []
+        if getattr(self, '_session_watcher', None) is None:
+            self._session_watcher = SessionWatcher(self.SessionBox)
+        watcher = self._session_watcher
+        if getattr(self, '_next_pending', None) is None:
+            self._next_pending = deque()
+        pending = self._next_pending
+        t0 = time.time()
+        msgs = []
+        while pending and len(msgs) < WxParam.GET_NEXT_MAX_QUANTITY:
+            msgs.append(pending.popleft())
+        sessions = watcher.poll(filter_mute) if len(msgs) < WxParam.GET_NEXT_MAX_QUANTITY else []
+        for session in sessions:
+            if (
+                len(msgs) >= WxParam.GET_NEXT_MAX_QUANTITY
+                or time.time() - t0 > WxParam.GET_NEXT_MAX_RUNTIME
+            ):
+                break
+            result = session.click()
+            if not getattr(result, 'is_success', False) and not self._api.switch_chat(session.name):
+                wxlog.debug(f'打开会话失败：{session.name}')
+                continue
+            # 打开后未读标记即被清除，所以一次读完全部未读消息（按时间顺序，最早的在前）
+            new_msgs = self.ChatBox.get_last_msgs(session.unread_count)
+            # 已经取走的消息不再由 GetNewMessage 重复返回
+            self.ChatBox._update_used_msg_ids()
+            watcher.ack(session)
+            take = WxParam.GET_NEXT_MAX_QUANTITY - len(msgs)
+            msgs.extend(new_msgs[:take])
+            pending.extend(new_msgs[take:])
+        if callback is not None:
+            for index, msg in enumerate(msgs):
+                if callback(msg, self) == WxParam.CALLBACK_STOP_SIGN:
+                    # 未交给回调的消息留到下次返回
+                    pending.extendleft(reversed(msgs[index + 1:]))
+                    return msgs[:index + 1]
+        return msgs
 
     def GetAllRecentGroups(self) -> List[str]:
         """获取所有最近的群聊
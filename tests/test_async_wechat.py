@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Test: asyncio facade running UI work on a dedicated thread."""
+import sys
+import os
+import asyncio
+import threading
+import unittest
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+
+class FakeChat:
+
+    def __init__(self, who):
+        self.who = who
+
+
+class FakeWeChat:
+
+    def __init__(self):
+        self.threads = set()
+        self.sent = []
+        self.listen = {}
+        self.gate = threading.Event()
+
+    def SendMsg(self, msg, who=None, *args):
+        self.threads.add(threading.current_thread().name)
+        if msg == 'slow':
+            self.gate.wait(2)
+        self.sent.append(msg)
+
+    def AddListenChat(self, nickname, callback):
+        from superwx4.param import WxResponse
+        if nickname in self.listen:
+            return WxResponse.failure('该聊天已监听')
+        chat = FakeChat(nickname)
+        self.listen[nickname] = (chat, callback)
+        return chat
+
+    def RemoveListenChat(self, nickname, close_window=False):
+        self.listen.pop(nickname, None)
+
+    def StopListening(self, remove=True):
+        self.listen.clear()
+
+    def deliver(self, who, msg):
+        chat, callback = self.listen[who]
+        threading.Thread(target=callback, args=(msg, chat)).start()
+
+
+class TestAsyncWeChat(unittest.TestCase):
+
+    def test_calls_run_on_one_ui_thread(self):
+        from superwx4.aio import AsyncWeChat
+        fake = FakeWeChat()
+
+        async def main():
+            wx = AsyncWeChat(wx=fake)
+            await asyncio.gather(*(wx.SendMsg(str(i)) for i in range(200)))
+            await wx.close()
+
+        asyncio.run(main())
+        self.assertEqual(fake.sent, [str(i) for i in range(200)])
+        self.assertEqual(len(fake.threads), 1)
+        self.assertNotIn(threading.current_thread().name, fake.threads)
+
+    def test_cancel_pending_call(self):
+        from superwx4.aio import AsyncWeChat
+        fake = FakeWeChat()
+
+        async def main():
+            wx = AsyncWeChat(wx=fake)
+            slow = asyncio.ensure_future(wx.SendMsg('slow'))
+            pending = asyncio.ensure_future(wx.SendMsg('pending'))
+            await asyncio.sleep(0.05)
+            pending.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await pending
+            fake.gate.set()
+            await slow
+            await wx.close()
+
+        asyncio.run(main())
+        self.assertEqual(fake.sent, ['slow'])
+
+    def test_message_stream(self):
+        from superwx4.aio import AsyncWeChat
+        fake = FakeWeChat()
+
+        async def main():
+            wx = AsyncWeChat(wx=fake)
+            stream = wx.messages(chats=['a'])
+            first = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0.05)
+            self.assertIn('a', fake.listen)
+            fake.deliver('a', 'hello')
+            self.assertEqual(await asyncio.wait_for(first, 2), 'hello')
+            await stream.aclose()
+            self.assertNotIn('a', fake.listen)
+            await wx.close()
+
+        asyncio.run(main())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""Test: GetChildrenCached fetches list children and their properties in one call."""
+import sys
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+# the memory backend runs without pywin32 / comtypes
+os.environ.setdefault('SUPERWX4_UI_BACKEND', 'memory')
+
+
+def message(i):
+    return {
+        "ControlType": "ListItemControl",
+        "ClassName": "mmui::ChatTextItemView",
+        "Name": f"消息{i}",
+        "Rect": {"left": 300, "top": 40 * i, "right": 1000, "bottom": 40 * i + 40},
+    }
+
+
+WINDOW = {
+    "ControlType": "WindowControl",
+    "ClassName": "mmui::MainWindow",
+    "Name": "微信",
+    "children": [
+        {"ControlType": "ListControl", "AutomationId": "session_list", "Name": "会话",
+         "children": [
+             {"ControlType": "ListItemControl", "Name": "张三\n你好\n12:00"},
+             {"ControlType": "ListItemControl", "Name": "群聊\n[3条]\n12:01"},
+         ]},
+        {"ControlType": "ListControl", "AutomationId": "chat_message_list", "Name": "消息",
+         "children": [message(i) for i in range(5)]},
+    ],
+}
+
+
+class TestGetChildrenCached(unittest.TestCase):
+
+    def setUp(self):
+        from superwx4.backend.memory import MemoryTree
+        self.tree = MemoryTree()
+        self.win = self.tree.load(WINDOW)
+        self.msgbox = self.win.ListControl(AutomationId='chat_message_list')
+
+    def test_single_call_matches_live_properties(self):
+        from superwx4.backend import CACHED_PROPERTIES
+        live = self.msgbox.GetChildren()
+        self.tree.reset_stats()
+        records = self.msgbox.GetChildrenCached()
+        self.assertEqual(sum(self.tree.calls.values()), 1)
+        for record, control in zip(records, live):
+            for name in CACHED_PROPERTIES:
+                self.assertEqual(getattr(record, name), getattr(control, name))
+        self.assertEqual(self.tree.calls['GetChildrenCached'], 1)
+        self.assertEqual(self.tree.calls['Name'], len(live))
+
+    def test_live_control_and_forwarding(self):
+        records = self.msgbox.GetChildrenCached(('Name',))
+        self.assertEqual(records[0].cached, {'Name': '消息0'})
+        self.tree.reset_stats()
+        # 未缓存的属性读取实时控件
+        self.assertEqual(records[0].ClassName, 'mmui::ChatTextItemView')
+        self.assertEqual(self.tree.calls['ClassName'], 1)
+        self.assertIs(records[0].control, records[0].control)
+        self.assertEqual(records[0].control, self.msgbox.GetChildren()[0])
+        with self.assertRaises(ValueError):
+            self.msgbox.GetChildrenCached(('HelpText',))
+
+    def test_fallback_for_controls_without_cache(self):
+        from superwx4.backend import get_children_cached
+        child = MagicMock()
+        child.Name = 'a'
+        parent = MagicMock()
+        parent.GetChildren.return_value = [child]
+        records = get_children_cached(parent, ('Name',))
+        self.assertEqual(records[0].Name, 'a')
+        self.assertIs(records[0].control, child)
+
+
+class TestCachedReaders(unittest.TestCase):
+
+    def setUp(self):
+        from superwx4.backend.memory import MemoryTree
+        self.tree = MemoryTree()
+        self.win = self.tree.load(WINDOW)
+
+    def test_get_new_msgs_reads_children_once(self):
+        from superwx4.ui.chatbox import ChatBox
+        from superwx4.utils.tracker import MessageTracker
+        msgbox = self.win.ListControl(AutomationId='chat_message_list')
+        chatbox = ChatBox.__new__(ChatBox)
+        chatbox.tracker = MessageTracker()
+        chatbox._empty = False
+        chatbox.msgbox = msgbox
+        parsed = []
+
+        def parse(controls, box):
+            parsed.append(list(controls))
+            return [c.Name for c in controls]
+
+        with patch('superwx4.ui.chatbox.parse_msgs', parse):
+            self.assertEqual(chatbox.get_new_msgs(), [])
+            for i in range(5, 8):
+                self.tree.add(message(i), parent=msgbox)
+            self.tree.reset_stats()
+            self.assertEqual(chatbox.get_new_msgs(), ['消息5', '消息6', '消息7'])
+        # 判断新消息时不再逐个读取 runtimeid、Name、位置
+        self.assertEqual(self.tree.calls['GetChildrenCached'], 1)
+        self.assertEqual(self.tree.calls['GetRuntimeId'], 1)  # ChatBox.id
+        self.assertEqual(self.tree.calls['BoundingRectangle'], 0)
+        self.assertEqual(self.tree.calls['Name'], 3)  # 只有解析时读取
+        # 解析拿到的是实时控件
+        self.assertTrue(all(type(c).__name__ == 'Control' for c in parsed[-1]))
+
+    def test_get_session_uses_cached_names(self):
+        from superwx4.ui.sessionbox import SessionBox
+        sessionbox = SessionBox.__new__(SessionBox)
+        sessionbox.root = None
+        sessionbox.session_list = self.win.ListControl(AutomationId='session_list')
+        self.tree.reset_stats()
+        sessions = sessionbox.get_session()
+        self.assertEqual([s.name for s in sessions], ['张三', '群聊'])
+        self.assertEqual(self.tree.calls['Name'], 0)
+        self.assertEqual(sessions[0].control.ControlTypeName, 'ListItemControl')
+
+
+if __name__ == '__main__':
+    unittest.main()
+# 1
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Test: per-chat ordered, bounded listener callback dispatch."""
+import sys
+import os
+import time
+import random
+import threading
+import unittest
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+
+def square(msg, chat):
+    return msg * msg
+
+
+class TestCallbackDispatcher(unittest.TestCase):
+
+    def test_per_chat_order_with_parallel_lanes(self):
+        from superwx4.listen import CallbackDispatcher
+        dispatcher = CallbackDispatcher(workers=4, maxsize=0)
+        received = {}
+        lock = threading.Lock()
+
+        def callback(msg, chat):
+            time.sleep(random.random() / 1000)
+            with lock:
+                received.setdefault(chat, []).append(msg)
+
+        for i in range(50):
+            for chat in ('a', 'b', 'c'):
+                dispatcher.submit(chat, callback, [i], chat)
+        dispatcher.close()
+        for chat in ('a', 'b', 'c'):
+            self.assertEqual(received[chat], list(range(50)))
+        self.assertEqual(dispatcher.stats()['delivered'], 150)
+
+    def test_block_applies_backpressure(self):
+        from superwx4.listen import CallbackDispatcher
+        gate = threading.Event()
+        dispatcher = CallbackDispatcher(workers=1, maxsize=2, overflow='block')
+        dispatcher.submit('a', lambda m, c: gate.wait(), [0], 'a')
+        time.sleep(0.05)
+        dispatcher.submit('a', lambda m, c: None, [1, 2], 'a')
+        producer = threading.Thread(
+            target=dispatcher.submit, args=('a', lambda m, c: None, [3], 'a')
+        )
+        producer.start()
+        producer.join(0.1)
+        self.assertTrue(producer.is_alive())
+        self.assertEqual(dispatcher.stats()['depth'], 2)
+        gate.set()
+        producer.join(1)
+        self.assertFalse(producer.is_alive())
+        dispatcher.close()
+
+    def test_drop_oldest(self):
+        from superwx4.listen import CallbackDispatcher
+        gate = threading.Event()
+        received = []
+        dispatcher = CallbackDispatcher(workers=1, maxsize=2, overflow='drop_oldest')
+        dispatcher.submit('x', lambda m, c: gate.wait(), [0], 'x')
+        time.sleep(0.05)
+        dispatcher.submit('a', lambda m, c: received.append(m), [1, 2, 3, 4], 'a')
+        gate.set()
+        dispatcher.close()
+        self.assertEqual(received, [3, 4])
+        self.assertEqual(dispatcher.stats()['dropped'], 2)
+
+    def test_spill_keeps_order(self):
+        from superwx4.listen import CallbackDispatcher
+        gate = threading.Event()
+        received = []
+        dispatcher = CallbackDispatcher(workers=1, maxsize=2, overflow='spill')
+        dispatcher.submit('x', lambda m, c: gate.wait(), [0], 'x')
+        time.sleep(0.05)
+        dispatcher.submit('a', lambda m, c: received.append(m), list(range(1, 8)), 'a')
+        stats = dispatcher.stats()
+        self.assertEqual((stats['depth'], stats['spill_depth']), (2, 5))
+        gate.set()
+        dispatcher.close()
+        self.assertEqual(received, list(range(1, 8)))
+
+    def test_batch_mode(self):
+        from superwx4.listen import CallbackDispatcher
+        received = []
+        dispatcher = CallbackDispatcher(workers=2, batch=True)
+        dispatcher.submit('a', lambda m, c: received.append(m), [1, 2, 3], 'a')
+        dispatcher.submit('a', lambda m, c: received.append(m), [], 'a')
+        dispatcher.close()
+        self.assertEqual(received, [[1, 2, 3]])
+        self.assertGreaterEqual(dispatcher.stats()['latency_ms']['max'], 0)
+
+    def test_process_mode(self):
+        from superwx4.listen import CallbackDispatcher
+        dispatcher = CallbackDispatcher(workers=1, mode='process')
+        dispatcher.submit('a', square, [3], 'a')
+        dispatcher.close()
+        self.assertEqual(dispatcher.stats()['delivered'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
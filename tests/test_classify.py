@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Test: table-driven message type classifier.
+
+Runs on plain (ClassName, Name) tuples. The old if/elif chain is kept
+here as the oracle for a randomized equivalence check.
+"""
+import sys
+import os
+import re
+import random
+import unittest
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+BUBBLE = 'mmui::ChatBubbleItemView'
+TEXT = 'mmui::ChatTextItemView'
+
+
+def reference_type(classname, name):
+    """The original parse_msg_type decision chain."""
+    mapping = {
+        "mmui::ChatVoiceItemView": "VoiceMessage",
+        "mmui::ChatPersonalCardItemView": "PersonalCardMessage",
+    }
+    if classname in mapping:
+        return mapping[classname]
+    if classname == BUBBLE:
+        if name.startswith("[链接]"):
+            return "LinkMessage"
+        elif name.startswith("位置"):
+            return "LocationMessage"
+        elif name.startswith("文件\n"):
+            return "FileMessage"
+        elif name.startswith("视频"):
+            return "VideoMessage"
+        if name == '图片':
+            return 'ImageMessage'
+        return 'OtherMessage'
+    if classname == TEXT:
+        if re.search(r'^(.*?)\s*\n引用\s+(.+?)\s+的消息\s*:\s*(.*)$', name, re.DOTALL):
+            return 'QuoteMessage'
+        return 'TextMessage'
+    return 'OtherMessage'
+
+
+class TestClassifier(unittest.TestCase):
+
+    def test_fields(self):
+        from superwx4.msgs.classify import classify_message
+        self.assertEqual(
+            classify_message(BUBBLE, '文件\nreport.pdf\n1.5MB\n微信电脑版'),
+            ('FileMessage', {'file_name': 'report.pdf', 'file_size': '1.5MB'}),
+        )
+        self.assertEqual(
+            classify_message(BUBBLE, '视频01:05'),
+            ('VideoMessage', {'duration': 65}),
+        )
+        self.assertEqual(
+            classify_message(TEXT, '好的 \n引用 张三 的消息 : 明天开会'),
+            ('QuoteMessage', {'content': '好的', 'quote_nickname': '张三', 'quote_content': '明天开会'}),
+        )
+        self.assertEqual(classify_message(BUBBLE, '图片'), ('ImageMessage', {}))
+        self.assertEqual(classify_message('mmui::ChatVoiceItemView', ''), ('VoiceMessage', {}))
+
+    def test_untranslated_language_falls_back_to_cn(self):
+        from superwx4.msgs.classify import get_classifier
+        self.assertEqual(get_classifier('en')(BUBBLE, '[链接]标题'), ('LinkMessage', {}))
+        self.assertIs(get_classifier('en'), get_classifier('en'))
+
+    def test_matches_reference(self):
+        from superwx4.msgs.classify import classify_message
+        pieces = ['[链接]', '位置', '文件\n', '视频', '图片', '引用', ' 的消息 : ', '\n',
+                  '张三', 'hello', ' ', '01:02', '1.2MB', '微信电脑版', '']
+        classnames = [BUBBLE, TEXT, 'mmui::ChatVoiceItemView',
+                      'mmui::ChatPersonalCardItemView', 'mmui::Other', None]
+        rnd = random.Random(7)
+        for _ in range(3000):
+            name = ''.join(rnd.choice(pieces) for _ in range(rnd.randrange(0, 6)))
+            classname = rnd.choice(classnames)
+            self.assertEqual(
+                classify_message(classname, name)[0],
+                reference_type(classname, name),
+                (classname, name),
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""Test: located-control registry revalidates cached controls instead of re-searching."""
+import sys
+import os
+import unittest
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+# the memory backend runs without pywin32 / comtypes
+os.environ.setdefault('SUPERWX4_UI_BACKEND', 'memory')
+
+
+RECT = {"left": 0, "top": 0, "right": 100, "bottom": 100}
+
+WINDOW = {
+    "ControlType": "WindowControl",
+    "ClassName": "mmui::MainWindow",
+    "Name": "微信",
+    "Rect": {"left": 0, "top": 0, "right": 1000, "bottom": 800},
+    "children": [
+        {"ControlType": "GroupControl", "ClassName": "mmui::ChatMessagePage", "Rect": RECT, "children": [
+            {"ControlType": "EditControl", "AutomationId": "chat_input_field",
+             "ClassName": "mmui::ChatInputField", "Rect": RECT},
+            {"ControlType": "ButtonControl", "ClassName": "mmui::XOutlineButton", "Name": "发送", "Rect": RECT},
+        ]},
+    ],
+}
+
+
+class TestControlRegistry(unittest.TestCase):
+
+    def setUp(self):
+        from superwx4.backend.memory import MemoryTree
+        from superwx4.locator.registry import ControlRegistry
+        self.tree = MemoryTree()
+        self.win = self.tree.load(WINDOW)
+        self.registry = ControlRegistry()
+
+    def locate(self, key='edit'):
+        return self.registry.locate(1, key, lambda: self.win.EditControl(AutomationId='chat_input_field'))
+
+    def test_hit_skips_search(self):
+        first = self.locate()
+        self.tree.reset_stats()
+        second = self.locate()
+        self.assertIs(second, first)
+        # 返回的是直接包装的控件，Exists 不再查找整棵树
+        self.assertTrue(second.Exists(0))
+        self.assertEqual(self.tree.calls['FindControl'], 0)
+        self.assertEqual(self.registry.stats(), {'hits': 1, 'misses': 1, 'stale': 0, 'size': 1})
+
+    def test_stale_entry_is_searched_again(self):
+        first = self.locate()
+        self.tree.remove(first)
+        self.tree.add({"ControlType": "EditControl", "AutomationId": "chat_input_field", "Rect": RECT},
+                      parent=self.win.GroupControl())
+        second = self.locate()
+        self.assertNotEqual(second, first)
+        self.assertTrue(second.Exists(0))
+        self.assertEqual(self.registry.stats()['stale'], 1)
+
+    def test_missing_control_is_not_stored(self):
+        missing = self.registry.locate(1, 'missing', lambda: self.win.TextControl(Name='不存在'))
+        self.assertFalse(missing.Exists(0))
+        self.assertEqual(self.registry.stats()['size'], 0)
+
+    def test_invalidate_and_prune(self):
+        self.locate('a')
+        self.registry.locate(2, 'a', lambda: self.win.ButtonControl(Name='发送'))
+        self.registry.prune(lambda hwnd: hwnd != 2)
+        self.assertEqual(self.registry.stats()['size'], 1)
+        self.registry.invalidate(1)
+        self.assertEqual(self.registry.stats()['size'], 0)
+
+    def test_disabled_by_param(self):
+        from superwx4.param import WxParam
+        old = WxParam.CONTROL_REGISTRY
+        WxParam.CONTROL_REGISTRY = False
+        try:
+            self.locate()
+            self.locate()
+        finally:
+            WxParam.CONTROL_REGISTRY = old
+        self.assertEqual(self.registry.stats()['size'], 0)
+
+    def test_find_first_waits_for_rendering(self):
+        from unittest.mock import MagicMock
+        from superwx4.locator import find_first
+        root = MagicMock()
+        root.ButtonControl.return_value.Exists.return_value = True
+        self.assertIs(find_first(root, 'send_button'), root.ButtonControl.return_value)
+        root.ButtonControl.return_value.Exists.assert_called_with(0.1)
+
+    def test_find_first_uses_registry(self):
+        from superwx4.locator import find_first, get_registry
+        registry = get_registry()
+        registry.invalidate(-7)
+        button = find_first(self.win, 'send_button', hwnd=-7)
+        self.tree.reset_stats()
+        self.assertIs(find_first(self.win, 'send_button', hwnd=-7), button)
+        self.assertEqual(self.tree.calls['FindControl'], 0)
+        registry.invalidate(-7)
+
+
+if __name__ == '__main__':
+    unittest.main()
+# 1
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""Test: in-memory message direction detector.
+
+The vectorized detector must return exactly what the old per-pixel
+column scan returned, for PIL images, array views and raw buffers.
+"""
+import sys
+import os
+import math
+import random
+import unittest
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+
+def reference_direction(img, avatar_height_ratio=0.8, tolerance=0):
+    """The original column-by-column scan, kept here as the oracle."""
+    img = img.convert('RGB')
+    w, h = img.size
+    band_h = int(h * avatar_height_ratio)
+    y0 = (h - band_h) // 2
+    y1 = y0 + band_h
+    pixels = img.load()
+
+    def is_uniform_column(x):
+        base = pixels[x, y0]
+        for y in range(y0, y1):
+            r, g, b = pixels[x, y]
+            if (abs(r - base[0]) > tolerance or
+                    abs(g - base[1]) > tolerance or
+                    abs(b - base[2]) > tolerance):
+                return False
+        return True
+
+    left_idx = math.inf
+    for x in range(w):
+        if not is_uniform_column(x):
+            left_idx = x
+            break
+    right_idx = math.inf
+    for offset, x in enumerate(range(w - 1, -1, -1)):
+        if not is_uniform_column(x):
+            right_idx = offset
+            break
+    if left_idx == math.inf and right_idx == math.inf:
+        return 'right', math.inf
+    if left_idx <= right_idx:
+        return 'left', float(left_idx)
+    return 'right', float(right_idx)
+
+
+def make_bubble(width, height, left, right, bg=(237, 237, 237), fg=(149, 236, 105), noise=0):
+    from PIL import Image
+    img = Image.new('RGB', (width, height), bg)
+    for x in range(left, right):
+        for y in range(height // 4, height - height // 4):
+            img.putpixel((x, y), fg)
+    rnd = random.Random(width * 31 + height)
+    for _ in range(noise):
+        x, y = rnd.randrange(width), rnd.randrange(height)
+        img.putpixel((x, y), tuple(max(0, c - rnd.randrange(1, 6)) for c in bg))
+    return img
+
+
+class TestDirectionDetector(unittest.TestCase):
+
+    def cases(self):
+        yield make_bubble(300, 60, 10, 120)        # friend: bubble near left
+        yield make_bubble(300, 60, 180, 290)       # self: bubble near right
+        yield make_bubble(300, 60, 100, 200)       # centered tie -> left
+        yield make_bubble(300, 60, 0, 0)           # blank -> ('right', inf)
+        yield make_bubble(120, 3, 40, 60)          # very short image
+        yield make_bubble(200, 50, 30, 90, noise=40)
+
+    def test_matches_reference_on_pil_images(self):
+        from superwx4.utils.tools import detect_message_direction_from_image
+        for img in self.cases():
+            for tolerance in (0, 3, 10):
+                self.assertEqual(
+                    detect_message_direction_from_image(img, tolerance=tolerance),
+                    reference_direction(img, tolerance=tolerance),
+                )
+
+    def test_matches_reference_on_array_views(self):
+        from superwx4.utils.tools import detect_message_direction_from_image, np
+        if np is None:
+            self.skipTest('numpy not installed')
+        for img in self.cases():
+            arr = np.asarray(img)
+            for tolerance in (0, 3):
+                self.assertEqual(
+                    detect_message_direction_from_image(arr[:, :], tolerance=tolerance),
+                    reference_direction(img, tolerance=tolerance),
+                )
+
+    def test_matches_reference_without_numpy(self):
+        from unittest import mock
+        from superwx4.utils import tools
+        with mock.patch.object(tools, 'np', None):
+            for img in self.cases():
+                for tolerance in (0, 3, 10):
+                    self.assertEqual(
+                        tools.detect_message_direction_from_image(img, tolerance=tolerance),
+                        reference_direction(img, tolerance=tolerance),
+                    )
+
+    def test_raw_bgrx_buffer(self):
+        from superwx4.utils.tools import detect_message_direction_from_image
+        img = make_bubble(300, 60, 180, 290)
+        raw = bytearray()
+        for r, g, b in img.getdata():
+            raw += bytes((b, g, r, 0))
+        result = detect_message_direction_from_image(bytes(raw), size=img.size, mode='BGRX')
+        self.assertEqual(result, reference_direction(img))
+
+    def test_raw_buffer_requires_size(self):
+        from superwx4.utils.tools import detect_message_direction_from_image
+        with self.assertRaises(ValueError):
+            detect_message_direction_from_image(b'\x00' * 12)
+
+    def test_path_api_still_works(self):
+        import tempfile
+        from superwx4.utils.tools import detect_message_direction
+        img = make_bubble(300, 60, 10, 120)
+        fd, path = tempfile.mkstemp(suffix='.png')
+        os.close(fd)
+        try:
+            img.save(path)
+            self.assertEqual(detect_message_direction(path), reference_direction(img))
+        finally:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""Test: pluggable listener event sources and the event-driven listen loop."""
+import sys
+import os
+import time
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+
+class TestEventSource(unittest.TestCase):
+
+    def test_memory_source_reports_fired_keys(self):
+        from superwx4.listen import MemoryEventSource
+        source = MemoryEventSource()
+        source.subscribe('a', None)
+        source.subscribe('b', None)
+        source.fire('a', 'unknown')
+        self.assertEqual(source.wait(0), {'a'})
+        self.assertEqual(source.wait(0.01), set())
+
+    def test_wait_wakes_on_notify(self):
+        from superwx4.listen import MemoryEventSource
+        source = MemoryEventSource()
+        source.subscribe('a', None)
+        threading.Timer(0.05, source.fire, args=('a',)).start()
+        start = time.perf_counter()
+        self.assertEqual(source.wait(5), {'a'})
+        self.assertLess(time.perf_counter() - start, 2)
+
+    def test_unsubscribe_and_close(self):
+        from superwx4.listen import MemoryEventSource
+        source = MemoryEventSource()
+        source.subscribe('a', None)
+        source.fire('a')
+        source.unsubscribe('a')
+        self.assertEqual(source.wait(0), set())
+        source.close()
+        start = time.perf_counter()
+        source.wait(5)
+        self.assertLess(time.perf_counter() - start, 1)
+
+    def test_polling_source_has_no_events(self):
+        from superwx4.listen import PollingSource
+        source = PollingSource()
+        source.subscribe('a', None)
+        self.assertEqual(source.wait(0.01), set())
+
+    def test_uia_source_falls_back_to_polling(self):
+        from superwx4.listen import UIAEventSource
+        source = UIAEventSource()
+        chat = MagicMock()
+        chat._api._chat_api.msgbox = None  # no element: registration fails
+        source.subscribe('a', chat)
+        self.assertIn('a', source.keys)
+        self.assertFalse(source.pushes('a'))
+        source.close()
+
+    def test_pushes(self):
+        from superwx4.listen import MemoryEventSource, PollingSource
+        source = MemoryEventSource()
+        source.subscribe('a', None)
+        self.assertTrue(source.pushes('a'))
+        self.assertFalse(source.pushes('b'))
+        polling = PollingSource()
+        polling.subscribe('a', None)
+        self.assertFalse(polling.pushes('a'))
+
+
+class FakeWeChat:
+    """A WeChat-like listener whose chats come from a plain dict."""
+
+    def __init__(self, source):
+        from superwx4.wx import WeChat
+        from superwx4.listen import PollScheduler
+        self.wx = WeChat.__new__(WeChat)
+        self.wx.listen = {}
+        self.received = []
+        self.wx._listener_start(source, PollScheduler(min_interval=60, max_interval=60))
+
+    def add(self, who, messages):
+        chat = MagicMock()
+        chat._api.HWND = None
+        chat._api.exists.return_value = True
+        chat.GetNewMessage.side_effect = lambda: messages.pop(0) if messages else []
+        self.wx.listen[who] = (chat, lambda msg, chat: self.received.append(msg))
+        self.wx._listener_watch(who, chat)
+        return chat
+
+
+class TestEventDrivenListener(unittest.TestCase):
+
+    def test_only_fired_chats_are_read(self):
+        from superwx4.listen import MemoryEventSource
+        source = MemoryEventSource()
+        fake = FakeWeChat(source)
+        try:
+            quiet = fake.add('quiet', [])
+            msg = MagicMock(attr='friend', content='hi')
+            busy = fake.add('busy', [[], [msg]])
+            time.sleep(0.1)
+            quiet.GetNewMessage.reset_mock()
+            source.fire('busy')
+            deadline = time.time() + 2
+            while not fake.received and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(fake.received, [msg])
+            busy.GetNewMessage.assert_called()
+            quiet.GetNewMessage.assert_not_called()
+        finally:
+            fake.wx._listener_stop()
+
+    def wait_called(self, chat):
+        deadline = time.time() + 2
+        while not chat.GetNewMessage.called and time.time() < deadline:
+            time.sleep(0.01)
+        chat.GetNewMessage.assert_called()
+
+    def test_event_chats_get_slow_safety_poll(self):
+        from superwx4.listen import MemoryEventSource
+        from superwx4.param import WxParam
+        fake = FakeWeChat(MemoryEventSource())
+        try:
+            chat = fake.add('a', [])
+            self.wait_called(chat)
+            stats = fake.wx.GetListenStats()['a']
+            self.assertEqual(stats['interval'], WxParam.LISTEN_EVENT_SAFETY_INTERVAL)
+            self.assertGreater(stats['next_in'], 60)
+        finally:
+            fake.wx._listener_stop()
+
+    def test_safety_poll_can_be_disabled(self):
+        from superwx4.listen import MemoryEventSource
+        from superwx4.param import WxParam
+        old = WxParam.LISTEN_EVENT_SAFETY_INTERVAL
+        WxParam.LISTEN_EVENT_SAFETY_INTERVAL = 0
+        source = MemoryEventSource()
+        fake = FakeWeChat(source)
+        try:
+            chat = fake.add('a', [])
+            self.assertNotIn('a', fake.wx._listener_scheduler)
+            # still checked when its event fires
+            self.wait_called(chat)
+        finally:
+            fake.wx._listener_stop()
+            WxParam.LISTEN_EVENT_SAFETY_INTERVAL = old
+
+    def test_failed_subscription_is_polled(self):
+        from superwx4.listen import MemoryEventSource
+
+        class FailingSource(MemoryEventSource):
+            """Every subscription fails, as when the UIA event cannot be registered."""
+
+            def pushes(self, key):
+                return False
+
+        fake = FakeWeChat(FailingSource())
+        try:
+            chat = fake.add('b', [])
+            self.wait_called(chat)
+            self.assertEqual(fake.wx.GetListenStats()['b']['interval'], 60)
+        finally:
+            fake.wx._listener_stop()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Test: find_many resolves several selector chains in one tree walk."""
+import sys
+import os
+import unittest
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+# the memory backend runs without pywin32 / comtypes
+os.environ.setdefault('SUPERWX4_UI_BACKEND', 'memory')
+
+
+RECT = {"left": 0, "top": 0, "right": 100, "bottom": 100}
+
+
+def node(control_type, children=(), **props):
+    return dict(props, ControlType=control_type, Rect=RECT, children=list(children))
+
+
+WINDOW = node("WindowControl", ClassName="mmui::MainWindow", Name="微信", children=[
+    node("GroupControl", ClassName="mmui::ChatMasterView", children=[
+        node("EditControl", ClassName="mmui::XValidatorTextEdit", Name="搜索"),
+        node("ListControl", AutomationId="session_list", Name="会话", children=[
+            node("ListItemControl", Name=f"会话{i}") for i in range(20)
+        ]),
+    ]),
+    node("GroupControl", AutomationId="chat_message_page", ClassName="mmui::ChatMessagePage", children=[
+        node("GroupControl", ClassName="mmui::MessageView", children=[
+            node("ListControl", AutomationId="chat_message_list", ClassName="mmui::RecyclerListView", children=[
+                node("ListItemControl", Name=f"消息{i}") for i in range(20)
+            ]),
+        ]),
+        node("GroupControl", ClassName="mmui::InputView", children=[
+            node("EditControl", AutomationId="chat_input_field", ClassName="mmui::ChatInputField"),
+            # 只有第二个选择器能匹配
+            node("ButtonControl", Name="发送"),
+        ]),
+    ]),
+])
+
+KEYS = ["chat_message_list", "chat_input_field", "send_button", "session_list", "search_box"]
+
+
+class TestFindMany(unittest.TestCase):
+
+    def setUp(self):
+        from superwx4.backend.memory import MemoryTree
+        self.tree = MemoryTree()
+        self.win = self.tree.load(WINDOW)
+
+    def test_same_controls_as_find_first(self):
+        from superwx4.locator.engine import find_first, find_many
+        found = find_many(self.win, KEYS)
+        for key in KEYS:
+            self.assertEqual(found[key], find_first(self.win, key), key)
+        self.assertEqual(found.ranks["send_button"], 1)
+        self.assertEqual(found.ranks["chat_message_list"], 0)
+
+    def test_each_node_visited_once(self):
+        from superwx4.locator.engine import find_many
+
+        def count(n):
+            return 1 + sum(count(c) for c in n["children"])
+
+        # send_button 只有第二个选择器能匹配，不会提前结束，整棵树恰好遍历一遍
+        found = find_many(self.win, KEYS)
+        self.assertEqual(found.visited, count(WINDOW) - 1)
+
+    def test_stops_when_every_key_has_top_hit(self):
+        from superwx4.locator.engine import find_many
+        found = find_many(self.win, ["search_box", "session_list"])
+        self.assertEqual(found["session_list"].AutomationId, "session_list")
+        # 会话列表是第三个节点，找到后不再进入其子项和聊天页面
+        self.assertEqual(found.visited, 3)
+
+    def test_missing_and_unknown_keys(self):
+        from superwx4.locator.engine import find_many
+        found = find_many(self.win, ["input_view", "message_view", "no_such_key"])
+        self.assertIsNotNone(found["input_view"])
+        self.assertIsNone(found["no_such_key"])
+        self.assertEqual(find_many(self.win, ["no_such_key"]).visited, 0)
+
+    def test_chatbox_init_uses_single_walk(self):
+        from superwx4.locator import get_registry
+        from superwx4.ui.chatbox import ChatBox
+        from superwx4.utils.cache import LRUCache
+        from superwx4.utils.tracker import MessageTracker
+        chatbox = ChatBox.__new__(ChatBox)
+        chatbox.control = self.win.GroupControl(AutomationId="chat_message_page")
+        chatbox._hwnd = -23
+        chatbox.tracker = MessageTracker()
+        chatbox.parse_cache = LRUCache(16)
+        self.tree.reset_stats()
+        chatbox.init()
+        self.assertEqual(chatbox.msgbox.AutomationId, "chat_message_list")
+        self.assertEqual(chatbox.editbox.AutomationId, "chat_input_field")
+        self.assertEqual(chatbox.sendbtn.Name, "发送")
+        self.assertEqual(chatbox.tracker.seen(chatbox.id)[:1], (chatbox.msgbox.GetChildren()[0].runtimeid,))
+        # 只查找了聊天页面本身，三个控件来自同一次遍历
+        self.assertEqual(self.tree.calls["FindControl"], 1)
+        get_registry().invalidate(-23)
+
+
+if __name__ == '__main__':
+    unittest.main()
+# 1
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""Test: one window capture per parse batch.
+
+Uses synthetic frames via an injected grabber — no win32 involved.
+"""
+import sys
+import os
+import unittest
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+
+def make_frame(width=200, height=100, color=(245, 245, 245)):
+    from PIL import Image
+    img = Image.new('RGB', (width, height), color)
+    # a dark block at screen (1060, 530) - (1080, 550) for a window at (1000, 500)
+    for x in range(60, 80):
+        for y in range(30, 50):
+            img.putpixel((x, y), (10, 20, 30))
+    return img
+
+
+class CountingGrabber:
+    def __init__(self, image, window_rect=(1000, 500, 1200, 600)):
+        self.image = image
+        self.window_rect = window_rect
+        self.calls = 0
+
+    def __call__(self, hwnd):
+        self.calls += 1
+        return self.image, self.window_rect
+
+
+class TestWindowFrame(unittest.TestCase):
+
+    def test_crop_uses_screen_coordinates(self):
+        from superwx4.utils.frame import WindowFrame
+        frame = WindowFrame(make_frame(), (1000, 500, 1200, 600))
+        crop = frame.crop((1060, 530, 1080, 550))
+        self.assertEqual(crop.size, (20, 20))
+        self.assertEqual(crop.getpixel((0, 0)), (10, 20, 30))
+
+    def test_crop_is_clamped_to_frame(self):
+        from superwx4.utils.frame import WindowFrame
+        frame = WindowFrame(make_frame(), (1000, 500, 1200, 600))
+        crop = frame.crop((950, 450, 1050, 550))
+        self.assertEqual(crop.size, (50, 50))
+        self.assertFalse(frame.contains((950, 450, 1050, 550)))
+        self.assertTrue(frame.contains((1000, 500, 1050, 550)))
+
+    def test_view_shares_frame_memory(self):
+        from superwx4.utils.frame import WindowFrame, np
+        if np is None:
+            self.skipTest('numpy not installed')
+        frame = WindowFrame(make_frame(), (1000, 500, 1200, 600))
+        view = frame.view((1060, 530, 1080, 550))
+        self.assertEqual(view.shape, (20, 20, 3))
+        self.assertTrue(np.shares_memory(view, frame.array))
+
+
+class TestFrameCapture(unittest.TestCase):
+
+    def test_one_capture_per_batch(self):
+        from superwx4.utils.frame import FrameCapture
+        grabber = CountingGrabber(make_frame())
+        capture = FrameCapture(lambda: 1, grabber)
+        with capture.batch():
+            for _ in range(30):
+                capture.crop((1060, 530, 1080, 550))
+        self.assertEqual(grabber.calls, 1)
+        self.assertEqual(capture.stats(), {'captures': 1, 'crops': 30})
+
+    def test_nested_batches_share_frame(self):
+        from superwx4.utils.frame import FrameCapture
+        grabber = CountingGrabber(make_frame())
+        capture = FrameCapture(lambda: 1, grabber)
+        with capture.batch():
+            capture.crop((1000, 500, 1010, 510))
+            with capture.batch():
+                capture.crop((1000, 500, 1010, 510))
+            capture.crop((1000, 500, 1010, 510))
+        self.assertEqual(grabber.calls, 1)
+
+    def test_capture_outside_batch_is_fresh(self):
+        from superwx4.utils.frame import FrameCapture
+        grabber = CountingGrabber(make_frame())
+        capture = FrameCapture(lambda: 1, grabber)
+        capture.crop((1000, 500, 1010, 510))
+        capture.crop((1000, 500, 1010, 510))
+        self.assertEqual(grabber.calls, 2)
+
+    def test_invalidate_forces_new_capture(self):
+        from superwx4.utils.frame import FrameCapture
+        grabber = CountingGrabber(make_frame())
+        capture = FrameCapture(lambda: 1, grabber)
+        with capture.batch():
+            capture.crop((1000, 500, 1010, 510))
+            capture.invalidate()
+            capture.crop((1000, 500, 1010, 510))
+        self.assertEqual(grabber.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
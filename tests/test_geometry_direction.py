@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""Test: pixel-free message direction from UIA geometry.
+
+Classifier is tested on plain rect tuples; parse_msg fallback is tested
+with mocked controls and with real in-memory control trees — no screenshot
+is taken when geometry is confident.
+"""
+import sys
+import os
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+# the memory backend runs without pywin32 / comtypes
+os.environ.setdefault('SUPERWX4_UI_BACKEND', 'memory')
+
+BOX = (100, 0, 700, 1000)
+ITEM = (100, 200, 700, 260)
+
+
+def make_rect(left, top, right, bottom):
+    rect = MagicMock()
+    rect.left, rect.top, rect.right, rect.bottom = left, top, right, bottom
+    rect.width.return_value = right - left
+    rect.height.return_value = bottom - top
+    return rect
+
+
+def make_child(rect, ctype='TextControl', classname=''):
+    child = MagicMock()
+    child.ControlTypeName = ctype
+    child.ClassName = classname
+    child.BoundingRectangle = make_rect(*rect)
+    child.GetChildren.return_value = []
+    return child
+
+
+def make_msg_control(children, rect=ITEM, name='hello'):
+    ctrl = MagicMock()
+    ctrl.AutomationId = 'msg_item'
+    ctrl.ClassName = 'mmui::ChatTextItemView'
+    ctrl.Name = name
+    ctrl.runtimeid = name
+    ctrl.BoundingRectangle = make_rect(*rect)
+    ctrl.GetChildren.return_value = children
+    return ctrl
+
+
+def make_chatbox():
+    from PIL import Image
+    from superwx4.utils.cache import LRUCache
+    chatbox = SimpleNamespace(root=None, parse_cache=LRUCache(8))
+    chatbox.msgbox = SimpleNamespace(BoundingRectangle=make_rect(*BOX))
+    chatbox.frame_capture = MagicMock()
+    chatbox.frame_capture.view.return_value = Image.new('RGB', (600, 60), (237, 237, 237))
+    return chatbox
+
+
+class TestGeometryClassifier(unittest.TestCase):
+
+    def test_friend_bubble_on_left(self):
+        from superwx4.msgs.geometry import classify_direction_by_geometry
+        direction, distance, confidence = classify_direction_by_geometry(
+            ITEM, [(170, 210, 330, 250)], [(120, 210, 156, 246)], BOX)
+        self.assertEqual(direction, 'left')
+        self.assertEqual(distance, 20.0)
+        self.assertGreater(confidence, 0.9)
+
+    def test_self_bubble_on_right(self):
+        from superwx4.msgs.geometry import classify_direction_by_geometry
+        direction, distance, confidence = classify_direction_by_geometry(
+            ITEM, [(450, 210, 630, 250)], [], BOX)
+        self.assertEqual(direction, 'right')
+        self.assertEqual(distance, 70.0)
+        self.assertGreater(confidence, 0.5)
+
+    def test_wide_bubble_is_ambiguous(self):
+        from superwx4.msgs.geometry import classify_direction_by_geometry
+        _, _, confidence = classify_direction_by_geometry(
+            ITEM, [(160, 210, 630, 250)], [], BOX)
+        self.assertLess(confidence, 0.3)
+
+    def test_conflicting_evidence_has_no_confidence(self):
+        from superwx4.msgs.geometry import classify_direction_by_geometry
+        _, _, confidence = classify_direction_by_geometry(
+            ITEM, [(450, 210, 630, 250)], [(120, 210, 156, 246)], BOX)
+        self.assertEqual(confidence, 0.0)
+
+    def test_no_children(self):
+        from superwx4.msgs.geometry import classify_direction_by_geometry
+        self.assertEqual(classify_direction_by_geometry(ITEM, [], [], BOX), (None, 0.0, 0.0))
+
+
+class TestGeometryFirstParse(unittest.TestCase):
+
+    def test_geometry_decides_without_screenshot(self):
+        from superwx4.msgs.msg import parse_msg
+        chatbox = make_chatbox()
+        ctrl = make_msg_control([
+            make_child((644, 210, 680, 246), 'ButtonControl'),
+            make_child((450, 210, 630, 250)),
+        ])
+        msg = parse_msg(ctrl, chatbox)
+        self.assertEqual(msg.attr, 'self')
+        self.assertEqual(msg.direction_source, 'geometry')
+        chatbox.frame_capture.view.assert_not_called()
+
+    def test_ambiguous_geometry_falls_back_to_pixels(self):
+        from superwx4.msgs.msg import parse_msg
+        chatbox = make_chatbox()
+        ctrl = make_msg_control([make_child((160, 210, 630, 250))])
+        msg = parse_msg(ctrl, chatbox)
+        self.assertEqual(msg.direction_source, 'pixel')
+        self.assertEqual(chatbox.frame_capture.view.call_count, 1)
+
+    def test_disabled_by_param(self):
+        from superwx4.msgs.msg import parse_msg
+        from superwx4.param import WxParam
+        chatbox = make_chatbox()
+        ctrl = make_msg_control([make_child((450, 210, 630, 250))])
+        old = WxParam.GEOMETRY_DIRECTION
+        WxParam.GEOMETRY_DIRECTION = False
+        try:
+            msg = parse_msg(ctrl, chatbox)
+        finally:
+            WxParam.GEOMETRY_DIRECTION = old
+        self.assertEqual(msg.direction_source, 'pixel')
+
+
+def tree_rect(left, top, right, bottom):
+    return {"left": left, "top": top, "right": right, "bottom": bottom}
+
+
+def message_node(row, side):
+    top = row * 60
+    avatar = (644, top + 10, 680, top + 46) if side == 'right' else (120, top + 10, 156, top + 46)
+    bubble = (450, top + 10, 630, top + 50) if side == 'right' else (170, top + 10, 330, top + 50)
+    return {
+        "ControlType": "ListItemControl", "AutomationId": "msg_item", "ClassName": "mmui::ChatTextItemView",
+        "Name": f"msg {row}", "Rect": tree_rect(100, top, 700, top + 60),
+        "children": [{"ControlType": "GroupControl", "Rect": tree_rect(100, top, 700, top + 60), "children": [
+            {"ControlType": "ButtonControl", "ClassName": "mmui::XAvatar", "Rect": tree_rect(*avatar)},
+            {"ControlType": "GroupControl", "ClassName": "mmui::ChatBubble", "Rect": tree_rect(*bubble), "children": [
+                {"ControlType": "TextControl", "Name": f"msg {row}", "Rect": tree_rect(bubble[0] + 10, bubble[1] + 5,
+                                                                                      bubble[2] - 10, bubble[3] - 5)},
+            ]},
+        ]}],
+    }
+
+
+class TestGeometryOnControlTree(unittest.TestCase):
+
+    def setUp(self):
+        from superwx4.backend.memory import MemoryTree
+        self.sides = ['left', 'right', 'right', 'left']
+        self.tree = MemoryTree()
+        self.msgbox = self.tree.load({
+            "ControlType": "ListControl", "Rect": tree_rect(*BOX),
+            "children": [message_node(i, side) for i, side in enumerate(self.sides)],
+        })
+
+    def make_chatbox(self):
+        from superwx4.utils.cache import LRUCache
+        from superwx4.utils.frame import FrameCapture
+        chatbox = SimpleNamespace(root=None, msgbox=self.msgbox, parse_cache=LRUCache(8))
+        chatbox.frame_capture = FrameCapture(lambda: 1, MagicMock(side_effect=AssertionError('no screenshot')))
+        return chatbox
+
+    def test_one_subtree_read_per_message(self):
+        from superwx4.msgs.geometry import collect_message_rects
+        ctrl = self.msgbox.GetChildren()[1]
+        self.tree.reset_stats()
+        bodies, avatars = collect_message_rects(ctrl)
+        self.assertEqual(len(bodies), 2)
+        self.assertEqual(avatars, [(644, 70, 680, 106)])
+        # 整个子树及其属性一次取回，不再逐个节点读取
+        self.assertEqual(dict(self.tree.calls), {'GetSubtreeCached': 1})
+
+    def test_batch_decided_without_screenshot(self):
+        from superwx4.msgs.msg import parse_msgs
+        chatbox = self.make_chatbox()
+        msgs = parse_msgs(self.msgbox.GetChildren(), chatbox, executor=None)
+        self.assertEqual([m.attr for m in msgs], ['friend', 'self', 'self', 'friend'])
+        self.assertEqual({m.direction_source for m in msgs}, {'geometry'})
+        self.assertEqual(chatbox.frame_capture.stats()['captures'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""Test: lazy message mode.
+
+Reading ``content`` / ``id`` must not trigger direction detection,
+rect reads or hashing; the first access to any other field resolves once.
+"""
+import sys
+import os
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, PropertyMock
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+
+def make_rect(left, top, right, bottom):
+    rect = MagicMock()
+    rect.left, rect.top, rect.right, rect.bottom = left, top, right, bottom
+    rect.width.return_value = right - left
+    rect.height.return_value = bottom - top
+    return rect
+
+
+def make_msg_control():
+    ctrl = MagicMock()
+    ctrl.AutomationId = 'msg_item'
+    ctrl.ClassName = 'mmui::ChatTextItemView'
+    ctrl.Name = 'hello'
+    ctrl.runtimeid = (1, 2, 3)
+    ctrl.GetChildren.return_value = []
+    rect_prop = PropertyMock(return_value=make_rect(0, 0, 300, 60))
+    type(ctrl).BoundingRectangle = rect_prop
+    return ctrl, rect_prop
+
+
+def make_chatbox():
+    from PIL import Image
+    from superwx4.utils.cache import LRUCache
+    bubble = Image.new('RGB', (300, 60), (237, 237, 237))
+    for x in range(200, 290):
+        for y in range(15, 45):
+            bubble.putpixel((x, y), (149, 236, 105))
+    chatbox = SimpleNamespace(root=None, parse_cache=LRUCache(8), msgbox=None)
+    chatbox.frame_capture = MagicMock()
+    chatbox.frame_capture.view.return_value = bubble
+    return chatbox
+
+
+class TestLazyMessage(unittest.TestCase):
+
+    def test_content_does_not_resolve(self):
+        from superwx4.msgs.msg import parse_msg
+        chatbox = make_chatbox()
+        ctrl, rect_prop = make_msg_control()
+        msg = parse_msg(ctrl, chatbox, lazy=True)
+        self.assertEqual(msg.content, 'hello')
+        self.assertEqual(msg.id, (1, 2, 3))
+        self.assertEqual(str(msg), 'hello')
+        self.assertFalse(msg.resolved)
+        rect_prop.assert_not_called()
+        chatbox.frame_capture.view.assert_not_called()
+
+    def test_quote_content_matches_resolved(self):
+        from superwx4.msgs.msg import parse_msg
+        chatbox = make_chatbox()
+        ctrl, rect_prop = make_msg_control()
+        ctrl.Name = '回复内容 \n引用 张三 的消息 : 原文'
+        msg = parse_msg(ctrl, chatbox, lazy=True)
+        self.assertEqual(msg.content, '回复内容')
+        self.assertFalse(msg.resolved)
+        rect_prop.assert_not_called()
+        self.assertEqual(msg['content'], msg.content)
+        self.assertEqual(msg.resolve().content, msg.content)
+        self.assertEqual(msg.quote_content, '原文')
+
+    def test_first_access_resolves_once(self):
+        from superwx4.msgs.msg import parse_msg
+        chatbox = make_chatbox()
+        ctrl, _ = make_msg_control()
+        msg = parse_msg(ctrl, chatbox, lazy=True)
+        self.assertEqual(msg.attr, 'self')
+        self.assertTrue(msg.is_self)
+        self.assertEqual(msg.type, 'text')
+        self.assertEqual(msg.direction, 'right')
+        self.assertEqual(chatbox.frame_capture.view.call_count, 1)
+        self.assertEqual(msg.resolve().__class__.__name__, 'SelfTextMessage')
+
+    def test_param_default(self):
+        from superwx4.msgs.msg import parse_msg
+        from superwx4.msgs.lazy import LazyMessage
+        from superwx4.param import WxParam
+        chatbox = make_chatbox()
+        ctrl, _ = make_msg_control()
+        self.assertNotIsInstance(parse_msg(ctrl, chatbox), LazyMessage)
+        old = WxParam.LAZY_MESSAGE
+        WxParam.LAZY_MESSAGE = True
+        try:
+            self.assertIsInstance(parse_msg(ctrl, chatbox), LazyMessage)
+        finally:
+            WxParam.LAZY_MESSAGE = old
+
+
+class TestLazyHash(unittest.TestCase):
+
+    def test_hash_is_computed_on_access(self):
+        from superwx4.msgs.msg import parse_msg
+        from superwx4.param import WxParam
+        chatbox = make_chatbox()
+        ctrl, _ = make_msg_control()
+        msg = parse_msg(ctrl, chatbox, lazy=False)
+        self.assertNotIn('hash', msg.__dict__)
+        self.assertNotIn('hash', msg.to_dict())
+        self.assertEqual(msg.hash_text, '(60,300)hello')
+        old = WxParam.MESSAGE_HASH
+        WxParam.MESSAGE_HASH = True
+        try:
+            self.assertEqual(len(msg.to_dict()['hash']), 32)
+        finally:
+            WxParam.MESSAGE_HASH = old
+
+
+class TestLazyListener(unittest.TestCase):
+
+    def test_listener_leaves_messages_unresolved(self):
+        from superwx4.msgs.msg import parse_msg
+        from superwx4.wx import WeChat
+        chatbox = make_chatbox()
+        ctrl, rect_prop = make_msg_control()
+        msg = parse_msg(ctrl, chatbox, lazy=True)
+        wx = WeChat.__new__(WeChat)
+        wx.listen = {}
+        wx._listener_start(thread=False)
+        chat = MagicMock()
+        chat._api.HWND = None
+        chat.GetNewMessage.return_value = [msg]
+        received = []
+        wx.listen['a'] = (chat, lambda m, chat: received.append(m.content))
+        wx._get_listen_messages(['a'])
+        wx._listener_stop()
+        self.assertEqual(received, ['hello'])
+        # 调试日志与分发都不解析消息，回调只读 content
+        self.assertFalse(msg.resolved)
+        rect_prop.assert_not_called()
+        chatbox.frame_capture.view.assert_not_called()
+
+
+class TestEagerRect(unittest.TestCase):
+
+    def test_rect_read_at_construction(self):
+        from superwx4.msgs.msg import parse_msg
+        chatbox = make_chatbox()
+        ctrl, rect_prop = make_msg_control()
+        msg = parse_msg(ctrl, chatbox, lazy=False)
+        reads = rect_prop.call_count
+        self.assertIn('rect', msg.__dict__)
+        # 之后计算哈希不再读取控件（列表项可能已被回收）
+        self.assertEqual(msg.hash_text, '(60,300)hello')
+        self.assertEqual(rect_prop.call_count, reads)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Test: saving and restoring the listen table across restarts."""
+import sys
+import os
+import json
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+# the memory backend runs without pywin32 / comtypes
+os.environ.setdefault('SUPERWX4_UI_BACKEND', 'memory')
+
+
+def make_subwin(name, hwnd):
+    from superwx4.utils.tracker import MessageTracker
+    subwin = MagicMock()
+    subwin.nickname = name
+    subwin.HWND = hwnd
+    subwin._chat_api.tracker = MessageTracker()
+    return subwin
+
+
+def make_wechat():
+    from superwx4.wx import WeChat
+    wx = WeChat.__new__(WeChat)
+    wx.listen = {}
+    wx._api = MagicMock()
+    wx._api.HWND = 1
+    wx._api.open_separate_window.side_effect = lambda name: make_subwin(name, 900)
+    return wx
+
+
+class TestListenState(unittest.TestCase):
+
+    def test_save_and_load(self):
+        from superwx4.wx import Chat
+        old = make_wechat()
+        for name, hwnd in (('alive', 101), ('gone', 102)):
+            subwin = make_subwin(name, hwnd)
+            subwin._chat_api.tracker.baseline((42, name), ['a', 'b'], 2)
+            old.listen[name] = (Chat(subwin), None)
+
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, 'state', 'listen.json')
+            self.assertEqual(old.SaveListenState(path)['data']['chats'], 2)
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(len(json.load(f)['chats']), 2)
+
+            wx = make_wechat()
+            restored_subwin = make_subwin('alive', 101)
+            with patch('superwx4.wx.is_window', lambda hwnd: hwnd == 101), \
+                    patch('superwx4.wx.WeChatSubWnd', lambda hwnd, parent: restored_subwin):
+                result = wx.LoadListenState(path, lambda msg, chat: None)
+            try:
+                self.assertEqual(result['data']['restored'], ['alive'])
+                self.assertEqual(result['data']['reopened'], ['gone'])
+                wx._api.open_separate_window.assert_called_once_with('gone')
+                self.assertEqual(
+                    restored_subwin._chat_api.tracker.seen((42, 'alive')), ('a', 'b')
+                )
+                self.assertEqual(set(wx.listen), {'alive', 'gone'})
+            finally:
+                wx.StopListening()
+
+    def test_fingerprints_survive_json_round_trip(self):
+        from superwx4.utils.diff import align_snapshots
+        from superwx4.utils.tracker import MessageTracker
+        old = MessageTracker()
+        prev = [((42, 1, i), f'msg {i}', 40) for i in range(3)]
+        old.baseline((42, 'alive'), [fp[0] for fp in prev], 3)
+        old.set_fingerprints((42, 'alive'), prev)
+
+        tracker = MessageTracker()
+        tracker.restore(json.loads(json.dumps(old.snapshot())))
+        restored = tracker.fingerprints((42, 'alive'))
+        self.assertEqual(restored, tuple(prev))
+        self.assertTrue(tracker.is_seen((42, 'alive'), (42, 1, 0)))
+        # 停机期间收到两条消息
+        curr = prev[1:] + [((42, 1, i), f'msg {i}', 40) for i in range(3, 5)]
+        alignment = align_snapshots(restored, curr)
+        self.assertTrue(alignment.anchored)
+        self.assertEqual(curr[alignment.start:], curr[2:])
+
+    def test_messages_received_while_down_are_delivered(self):
+        from superwx4.backend.memory import MemoryTree
+        from superwx4.ui.chatbox import ChatBox
+        from superwx4.utils.cache import LRUCache
+        from superwx4.utils.frame import FrameCapture
+        from superwx4.utils.tracker import MessageTracker
+
+        def item(i):
+            return {"ControlType": "ListItemControl", "Name": f"msg {i}",
+                    "Rect": {"left": 0, "top": i * 40, "right": 300, "bottom": i * 40 + 40}}
+
+        tree = MemoryTree()
+        page = tree.load({"ControlType": "GroupControl", "children": [
+            {"ControlType": "ListControl", "AutomationId": "chat_message_list",
+             "children": [item(i) for i in range(3)]},
+        ]})
+
+        def chatbox(tracker):
+            box = ChatBox.__new__(ChatBox)
+            box.control = page
+            box.msgbox = page.ListControl(AutomationId="chat_message_list")
+            box.tracker = tracker
+            box.parse_cache = LRUCache(16)
+            box.frame_capture = FrameCapture(lambda: 1, MagicMock())
+            box.last_parse_stats = {}
+            box.root = None
+            box._empty = False
+            return box
+
+        before = chatbox(MessageTracker())
+        before._update_used_msg_ids()
+        state = json.loads(json.dumps(before.tracker.snapshot()))
+
+        for i in range(3, 5):
+            tree.add(item(i), parent=before.msgbox)
+        after = chatbox(MessageTracker())
+        after.tracker.restore(state)
+        self.assertEqual([m.content for m in after.get_new_msgs()], ['msg 3', 'msg 4'])
+        self.assertEqual(after.get_new_msgs(), [])
+
+    def test_missing_file(self):
+        wx = make_wechat()
+        self.assertFalse(wx.LoadListenState('/nonexistent/listen.json', print))
+
+
+if __name__ == '__main__':
+    unittest.main()
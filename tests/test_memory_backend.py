@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""Test: in-memory UI backend loaded from dump_ui_tree JSON."""
+import sys
+import os
+import json
+import tempfile
+import unittest
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+# the memory backend runs without pywin32 / comtypes
+os.environ.setdefault('SUPERWX4_UI_BACKEND', 'memory')
+
+
+WINDOW = {
+    "depth": 0,
+    "ControlType": "WindowControl",
+    "ClassName": "mmui::MainWindow",
+    "AutomationId": "",
+    "Name": "微信",
+    "Rect": {"left": 0, "top": 0, "right": 1000, "bottom": 800},
+    "children": [
+        {
+            "depth": 1,
+            "ControlType": "GroupControl",
+            "ClassName": "mmui::ChatMessagePage",
+            "AutomationId": "chat_message_page",
+            "Name": "",
+            "children": [
+                {
+                    "depth": 2,
+                    "ControlType": "ListControl",
+                    "ClassName": "mmui::RecyclerListView",
+                    "AutomationId": "chat_message_list",
+                    "Name": "消息",
+                    "Rect": {"left": 300, "top": 60, "right": 1000, "bottom": 600},
+                    "children": [
+                        {"ControlType": "ListItemControl", "ClassName": "mmui::ChatTextItemView",
+                         "Name": "你好", "Rect": {"left": 300, "top": 100, "right": 1000, "bottom": 140}},
+                        {"ControlType": "ListItemControl", "ClassName": "mmui::ChatTextItemView",
+                         "Name": "在吗", "Rect": {"left": 300, "top": 700, "right": 1000, "bottom": 740}},
+                    ],
+                },
+                {
+                    "depth": 2,
+                    "ControlType": "EditControl",
+                    "ClassName": "mmui::ChatInputField",
+                    "AutomationId": "chat_input_field",
+                    "Name": "张三",
+                    "Patterns": {"Value": {"Value": "草稿"}},
+                },
+                {"depth": 2, "ControlType": "ButtonControl", "ClassName": "mmui::XOutlineButton", "Name": "发送"},
+            ],
+        },
+    ],
+}
+
+
+class TestMemoryBackend(unittest.TestCase):
+
+    def make(self, **kwargs):
+        from superwx4.backend.memory import MemoryTree
+        tree = MemoryTree(**kwargs)
+        return tree, tree.load(WINDOW)
+
+    def test_typed_finders_and_properties(self):
+        tree, win = self.make()
+        msgbox = win.ListControl(AutomationId='chat_message_list')
+        self.assertTrue(msgbox.Exists(0))
+        self.assertEqual(msgbox.ClassName, 'mmui::RecyclerListView')
+        self.assertEqual(msgbox.ControlTypeName, 'ListControl')
+        self.assertEqual(msgbox.BoundingRectangle.height(), 540)
+        self.assertEqual([c.Name for c in msgbox.GetChildren()], ['你好', '在吗'])
+        self.assertEqual(win.ListItemControl(foundIndex=2).Name, '在吗')
+        self.assertEqual(win.ButtonControl(SubName='发').Name, '发送')
+        self.assertEqual(win.ButtonControl(RegexName='^发').Name, '发送')
+        # searchDepth 限制查找深度
+        self.assertFalse(win.ListControl(searchDepth=1).Exists(0))
+        self.assertTrue(win.ListControl(searchDepth=2).Exists(0))
+        missing = win.TextControl(Name='不存在')
+        self.assertFalse(missing.Exists(0))
+        with self.assertRaises(LookupError):
+            missing.Name
+
+    def test_navigation_and_runtime_ids(self):
+        tree, win = self.make()
+        first, second = win.ListControl().GetChildren()
+        self.assertEqual(first.GetNextSiblingControl(), second)
+        self.assertIsNone(second.GetNextSiblingControl())
+        self.assertEqual(second.GetPreviousSiblingControl(), first)
+        self.assertEqual(first.GetParentControl().AutomationId, 'chat_message_list')
+        self.assertEqual(first.GetTopLevelControl(), win)
+        self.assertNotEqual(first.runtimeid, second.runtimeid)
+        # 同一元素多次获取 runtimeid 不变
+        self.assertEqual(win.ListControl().GetChildren()[0].runtimeid, first.runtimeid)
+        ancestor = first.GetAncestorControl(lambda c, d: c.ClassName == 'mmui::MainWindow')
+        self.assertEqual(ancestor, win)
+
+    def test_tree_mutation_is_visible_to_finders(self):
+        tree, win = self.make()
+        msgbox = win.ListControl()
+        tree.add({"ControlType": "ListItemControl", "Name": "新消息"}, parent=msgbox)
+        self.assertEqual([c.Name for c in msgbox.GetChildren()][-1], '新消息')
+        old = msgbox.GetChildren()[0]
+        tree.remove(old)
+        self.assertFalse(old.Exists(0))
+        send = win.ButtonControl(Name='发送')
+        self.assertTrue(send.Exists(0))
+        tree.remove(win.ButtonControl(Name='发送'))
+        self.assertFalse(send.Exists(0))
+
+    def test_patterns_and_actions(self):
+        tree, win = self.make()
+        edit = win.EditControl()
+        self.assertEqual(edit.GetValuePattern().Value, '草稿')
+        edit.GetValuePattern().SetValue('')
+        self.assertEqual(edit.GetValuePattern().Value, '')
+        self.assertIsNone(edit.GetInvokePattern())
+        send = win.ButtonControl(Name='发送')
+        self.assertIsNotNone(send.GetInvokePattern())
+        self.assertIsNone(send.GetValuePattern())
+        self.assertIsNotNone(send.GetLegacyIAccessiblePattern())
+        seen = []
+        tree.on_action = seen.append
+        send.GetInvokePattern().Invoke()
+        edit.SetFocus()
+        edit.SendKeys('{Ctrl}a')
+        self.assertTrue(edit.HasKeyboardFocus)
+        self.assertEqual([a.action for a in tree.actions], ['SetValue', 'Invoke', 'SetFocus', 'SendKeys'])
+        self.assertEqual([a.action for a in seen], ['Invoke', 'SetFocus', 'SendKeys'])
+        self.assertEqual(tree.actions[-1].args, ('{Ctrl}a',))
+
+    def test_call_counters(self):
+        from superwx4.backend.memory import WalkControl
+        tree, win = self.make()
+        tree.reset_stats()
+        nodes = list(WalkControl(win, maxDepth=3))
+        self.assertEqual(len(nodes), 6)
+        self.assertGreater(tree.calls['GetNextSiblingControl'], 0)
+        tree.reset_stats()
+        win.ListControl().Name
+        self.assertEqual(tree.calls['FindControl'], 1)
+        self.assertEqual(tree.calls['Name'], 1)
+
+    def test_in_window_and_roll_into_view(self):
+        from superwx4.backend.memory import IsElementInWindow, RollIntoView
+        tree, win = self.make()
+        msgbox = win.ListControl()
+        visible, hidden = msgbox.GetChildren()
+        self.assertTrue(IsElementInWindow(msgbox, visible))
+        self.assertFalse(IsElementInWindow(msgbox, hidden))
+        RollIntoView(msgbox, hidden)
+        self.assertEqual(tree.actions[-1].action, 'RollIntoView')
+
+    def test_module_functions_use_current_tree(self):
+        from superwx4.backend import memory
+        tmp = tempfile.mkdtemp()
+        path = os.path.join(tmp, 'dump.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(dict(WINDOW, NativeWindowHandle=0x1234), f, ensure_ascii=False)
+        previous = memory.get_tree()
+        try:
+            tree = memory.load_tree(path)
+            self.assertIs(memory.get_tree(), tree)
+            root = memory.GetRootControl()
+            self.assertEqual([w.Name for w in root.GetChildren()], ['微信'])
+            win = memory.ControlFromHandle(0x1234)
+            self.assertEqual(win.ClassName, 'mmui::MainWindow')
+            self.assertIsNone(memory.ControlFromHandle(1))
+            # 不指定起点时从桌面开始查找
+            self.assertTrue(memory.Control(AutomationId='chat_input_field').Exists(0))
+        finally:
+            memory.set_tree(previous)
+
+    def test_dump_round_trip(self):
+        from superwx4.backend.memory import MemoryTree
+        from superwx4.locator.dump import _walk_control
+        tree, win = self.make()
+        dumped = _walk_control(win, max_depth=8)
+        copy = MemoryTree()
+        win2 = copy.load(json.loads(json.dumps(dumped)))
+        names = lambda t: [(c.ControlTypeName, c.ClassName, c.Name) for c in t.GetChildren()]
+        self.assertEqual(names(win2.GroupControl()), names(win.GroupControl()))
+        self.assertEqual(win2.ListControl().BoundingRectangle, win.ListControl().BoundingRectangle)
+        # tree.dump 的结果与 dump_ui_tree 格式相同
+        self.assertEqual(tree.dump(win)['children'][0]['ClassName'], 'mmui::ChatMessagePage')
+
+    def test_locator_engine_runs_on_memory_tree(self):
+        from superwx4.locator.engine import find_first
+        tree, win = self.make()
+        self.assertEqual(find_first(win, 'chat_input_field').Name, '张三')
+        self.assertEqual(find_first(win, 'send_button').Name, '发送')
+
+    def test_satisfies_protocol(self):
+        from superwx4.backend import ControlLike, UIBackend, RectLike
+        from superwx4.backend import memory
+        tree, win = self.make()
+        self.assertIsInstance(win, ControlLike)
+        self.assertIsInstance(win.BoundingRectangle, RectLike)
+        self.assertIsInstance(memory, UIBackend)
+
+    def test_rect_equality(self):
+        from superwx4.backend.memory import Rect
+        rect = Rect(0, 0, 10, 10)
+        self.assertEqual(rect, Rect(0, 0, 10, 10))
+        self.assertNotEqual(rect, Rect(0, 0, 10, 20))
+        self.assertNotEqual(rect, None)
+        self.assertNotEqual(rect, (0, 0, 10, 10))
+
+    def test_imports_without_windows_modules(self):
+        import subprocess
+        # None in sys.modules makes the import raise, as on a machine without pywin32 / comtypes
+        code = (
+            "import sys\n"
+            "for name in ('win32ui', 'win32gui', 'win32api', 'win32con', 'win32process',\n"
+            "             'win32clipboard', 'comtypes', 'comtypes.client'):\n"
+            "    sys.modules[name] = None\n"
+            "import superwx4.backend.memory\n"
+            "from superwx4 import WeChat, uia\n"
+            "from superwx4.ui import driver\n"
+            "assert uia.uiautomation is superwx4.backend.memory\n"
+            "try:\n"
+            "    driver.win32gui.GetForegroundWindow()\n"
+            "except ImportError:\n"
+            "    pass\n"
+            "else:\n"
+            "    raise AssertionError('win32gui should be unavailable')\n"
+        )
+        env = dict(os.environ, SUPERWX4_UI_BACKEND='memory', PYTHONPATH=CUR)
+        result = subprocess.run([sys.executable, '-c', code], cwd=CUR, env=env,
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
+# 1
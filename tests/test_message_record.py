@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""Test: slotted immutable MessageRecord and Message mapping access."""
+import sys
+import os
+import pickle
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+
+def make_message(name='好的 \n引用 张三 的消息 : 明天开会'):
+    from superwx4.msgs.msg import parse_msg_type
+    rect = MagicMock()
+    rect.left, rect.top, rect.right, rect.bottom = 0, 100, 300, 160
+    rect.width.return_value = 300
+    rect.height.return_value = 60
+    ctrl = MagicMock()
+    ctrl.AutomationId = 'msg_item'
+    ctrl.ClassName = 'mmui::ChatTextItemView'
+    ctrl.Name = name
+    ctrl.runtimeid = '42123'
+    ctrl.BoundingRectangle = rect
+    chatbox = SimpleNamespace(root=None)
+    return parse_msg_type(ctrl, chatbox, 'Self', {'direction': 'right'})
+
+
+class TestMessageRecord(unittest.TestCase):
+
+    def test_to_record(self):
+        record = make_message().to_record()
+        self.assertEqual(record.id, '42123')
+        self.assertEqual(record.type, 'quote')
+        self.assertEqual(record.attr, 'self')
+        self.assertEqual(record.content, '好的')
+        self.assertEqual(record.direction, 'right')
+        self.assertIsNone(record.rect)
+        self.assertIsNone(record.hash)
+        self.assertEqual(record['quote_nickname'], '张三')
+        self.assertTrue(record.is_self)
+        data = record.to_dict()
+        self.assertEqual(data['quote_content'], '明天开会')
+        self.assertNotIn('control', data)
+        self.assertNotIn('parent', data)
+
+    def test_rect_and_hash_are_opt_in(self):
+        from superwx4.param import WxParam
+        msg = make_message()
+        self.assertEqual(msg.to_record(rect=True).rect, (0, 100, 300, 160))
+        self.assertNotIn('hash', msg.__dict__)
+        old = WxParam.MESSAGE_HASH
+        WxParam.MESSAGE_HASH = True
+        try:
+            self.assertEqual(len(msg.to_record().hash), 32)
+        finally:
+            WxParam.MESSAGE_HASH = old
+
+    def test_public_payload_unchanged(self):
+        # MCP / skill 输出 to_dict()，不包含记录专有字段和几何判断信息
+        data = make_message().to_dict()
+        for key in ('rect', 'hash', 'type', 'attr', 'direction_source', 'direction_confidence'):
+            self.assertNotIn(key, data)
+        self.assertEqual(data['content'], '好的')
+        self.assertEqual(data['direction'], 'right')
+
+    def test_immutable_and_slotted(self):
+        record = make_message().to_record()
+        self.assertFalse(hasattr(record, '__dict__'))
+        with self.assertRaises(AttributeError):
+            record.content = 'x'
+        record.to_dict()['content'] = 'x'
+        self.assertEqual(record['content'], '好的')
+
+    def test_pickle_roundtrip(self):
+        record = make_message().to_record()
+        clone = pickle.loads(pickle.dumps(record))
+        self.assertEqual(clone.to_dict(), record.to_dict())
+        self.assertEqual(clone, record)
+        self.assertEqual(hash(clone), hash(record))
+
+    def test_message_mapping_access(self):
+        from superwx4.param import WxParam
+        msg = make_message()
+        self.assertEqual(msg['content'], '好的')
+        self.assertEqual(msg.get('missing', 1), 1)
+        self.assertIn('quote_nickname', msg)
+        self.assertNotIn('control', msg)
+        self.assertNotIn('_fields', msg)
+        self.assertEqual(set(msg), set(msg.to_dict()))
+        self.assertEqual(len(msg), len(msg.to_dict()))
+        self.assertEqual(WxParam.MESSAGE_HASH, 'hash' in msg)
+        with self.assertRaises(KeyError):
+            msg['parent']
+
+    def test_public_fields_precomputed(self):
+        from superwx4.param import WxParam
+        msg = make_message()
+        size = len(msg)
+        cache = msg.__dict__['_public_cache']
+        self.assertIn('content', msg)
+        self.assertEqual(len(msg), size)
+        self.assertIs(msg.__dict__['_public_cache'], cache)
+        # cached lazy fields and new attributes keep the set consistent
+        msg.hash_text
+        self.assertEqual(len(msg), size)
+        msg.note = 'x'
+        self.assertEqual(len(msg), size + 1)
+        self.assertIn('note', msg)
+        old = WxParam.MESSAGE_HASH
+        WxParam.MESSAGE_HASH = not old
+        try:
+            # 'note' plus 'hash' appearing or disappearing with the switch
+            self.assertEqual(len(msg), size + 1 + (1 if WxParam.MESSAGE_HASH else -1))
+            self.assertEqual(len(msg), len(msg.to_dict()))
+        finally:
+            WxParam.MESSAGE_HASH = old
+
+
+if __name__ == '__main__':
+    unittest.main()
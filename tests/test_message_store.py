@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""Test: SQLite message store, dedupe and resume after restart."""
+import sys
+import os
+import time
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+
+def record(i, content=None):
+    from superwx4.msgs.record import MessageRecord
+    content = content or f'msg {i}'
+    return MessageRecord(id=str(i), type='text', attr='friend', content=content,
+                         hash=f'h-{content}', extra={'sender': 'a'})
+
+
+class TestMessageStore(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'msgs.db')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_wal_and_batch_insert(self):
+        from superwx4.store import MessageStore
+        store = MessageStore(self.path)
+        mode = store._conn.execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual(mode.lower(), 'wal')
+        inserted = store.add_batch({'a': [record(1), record(2)], 'b': [record(1)]})
+        self.assertEqual(inserted, 3)
+        self.assertEqual(store.chats(), ['a', 'b'])
+        got = store.messages('a')
+        self.assertEqual([m.content for m in got], ['msg 1', 'msg 2'])
+        self.assertEqual(got[0]['sender'], 'a')
+        self.assertEqual(got[0]['chat'], 'a')
+        store.close()
+
+    def test_dedupe(self):
+        from superwx4.store import MessageStore
+        store = MessageStore(':memory:')
+        store.add('a', [record(1), record(2)])
+        # the last message is delivered again
+        self.assertEqual(store.add('a', [record(2)]), 0)
+        # same content in a different bubble is kept
+        self.assertEqual(store.add('a', [record(3, 'msg 2')]), 1)
+        self.assertEqual(store.count('a'), 3)
+
+    def test_dedupe_ignores_write_order(self):
+        from superwx4.store import MessageStore
+        store = MessageStore(':memory:')
+        store.add('a', [record(1), record(2), record(3)])
+        # redelivered out of order or after other messages
+        self.assertEqual(store.add('a', [record(1)]), 0)
+        self.assertEqual(store.add('a', [record(3), record(2), record(4)]), 1)
+        self.assertEqual(store.add_batch({'a': [record(2)], 'b': [record(2)]}), 1)
+        self.assertEqual([m.id for m in store.messages('a')], ['1', '2', '3', '4'])
+
+    def test_recycled_id_is_new_message(self):
+        from superwx4.store import MessageStore
+        store = MessageStore(':memory:')
+        store.add('a', [record(1, 'ok')])
+        # the list item is reused for another message, then for 'ok' again
+        store.add('a', [record(1, 'later')])
+        self.assertEqual(store.add('a', [record(1, 'ok')]), 1)
+        self.assertEqual(store.add('a', [record(1, 'ok')]), 0)
+        self.assertEqual([m.content for m in store.messages('a')], ['ok', 'later', 'ok'])
+
+    def test_since_and_limit(self):
+        from superwx4.store import MessageStore
+        store = MessageStore(':memory:')
+        store.add('a', [record(1)])
+        mark = time.time()
+        time.sleep(0.01)
+        store.add('a', [record(2), record(3)])
+        self.assertEqual([m.id for m in store.messages('a', since=mark)], ['2', '3'])
+        self.assertEqual([m.id for m in store.recent('a', 1)], ['3'])
+
+    def test_resume_after_restart(self):
+        from superwx4.store import MessageStore
+        store = MessageStore(self.path)
+        store.add('a', [record(i) for i in range(5)])
+        self.assertEqual(store.high_water('a')['hash'], 'h-msg 4')
+        store.close()
+
+        store = MessageStore(self.path)
+        # after restart the list shows old messages plus two that arrived offline
+        visible = [record(i) for i in range(2, 7)]
+        self.assertEqual([m.id for m in store.missed('a', visible)], ['5', '6'])
+        self.assertEqual(store.missed('unknown', visible), [])
+        store.close()
+
+    def test_listener_writes_and_resumes(self):
+        from superwx4.store import MessageStore
+        from superwx4.wx import WeChat
+        store = MessageStore(':memory:')
+        store.add('a', [record(1)])
+        wx = WeChat.__new__(WeChat)
+        wx.listen = {}
+        wx._listener_start(store=store, thread=False)
+        chat = MagicMock()
+        chat._api.HWND = None
+        chat.GetAllMessage.return_value = [record(1), record(2)]
+        chat.GetNewMessage.side_effect = [[], [record(3)]]
+        received = []
+        wx.listen['a'] = (chat, lambda msg, chat: received.append(msg.id))
+        wx._get_listen_messages(['a'])
+        wx._get_listen_messages(['a'])
+        wx._listener_stop()
+        self.assertEqual(received, ['2', '3'])
+        self.assertEqual([m.id for m in wx.GetStoredMessages('a')], ['1', '2', '3'])
+
+    def test_history_reads_store_first(self):
+        from superwx4.store import MessageStore
+        from superwx4.wx import Chat, WeChat
+        store = MessageStore(':memory:')
+        store.add('a', [record(i) for i in range(5)])
+        wx = WeChat.__new__(WeChat)
+        wx.listen = {}
+        wx._listener_start(store=store, thread=False)
+        api = MagicMock()
+        api.nickname = 'a'
+        api.HWND = None
+        api.get_history_msg.return_value = ['scrolled']
+        chat = Chat(api)
+        wx.listen['a'] = (chat, None)
+        wx._listener_watch('a', chat)
+        self.assertEqual([m.id for m in chat.GetHistoryMessage(n=3)], ['2', '3', '4'])
+        api.get_history_msg.assert_not_called()
+        # not enough stored messages: scroll the UI
+        self.assertEqual(chat.GetHistoryMessage(n=10), ['scrolled'])
+        wx.RemoveListenChat('a')
+        self.assertEqual(chat.GetHistoryMessage(n=3), ['scrolled'])
+        wx._listener_stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
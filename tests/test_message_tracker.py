@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""Test: per-window new-message tracker and ChatBox.get_new_msgs on top of it."""
+import sys
+import os
+import json
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+
+class TestMessageTracker(unittest.TestCase):
+
+    def test_bounded_ids_evict_oldest(self):
+        from superwx4.utils.tracker import MessageTracker
+        tracker = MessageTracker(maxlen=3)
+        tracker.baseline('chat', ['a', 'b', 'c'], 3)
+        tracker.update('chat', ['d'], 4)
+        self.assertEqual(tracker.seen('chat'), ('b', 'c', 'd'))
+        self.assertEqual(tracker.unseen('chat', ['a', 'c', 'e']), ['a', 'e'])
+        self.assertEqual(tracker.last_count('chat'), 4)
+
+    def test_chats_are_lru_bounded(self):
+        from superwx4.utils.tracker import MessageTracker
+        tracker = MessageTracker(max_chats=2)
+        tracker.baseline('a', [1])
+        tracker.baseline('b', [1])
+        tracker.seen('a')
+        tracker.baseline('c', [1])
+        self.assertTrue(tracker.has('a'))
+        self.assertFalse(tracker.has('b'))
+        tracker.evict('a')
+        self.assertFalse(tracker.has('a'))
+
+    def test_snapshot_restore_is_json_safe(self):
+        from superwx4.utils.tracker import MessageTracker
+        tracker = MessageTracker()
+        tracker.baseline('chat', ['1', '2'], 2)
+        data = json.loads(json.dumps(tracker.snapshot()))
+        clone = MessageTracker()
+        clone.restore(data)
+        self.assertEqual(clone.seen('chat'), ('1', '2'))
+        self.assertEqual(clone.last_count('chat'), 2)
+
+    def test_concurrent_updates(self):
+        from superwx4.utils.tracker import MessageTracker
+        tracker = MessageTracker(maxlen=10000)
+
+        def work(n):
+            for i in range(500):
+                tracker.update('chat', [f'{n}-{i}'])
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(tracker.size('chat'), 4000)
+
+    def test_registry_drops_dead_windows(self):
+        from superwx4.utils.tracker import get_tracker
+        first = get_tracker(-101)
+        self.assertIs(get_tracker(-101), first)
+        get_tracker(-102, alive=lambda hwnd: hwnd != -101)
+        self.assertIsNot(get_tracker(-101), first)
+
+
+def make_control(item):
+    runtimeid, name = item if isinstance(item, tuple) else (item, f'msg {item}')
+    ctrl = MagicMock()
+    ctrl.runtimeid = runtimeid
+    ctrl.Name = name
+    ctrl.BoundingRectangle.height.return_value = 40
+    ctrl.ControlTypeName = 'ListItemControl'
+    return ctrl
+
+
+class TestGetNewMsgs(unittest.TestCase):
+
+    def make_chatbox(self, ids):
+        from superwx4.ui.chatbox import ChatBox
+        from superwx4.utils.tracker import MessageTracker
+        chatbox = ChatBox.__new__(ChatBox)
+        chatbox.tracker = MessageTracker()
+        chatbox._empty = False
+        chatbox.msgbox = MagicMock()
+        chatbox.msgbox.runtimeid = 'box'
+        chatbox.msgbox.Exists.return_value = True
+        chatbox.msgbox.GetChildren.return_value = [make_control(i) for i in ids]
+        return chatbox
+
+    def poll(self, chatbox, ids):
+        chatbox.msgbox.GetChildren.return_value = [make_control(i) for i in ids]
+        with patch('superwx4.ui.chatbox.parse_msgs', lambda controls, box: [c.runtimeid for c in controls]):
+            return chatbox.get_new_msgs()
+
+    def test_incremental_polls(self):
+        chatbox = self.make_chatbox([])
+        self.assertEqual(self.poll(chatbox, ['1', '2']), [])
+        self.assertEqual(self.poll(chatbox, ['1', '2']), [])
+        self.assertEqual(self.poll(chatbox, ['1', '2', '3', '4']), ['3', '4'])
+        self.assertEqual(self.poll(chatbox, ['2', '3', '4', '5']), ['5'])
+        self.assertEqual(chatbox.used_msg_ids, ('1', '2', '3', '4', '5'))
+
+    def test_recycled_id_with_new_content(self):
+        chatbox = self.make_chatbox([])
+        self.poll(chatbox, [('1', 'a'), ('2', 'b')])
+        # the list recycled item '1' for a new message; count did not grow
+        self.assertEqual(self.poll(chatbox, [('2', 'b'), ('1', 'c')]), ['1'])
+        self.assertEqual(self.poll(chatbox, [('2', 'b'), ('1', 'c')]), [])
+
+    def test_fallback_without_fingerprints(self):
+        from superwx4.param import WxParam
+        old = WxParam.MESSAGE_DIFF
+        WxParam.MESSAGE_DIFF = False
+        try:
+            chatbox = self.make_chatbox([])
+            self.poll(chatbox, ['1', '2'])
+            self.assertEqual(self.poll(chatbox, ['1', '2', '3']), ['3'])
+        finally:
+            WxParam.MESSAGE_DIFF = old
+
+
+if __name__ == '__main__':
+    unittest.main()
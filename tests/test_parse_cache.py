@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""Test: per-ChatBox parse result memo.
+
+A second parse of the same (runtimeid, Name, width, height) must rebuild
+the message without touching the frame capture.
+"""
+import sys
+import os
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+
+def make_rect(left, top, right, bottom):
+    rect = MagicMock()
+    rect.left, rect.top, rect.right, rect.bottom = left, top, right, bottom
+    rect.width.return_value = right - left
+    rect.height.return_value = bottom - top
+    return rect
+
+
+def make_msg_control(name='hello', runtimeid='42', classname='mmui::ChatTextItemView'):
+    ctrl = MagicMock()
+    ctrl.AutomationId = 'msg_item'
+    ctrl.ClassName = classname
+    ctrl.Name = name
+    ctrl.runtimeid = runtimeid
+    ctrl.BoundingRectangle = make_rect(0, 0, 300, 60)
+    return ctrl
+
+
+def make_chatbox(maxsize=8):
+    from PIL import Image
+    from superwx4.utils.cache import LRUCache
+    bubble = Image.new('RGB', (300, 60), (237, 237, 237))
+    for x in range(200, 290):
+        for y in range(15, 45):
+            bubble.putpixel((x, y), (149, 236, 105))
+    chatbox = SimpleNamespace(root=None, parse_cache=LRUCache(maxsize))
+    chatbox.frame_capture = MagicMock()
+    chatbox.frame_capture.view.return_value = bubble
+    return chatbox
+
+
+class TestParseCache(unittest.TestCase):
+
+    def test_hit_skips_pixels(self):
+        from superwx4.msgs.msg import parse_msg
+        chatbox = make_chatbox()
+        ctrl = make_msg_control()
+        first = parse_msg(ctrl, chatbox)
+        second = parse_msg(ctrl, chatbox)
+        self.assertEqual(chatbox.frame_capture.view.call_count, 1)
+        self.assertIs(type(first), type(second))
+        self.assertEqual(first.attr, 'self')
+        self.assertEqual(second.direction, first.direction)
+        self.assertEqual(chatbox.parse_cache.stats()['hits'], 1)
+        self.assertEqual(chatbox.parse_cache.stats()['misses'], 1)
+
+    def test_recycled_runtimeid_with_new_name_misses(self):
+        from superwx4.msgs.msg import parse_msg
+        chatbox = make_chatbox()
+        parse_msg(make_msg_control(name='a'), chatbox)
+        parse_msg(make_msg_control(name='b'), chatbox)
+        self.assertEqual(chatbox.frame_capture.view.call_count, 2)
+
+    def test_clear_invalidates(self):
+        from superwx4.msgs.msg import parse_msg
+        chatbox = make_chatbox()
+        ctrl = make_msg_control()
+        parse_msg(ctrl, chatbox)
+        chatbox.parse_cache.clear()
+        parse_msg(ctrl, chatbox)
+        self.assertEqual(chatbox.frame_capture.view.call_count, 2)
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        from superwx4.utils.cache import LRUCache
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertEqual(len(cache), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""Test: staged batch message parsing.
+
+parse_msgs must return the same messages, in the same order, as calling
+parse_msg one by one — with or without a worker pool.
+"""
+import sys
+import os
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+WIDTH, ROW = 300, 60
+
+
+def make_rect(left, top, right, bottom):
+    rect = MagicMock()
+    rect.left, rect.top, rect.right, rect.bottom = left, top, right, bottom
+    rect.width.return_value = right - left
+    rect.height.return_value = bottom - top
+    return rect
+
+
+def make_frame(sides):
+    from PIL import Image
+    img = Image.new('RGB', (WIDTH, ROW * len(sides)), (237, 237, 237))
+    for row, side in enumerate(sides):
+        x0, x1 = (10, 120) if side == 'left' else (180, 290)
+        for x in range(x0, x1):
+            for y in range(row * ROW + 15, row * ROW + 45):
+                img.putpixel((x, y), (149, 236, 105))
+    return img
+
+
+def make_controls(sides):
+    controls = []
+    for row, side in enumerate(sides):
+        ctrl = MagicMock()
+        ctrl.AutomationId = '' if side == 'system' else 'msg_item'
+        ctrl.ClassName = 'mmui::ChatTextItemView'
+        ctrl.Name = f'msg {row}'
+        ctrl.runtimeid = (row,)
+        ctrl.GetChildren.return_value = []
+        ctrl.BoundingRectangle = make_rect(0, row * ROW, WIDTH, (row + 1) * ROW)
+        controls.append(ctrl)
+    return controls
+
+
+def make_chatbox(sides):
+    from superwx4.utils.cache import LRUCache
+    from superwx4.utils.frame import FrameCapture
+    grabs = []
+
+    def grabber(hwnd):
+        grabs.append(hwnd)
+        return make_frame(sides), (0, 0, WIDTH, ROW * len(sides))
+
+    chatbox = SimpleNamespace(root=None, msgbox=None, parse_cache=LRUCache(64))
+    chatbox.frame_capture = FrameCapture(lambda: 1, grabber)
+    return chatbox, grabs
+
+
+SIDES = ['left', 'right', 'system', 'right', 'left', 'left', 'right']
+
+
+class TestParseMsgs(unittest.TestCase):
+
+    def describe(self, msgs):
+        return [(m.__class__.__name__, m.content) for m in msgs]
+
+    def test_matches_single_parse_in_order(self):
+        from superwx4.msgs.msg import parse_msg, parse_msgs
+        chatbox, _ = make_chatbox(SIDES)
+        expected = self.describe([parse_msg(c, chatbox) for c in make_controls(SIDES)])
+        for executor in (None, ThreadPoolExecutor(max_workers=3)):
+            chatbox, grabs = make_chatbox(SIDES)
+            msgs = parse_msgs(make_controls(SIDES), chatbox, executor=executor)
+            self.assertEqual(self.describe(msgs), expected)
+            self.assertEqual(len(grabs), 1)
+            if executor is not None:
+                executor.shutdown()
+        self.assertEqual(expected[0][0], 'FriendTextMessage')
+        self.assertEqual(expected[1][0], 'SelfTextMessage')
+        self.assertEqual(expected[2][0], 'SystemMessage')
+
+    def test_stats_and_cache(self):
+        from superwx4.msgs.msg import parse_msgs
+        chatbox, grabs = make_chatbox(SIDES)
+        controls = make_controls(SIDES)
+        parse_msgs(controls, chatbox)
+        stats = chatbox.last_parse_stats
+        self.assertEqual(stats['count'], len(SIDES))
+        self.assertEqual(stats['pixel'], len(SIDES) - 1)
+        for key in ('uia_ms', 'analysis_wait_ms', 'assemble_ms', 'total_ms'):
+            self.assertIn(key, stats)
+        parse_msgs(controls, chatbox)
+        self.assertEqual(chatbox.last_parse_stats['pixel'], 0)
+        self.assertEqual(len(grabs), 1)
+
+    def test_ignore_errors_skips_broken_control(self):
+        from superwx4.msgs.msg import parse_msgs
+        chatbox, _ = make_chatbox(SIDES)
+        controls = make_controls(SIDES)
+        type(controls[3]).AutomationId = property(lambda self: 1 / 0)
+        with self.assertRaises(ZeroDivisionError):
+            parse_msgs(controls, chatbox, executor=None)
+        msgs = parse_msgs(controls, chatbox, executor=None, ignore_errors=True)
+        self.assertEqual(len(msgs), len(SIDES) - 1)
+        self.assertNotIn('msg 3', [m.content for m in msgs])
+
+
+class TestParseExecutorLease(unittest.TestCase):
+
+    def setUp(self):
+        from superwx4.param import WxParam
+        self.saved = (WxParam.PARSE_EXECUTOR, WxParam.PARSE_WORKERS)
+        WxParam.PARSE_EXECUTOR, WxParam.PARSE_WORKERS = 'thread', 2
+
+    def tearDown(self):
+        from superwx4.param import WxParam
+        WxParam.PARSE_EXECUTOR, WxParam.PARSE_WORKERS = self.saved
+
+    def test_leased_pool_outlives_switch(self):
+        from superwx4.param import WxParam
+        from superwx4.msgs.msg import get_parse_executor, lease_parse_executor
+        with lease_parse_executor() as old:
+            WxParam.PARSE_WORKERS = 3
+            self.assertIsNot(get_parse_executor(), old)
+            # 参数已变化，但借出的旧线程池仍可提交
+            self.assertEqual(old.submit(int, '1').result(), 1)
+        with self.assertRaises(RuntimeError):
+            old.submit(int, '1')
+        with lease_parse_executor() as current:
+            self.assertIs(current, get_parse_executor())
+        self.assertEqual(current.submit(int, '2').result(), 2)
+
+    def test_concurrent_parse_while_switching(self):
+        import threading
+        from superwx4.param import WxParam
+        from superwx4.msgs.msg import parse_msg, parse_msgs
+        chatbox, _ = make_chatbox(SIDES)
+        expected = self.describe([parse_msg(c, chatbox) for c in make_controls(SIDES)])
+        errors, results = [], []
+
+        def worker():
+            try:
+                for _ in range(10):
+                    chatbox, _ = make_chatbox(SIDES)
+                    results.append(self.describe(parse_msgs(make_controls(SIDES), chatbox)))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        while any(t.is_alive() for t in threads):
+            WxParam.PARSE_WORKERS = 5 - WxParam.PARSE_WORKERS
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results), 40)
+        self.assertTrue(all(r == expected for r in results))
+
+    describe = TestParseMsgs.describe
+
+
+if __name__ == '__main__':
+    unittest.main()
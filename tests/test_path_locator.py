@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""Test: recorded index-path locator follows, verifies and re-records paths."""
+import sys
+import os
+import json
+import tempfile
+import unittest
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+# the memory backend runs without pywin32 / comtypes
+os.environ.setdefault('SUPERWX4_UI_BACKEND', 'memory')
+
+
+def group(children=(), **props):
+    return dict(props, ControlType="GroupControl", children=list(children))
+
+
+WINDOW = {
+    "ControlType": "WindowControl",
+    "ClassName": "mmui::MainWindow",
+    "Name": "微信",
+    "children": [
+        group(AutomationId="MainView", children=[
+            group(ClassName="mmui::MainTabBar"),
+            group(ClassName="mmui::XView", children=[
+                group(ClassName="mmui::XSplitterView", children=[
+                    group(ClassName="mmui::XStackedView"),
+                    group(AutomationId="primary_table_", children=[
+                        {"ControlType": "ScrollBarControl"},
+                        {"ControlType": "ListControl", "AutomationId": "primary_table_.contact_list",
+                         "children": [{"ControlType": "ListItemControl", "Name": "张三"}]},
+                    ]),
+                ]),
+            ]),
+        ]),
+    ],
+}
+
+
+class TestPathLocator(unittest.TestCase):
+
+    def setUp(self):
+        from superwx4.backend.memory import MemoryTree
+        self.tree = MemoryTree()
+        self.win = self.tree.load(WINDOW)
+        self.main = self.win.GroupControl(AutomationId="MainView")
+        self.file = os.path.join(tempfile.mkdtemp(), "paths.json")
+        self.searches = 0
+
+    def search(self):
+        self.searches += 1
+        return self.main.ListControl(AutomationId="primary_table_.contact_list")
+
+    def test_record_then_follow_from_cold_start(self):
+        from superwx4.locator.paths import PathLocator
+        locator = PathLocator("4.0.3.22", self.file)
+        found = locator.locate(self.main, "contact_list", self.search)
+        self.assertEqual(found.AutomationId, "primary_table_.contact_list")
+        self.assertEqual(locator.paths["contact_list"], [
+            (1, "mmui::XView", ""),
+            (0, "mmui::XSplitterView", ""),
+            (1, "", "primary_table_"),
+            (1, "", "primary_table_.contact_list"),
+        ])
+        # 新进程读取同一版本的路径，不再查找
+        cold = PathLocator("4.0.3.22", self.file)
+        self.tree.reset_stats()
+        again = cold.locate(self.main, "contact_list", self.search)
+        self.assertEqual(again, found)
+        self.assertEqual(self.searches, 1)
+        self.assertEqual(self.tree.calls["FindControl"], 0)
+        self.assertEqual(self.tree.calls["GetChildrenCached"], 4)
+        self.assertEqual(cold.stats(), {"hits": 1, "misses": 0, "mismatches": 0, "paths": 1})
+
+    def test_mismatch_falls_back_and_rerecords(self):
+        from superwx4.locator.paths import PathLocator
+        locator = PathLocator("4.0.3.22", self.file)
+        locator.locate(self.main, "contact_list", self.search)
+        # 新版本界面在前面插入了一个控件，索引整体后移
+        self.tree.add(group(ClassName="mmui::Banner"), parent=self.main, index=0)
+        found = locator.locate(self.main, "contact_list", self.search)
+        self.assertEqual(found.AutomationId, "primary_table_.contact_list")
+        self.assertEqual(self.searches, 2)
+        self.assertEqual(locator.paths["contact_list"][0], (2, "mmui::XView", ""))
+        self.assertEqual(locator.stats()["mismatches"], 1)
+        self.assertEqual(locator.follow(self.main, "contact_list"), found)
+
+    def test_paths_are_per_version(self):
+        from superwx4.locator.paths import PathLocator
+        PathLocator("4.0.3.22", self.file).locate(self.main, "contact_list", self.search)
+        PathLocator("4.1.0.10", self.file).locate(self.main, "contact_list", self.search)
+        with open(self.file, encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual(set(data), {"4.0.3.22", "4.1.0.10"})
+        self.assertEqual(self.searches, 2)
+        missing = PathLocator("4.0.3.22", self.file).locate(self.main, "other", lambda: None)
+        self.assertIsNone(missing)
+
+    def test_contactbox_uses_recorded_path(self):
+        from superwx4.param import WxParam
+        from superwx4.ui.contactbox import ContactBox
+
+        class Root:
+            control = self.win
+
+            def _get_wx_version(self):
+                return "4.0.3.22"
+
+        old = WxParam.LOCATOR_PATHS
+        WxParam.LOCATOR_PATHS = self.file
+        try:
+            box = ContactBox(Root())
+            first = box._find_contact_list()
+            self.tree.reset_stats()
+            second = box._find_contact_list()
+        finally:
+            WxParam.LOCATOR_PATHS = old
+        self.assertEqual(first.AutomationId, "primary_table_.contact_list")
+        self.assertEqual(second, first)
+        # 只查找了 MainView，联系人列表沿路径取得
+        self.assertEqual(self.tree.calls["FindControl"], 1)
+
+    def test_default_keeps_paths_in_memory(self):
+        from superwx4.param import WxParam
+        from superwx4.locator.paths import get_path_locator
+        self.assertEqual(WxParam.LOCATOR_PATHS, '')
+        self.assertIsNone(get_path_locator("4.0.3.22").path)
+
+
+if __name__ == '__main__':
+    unittest.main()
+# 1
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""Test: adaptive per-chat poll scheduler."""
+import sys
+import os
+import unittest
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPollScheduler(unittest.TestCase):
+
+    def make(self, **kwargs):
+        from superwx4.listen import PollScheduler
+        clock = FakeClock()
+        kwargs.setdefault('min_interval', 1)
+        kwargs.setdefault('max_interval', 8)
+        return PollScheduler(clock=clock, **kwargs), clock
+
+    def test_idle_backoff_and_snap_back(self):
+        scheduler, clock = self.make()
+        scheduler.add('a')
+        intervals = []
+        for _ in range(5):
+            self.assertEqual(scheduler.pop_due(), ['a'])
+            scheduler.report('a', 0)
+            intervals.append(scheduler.stats()['a']['interval'])
+            clock.now += scheduler.next_wait()
+        self.assertEqual(intervals, [2, 4, 8, 8, 8])
+        scheduler.pop_due()
+        scheduler.report('a', 3)
+        self.assertEqual(scheduler.rates()['a'], 1.0)
+        self.assertEqual(scheduler.stats()['a']['messages'], 3)
+
+    def test_busy_chat_polled_more_often(self):
+        scheduler, clock = self.make()
+        scheduler.add('busy')
+        scheduler.add('quiet')
+        polls = {'busy': 0, 'quiet': 0}
+        while clock.now < 60:
+            for key in scheduler.pop_due():
+                polls[key] += 1
+                scheduler.report(key, 1 if key == 'busy' else 0)
+            clock.now += scheduler.next_wait() or 1
+        self.assertGreater(polls['busy'], 4 * polls['quiet'])
+
+    def test_budget_limits_polls_per_second(self):
+        scheduler, clock = self.make(budget=2)
+        for i in range(10):
+            scheduler.add(i)
+        self.assertEqual(len(scheduler.pop_due()), 2)
+        self.assertEqual(scheduler.pop_due(), [])
+        self.assertAlmostEqual(scheduler.next_wait(), 0.5)
+        clock.now += 1
+        self.assertEqual(len(scheduler.pop_due()), 2)
+
+    def test_per_chat_min_interval(self):
+        scheduler, clock = self.make()
+        scheduler.add('slow', min_interval=100)
+        self.assertEqual(scheduler.pop_due(), ['slow'])
+        scheduler.report('slow', 0)
+        self.assertEqual(scheduler.next_wait(), 100)
+        clock.now += 100
+        scheduler.pop_due()
+        scheduler.report('slow', 2)
+        self.assertEqual(scheduler.stats()['slow']['interval'], 100)
+        # an event still makes it due at once
+        scheduler.poke('slow')
+        self.assertEqual(scheduler.pop_due(), ['slow'])
+
+    def test_poke_and_remove(self):
+        scheduler, clock = self.make()
+        scheduler.add('a')
+        scheduler.pop_due()
+        scheduler.report('a', 0)
+        self.assertEqual(scheduler.pop_due(), [])
+        scheduler.poke('a')
+        self.assertEqual(scheduler.pop_due(), ['a'])
+        scheduler.remove('a')
+        scheduler.report('a', 0)
+        self.assertIsNone(scheduler.next_wait())
+        self.assertNotIn('a', scheduler)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""Test: session recorder writes deltas and replay reproduces the UI tree."""
+import sys
+import os
+import gzip
+import json
+import tempfile
+import unittest
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+# the memory backend runs without pywin32 / comtypes
+os.environ.setdefault('SUPERWX4_UI_BACKEND', 'memory')
+
+
+def message(i):
+    return {
+        "ControlType": "ListItemControl",
+        "ClassName": "mmui::ChatTextItemView",
+        "Name": f"消息{i}",
+        "Rect": {"left": 300, "top": 40 * i, "right": 1000, "bottom": 40 * i + 40},
+        "children": [{"ControlType": "TextControl", "Name": f"消息{i}"}],
+    }
+
+
+WINDOW = {
+    "ControlType": "WindowControl",
+    "ClassName": "mmui::MainWindow",
+    "Name": "微信",
+    "children": [
+        {"ControlType": "ListControl", "AutomationId": "session_list", "Name": "会话",
+         "children": [{"ControlType": "ListItemControl", "Name": "群聊"}]},
+        {"ControlType": "GroupControl", "ClassName": "mmui::ChatMessagePage", "children": [
+            {"ControlType": "ListControl", "AutomationId": "chat_message_list", "Name": "消息"},
+        ]},
+    ],
+}
+
+
+class TestTreeDiff(unittest.TestCase):
+
+    def test_diff_apply_round_trip(self):
+        from superwx4.backend.recording import diff_tree, apply_patch
+        old = {"ControlType": "ListControl", "children": [message(i) for i in range(10)]}
+        new = json.loads(json.dumps(old))
+        del new["children"][0]
+        new["children"][3]["children"][0]["Name"] = "已撤回"
+        new["children"].extend(message(i) for i in range(10, 13))
+        new["Name"] = "消息"
+        patch = diff_tree(old, new)
+        self.assertEqual(apply_patch(old, patch), new)
+        self.assertIsNone(diff_tree(old, json.loads(json.dumps(old))))
+        # 只有新消息与修改的节点写入差异
+        inserted = [op for op in patch["c"] if op[0] == "+"]
+        self.assertEqual(sum(len(op[1]) for op in inserted), 3)
+        self.assertTrue(any(op[0] == "~" for op in patch["c"]))
+
+    def test_removed_properties(self):
+        from superwx4.backend.recording import diff_tree, apply_patch
+        old = {"ControlType": "TextControl", "Name": "a", "Extra": 1}
+        new = {"ControlType": "TextControl", "Name": "b"}
+        patch = diff_tree(old, new)
+        self.assertEqual(patch, {"p": {"Name": "b"}, "x": ["Extra"]})
+        self.assertEqual(apply_patch(old, patch), new)
+
+
+class TestRecordReplay(unittest.TestCase):
+
+    def setUp(self):
+        from superwx4.backend.memory import MemoryTree, get_tree
+        self.previous = get_tree()
+        self.source = MemoryTree()
+        self.win = self.source.load(WINDOW)
+        self.msgbox = self.win.ListControl(AutomationId='chat_message_list')
+        self.sessions = self.win.ListControl(AutomationId='session_list')
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        from superwx4.backend.memory import set_tree
+        set_tree(self.previous)
+
+    def record_burst(self, path, total=2000, per_frame=100):
+        from superwx4.backend.recording import SessionRecorder
+        recorder = SessionRecorder(
+            path, {'main': self.msgbox, 'session_list': self.sessions}, keyframe_every=1000
+        )
+        recorder.snapshot()
+        for start in range(0, total, per_frame):
+            for i in range(start, start + per_frame):
+                self.source.add(message(i), parent=self.msgbox)
+            # 微信只保留可见的若干条
+            for old in self.msgbox.GetChildren()[:-50]:
+                self.source.remove(old)
+            recorder.snapshot()
+        # 没有变化的帧不写入
+        self.assertEqual(recorder.snapshot(), 0)
+        recorder.close()
+        return recorder
+
+    def test_replay_reproduces_final_state(self):
+        from superwx4.backend.memory import get_tree
+        from superwx4.backend.recording import ReplayDriver
+        path = os.path.join(self.tmp, 'burst.jsonl.gz')
+        self.record_burst(path)
+        frames = []
+        driver = ReplayDriver(path, on_frame=lambda t, names: frames.append(names))
+        self.assertIs(get_tree(), driver.tree)
+        stats = driver.run(speed=None)
+        self.assertEqual(stats['frames'], 21)
+        self.assertEqual(frames[0], ['main', 'session_list'])
+        replayed = driver.controls['main']
+        self.assertEqual(
+            driver.tree.dump(replayed, runtime_ids=False)['children'],
+            self.source.dump(self.msgbox, runtime_ids=False)['children'],
+        )
+        # 两个控件挂在同一个重建的主窗口下，可以按原来的方式查找
+        windows = driver.tree.root.GetChildren()
+        self.assertEqual(len(windows), 1)
+        self.assertEqual(windows[0].ClassName, 'mmui::MainWindow')
+        self.assertEqual(windows[0].ListControl(AutomationId='chat_message_list'), replayed)
+        self.assertEqual(replayed.GetChildren()[-1].Name, '消息1999')
+
+    def test_deltas_keep_file_small_and_ids_stable(self):
+        from superwx4.backend.recording import ReplayDriver, Recording
+        path = os.path.join(self.tmp, 'burst.jsonl')
+        self.record_burst(path, total=200, per_frame=5)
+        recording = Recording(path)
+        frames = list(recording)
+        self.assertTrue(all(not f.keyframes for f in frames[1:]))
+        full = sum(len(json.dumps(s, ensure_ascii=False)) for _, s in recording.snapshots())
+        self.assertLess(os.path.getsize(path), full / 4)
+
+        driver = ReplayDriver(path)
+        driver.step()
+        driver.step()
+        before = {c.Name: c.runtimeid for c in driver.controls['main'].GetChildren()}
+        driver.step()
+        after = {c.Name: c.runtimeid for c in driver.controls['main'].GetChildren()}
+        # 仍然可见的消息保持同一元素
+        common = set(before) & set(after)
+        self.assertTrue(common)
+        self.assertTrue(all(before[name] == after[name] for name in common))
+
+    def test_timed_replay_and_until(self):
+        from superwx4.backend.recording import ReplayDriver
+        path = os.path.join(self.tmp, 'timed.jsonl')
+        lines = [
+            {"version": 1, "started": 0, "max_depth": 12, "roots": {"main": {"path": []}}},
+            {"t": 0.0, "k": {"main": {"ControlType": "ListControl", "Name": "a"}}},
+            {"t": 0.5, "d": {"main": {"p": {"Name": "b"}}}},
+            {"t": 1.0, "d": {"main": {"p": {"Name": "c"}}}},
+        ]
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(json.dumps(line) for line in lines))
+        driver = ReplayDriver(path)
+        stats = driver.run(speed=10, until=0.6)
+        self.assertEqual(stats['frames'], 2)
+        self.assertEqual(driver.controls['main'].Name, 'b')
+        self.assertGreaterEqual(stats['replay_seconds'], 0.04)
+        driver.start(speed=None)
+        self.assertTrue(driver.join(5))
+        self.assertEqual(driver.controls['main'].Name, 'c')
+
+    def test_gzip_file_is_json_lines(self):
+        path = os.path.join(self.tmp, 'small.jsonl.gz')
+        self.record_burst(path, total=10, per_frame=5)
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            rest = [json.loads(line) for line in f]
+        self.assertEqual(set(header['roots']), {'main', 'session_list'})
+        self.assertEqual(header['roots']['main']['path'][0]['ClassName'], 'mmui::MainWindow')
+        self.assertEqual(len(rest), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
+# 1
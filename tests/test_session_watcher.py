@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Test: session-list unread watcher and GetNextNewMessage on top of it."""
+import sys
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+
+class FakeSessionBox:
+
+    def __init__(self):
+        self.root = None
+        self.rows = []
+        self.reads = 0
+
+    def get_session(self):
+        from superwx4.ui.sessionbox import SessionElement
+        self.reads += 1
+        return [SessionElement(MagicMock(Name=name), self) for name in self.rows]
+
+
+class TestSessionWatcher(unittest.TestCase):
+
+    def make(self, rows):
+        from superwx4.ui.sessionbox import SessionWatcher
+        box = FakeSessionBox()
+        box.rows = rows
+        return SessionWatcher(box), box
+
+    def names(self, sessions):
+        return [s.name for s in sessions]
+
+    def test_reports_unread_until_acked(self):
+        watcher, box = self.make(['张三\n[2条]你好', '李四\n在吗', '公众号\n[3条]推送'])
+        active = watcher.poll()
+        self.assertEqual(self.names(active), ['张三'])
+        self.assertEqual(active[0].unread_count, 2)
+        self.assertEqual(self.names(watcher.poll()), ['张三'])
+        watcher.ack(active[0])
+        self.assertEqual(watcher.poll(), [])
+        box.rows = ['张三\n[3条]还在吗', '李四\n在吗']
+        self.assertEqual(self.names(watcher.poll()), ['张三'])
+        self.assertEqual(box.reads, 4)
+
+    def test_filter_mute(self):
+        watcher, _ = self.make(['群聊\n[5条]消息\n消息免打扰', '张三\n[1条]hi'])
+        self.assertEqual(self.names(watcher.poll()), ['群聊', '张三'])
+        self.assertEqual(self.names(watcher.poll(filter_mute=True)), ['张三'])
+
+    def open_sessions(self):
+        """Stand-in for clicking a session row; records the opened session names."""
+        from superwx4.param import WxResponse
+        from superwx4.ui.sessionbox import SessionElement
+        return patch.object(SessionElement, 'click', autospec=True, return_value=WxResponse.success())
+
+    def make_wx(self, watcher, clicked):
+        from superwx4.wx import WeChat
+        wx = WeChat.__new__(WeChat)
+        wx._session_watcher = watcher
+        wx._api = MagicMock()
+        wx.ChatBox = MagicMock()
+        # the open chat is the last clicked session
+        wx.ChatBox.get_last_msgs.side_effect = lambda n: [
+            f'{clicked.call_args.args[0].name}{i}' for i in range(n)
+        ]
+        return wx
+
+    def opened(self, clicked):
+        return [c.args[0].name for c in clicked.call_args_list]
+
+    def test_get_next_new_message_bounded(self):
+        from superwx4.param import WxParam
+        from superwx4.ui.sessionbox import SessionWatcher
+        watcher, box = self.make(['a\n[2条]x', 'b\n[2条]y', 'c\n[2条]z'])
+        old = WxParam.GET_NEXT_MAX_QUANTITY
+        WxParam.GET_NEXT_MAX_QUANTITY = 3
+        try:
+            with self.open_sessions() as clicked:
+                wx = self.make_wx(watcher, clicked)
+                # 'b' is cut by the limit: its oldest unread message is returned now, the rest next time
+                self.assertEqual(wx.GetNextNewMessage(), ['a0', 'a1', 'b0'])
+                self.assertEqual(self.opened(clicked), ['a', 'b'])
+                # opening a chat clears its badge; 'c' was not reached and is still unread
+                box.rows = ['a\nx', 'b\ny', 'c\n[2条]z']
+                self.assertEqual(wx.GetNextNewMessage(), ['b1', 'c0', 'c1'])
+                box.rows = ['a\nx', 'b\ny', 'c\nz']
+                self.assertEqual(wx.GetNextNewMessage(), [])
+                self.assertEqual(self.opened(clicked), ['a', 'b', 'c'])
+            # every opened session was read completely before being acked
+            self.assertEqual([c.args[0] for c in wx.ChatBox.get_last_msgs.call_args_list], [2, 2, 2])
+            wx._api.switch_chat.assert_not_called()
+        finally:
+            WxParam.GET_NEXT_MAX_QUANTITY = old
+        self.assertIsInstance(wx._session_watcher, SessionWatcher)
+
+    def test_get_next_new_message_callback_stop_keeps_rest(self):
+        from superwx4.param import WxParam
+        watcher, box = self.make(['a\n[3条]x'])
+        stop = lambda msg, chat: WxParam.CALLBACK_STOP_SIGN if msg == 'a0' else None
+        with self.open_sessions() as clicked:
+            wx = self.make_wx(watcher, clicked)
+            self.assertEqual(wx.GetNextNewMessage(callback=stop), ['a0'])
+            box.rows = ['a\nx']
+            self.assertEqual(wx.GetNextNewMessage(), ['a1', 'a2'])
+            # the rest came from the pending queue, the chat was not opened again
+            self.assertEqual(self.opened(clicked), ['a'])
+
+if __name__ == '__main__':
+    unittest.main()
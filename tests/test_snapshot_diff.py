@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Test: anchor-based alignment of visible message snapshots.
+
+Generated traffic: an append-only message stream whose runtime ids come
+from a small recycled pool, observed through a sliding visible window.
+"""
+import sys
+import os
+import random
+import unittest
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+
+def generate_stream(rnd, n, id_pool=12):
+    """Messages with recycled ids; content stays unique so fingerprints do."""
+    return [
+        (str(rnd.randrange(id_pool)), f'msg-{i}-{rnd.randrange(1000)}', rnd.choice((40, 60, 80)))
+        for i in range(n)
+    ]
+
+
+class TestAlignSnapshots(unittest.TestCase):
+
+    def test_simple_append(self):
+        from superwx4.utils.diff import align_snapshots
+        prev = [('1', 'a', 40), ('2', 'b', 40), ('3', 'c', 40)]
+        curr = [('2', 'b', 40), ('3', 'c', 40), ('1', 'd', 40), ('2', 'e', 40)]
+        alignment = align_snapshots(prev, curr)
+        self.assertTrue(alignment.anchored)
+        self.assertEqual(alignment.start, 2)
+        self.assertEqual(alignment.offset, -1)
+
+    def test_recycled_id_is_not_treated_as_seen(self):
+        from superwx4.utils.diff import appended
+        prev = [('1', 'a', 40), ('2', 'b', 40)]
+        # id '1' comes back with different content: it is a new message
+        curr = [('2', 'b', 40), ('1', 'c', 40)]
+        self.assertEqual(appended(prev, curr), [1])
+
+    def test_duplicate_content_is_not_doubled(self):
+        from superwx4.utils.diff import appended
+        prev = [('1', 'ok', 40), ('2', 'ok', 40)]
+        self.assertEqual(appended(prev, list(prev)), [])
+
+    def test_scroll_up_has_no_new_messages(self):
+        from superwx4.utils.diff import appended
+        stream = generate_stream(random.Random(1), 30)
+        self.assertEqual(appended(stream[10:20], stream[5:15]), [])
+
+    def test_no_overlap(self):
+        from superwx4.utils.diff import align_snapshots, appended
+        stream = generate_stream(random.Random(2), 30)
+        self.assertFalse(align_snapshots(stream[:10], stream[20:]).anchored)
+        self.assertEqual(appended(stream[:10], stream[20:]), list(range(10)))
+
+    def test_changed_items_in_overlap(self):
+        from superwx4.utils.diff import align_snapshots
+        prev = [('1', 'a', 40), ('2', 'b', 40), ('3', 'c', 40), ('4', 'd', 40)]
+        curr = [('1', 'a', 40), ('2', 'b', 40), ('3', '撤回', 40), ('4', 'd', 40), ('5', 'e', 40)]
+        alignment = align_snapshots(prev, curr)
+        self.assertEqual(alignment.start, 4)
+        self.assertEqual(alignment.changed, (2,))
+
+    def test_property_generated_traffic(self):
+        from superwx4.utils.diff import appended
+        rnd = random.Random(20261017)
+        for _ in range(200):
+            stream = generate_stream(rnd, 300)
+            window = rnd.randrange(3, 25)
+            end = rnd.randrange(window, 200)
+            delivered = []
+            prev = stream[end - window:end]
+            while end < len(stream):
+                # keep at least one message of overlap between polls
+                burst = min(rnd.choice((0, 0, 1, 1, 2, 3, 5, window - 1)), window - 1)
+                grown = min(end + burst, len(stream)) - end
+                end += grown
+                curr = stream[end - window:end]
+                new = [curr[i] for i in appended(prev, curr)]
+                self.assertEqual(new, curr[window - grown:])
+                delivered.extend(new)
+                prev = curr
+            # every message after the first window is delivered exactly once, in order
+            self.assertEqual(delivered, stream[len(stream) - len(delivered):])
+
+
+if __name__ == '__main__':
+    unittest.main()
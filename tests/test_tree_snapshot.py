@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""Test: tree snapshot fetches a subtree in one call and answers queries in memory."""
+import sys
+import os
+import unittest
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+# the memory backend runs without pywin32 / comtypes
+os.environ.setdefault('SUPERWX4_UI_BACKEND', 'memory')
+
+
+def rect(left, top, right, bottom):
+    return {"left": left, "top": top, "right": right, "bottom": bottom}
+
+
+def node(control_type, children=(), **props):
+    return dict(props, ControlType=control_type, children=list(children))
+
+
+def moment(i):
+    top = 100 + i * 200
+    return node("ListItemControl", ClassName="mmui::TimelineCell", Name=f"动态{i}", Rect=rect(0, top, 600, top + 180), children=[
+        node("TextControl", Name=f"好友{i}", Rect=rect(10, top + 10, 200, top + 30)),
+        node("ButtonControl", Name="评论", ClassName="mmui::XButton", Rect=rect(500, top + 140, 540, top + 160)),
+        # 灰色分割线
+        node("ListItemControl", ClassName="mmui::TimelineCommentCell", Rect=rect(0, top + 170, 600, top + 172)),
+    ])
+
+
+SNS = node("WindowControl", ClassName="mmui::SNSWindow", Name="朋友圈", Rect=rect(0, 0, 600, 1000), children=[
+    node("GroupControl", ClassName="mmui::XView", Rect=rect(0, 0, 600, 1000), children=[
+        node("ListControl", ClassName="mmui::XRecyclerList", AutomationId="sns_moment_list", Rect=rect(0, 60, 600, 1000),
+             children=[moment(i) for i in range(4)]),
+        node("ButtonControl", Name="赞", ClassName="mmui::XButton", Rect=rect(420, 230, 460, 250)),
+        node("ButtonControl", Name="赞", ClassName="mmui::XButton", Rect=rect(420, 830, 460, 850)),
+    ]),
+])
+
+
+class TestTreeSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        from superwx4.backend.memory import MemoryTree
+        self.tree = MemoryTree()
+        self.sns = self.tree.load(SNS)
+
+    def test_queries_cost_one_call(self):
+        from superwx4.locator.snapshot import TreeSnapshot
+        snap = TreeSnapshot(self.sns)
+        self.tree.reset_stats()
+        cells = snap.find_all(control_type="ListItemControl", class_name="mmui::TimelineCommentCell")
+        friends = snap.find_all(regex_name=r"^好友\d$")
+        comment = snap.find(name="评论", control_type="ButtonControl")
+        self.assertEqual(len(cells), 4)
+        self.assertEqual(len(friends), 4)
+        self.assertEqual(comment.parent.Name, "动态0")
+        self.assertEqual(snap.find(sub_name="动态").depth, 3)
+        self.assertEqual(len(snap.find_all(control_type="ListItemControl", limit=2)), 2)
+        self.assertIsNone(snap.find(name="不存在"))
+        self.assertEqual(sum(self.tree.calls.values()), 1)
+        self.assertEqual(self.tree.calls["GetSubtreeCached"], 1)
+        self.assertEqual(snap.walks, 1)
+
+    def test_breadth_first_order_and_structure(self):
+        from superwx4.locator.snapshot import TreeSnapshot
+        snap = TreeSnapshot(self.sns)
+        depths = [n.depth for n in snap]
+        self.assertEqual(depths, sorted(depths))
+        self.assertEqual(len(snap), 1 + 1 + 2 + 4 * 4)
+        sns_list = snap.find(automation_id="sns_moment_list")
+        self.assertEqual([c.Name for c in sns_list.children], [f"动态{i}" for i in range(4)])
+        self.assertEqual(sns_list.control, self.sns.ListControl(AutomationId="sns_moment_list"))
+        self.assertEqual(len(TreeSnapshot(self.sns, max_depth=2)), 4)
+        self.assertEqual(len(TreeSnapshot(self.sns, max_nodes=3)), 3)
+
+    def test_near_returns_nearest_first(self):
+        from superwx4.locator.snapshot import TreeSnapshot
+        snap = TreeSnapshot(self.sns)
+        hits = snap.near(470, 240, 100, control_type="ButtonControl")
+        self.assertEqual([h.Name for h in hits], ["赞", "评论"])
+        self.assertEqual(snap.near(470, 240, 10, name="评论"), [])
+
+    def test_invalidate_and_ttl(self):
+        from superwx4.locator.snapshot import TreeSnapshot
+        snap = TreeSnapshot(self.sns)
+        self.assertIsNone(snap.find(name="取消"))
+        self.tree.add(node("ButtonControl", Name="取消", Rect=rect(420, 230, 460, 250)), parent=self.sns.GroupControl())
+        # 快照不会自动看到界面变化
+        self.assertIsNone(snap.find(name="取消"))
+        snap.invalidate()
+        self.assertIsNotNone(snap.find(name="取消"))
+        self.assertEqual(snap.walks, 2)
+
+        expiring = TreeSnapshot(self.sns, ttl=0)
+        expiring.find_all()
+        self.assertFalse(TreeSnapshot(self.sns, ttl=60).refresh().stale)
+        expiring.taken_at -= 1
+        self.assertTrue(expiring.stale)
+        expiring.find_all()
+        self.assertEqual(expiring.walks, 2)
+
+    def test_moment_queries_use_snapshot(self):
+        from superwx4.moment import Moment, MomentList
+        m = Moment.__new__(Moment)
+        self.tree.reset_stats()
+        seps = m._find_comment_separators(self.sns)
+        self.assertEqual([s[0] for s in seps], [270, 470, 670, 870])
+        self.assertEqual(seps[0][5].ClassName, "mmui::TimelineCommentCell")
+        ctrls = m._find_like_panel_controls_near(self.sns, 470, 240, radius=100)
+        self.assertEqual([c.Name for c in ctrls], ["赞", "评论"])
+        self.assertEqual(m._pick_like_button(ctrls).BoundingRectangle.top, 230)
+        self.assertEqual(self.tree.calls["GetSubtreeCached"], 2)
+        self.assertEqual(self.tree.calls["GetChildren"], 0)
+
+        class Api:
+            control = self.sns
+
+        class Parent:
+            _api = Api()
+
+        self.tree.reset_stats()
+        found = MomentList._locate_list(MomentList.__new__(MomentList), Parent())
+        self.assertEqual(found.AutomationId, "sns_moment_list")
+        self.assertEqual(self.tree.calls["GetSubtreeCached"], 1)
+        self.assertEqual(self.tree.calls["GetChildren"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
+# 1
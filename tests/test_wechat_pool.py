@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Test: multi-account pool sharing one listener thread."""
+import sys
+import os
+import time
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+# Ensure project root is on path
+CUR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CUR not in sys.path:
+    sys.path.insert(0, CUR)
+
+
+def make_wechat(info):
+    from superwx4.wx import WeChat
+    from superwx4.param import WxResponse
+    wx = WeChat.__new__(WeChat)
+    wx.listen = {}
+    wx.nickname = f'wx{info.pid}'
+    wx._api = MagicMock()
+    wx.inbox = []
+
+    def open_separate_window(nickname):
+        subwin = MagicMock()
+        subwin.nickname = nickname
+        subwin.HWND = None
+        subwin.exists.return_value = True
+        batches = [[MagicMock(attr='friend', content=f'{info.pid}-1')]]
+        subwin.get_new_msgs.side_effect = lambda: batches.pop(0) if batches else []
+        return subwin
+
+    wx._api.open_separate_window.side_effect = open_separate_window
+    wx.SendMsg = lambda msg, who=None, **kwargs: WxResponse.success(data={'account': info.pid, 'msg': msg})
+    return wx
+
+
+class TestWeChatPool(unittest.TestCase):
+
+    def make_pool(self, n):
+        from superwx4.pool import WeChatPool, AccountInfo
+        pool = WeChatPool(factory=make_wechat, discover=False)
+        for pid in range(1, n + 1):
+            pool.add(AccountInfo(pid, 100 + pid, '微信'))
+        return pool
+
+    def test_lazy_init_and_routing(self):
+        pool = self.make_pool(2)
+        self.assertEqual(pool.GetStats()[1]['initialized'], False)
+        result = pool.SendMsg(2, 'hi', who='a')
+        self.assertEqual(result['data']['account'], 2)
+        self.assertIs(pool[102], pool.get(2))
+        stats = pool.GetStats()
+        self.assertFalse(stats[1]['initialized'])
+        self.assertEqual(stats[2]['sent'], 1)
+        with self.assertRaises(KeyError):
+            pool.get(99)
+
+    def test_single_listener_thread(self):
+        pool = self.make_pool(6)
+        received = []
+
+        def listen(pid):
+            pool.AddListenChat(pid, 'same', lambda msg, chat: received.append(msg.content))
+
+        listen(1)
+        baseline = threading.active_count()
+        for pid in range(2, 7):
+            listen(pid)
+        self.assertEqual(threading.active_count(), baseline)
+        deadline = time.time() + 3
+        total = lambda: sum(s['received'] for s in pool.GetStats().values())
+        while (len(received) < 6 or total() < 6) and time.time() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(total(), 6)
+        pool.StopListening()
+        self.assertEqual(sorted(received), sorted(f'{pid}-1' for pid in range(1, 7)))
+
+
+if __name__ == '__main__':
+    unittest.main()